@@ -0,0 +1,93 @@
+"""
+Benchmark du recalcul incrémental des sessions de brief
+
+Pour chaque brief synthétique, ouvre une session /improve puis ajoute des
+réponses aux questions manquantes, une à une : compare le recalcul par
+session (recompute_session, seul le texte des réponses est analysé) à un
+nouvel appel du pipeline complet de /improve sur la description concaténée
+avec les questions et réponses. Vérifie que les scores qualité des deux voies
+concordent.
+
+Usage (depuis apps/ml) :
+    python -m benchmarks.brief_session --briefs 200
+"""
+
+import argparse
+import logging
+import random
+import time
+
+import numpy as np
+
+from main import ProjectImproveRequest, build_improvement, recompute_session
+
+PHRASES = [
+    "Nous voulons un site web pour notre restaurant avec menu en ligne.",
+    "Refonte complète du site vitrine de l'entreprise, responsive et rapide.",
+    "Application mobile iphone et android avec chat et notifications.",
+    "Boutique en ligne avec paiement, espace admin et api de livraison.",
+    "Nouveau logo simple et charte graphique pour une association.",
+    "Outil interne de gestion des stocks, backend python et base de données.",
+]
+ANSWERS = {
+    "objective": ["Augmenter les réservations de 20%", "Remplacer un fichier Excel partagé"],
+    "scope": ["Inclure menu, galerie et formulaire de contact", "Hors maintenance et hébergement"],
+    "requirements": ["Le site doit être responsive, backend simple", "Compatible avec notre ERP"],
+    "deliverables": ["Codes sources et documentation", "Fichiers PDF et SVG"],
+    "timeline": ["Avant fin mars", "Urgent, sous deux semaines"],
+    "budget": ["5 000 - 8 000 €", "Environ 3k€"],
+}
+
+
+def _briefs(n_briefs: int, rng: random.Random):
+    return [
+        ProjectImproveRequest(
+            title=f"Projet {i}",
+            description=" ".join(rng.sample(PHRASES, rng.randint(1, 3))) * rng.randint(1, 4),
+            budget_max=rng.choice([None, 1500, 5000])
+        )
+        for i in range(n_briefs)
+    ]
+
+
+def run(n_briefs: int, rounds: int):
+    rng = random.Random(5)
+    incremental, full, mismatches, answered = [], [], 0, 0
+    for request in _briefs(n_briefs, rng):
+        response, session = build_improvement(request)
+        description = request.description
+        for missing in response.missing_info[:rounds]:
+            answer = {"id": missing["id"], "q": missing["q"], "a": rng.choice(ANSWERS[missing["id"]])}
+            description = f"{description}\n{missing['q']} {answer['a']}"
+
+            start = time.perf_counter()
+            session, recomputed = recompute_session("bench", session, [answer])
+            incremental.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            rerun, _ = build_improvement(request.model_copy(update={"description": description}))
+            full.append(time.perf_counter() - start)
+
+            answered += 1
+            mismatches += (recomputed.brief_quality_score != rerun.brief_quality_score
+                           or recomputed.richness_score != rerun.richness_score)
+
+    incremental, full = np.array(incremental) * 1e3, np.array(full) * 1e3
+    print(f"{n_briefs} briefs, {answered} réponses (scores qualité divergents : {mismatches})")
+    for label, timings in (("recalcul de session", incremental), ("/improve complet", full)):
+        print(f"  {label:<20} p50 {np.percentile(timings, 50):7.3f} ms  p99 {np.percentile(timings, 99):7.3f} ms  "
+              f"moyenne {timings.mean():7.3f} ms")
+    print(f"  gain moyen x{full.mean() / incremental.mean():.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--briefs", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=3, help="réponses ajoutées par brief")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+    run(args.briefs, args.rounds)
+
+
+if __name__ == "__main__":
+    main()
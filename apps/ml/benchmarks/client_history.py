@@ -0,0 +1,94 @@
+"""
+Benchmark du feature store historique client
+
+Charge N clients depuis un CSV synthétique, applique un journal d'événements,
+puis mesure l'empreinte mémoire (rapportée à un million de clients) et la
+latence de lookup avec et sans cache LRU, comparée à un dict de dicts.
+
+Usage (depuis apps/ml) :
+    python -m benchmarks.client_history --clients 1000000
+"""
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from services.client_history_store import ClientHistoryStore
+
+
+def _write_data(data_path: Path, n_clients: int, n_events: int):
+    rng = random.Random(7)
+    with open(data_path / "client_history.csv", "w", encoding="utf-8") as f:
+        f.write("client_id,missions_posted,missions_completed,avg_budget\n")
+        for i in range(n_clients):
+            posted = rng.randrange(1, 40)
+            f.write(f"cl_{i:08d},{posted},{rng.randrange(posted + 1)},{rng.randrange(200, 20000)}\n")
+    with open(data_path / "client_events.jsonl", "w", encoding="utf-8") as f:
+        for _ in range(n_events):
+            event = {"client_id": f"cl_{rng.randrange(n_clients * 2):08d}",
+                     "type": rng.choice(["mission_posted", "mission_completed"]), "budget": 1500}
+            f.write(json.dumps(event) + "\n")
+
+
+def _time_lookups(get, keys):
+    start = time.perf_counter()
+    for key in keys:
+        get(key)
+    return (time.perf_counter() - start) / len(keys) * 1e9
+
+
+def run(n_clients: int, n_events: int, n_lookups: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        data_path = Path(tmp)
+        _write_data(data_path, n_clients, n_events)
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        store = ClientHistoryStore(str(data_path), cache_size=10000)
+        load_time = time.perf_counter() - start
+        store_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        rng = random.Random(3)
+        cold_keys = [f"cl_{rng.randrange(n_clients):08d}" for _ in range(n_lookups)]
+        hot_keys = [f"cl_{rng.randrange(1000):08d}" for _ in range(n_lookups)]
+        cold_ns = _time_lookups(store.get, cold_keys)
+        hot_ns = _time_lookups(store.get, hot_keys)
+
+        tracemalloc.start()
+        naive = {}
+        with open(data_path / "client_history.csv", encoding="utf-8") as f:
+            next(f)
+            for line in f:
+                client_id, posted, completed, avg_budget = line.rstrip("\n").split(",")
+                naive[client_id] = {"missions_posted": int(posted), "missions_completed": int(completed),
+                                    "avg_budget": float(avg_budget)}
+        naive_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+    per_million = 1_000_000 / max(len(store), 1) / (1024 * 1024)
+    footprint = store.memory_footprint()
+    print(f"{len(store)} clients ({n_clients} chargés, {store.events_applied} événements), chargement {load_time:.2f} s")
+    print(f"feature store : {store_bytes * per_million:8.1f} Mo / million de clients (tracemalloc)")
+    print(f"                {footprint['mb_per_million_clients']:8.1f} Mo / million de clients (memory_footprint)")
+    print(f"dict de dicts : {naive_bytes * 1_000_000 / n_clients / (1024 * 1024):8.1f} Mo / million de clients")
+    print(f"lookup froid  : {cold_ns:8.0f} ns, lookup chaud (cache LRU) : {hot_ns:.0f} ns")
+    del naive
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=1000000)
+    parser.add_argument("--events", type=int, default=100000)
+    parser.add_argument("--lookups", type=int, default=200000)
+    args = parser.parse_args()
+    run(args.clients, args.events, args.lookups)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""
+Benchmark de l'analyse qualité incrémentale pendant la saisie
+
+Simule la frappe d'un brief caractère par caractère, entrecoupée de
+corrections (retours arrière, insertions au milieu du texte, collages), et
+mesure par frappe la latence de IncrementalBriefAnalyzer (modification +
+analyse) face à un BriefQualityAnalyzer.analyze complet du texte courant.
+Vérifie régulièrement que les deux analyses concordent.
+
+Usage (depuis apps/ml) :
+    python -m benchmarks.live_quality --sizes 500 1500 5000 --keystrokes 2000
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from services.brief_quality import BriefQualityAnalyzer
+
+PHRASES = [
+    "Nous voulons un site web pour notre restaurant avec menu en ligne.",
+    "L'objectif est d'augmenter les réservations de 20% avant l'été.",
+    "Le périmètre doit inclure la galerie, le formulaire de contact et un espace admin.",
+    "Livrables attendus : codes sources, documentation et formation.",
+    "Budget prévisionnel de 5 000 €, délai de 6 semaines, télétravail possible.",
+    "Application mobile responsive avec api et backend python.",
+]
+
+
+def _text(size: int, rng: random.Random) -> str:
+    text = ""
+    while len(text) < size:
+        text += rng.choice(PHRASES) + " "
+    return text[:size]
+
+
+def _keystroke(length: int, rng: random.Random):
+    """(start, end, texte) : frappe en fin de texte le plus souvent, sinon correction"""
+    draw = rng.random()
+    if draw < 0.75 or length == 0:
+        return length, length, rng.choice("abcdefghijklmnopqrstuvwxyzé ,.")
+    if draw < 0.9:
+        return length - 1, length, ""
+    position = rng.randint(0, length)
+    if draw < 0.97:
+        return position, position, rng.choice("abcdefghijklmnopqrstuvwxyz ")
+    return position, min(length, position + rng.randint(0, 20)), rng.choice(PHRASES)
+
+
+def run(sizes, keystrokes: int, check_every: int):
+    analyzer = BriefQualityAnalyzer()
+    for size in sizes:
+        rng = random.Random(size)
+        live = analyzer.live("Site vitrine restaurant", _text(size, rng))
+        incremental, full, mismatches = [], [], 0
+        for i in range(keystrokes):
+            start, end, text = _keystroke(len(live.description), rng)
+
+            begin = time.perf_counter()
+            live.apply_edit(start, end, text)
+            result = live.analysis()
+            incremental.append(time.perf_counter() - begin)
+
+            begin = time.perf_counter()
+            expected = analyzer.analyze(live.title, live.description)
+            full.append(time.perf_counter() - begin)
+
+            if i % check_every == 0:
+                mismatches += result != expected
+
+        incremental, full = np.array(incremental) * 1e3, np.array(full) * 1e3
+        print(f"{size} caractères, {keystrokes} frappes (analyses divergentes : {mismatches})")
+        for label, timings in (("incrémental", incremental), ("analyze complet", full)):
+            print(f"  {label:<16} p50 {np.percentile(timings, 50):7.3f} ms  p99 {np.percentile(timings, 99):7.3f} ms  "
+                  f"max {timings.max():7.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 1500, 5000])
+    parser.add_argument("--keystrokes", type=int, default=2000)
+    parser.add_argument("--check-every", type=int, default=1)
+    args = parser.parse_args()
+    run(args.sizes, args.keystrokes, args.check_every)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Benchmark du scoring LOC par lot : chemin colonnes numpy vs calculate_loc_with_uplift
+
+Génère des missions synthétiques, vérifie la parité (LOC, LOC potentiel, meilleur
+levier) avec le chemin unitaire sur un échantillon puis chronomètre score_batch.
+
+Usage (depuis apps/ml) :
+    python -m benchmarks.loc_batch --missions 100000 --check 20000
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from services.loc_uplift import UPLIFT_ACTIONS, loc_uplift_calculator
+
+CATEGORIES = ['developpement', 'mobile', 'design', 'marketing', 'travaux', 'menage', 'autre']
+DESCRIPTIONS = [
+    "Site vitrine pour un cabinet d'avocats",
+    "Application mobile urgente de réservation",
+    "Refonte du logo, pas pressé",
+    "Campagne SEO à lancer vite",
+    "Rénovation salle de bain, flexible sur les dates",
+    "Ménage hebdomadaire bureaux 200m2",
+]
+
+
+def generate_columns(n: int, seed: int = 42):
+    rng = random.Random(seed)
+    med = [rng.choice([0, 800, 1500, 3000, 5000, 12000]) for _ in range(n)]
+    return {
+        'budget': [rng.choice([0, 1]) * round(m * rng.uniform(0.5, 1.6)) for m in med],
+        'category': [rng.choice(CATEGORIES) for _ in range(n)],
+        'description': [f"{rng.choice(DESCRIPTIONS)} #{i}" for i in range(n)],
+        'client_id': [rng.choice([None, f"client-{rng.randrange(5000)}"]) for _ in range(n)],
+        'brief_quality_score': [round(rng.uniform(0.2, 0.95), 3) for _ in range(n)],
+        'price_suggested_min': [round(m * 0.7) for m in med],
+        'price_suggested_med': med,
+        'price_suggested_max': [round(m * 1.3) for m in med],
+        'heat_score': [round(rng.uniform(0.2, 0.9), 2) for _ in range(n)],
+        'missing_info_count': [rng.randrange(3) for _ in range(n)],
+    }
+
+
+def scalar_row(columns, i):
+    project_data = {
+        'budget': columns['budget'][i],
+        'category': columns['category'][i],
+        'description': columns['description'][i],
+        'client_id': columns['client_id'][i]
+    }
+    standardization_data = {
+        'brief_quality_score': columns['brief_quality_score'][i],
+        'price_suggested_min': columns['price_suggested_min'][i],
+        'price_suggested_med': columns['price_suggested_med'][i],
+        'price_suggested_max': columns['price_suggested_max'][i],
+        'missing_info': [None] * columns['missing_info_count'][i]
+    }
+    market_context = {
+        'price_suggested_med': columns['price_suggested_med'][i],
+        'heat_score': columns['heat_score'][i]
+    }
+    return loc_uplift_calculator.calculate_loc_with_uplift(project_data, standardization_data, market_context)
+
+
+def check_parity(columns, scores, sample: int):
+    mismatches = 0
+    for i in range(sample):
+        result = scalar_row(columns, i)
+        actions = sorted(result.loc_uplift_reco['actions'], key=lambda a: -a['expected_loc_improvement'])
+        expected_top = actions[0]['type'] if actions else None
+        top_index = scores['top_actions'][i, 0]
+        batch_top = UPLIFT_ACTIONS[top_index] if top_index >= 0 else None
+        if (result.loc_base != scores['loc'][i]
+                or not np.isclose(result.loc_uplift_reco['potential_final_loc'], scores['potential_loc'][i])
+                or expected_top != batch_top):
+            mismatches += 1
+    return mismatches
+
+
+def run(n: int, check: int, repeat: int):
+    columns = generate_columns(n)
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        scores = loc_uplift_calculator.score_batch(columns)
+        timings.append(time.perf_counter() - start)
+
+    check = min(check, n)
+    start = time.perf_counter()
+    mismatches = check_parity(columns, scores, check)
+    scalar_time = (time.perf_counter() - start) / max(check, 1)
+
+    print(f"{n} missions")
+    print(f"score_batch       : {min(timings) * 1000:.1f} ms (meilleur de {repeat})")
+    print(f"chemin unitaire   : {scalar_time * 1e6:.1f} µs/mission, soit ~{scalar_time * n:.2f} s pour le lot")
+    print(f"parité            : {check - mismatches}/{check} lignes identiques")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--missions", type=int, default=100000)
+    parser.add_argument("--check", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.missions, args.check, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
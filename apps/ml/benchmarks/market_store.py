@@ -0,0 +1,82 @@
+"""
+Benchmark de l'historique marché Arrow : agrégats par catégorie sur des millions de lignes
+
+Écrit N événements synthétiques en partitions Arrow IPC puis calcule les
+agrégats de chaque catégorie (memory mapping, colonnes utiles seulement,
+partition filtrée). Compare avec le chargement complet en pandas.
+
+Usage (depuis apps/ml) :
+    python -m benchmarks.market_store --rows 5000000
+"""
+
+import argparse
+import resource
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from services.market_stats import summarize
+from services.market_store import MarketDataStore
+
+CATEGORIES = ["development", "mobile", "design", "marketing", "travaux",
+              "services_personne", "jardinage", "comptabilite"]
+
+
+def _generate(store: MarketDataStore, n_rows: int, chunk: int = 1_000_000):
+    rng = np.random.default_rng(5)
+    for start in range(0, n_rows, chunk):
+        size = min(chunk, n_rows - start)
+        is_bid = rng.random(size) < 0.8
+        category = np.array(CATEGORIES)[rng.integers(0, len(CATEGORIES), size)]
+        price = np.where(is_bid, rng.lognormal(6, 0.6, size), np.nan)
+        store.append(pa.table({
+            "category": category,
+            "ts": time.time() - rng.uniform(0, 365 * 86400, size),
+            "type": np.where(is_bid, "bid", "mission"),
+            "budget": np.where(is_bid, np.nan, rng.lognormal(7, 0.5, size)),
+            "price": price,
+            "timeline_days": np.where(is_bid, rng.integers(1, 60, size), np.nan),
+            "provider_id": np.char.add("p", rng.integers(0, 20000, size).astype(str)),
+        }))
+
+
+def run(n_rows: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        store = MarketDataStore(Path(tmp) / "market")
+        start = time.perf_counter()
+        _generate(store, n_rows)
+        print(f"{n_rows} lignes écrites en {time.perf_counter() - start:.1f} s")
+
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        pool = pa.default_memory_pool()
+        start = time.perf_counter()
+        for category in store.categories():
+            summary = summarize(store.category_stats(category))
+            print(f"  {category:<18} offres={summary['bids']:>8} p50={summary['price_p50']:8.1f} "
+                  f"prestataires≈{summary['providers']}")
+        elapsed = time.perf_counter() - start
+        rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        print(f"agrégats Arrow : {elapsed:.2f} s, pic pool Arrow {pool.max_memory() / 2**20:.0f} Mo, "
+              f"hausse du RSS max {(rss_after - rss_before) / 1024:.0f} Mo")
+
+        start = time.perf_counter()
+        frame = ds.dataset(str(store.root), format="ipc", partitioning="hive").to_table().to_pandas()
+        bids = frame[frame["type"] == "bid"]
+        bids.groupby("category")["price"].quantile([0.1, 0.5, 0.9])
+        print(f"pandas (table complète en mémoire) : {time.perf_counter() - start:.2f} s, "
+              f"{frame.memory_usage(deep=True).sum() / 2**20:.0f} Mo")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    args = parser.parse_args()
+    run(args.rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark de l'index des missions similaires : latence et rappel
+
+Missions synthétiques thématiques (sujets par catégorie + vocabulaire de fond
+zipfien). Le rappel@k de chaque réglage `query_terms` est mesuré par rapport
+à la recherche exacte (tous les termes de la requête).
+
+Usage (depuis apps/ml) :
+    python -m benchmarks.mission_index --missions 1000000 --categories 20 --queries 300
+"""
+
+import argparse
+import random
+import string
+import tempfile
+import time
+
+import numpy as np
+
+from services.mission_index import MissionIndex
+
+
+class _Generator:
+    def __init__(self, categories: int, seed: int = 42):
+        self.rng = random.Random(seed)
+        self.np_rng = np.random.default_rng(seed)
+        self.vocabulary = ["".join(self.rng.choices(string.ascii_lowercase, k=self.rng.randint(4, 10)))
+                           for _ in range(30000)]
+        self.categories = [f"cat{i}" for i in range(categories)]
+        self.topics = {
+            category: [self.rng.sample(self.vocabulary, 40) for _ in range(50)] for category in self.categories
+        }
+
+    def mission(self, mission_id: int):
+        category = self.rng.choice(self.categories)
+        topic = self.rng.choice(self.topics[category])
+        length = self.rng.randint(12, 40)
+        background = np.minimum(self.np_rng.zipf(1.3, size=length // 2), len(self.vocabulary)) - 1
+        words = self.rng.choices(topic, k=length - len(background)) + [self.vocabulary[i] for i in background]
+        return {
+            'mission_id': str(mission_id),
+            'category': category,
+            'title': " ".join(words[:5]),
+            'description': " ".join(words),
+            'final_price': self.rng.randint(300, 20000)
+        }
+
+
+def _percentiles(values):
+    values = np.array(values)
+    return f"p50 {np.percentile(values, 50):6.2f} ms  p95 {np.percentile(values, 95):6.2f} ms"
+
+
+def run(n_missions: int, n_categories: int, n_queries: int, k: int):
+    generator = _Generator(n_categories)
+    with tempfile.TemporaryDirectory() as tmp:
+        index = MissionIndex(data_path=tmp)
+        start = time.perf_counter()
+        chunk = 50000
+        for offset in range(0, n_missions, chunk):
+            index.add_many([generator.mission(i) for i in range(offset, min(offset + chunk, n_missions))])
+        build_s = time.perf_counter() - start
+        print(f"{len(index)} missions, {n_categories} catégories : indexation {build_s:.1f} s "
+              f"({len(index) / build_s:.0f} missions/s), {index.get_stats()['index_mb']} Mo")
+
+        start = time.perf_counter()
+        index.save()
+        save_s = time.perf_counter() - start
+        start = time.perf_counter()
+        reloaded = MissionIndex(data_path=tmp)
+        print(f"persistance : écriture {save_s:.1f} s, rechargement {time.perf_counter() - start:.1f} s "
+              f"({len(reloaded)} missions)")
+
+    queries = [generator.mission(n_missions + i) for i in range(n_queries)]
+    texts = [f"{q['title']} {q['description']}" for q in queries]
+
+    exact, latencies = [], []
+    for text, query in zip(texts, queries):
+        start = time.perf_counter()
+        exact.append({m.mission_id for m in index.search(text, query['category'], k)})
+        latencies.append((time.perf_counter() - start) * 1000)
+    print(f"{'exact':<16}{_percentiles(latencies)}  rappel@{k} 1.000")
+
+    for query_terms in (16, 8, 4):
+        latencies, recall = [], []
+        for text, query, truth in zip(texts, queries, exact):
+            start = time.perf_counter()
+            found = {m.mission_id for m in index.search(text, query['category'], k, query_terms=query_terms)}
+            latencies.append((time.perf_counter() - start) * 1000)
+            recall.append(len(found & truth) / len(truth) if truth else 1.0)
+        print(f"{f'query_terms={query_terms}':<16}{_percentiles(latencies)}  rappel@{k} {np.mean(recall):.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--missions", type=int, default=1000000)
+    parser.add_argument("--categories", type=int, default=20)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+    run(args.missions, args.categories, args.queries, args.k)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Benchmark du modèle spaCy partagé
+
+Débit (docs/s) : appel texte par texte sur le pipeline complet (ancien
+chargement), appel unitaire via le provider (parser exclu, NER désactivé),
+puis `pipe` par lots en mono et multi-processus.
+
+Mémoire : N instances chargeant chacune le modèle (ancien SmartBriefProcessor)
+comparées à N utilisateurs du provider partagé, mesurées dans des processus
+neufs.
+
+Usage (depuis apps/ml) :
+    python -m benchmarks.nlp_provider --docs 5000 --instances 4 --processes 2
+"""
+
+import argparse
+import multiprocessing as mp
+import random
+import time
+
+from services.nlp_provider import DEFAULT_MODEL, NLPProvider
+from services.shared_store import process_memory
+
+FRAGMENTS = [
+    "Nous souhaitons créer un site e-commerce en React avec paiement Stripe",
+    "le back-office doit permettre la gestion des stocks et des commandes",
+    "refonte du logo et de la charte graphique de l'entreprise à Lyon",
+    "campagne SEO et Google Ads pour une boutique en ligne de vêtements",
+    "application mobile Flutter pour la prise de rendez-vous",
+    "le budget est de 5000 euros et la livraison attendue sous deux mois",
+]
+
+
+def _corpus(n_docs: int):
+    rng = random.Random(42)
+    return [". ".join(rng.sample(FRAGMENTS, 3)) + "." for _ in range(n_docs)]
+
+
+def _rate(count: int, seconds: float) -> str:
+    return f"{count / seconds:>10.0f} docs/s  ({seconds:.2f} s)"
+
+
+def _throughput(texts, processes: int, batch_size: int):
+    import spacy
+
+    full = spacy.load(DEFAULT_MODEL)
+    start = time.perf_counter()
+    for text in texts:
+        full(text)
+    print(f"{'unitaire, pipeline complet':<34}{_rate(len(texts), time.perf_counter() - start)}")
+
+    provider = NLPProvider(batch_size=batch_size)
+    provider.get()
+    start = time.perf_counter()
+    for text in texts:
+        provider(text)
+    print(f"{'unitaire, provider':<34}{_rate(len(texts), time.perf_counter() - start)}")
+
+    start = time.perf_counter()
+    for _ in provider.pipe(texts):
+        pass
+    print(f"{f'pipe batch={batch_size}':<34}{_rate(len(texts), time.perf_counter() - start)}")
+
+    if processes > 1:
+        start = time.perf_counter()
+        for _ in provider.pipe(texts, n_process=processes):
+            pass
+        label = f"pipe batch={batch_size} n_process={processes}"
+        print(f"{label:<34}{_rate(len(texts), time.perf_counter() - start)}")
+
+
+def _memory_worker(mode: str, instances: int, queue):
+    baseline = process_memory()['rss_kb']
+    if mode == "per_instance":
+        import spacy
+        models = [spacy.load(DEFAULT_MODEL) for _ in range(instances)]
+        for model in models:
+            model("Création d'un site vitrine")
+    else:
+        provider = NLPProvider()
+        for _ in range(instances):
+            provider("Création d'un site vitrine")
+    queue.put((mode, process_memory()['rss_kb'] - baseline))
+
+
+def _memory(instances: int):
+    spawn = mp.get_context("spawn")
+    queue = spawn.Queue()
+    results = {}
+    for mode in ("per_instance", "shared"):
+        process = spawn.Process(target=_memory_worker, args=(mode, instances, queue))
+        process.start()
+        name, delta_kb = queue.get()
+        process.join()
+        results[name] = delta_kb / 1024
+
+    print(f"\nMémoire pour {instances} instances (RSS ajouté au processus)")
+    print(f"{'chargement par instance':<34}{results['per_instance']:>10.1f} Mo")
+    print(f"{'provider partagé':<34}{results['shared']:>10.1f} Mo")
+    print(f"{'économie':<34}{results['per_instance'] - results['shared']:>10.1f} Mo")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--processes", type=int, default=2)
+    parser.add_argument("--instances", type=int, default=4)
+    args = parser.parse_args()
+
+    print(f"Modèle {DEFAULT_MODEL}, {args.docs} briefs")
+    _throughput(_corpus(args.docs), args.processes, args.batch_size)
+    _memory(args.instances)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark de l'analyse qualité par lot
+
+Compare, sur des briefs synthétiques, une boucle de
+BriefQualityAnalyzer.analyze à BriefQualityAnalyzer.analyze_many, puis la
+seule phase de notation (états déjà extraits) : analyze_state brief par brief
+face à analyze_states, qui calcule les scores pondérés du lot en opérations
+matricielles. Vérifie que les analyses concordent.
+
+Usage (depuis apps/ml) :
+    python -m benchmarks.quality_batch --sizes 100 1000 10000
+"""
+
+import argparse
+import random
+import time
+
+from benchmarks.live_quality import PHRASES
+from services.brief_quality import BriefQualityAnalyzer
+
+
+def _briefs(n_briefs: int, rng: random.Random):
+    return [
+        (f"Projet {i}", " ".join(rng.choice(PHRASES) for _ in range(rng.randint(1, 8))))
+        for i in range(n_briefs)
+    ]
+
+
+def _timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, (time.perf_counter() - start) * 1e3
+
+
+def run(sizes, repeats: int):
+    analyzer = BriefQualityAnalyzer()
+    for n_briefs in sizes:
+        briefs = _briefs(n_briefs, random.Random(n_briefs))
+        states = [analyzer.build_state(title, description) for title, description in briefs]
+
+        timings = {"analyze": [], "analyze_many": [], "analyze_state": [], "analyze_states": []}
+        for _ in range(repeats):
+            expected, elapsed = _timed(lambda: [analyzer.analyze(title, description) for title, description in briefs])
+            timings["analyze"].append(elapsed)
+            batch, elapsed = _timed(analyzer.analyze_many, briefs)
+            timings["analyze_many"].append(elapsed)
+            _, elapsed = _timed(lambda: [analyzer.analyze_state(state) for state in states])
+            timings["analyze_state"].append(elapsed)
+            scored, elapsed = _timed(analyzer.analyze_states, states)
+            timings["analyze_states"].append(elapsed)
+
+        mismatches = sum(a != b for a, b in zip(expected, batch)) + sum(a != b for a, b in zip(expected, scored))
+        best = {label: min(values) for label, values in timings.items()}
+        print(f"{n_briefs} briefs (analyses divergentes : {mismatches})")
+        for loop, batched, phase in (("analyze", "analyze_many", "extraction + notation"),
+                                     ("analyze_state", "analyze_states", "notation seule")):
+            print(f"  {phase:<22} boucle {best[loop]:9.2f} ms  lot {best[batched]:9.2f} ms  "
+                  f"({best[loop] / n_briefs * 1e3:6.1f} -> {best[batched] / n_briefs * 1e3:6.1f} µs/brief, "
+                  f"x{best[loop] / best[batched]:.1f})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+    run(args.sizes, args.repeats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark du planificateur de questions (recherche en faisceau)
+
+Pour chaque brief, compare la VoI attendue actualisée du top-k glouton
+(classement statique, qui peut proposer plusieurs questions d'une même
+catégorie), du glouton séquentiel (faisceau de 1 : VoI réévaluée après
+chaque réponse, sans anticipation) et du plan de
+QuestionerService.plan_questions, qui anticipe l'effet des réponses sur la
+valeur des questions suivantes. Mesure
+la latence de planification (p50/p99) et la part de plans tronqués par le
+budget de temps.
+
+Usage (depuis apps/ml) :
+    python -m benchmarks.question_planner --sizes 8 1000 5000 --budget-ms 25
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from benchmarks.questioner_voi import _bank, _briefs
+from enhancements.questioner import QuestionerService
+
+
+def run(sizes, n_briefs: int, k: int, budget_ms: float, beam_width: int):
+    for n_questions in sizes:
+        rng = random.Random(n_questions)
+        service = QuestionerService() if n_questions == 8 else QuestionerService(_bank(n_questions, rng))
+        briefs, answers = _briefs(n_briefs, rng)
+        index = {id(question): i for i, question in enumerate(service.question_bank)}
+
+        greedy_values, sequential_values, plan_values, latencies, truncated = [], [], [], [], 0
+        for brief, given in zip(briefs, answers):
+            greedy = [index[id(q)] for q in service.select_next_questions(brief, given, k)]
+            greedy_values.append(service.plan_value(brief, given, greedy))
+            sequential = service.plan_questions(brief, given, k, time_budget_ms=1e6, beam_width=1, branching=1)
+            sequential_values.append(service.plan_value(brief, given, [index[id(q)] for q in sequential.questions]))
+
+            start = time.perf_counter()
+            plan = service.plan_questions(brief, given, k, time_budget_ms=budget_ms, beam_width=beam_width,
+                                          branching=beam_width)
+            latencies.append((time.perf_counter() - start) * 1000)
+            plan_values.append(service.plan_value(brief, given, [index[id(q)] for q in plan.questions]))
+            truncated += plan.truncated
+
+        plan_values = np.array(plan_values)
+        print(f"{n_questions} questions, {n_briefs} briefs, plans de {k}, faisceau {beam_width}, "
+              f"budget {budget_ms} ms")
+        for label, values in (("top-k glouton", np.array(greedy_values)),
+                              ("glouton séquentiel", np.array(sequential_values))):
+            gain = (plan_values.mean() - values.mean()) / values.mean()
+            print(f"  VoI attendue {label:<19} {values.mean():.3f} -> plan {plan_values.mean():.3f} ({gain:+.1%}), "
+                  f"plan >= {label} pour {np.mean(plan_values >= values - 1e-9):.1%} des briefs")
+        print(f"  latence : p50 {np.percentile(latencies, 50):.2f} ms  p99 {np.percentile(latencies, 99):.2f} ms  "
+              f"max {max(latencies):.2f} ms, tronqués {truncated / n_briefs:.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[8, 1000, 5000])
+    parser.add_argument("--briefs", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=25.0)
+    parser.add_argument("--beam-width", type=int, default=8)
+    args = parser.parse_args()
+    run(args.sizes, args.briefs, args.k, args.budget_ms, args.beam_width)
+
+
+if __name__ == "__main__":
+    main()
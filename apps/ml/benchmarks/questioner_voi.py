@@ -0,0 +1,110 @@
+"""
+Benchmark du classement des questions par Value of Information
+
+Compare la boucle question par question (VoI recalculée pour chaque
+question, description remise en minuscules à chaque fois, puis tri complet)
+au calcul vectorisé de QuestionerService (une expression pour toute la
+banque, top-k par argpartition), brief par brief puis par lots, sans puis
+avec la mémorisation des classements par combinaison de signaux. Les banques
+synthétiques ont des VoI arrondies au dixième : beaucoup d'ex aequo, dont
+l'ordre doit rester celui de la banque.
+
+Usage (depuis apps/ml) :
+    python -m benchmarks.questioner_voi --sizes 8 1000 5000 --briefs 256
+"""
+
+import argparse
+import random
+import time
+
+from enhancements.questioner import CONTEXT_RULES, SYNERGY_RULES, Question, QuestionerService
+
+CATEGORIES = ["budget", "timeline", "quality", "tech_constraints", "context"]
+DESCRIPTIONS = [
+    "Site vitrine simple pour un artisan",
+    "Application urgente, budget 3000€, rendu haut de gamme",
+    "Refonte premium de notre plateforme, qualité avant tout",
+    "Migration d'une API complexe vers un nouveau cloud",
+]
+
+
+def _bank(n_questions: int, rng: random.Random):
+    return [
+        Question(text=f"Question {i}", type="text", options=None, importance=round(rng.random(), 2),
+                 voi=round(rng.random(), 1), category=rng.choice(CATEGORIES))
+        for i in range(n_questions)
+    ]
+
+
+def _briefs(n_briefs: int, rng: random.Random):
+    briefs, answers = [], []
+    for _ in range(n_briefs):
+        briefs.append({"description": rng.choice(DESCRIPTIONS) * rng.randint(1, 20),
+                       "structured": {"estimated_complexity": rng.randint(1, 10)}})
+        given = {}
+        if rng.random() < 0.3:
+            given["budget"] = rng.choice(["500-1500€", "5000-15000€", "> 15000€"])
+        if rng.random() < 0.3:
+            given["timeline"] = rng.choice(["Urgent (< 1 semaine)", "Flexible (> 1 mois)"])
+        answers.append(given)
+    return briefs, answers
+
+
+def _naive(service: QuestionerService, brief, answers, k: int):
+    """Boucle d'origine : chaque question recalcule les signaux du brief"""
+    scored = []
+    for question in service.question_bank:
+        if question.category in answers:
+            continue
+        context = service._context_signals(brief)
+        signals = service._answer_signals(answers)
+        adjustment = 0.0
+        for active, (_, category, if_true, if_false) in zip(context, CONTEXT_RULES):
+            if category == question.category:
+                adjustment += if_true if active else if_false
+        synergy = sum(value for active, (_, category, value) in zip(signals, SYNERGY_RULES)
+                      if active and category == question.category)
+        scored.append((question, max(0.0, min(1.0, question.voi + adjustment + synergy))))
+    scored.sort(key=lambda item: item[1], reverse=True)
+    return [question for question, _ in scored[:k]]
+
+
+def run(sizes, n_briefs: int, k: int):
+    for n_questions in sizes:
+        rng = random.Random(n_questions)
+        bank = _bank(n_questions, rng)
+        briefs, answers = _briefs(n_briefs, rng)
+
+        reference = QuestionerService(bank)
+        start = time.perf_counter()
+        expected = [_naive(reference, brief, given, k) for brief, given in zip(briefs, answers)]
+        timings = [("boucle + tri", time.perf_counter() - start)]
+
+        identical = True
+        for cache_size, suffix in ((0, "sans mémo"), (4096, "avec mémo")):
+            service = QuestionerService(bank, ranking_cache_size=cache_size)
+            start = time.perf_counter()
+            single = [service.select_next_questions(brief, given, k) for brief, given in zip(briefs, answers)]
+            timings.append((f"par brief, {suffix}", time.perf_counter() - start))
+
+            start = time.perf_counter()
+            batch = service.select_next_questions_batch(briefs, answers, k)
+            timings.append((f"par lot, {suffix}", time.perf_counter() - start))
+            identical = identical and single == expected and batch == expected
+
+        print(f"{n_questions} questions, {n_briefs} briefs, top {k} (sélections identiques : {identical})")
+        for label, elapsed in timings:
+            print(f"  {label:<22} {elapsed * 1e6 / n_briefs:10.1f} µs/brief")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[8, 1000, 5000])
+    parser.add_argument("--briefs", type=int, default=256)
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+    run(args.sizes, args.briefs, args.k)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark de l'autocomplétion des compétences (/skills/complete côté serveur)
+
+Taxonomie synthétique (compétences d'un à trois mots, fréquences zipfiennes),
+préfixes de 1 à 8 caractères tirés des compétences, avec et sans filtre de
+catégorie. Mesure le temps de reconstruction et la latence de complete().
+
+Usage (depuis apps/ml) :
+    python -m benchmarks.skill_complete --skills 100000 --categories 40 --queries 20000
+"""
+
+import argparse
+import random
+import string
+import time
+
+import numpy as np
+
+from services.skill_index import SkillCompleter
+
+
+def _entries(n_skills: int, n_categories: int, rng: random.Random):
+    words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9))) for _ in range(n_skills // 2)]
+    skills = [" ".join(rng.choices(words, k=rng.choice((1, 1, 2, 3)))).title() for _ in range(n_skills)]
+    entries = []
+    for skill in skills:
+        # Nombre d'occurrences zipfien : quelques compétences très répandues
+        for _ in range(min(int(rng.paretovariate(1.2)), 50)):
+            entries.append((skill, f"cat{rng.randrange(n_categories)}"))
+    return skills, entries
+
+
+def run(n_skills: int, n_categories: int, n_queries: int):
+    rng = random.Random(42)
+    skills, entries = _entries(n_skills, n_categories, rng)
+
+    completer = SkillCompleter()
+    start = time.perf_counter()
+    completer.build(entries)
+    print(f"{completer.get_stats()['skills']} compétences, {n_categories} catégories : "
+          f"reconstruction {time.perf_counter() - start:.2f} s")
+
+    for label, category in (("toutes catégories", None), ("filtre catégorie", "cat0")):
+        latencies = []
+        for _ in range(n_queries):
+            skill = rng.choice(skills).lower()
+            prefix = skill[:rng.randint(1, min(8, len(skill)))]
+            start = time.perf_counter()
+            completer.complete(prefix, category)
+            latencies.append((time.perf_counter() - start) * 1000)
+        latencies = np.array(latencies)
+        print(f"{label:<20}p50 {np.percentile(latencies, 50):.4f} ms  p99 {np.percentile(latencies, 99):.4f} ms  "
+              f"max {latencies.max():.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--skills", type=int, default=100000)
+    parser.add_argument("--categories", type=int, default=40)
+    parser.add_argument("--queries", type=int, default=20000)
+    args = parser.parse_args()
+    run(args.skills, args.categories, args.queries)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Benchmark de la correspondance approchée des compétences
+
+Compare l'index de suppressions (SymSpellIndex) à la boucle naïve qui score
+chaque compétence avec fuzz.ratio, à 1k, 10k et 100k compétences. Requêtes :
+compétences du vocabulaire avec 1 ou 2 fautes (insertion, suppression,
+substitution, inversion) et mots hors vocabulaire.
+
+Usage (depuis apps/ml) :
+    python -m benchmarks.skill_index --sizes 1000 10000 100000 --queries 300
+"""
+
+import argparse
+import random
+import string
+import time
+
+import numpy as np
+
+from services.skill_index import SymSpellIndex, skill_key
+
+try:
+    from fuzzywuzzy import fuzz
+    fuzz_ratio = fuzz.ratio
+except ImportError:  # même score que fuzz.ratio sans python-Levenshtein
+    from difflib import SequenceMatcher
+
+    def fuzz_ratio(left: str, right: str) -> int:
+        return int(round(100 * SequenceMatcher(None, left, right).ratio()))
+
+
+def _typo(word: str, rng: random.Random) -> str:
+    chars = list(word)
+    for _ in range(rng.randint(1, 2)):
+        position = rng.randrange(len(chars))
+        edit = rng.choice(("insert", "delete", "substitute", "transpose"))
+        if edit == "insert":
+            chars.insert(position, rng.choice(string.ascii_lowercase))
+        elif edit == "delete" and len(chars) > 4:
+            del chars[position]
+        elif edit == "transpose" and position + 1 < len(chars):
+            chars[position], chars[position + 1] = chars[position + 1], chars[position]
+        else:
+            chars[position] = rng.choice(string.ascii_lowercase)
+    return "".join(chars)
+
+
+def _skills(n_skills: int, rng: random.Random):
+    skills = set()
+    while len(skills) < n_skills:
+        skills.add("".join(rng.choices(string.ascii_lowercase, k=rng.randint(6, 12))))
+    return sorted(skills)
+
+
+def _naive(token: str, skills, threshold: int = 80):
+    best_score, best_skill = 0, None
+    for skill in skills:
+        score = fuzz_ratio(token, skill)
+        if score > best_score:
+            best_score, best_skill = score, skill
+    return best_skill if best_score >= threshold else None
+
+
+def _ms(values):
+    return f"p50 {np.percentile(values, 50):8.3f} ms  p99 {np.percentile(values, 99):8.3f} ms"
+
+
+def run(sizes, n_queries: int, naive_queries: int):
+    for n_skills in sizes:
+        rng = random.Random(n_skills)
+        skills = _skills(n_skills, rng)
+        sources = rng.sample(skills, n_queries)
+        queries = [_typo(skill, rng) for skill in sources]
+        misses = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(6, 12))) for _ in range(n_queries // 3)]
+
+        start = time.perf_counter()
+        index = SymSpellIndex(skills, max_distance=2)
+        build_s = time.perf_counter() - start
+
+        latencies, found = [], 0
+        for query, source in zip(queries, sources):
+            start = time.perf_counter()
+            matches = index.lookup(query, limit=1)
+            latencies.append((time.perf_counter() - start) * 1000)
+            found += bool(matches) and matches[0].skill == source
+        for query in misses:
+            start = time.perf_counter()
+            index.lookup(query, limit=1)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        naive_latencies, naive_found = [], 0
+        for query, source in list(zip(queries, sources))[:naive_queries]:
+            start = time.perf_counter()
+            naive_found += _naive(skill_key(query), skills) == source
+            naive_latencies.append((time.perf_counter() - start) * 1000)
+
+        print(f"{n_skills} compétences (index construit en {build_s:.2f} s, {index.nbytes() / 1024 / 1024:.1f} Mo)")
+        print(f"  {'index de suppressions':<24}{_ms(latencies)}  retrouvées {found / n_queries:.3f}")
+        print(f"  {'boucle fuzz.ratio':<24}{_ms(naive_latencies)}  retrouvées {naive_found / len(naive_latencies):.3f}"
+              f"  ({len(naive_latencies)} requêtes)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--naive-queries", type=int, default=30)
+    args = parser.parse_args()
+    run(args.sizes, args.queries, args.naive_queries)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Benchmark du rendu des templates précompilés
+
+Mesure le débit de rendu des gabarits compilés (CompiledTemplate.render)
+face à str.format sur les mêmes gabarits, puis le débit de bout en bout de
+TemplateRewriter.rewrite_project et de GeneratorService.generate_variants
+(sans le cache LRU de /generate) sur des briefs synthétiques. La mémoire
+retenue par réécriture conservée (tracemalloc) montre le partage des
+squelettes de réécriture entre réponses.
+
+Usage (depuis apps/ml) :
+    python -m benchmarks.template_render --iterations 20000
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+
+from enhancements.generator import GeneratorService
+from services.template_rewriter import TemplateRewriter
+
+CATEGORIES = ["développement", "mobile", "design", "marketing", "rédaction"]
+GENERATOR_CATEGORIES = ["développement web", "design graphique", "autre"]
+SKILLS = ["React", "Vue", "SEO", "Python", "sécurité", "Figma", "WordPress"]
+PHRASES = [
+    "Créer une boutique en ligne avec paiement et espace admin",
+    "Refonte complète du site vitrine de l'entreprise",
+    "Application iphone et android avec chat et notifications par email",
+    "Améliorer le référencement et la visibilité sur les réseaux",
+    "Nouveau logo simple et charte graphique",
+    "API python et base postgresql pour un crm interne, projet complexe",
+]
+
+
+def _briefs(n_briefs: int, seed: int = 7):
+    rng = random.Random(seed)
+    return [
+        (
+            f"Projet {i}",
+            " ".join(rng.sample(PHRASES, rng.randint(1, 4))),
+            rng.choice(CATEGORIES),
+            rng.sample(SKILLS, rng.randint(0, 3)),
+        )
+        for i in range(n_briefs)
+    ]
+
+
+def _rate(count: int, elapsed: float) -> str:
+    return f"{count / elapsed:12,.0f} /s  ({elapsed * 1e6 / count:7.2f} µs)"
+
+
+def bench_templates(generator: GeneratorService, iterations: int):
+    values = {
+        'category': "développement web",
+        'category_title': "Développement Web",
+        'original_title': "Boutique en ligne",
+        'original_description': PHRASES[0] * 3,
+        'description_excerpt': (PHRASES[0] * 3)[:100],
+        'tech_details': " Technologies : react, node",
+        'complexity': "6",
+    }
+    print("Gabarits (variantes de /generate)")
+    for variant in generator._compiled.variants:
+        for name, template in (("titre", variant.title), ("description", variant.description)):
+            source = template.source
+            start = time.perf_counter()
+            for _ in range(iterations):
+                source.format(**values)
+            formatted = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for _ in range(iterations):
+                template.render(values)
+            rendered = time.perf_counter() - start
+
+            assert template.render(values) == source.format(**values)
+            label = f"{variant.type}/{name}"
+            print(f"  {label:<22} str.format {_rate(iterations, formatted)}   compilé {_rate(iterations, rendered)}")
+
+
+def bench_end_to_end(rewriter: TemplateRewriter, generator: GeneratorService, n_briefs: int, rounds: int):
+    briefs = _briefs(n_briefs)
+    print(f"Bout en bout ({n_briefs} briefs x {rounds})")
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for title, description, category, skills in briefs:
+            rewriter.rewrite_project(title, description, category, skills=skills)
+    elapsed = time.perf_counter() - start
+    print(f"  {'rewrite_project':<22} {_rate(n_briefs * rounds, elapsed)}")
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for i, (title, description, _, _) in enumerate(briefs):
+            generator.generate_variants(title, description, GENERATOR_CATEGORIES[i % len(GENERATOR_CATEGORIES)])
+    elapsed = time.perf_counter() - start
+    print(f"  {'generate_variants':<22} {_rate(n_briefs * rounds, elapsed)}")
+
+
+def bench_allocations(rewriter: TemplateRewriter, n_briefs: int):
+    briefs = _briefs(n_briefs, seed=11)
+    tracemalloc.start()
+    results = [rewriter.rewrite_project(title, description, category, skills=skills)
+               for title, description, category, skills in briefs]
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    stats = rewriter.get_skeleton_stats()
+    print(f"Allocations ({len(results)} réécritures conservées)")
+    print(f"  {'mémoire retenue':<22} {current / len(results):8.0f} octets/réécriture  (pic {peak / 1e6:.1f} Mo)")
+    print(f"  {'squelettes partagés':<22} {stats['entries']} en cache, taux de succès {stats['hit_rate']:.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--briefs", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    rewriter = TemplateRewriter()
+    generator = GeneratorService(cache_size=0)
+    print(f"Templates : réécriture {rewriter.get_rewrite_stats()['template_version']}, "
+          f"génération {generator.template_version}")
+    bench_templates(generator, args.iterations)
+    bench_end_to_end(rewriter, generator, args.briefs, args.rounds)
+    bench_allocations(rewriter, args.briefs * args.rounds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Benchmark mémoire par worker : chargement isolé (CSV par worker) vs données partagées
+
+Chaque worker exécute la même charge (classification, prix, réécriture) puis
+mesure sa mémoire pendant que tous les workers sont vivants. Le RSS compte
+intégralement les pages partagées ; le PSS les répartit entre processus et
+donne donc l'empreinte réelle par worker.
+
+Usage (depuis apps/ml) :
+    python -m benchmarks.worker_memory --workers 4 --skills 50000
+"""
+
+import argparse
+import multiprocessing as mp
+import random
+import tempfile
+from pathlib import Path
+
+from services.shared_store import ensure_snapshot, preload_shared_state, process_memory
+
+TEXTS = [
+    "Création d'un site e-commerce en React avec paiement et back-office",
+    "Refonte graphique du logo et de la charte, maquettes Figma",
+    "Campagne SEO et Google Ads pour une boutique en ligne",
+]
+
+
+def _generate_data(data_path: Path, n_skills: int):
+    """Taxonomie synthétique de n_skills lignes et grille de prix du dépôt"""
+    rng = random.Random(42)
+    vocabulary = [f"kw{i}" for i in range(max(100, n_skills // 10))]
+    rows = ["category,sub_category,skill,keywords"]
+    for i in range(n_skills):
+        keywords = ",".join(rng.sample(vocabulary, 4))
+        rows.append(f"cat{i % 40},sub{i % 400},Skill{i},\"{keywords}\"")
+    (data_path / "taxonomy_skills_fr.csv").write_text("\n".join(rows) + "\n", encoding="utf-8")
+
+    repo_prices = Path(__file__).resolve().parents[3] / "infra" / "data" / "price_terms_fr.csv"
+    prices = repo_prices.read_text(encoding="utf-8").lstrip() if repo_prices.exists() else \
+        "category,sub_category,hourly_min,hourly_med,hourly_max,daily_min,daily_med,daily_max,complexity_factor,avg_days\n"
+    (data_path / "price_terms_fr.csv").write_text(prices, encoding="utf-8")
+
+
+def _build_services(data_path: Path, snapshot_path: Path):
+    from services.taxonomizer import Taxonomizer
+    from services.price_time_suggester import PriceTimeSuggester
+    from services.template_rewriter import TemplateRewriter
+    return (
+        Taxonomizer(str(data_path), snapshot_path=str(snapshot_path)),
+        PriceTimeSuggester(str(data_path), snapshot_path=str(snapshot_path)),
+        TemplateRewriter()
+    )
+
+
+def _run_workload(services):
+    taxonomizer, suggester, rewriter = services
+    for text in TEXTS:
+        result = taxonomizer.classify(text, text.lower().split())
+        suggester.suggest(result.category_std, result.sub_category_std)
+        rewriter.rewrite_project(text, text, result.category_std, result.sub_category_std, result.skills_std)
+
+
+def _report(mode, barrier, queue):
+    # Mesure quand tous les workers sont vivants, puis attente avant de sortir
+    barrier.wait()
+    queue.put((mode, mp.current_process().pid, process_memory()))
+    barrier.wait()
+
+
+def _isolated_worker(data_path, barrier, queue):
+    from services.shared_store import PRELOAD_MODULES
+    import importlib
+    for module in PRELOAD_MODULES:
+        try:
+            importlib.import_module(module)
+        except Exception:
+            pass
+    # Chemin de snapshot inexistant : chaque worker parse les CSV
+    services = _build_services(Path(data_path), Path(data_path) / "absent.snap")
+    _run_workload(services)
+    _report("isolated", barrier, queue)
+
+
+def _shared_worker(services, barrier, queue):
+    _run_workload(services)
+    _report("shared", barrier, queue)
+
+
+def _collect(processes, queue):
+    for process in processes:
+        process.start()
+    results = [queue.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return results
+
+
+def run(workers: int, n_skills: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        data_path = Path(tmp)
+        _generate_data(data_path, n_skills)
+        snapshot_path = data_path / "reference_data.snap"
+
+        spawn = mp.get_context("spawn")
+        barrier, queue = spawn.Barrier(workers), spawn.Queue()
+        isolated = _collect(
+            [spawn.Process(target=_isolated_worker, args=(str(data_path), barrier, queue)) for _ in range(workers)],
+            queue
+        )
+
+        ensure_snapshot(data_path, snapshot_path)
+        services = _build_services(data_path, snapshot_path)
+        preload_shared_state(services[:2])
+        fork = mp.get_context("fork")
+        barrier, queue = fork.Barrier(workers), fork.Queue()
+        shared = _collect(
+            [fork.Process(target=_shared_worker, args=(services, barrier, queue)) for _ in range(workers)],
+            queue
+        )
+
+    print(f"{workers} workers, taxonomie de {n_skills} compétences")
+    print(f"{'mode':<10}{'pid':>8}{'RSS (Mo)':>12}{'PSS (Mo)':>12}{'privé (Mo)':>12}")
+    for mode, results in (("isolated", isolated), ("shared", shared)):
+        for _, pid, memory in results:
+            print(f"{mode:<10}{pid:>8}{memory['rss_kb'] / 1024:>12.1f}"
+                  f"{memory['pss_kb'] / 1024:>12.1f}{memory['uss_kb'] / 1024:>12.1f}")
+        total_pss = sum(memory['pss_kb'] for _, _, memory in results) / 1024
+        print(f"{mode:<10}{'total':>8}{'':>12}{total_pss:>12.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--skills", type=int, default=50000)
+    args = parser.parse_args()
+    run(args.workers, args.skills)
+
+
+if __name__ == "__main__":
+    main()
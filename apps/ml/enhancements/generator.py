@@ -4,9 +4,28 @@ Service de génération d'annonces optimisées
 Sert à réduire l'effort utilisateur et améliorer la qualité
 """
 
-from typing import Dict, List, Optional
+from typing import Dict, List, Mapping, Optional, Tuple
 from dataclasses import dataclass
+from collections import OrderedDict
+from pathlib import Path
+import hashlib
+import json
+import logging
 import random
+import re
+import threading
+import unicodedata
+
+from services.template_engine import (
+    CompiledTemplate, TemplateError, TemplateFile, freeze, load_template_file, template_path
+)
+
+logger = logging.getLogger(__name__)
+
+VARIANT_FIELDS = (
+    'category', 'category_title', 'original_title', 'original_description', 'description_excerpt',
+    'tech_details', 'complexity'
+)
 
 @dataclass
 class BriefVariant:
@@ -23,113 +42,139 @@ class GeneratedBrief:
     questions: List[str]
     templates: Dict
 
+@dataclass(frozen=True)
+class CompiledVariant:
+    type: str
+    title: CompiledTemplate
+    description: CompiledTemplate
+    explanation: str
+    estimated_appeal: int
+
+@dataclass(frozen=True)
+class _GeneratorTemplates:
+    file: TemplateFile
+    default_category: str
+    templates: Dict[str, Dict]
+    sow: Dict[str, Dict]
+    garanties: Tuple[str, ...]
+    variants: Tuple[CompiledVariant, ...]
+    template_ids: Dict[str, str]
+    template_bytes: Dict[str, int]
+
+def _template_id(category: str) -> str:
+    """Identifiant stable d'un template (« développement web » -> « developpement-web »)"""
+    text = unicodedata.normalize('NFKD', category.lower())
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return re.sub(r'[^a-z0-9]+', '-', text).strip('-')
+
 class GeneratorService:
-    """Génère des variantes d'annonces optimisées"""
+    """Génère des variantes d'annonces optimisées.
+
+    Les templates viennent de templates/generator.json, compilé au chargement
+    (variantes rendues par simple remplissage d'emplacements). Les résultats
+    sont mémorisés (LRU) par (empreinte du contenu, catégorie, version des
+    templates) : la génération est déterministe pour ces trois entrées. Les
+    réponses mémorisées sont partagées et ne doivent pas être modifiées par
+    l'appelant.
+    """
     
-    def __init__(self):
-        self.templates = self._load_templates()
-        self.sow_templates = self._load_sow_templates()
+    def __init__(self, cache_size: int = 2048, templates_dir: Optional[Path] = None):
+        self.template_file = template_path("generator", templates_dir)
+        self._compiled = self._compile(load_template_file(self.template_file))
+        self.cache_size = cache_size
+        self._cache: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.slim_responses = 0
+        self.bytes_saved = 0
     
-    def _load_templates(self) -> Dict:
-        """Templates par catégorie"""
-        return {
-            "développement web": {
-                "title_patterns": [
-                    "Développement de {type_site} {tech_stack}",
-                    "Création {type_site} avec {features}",
-                    "{type_site} sur mesure - {tech_stack}"
-                ],
-                "intro_patterns": [
-                    "Nous recherchons un développeur expérimenté pour créer {description}.",
-                    "Projet de développement : {description}.",
-                    "Mission : développer {description} avec les technologies {tech_stack}."
-                ]
-            },
-            "design graphique": {
-                "title_patterns": [
-                    "Création {type_design} pour {secteur}",
-                    "Design {type_design} - {style}",
-                    "{type_design} professionnel {secteur}"
-                ],
-                "intro_patterns": [
-                    "Nous cherchons un designer pour créer {description}.",
-                    "Projet de design : {description}.",
-                    "Mission graphique : {description} dans l'esprit {style}."
-                ]
-            }
-        }
+    @property
+    def templates(self) -> Dict[str, Dict]:
+        return self._compiled.templates
     
-    def _load_sow_templates(self) -> Dict:
-        """Templates SOW par catégorie"""
-        return {
-            "développement web": {
-                "livrables": [
-                    "Code source complet et documenté",
-                    "Site web responsive et testé",
-                    "Documentation technique",
-                    "Formation utilisateur (optionnel)"
-                ],
-                "criteres_acceptance": [
-                    "Compatibilité navigateurs (Chrome, Firefox, Safari)",
-                    "Responsive design mobile et tablette",
-                    "Temps de chargement < 3 secondes",
-                    "Code validé W3C"
-                ],
-                "jalons": [
-                    "Maquette et wireframes (20%)",
-                    "Développement front-end (40%)",
-                    "Intégration back-end (30%)",
-                    "Tests et livraison (10%)"
-                ]
-            },
-            "design graphique": {
-                "livrables": [
-                    "Fichiers sources (AI, PSD, Sketch)",
-                    "Exports haute résolution (PNG, JPG)",
-                    "Versions web optimisées",
-                    "Charte graphique (si applicable)"
-                ],
-                "criteres_acceptance": [
-                    "Qualité print 300 DPI minimum",
-                    "Versions couleur et noir/blanc",
-                    "Formats vectoriels modifiables",
-                    "Respect de l'identité visuelle"
-                ],
-                "jalons": [
-                    "Concepts et premières pistes (30%)",
-                    "Développement créatif (40%)",
-                    "Finalisation et déclinaisons (30%)"
-                ]
+    @property
+    def sow_templates(self) -> Dict[str, Dict]:
+        return self._compiled.sow
+    
+    @property
+    def template_version(self) -> str:
+        """Version du fichier de templates (déclarée + empreinte du contenu)"""
+        return self._compiled.file.tag
+    
+    @property
+    def template_ids(self) -> Dict[str, str]:
+        return self._compiled.template_ids
+    
+    def reload(self) -> bool:
+        """Recharge et recompile le fichier de templates (False si invalide)"""
+        try:
+            compiled = self._compile(load_template_file(self.template_file))
+        except (OSError, TemplateError, KeyError, TypeError) as e:
+            logger.error(f"Templates de génération non rechargés ({self.template_file}): {e}")
+            return False
+        with self._lock:
+            self._compiled = compiled
+            self._cache.clear()
+        logger.info(f"Templates de génération chargés: version {compiled.file.tag}")
+        return True
+    
+    @staticmethod
+    def _compile(template_file: TemplateFile) -> _GeneratorTemplates:
+        data = template_file.data
+        default_category = data['default_category']
+        if default_category not in data['templates'] or default_category not in data['sow']:
+            raise TemplateError(f"{template_file.path}: catégorie par défaut {default_category!r} sans template")
+        
+        variants = tuple(
+            CompiledVariant(
+                type=variant['type'],
+                title=CompiledTemplate(variant['title'], VARIANT_FIELDS),
+                description=CompiledTemplate(variant['description'], VARIANT_FIELDS),
+                explanation=variant['explanation'],
+                estimated_appeal=int(variant['estimated_appeal'])
+            )
+            for variant in data['variants']
+        )
+        return _GeneratorTemplates(
+            file=template_file,
+            default_category=default_category,
+            templates=data['templates'],
+            sow=data['sow'],
+            garanties=tuple(data['garanties']),
+            variants=variants,
+            template_ids={_template_id(category): category for category in data['templates']},
+            template_bytes={
+                category: len(json.dumps(template, ensure_ascii=False).encode('utf-8'))
+                for category, template in data['templates'].items()
             }
-        }
+        )
     
-    def generate_variants(self, title: str, description: str, category: str) -> GeneratedBrief:
+    def generate_variants(self, title: str, description: str, category: str,
+                          templates: Optional[_GeneratorTemplates] = None) -> GeneratedBrief:
         """Génère 3 variantes optimisées"""
+        templates = templates or self._compiled
         
         # Analyse du brief original
         context = self._analyze_context(title, description, category)
         
-        # Génération des 3 variantes
-        variants = [
-            self._generate_clear_variant(context),
-            self._generate_pro_variant(context),
-            self._generate_premium_variant(context)
-        ]
+        # Génération des variantes
+        variants = self._render_variants(context, templates)
         
         # SOW adaptée
-        sow = self._generate_sow(category, context)
+        sow = self._generate_sow(category, context, templates)
         
         # Questions de clarification
         questions = self._generate_questions(context)
         
         # Template personnalisé
-        templates = self._get_category_template(category)
+        category_template = self._get_category_template(category, templates)
         
         return GeneratedBrief(
             variants=variants,
             sow=sow,
             questions=questions,
-            templates=templates
+            templates=category_template
         )
     
     def _analyze_context(self, title: str, description: str, category: str) -> Dict:
@@ -145,123 +190,38 @@ class GeneratorService:
             "tone": self._detect_tone(description)
         }
     
-    def _generate_clear_variant(self, context: Dict) -> BriefVariant:
-        """Variante claire et accessible"""
-        title = f"{context['category'].title()} - {context['original_title']}"
-        
-        description = f"""
-**Projet :** {context['original_description'][:100]}...
-
-**Ce que nous recherchons :**
-• Un professionnel expérimenté en {context['category']}
-• Approche collaborative et communication claire
-• Respect des délais et de la qualité
-
-**Livrables attendus :**
-• Solution fonctionnelle et testée
-• Documentation simple
-• Support post-livraison
-
-**Prochaines étapes :**
-Présentez-nous votre approche et vos références similaires.
-        """.strip()
-        
-        return BriefVariant(
-            type="clair",
-            title=title,
-            description=description,
-            explanation="Version accessible, met l'accent sur la clarté et la collaboration",
-            estimated_appeal=7
-        )
-    
-    def _generate_pro_variant(self, context: Dict) -> BriefVariant:
-        """Variante professionnelle détaillée"""
-        title = f"Mission {context['category']} - {context['original_title']}"
-        
-        tech_details = f" Technologies : {', '.join(context['tech_stack'])}" if context['tech_stack'] else ""
-        
-        description = f"""
-**Contexte du projet :**
-{context['original_description']}
-
-**Spécifications techniques :**{tech_details}
-• Complexité estimée : {context['complexity']}/10
-• Approche méthodologique requise
-• Standards industriels respectés
-
-**Profil recherché :**
-• Expertise confirmée ({context['category']})
-• Portfolio de références similaires
-• Capacité de conseil et d'optimisation
-
-**Modalités :**
-• Méthodologie transparente
-• Points d'étape réguliers
-• Garantie de résultat
-
-Merci de détailler votre méthodologie et timeline.
-        """.strip()
-        
-        return BriefVariant(
-            type="pro",
-            title=title,
-            description=description,
-            explanation="Version professionnelle, détaille les aspects techniques et méthodologiques",
-            estimated_appeal=8
-        )
-    
-    def _generate_premium_variant(self, context: Dict) -> BriefVariant:
-        """Variante premium avec valeur ajoutée"""
-        title = f"Projet stratégique {context['category']} - {context['original_title']}"
-        
-        description = f"""
-**Vision du projet :**
-{context['original_description']}
-
-**Ambition :**
-Créer une solution d'excellence qui dépasse les attentes et génère de la valeur à long terme.
-
-**Approche premium :**
-• Analyse stratégique préalable
-• Solution sur-mesure et évolutive  
-• Optimisations performance et UX
-• Accompagnement post-projet
-
-**Partenaire recherché :**
-• Expert reconnu avec vision stratégique
-• Approche consultative et proactive
-• Engagement qualité et innovation
-• Références de projets d'envergure
-
-**Engagement mutuel :**
-• Collaboration étroite et transparente
-• Investissement dans l'excellence
-• Relation de confiance long terme
-
-Présentez votre vision et proposition de valeur unique.
-        """.strip()
-        
-        return BriefVariant(
-            type="premium",
-            title=title,
-            description=description,
-            explanation="Version premium, positionne le projet comme stratégique avec forte valeur ajoutée",
-            estimated_appeal=9
-        )
+    def _render_variants(self, context: Dict, templates: _GeneratorTemplates) -> List[BriefVariant]:
+        """Variantes claire, pro et premium rendues depuis les gabarits compilés"""
+        tech_stack = context['tech_stack']
+        values = {
+            'category': context['category'],
+            'category_title': context['category'].title(),
+            'original_title': context['original_title'],
+            'original_description': context['original_description'],
+            'description_excerpt': context['original_description'][:100],
+            'tech_details': " Technologies : " + ", ".join(tech_stack) if tech_stack else "",
+            'complexity': str(context['complexity'])
+        }
+        return [
+            BriefVariant(
+                type=variant.type,
+                title=variant.title.render(values),
+                description=variant.description.render(values),
+                explanation=variant.explanation,
+                estimated_appeal=variant.estimated_appeal
+            )
+            for variant in templates.variants
+        ]
     
-    def _generate_sow(self, category: str, context: Dict) -> Dict:
+    def _generate_sow(self, category: str, context: Dict, templates: _GeneratorTemplates) -> Dict:
         """Génère une SOW adaptée"""
-        template = self.sow_templates.get(category, self.sow_templates["développement web"])
+        template = templates.sow.get(category, templates.sow[templates.default_category])
         
         return {
             "livrables": template["livrables"],
             "criteres_acceptance": template["criteres_acceptance"],
             "jalons": template["jalons"],
-            "garanties": [
-                "Correction des bugs pendant 30 jours",
-                "Code source et documentation remis",
-                "Formation utilisateur incluse"
-            ],
+            "garanties": list(templates.garanties),
             "clauses_specifiques": self._generate_specific_clauses(context)
         }
     
@@ -313,9 +273,78 @@ Présentez votre vision et proposition de valeur unique.
         else:
             return "neutre"
     
-    def _get_category_template(self, category: str) -> Dict:
+    def _get_category_template(self, category: str, templates: _GeneratorTemplates) -> Dict:
         """Retourne le template de la catégorie"""
-        return self.templates.get(category, self.templates.get("développement web", {}))
+        return templates.templates.get(category, templates.templates[templates.default_category])
+    
+    def get_template(self, template_id: str) -> Optional[Dict]:
+        """Template d'une catégorie par identifiant (None si inconnu)"""
+        templates = self._compiled
+        category = templates.template_ids.get(template_id)
+        return templates.templates[category] if category is not None else None
+    
+    def generate_payload(self, title: str, description: str, category: str) -> Tuple[Mapping, bool]:
+        """Réponse complète de /generate, mémorisée ; retourne (réponse, trouvée en cache).
+
+        La réponse est partagée par tous les appels qui la retrouvent en cache :
+        elle est gelée (copie en lecture seule, détachée des templates).
+        """
+        templates = self._compiled
+        content_hash = hashlib.sha1(f"{title}\x00{description}".encode('utf-8')).hexdigest()
+        key = (content_hash, category, templates.file.tag)
+        with self._lock:
+            payload = self._cache.get(key)
+            if payload is not None:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+                return payload, True
+            self.cache_misses += 1
+        
+        result = self.generate_variants(title, description, category, templates)
+        template_category = category if category in templates.templates else templates.default_category
+        payload = freeze({
+            "variants": [
+                {
+                    "type": v.type,
+                    "title": v.title,
+                    "description": v.description,
+                    "explanation": v.explanation,
+                    "estimated_appeal": v.estimated_appeal
+                }
+                for v in result.variants
+            ],
+            "sow": result.sow,
+            "questions": result.questions,
+            "templates": result.templates,
+            "template_id": _template_id(template_category),
+            "template_version": templates.file.tag
+        })
+        
+        with self._lock:
+            self._cache[key] = payload
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return payload, False
+    
+    def slim_payload(self, payload: Mapping) -> Dict:
+        """Réponse sans corps de template : le client le récupère via /templates/{id}"""
+        slim = {name: value for name, value in payload.items() if name != "templates"}
+        templates = self._compiled
+        category = templates.template_ids.get(payload["template_id"])
+        with self._lock:
+            self.slim_responses += 1
+            self.bytes_saved += templates.template_bytes.get(category, 0)
+        return slim
+    
+    def get_cache_stats(self) -> Dict[str, any]:
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            'entries': len(self._cache),
+            'hit_rate': round(self.cache_hits / lookups, 3) if lookups else 0.0,
+            'slim_responses': self.slim_responses,
+            'bytes_saved_per_slim_response': round(self.bytes_saved / self.slim_responses) if self.slim_responses else 0,
+            'template_version': self.template_version
+        }
     
     def _generate_specific_clauses(self, context: Dict) -> List[str]:
         """Génère des clauses spécifiques au contexte"""
@@ -332,22 +361,7 @@ Présentez votre vision et proposition de valeur unique.
 # Service global
 generator_service = GeneratorService()
 
-def generate_brief_variants(title: str, description: str, category: str) -> dict:
-    """Interface simple pour l'API"""
-    result = generator_service.generate_variants(title, description, category)
-    
-    return {
-        "variants": [
-            {
-                "type": v.type,
-                "title": v.title,
-                "description": v.description,
-                "explanation": v.explanation,
-                "estimated_appeal": v.estimated_appeal
-            }
-            for v in result.variants
-        ],
-        "sow": result.sow,
-        "questions": result.questions,
-        "templates": result.templates
-    }
+def generate_brief_variants(title: str, description: str, category: str, slim: bool = False) -> Mapping:
+    """Interface simple pour l'API (slim : template référencé par template_id au lieu d'être inclus)"""
+    payload, _ = generator_service.generate_payload(title, description, category)
+    return generator_service.slim_payload(payload) if slim else payload
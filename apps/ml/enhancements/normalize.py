@@ -8,8 +8,7 @@ import re
 import json
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
-import spacy
-from fuzzywuzzy import fuzz
+from services.skill_index import SymSpellIndex
 
 @dataclass
 class NormalizedBrief:
@@ -31,6 +30,12 @@ class NormalizeService:
     def __init__(self):
         self.taxonomies = self._load_taxonomies()
         self.skills_db = self._load_skills()
+        self.skill_index = SymSpellIndex(self.skills_db, max_distance=2)
+        # Nom de compétence en mot entier : « pythons » ou « reactif » ne comptent pas
+        self._skill_patterns = [
+            (skill, re.compile(r'(?<![\w.+#-])' + re.escape(skill.lower()) + r'(?![\w+#])'))
+            for skill in self.skills_db
+        ]
         
     def _load_taxonomies(self) -> Dict:
         """Charge la taxonomie depuis la DB ou fichier"""
@@ -126,14 +131,19 @@ class NormalizeService:
         return best_match
     
     def _extract_skills(self, text: str) -> List[str]:
-        """Extrait les compétences mentionnées"""
+        """Extrait les compétences mentionnées, y compris avec fautes de frappe"""
         found_skills = []
         text_lower = text.lower()
         
-        for skill in self.skills_db:
-            if skill.lower() in text_lower:
+        for skill, pattern in self._skill_patterns:
+            if pattern.search(text_lower):
                 found_skills.append(skill)
         
+        # Variantes approchées (« reactjs », « wordpres », « nodejs ») via l'index de suppressions
+        for match in self.skill_index.extract(text):
+            if match.skill not in found_skills:
+                found_skills.append(match.skill)
+        
         return found_skills
     
     def _generate_tags(self, title: str, description: str, category: str) -> List[str]:
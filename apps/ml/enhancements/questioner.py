@@ -4,9 +4,15 @@ Service de questions adaptatives basées sur la Value of Information
 Sert à compléter les données manquantes de manière ciblée
 """
 
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 from dataclasses import dataclass
+from collections import OrderedDict
+import heapq
 import math
+import threading
+import time
+
+import numpy as np
 
 @dataclass
 class Question:
@@ -17,11 +23,78 @@ class Question:
     voi: float  # Value of Information
     category: str
 
+# Marge sur la durée estimée d'une étape du planificateur (dispersion des durées observées)
+STEP_MARGIN = 2.0
+
+# Ajustements de contexte : (signal du brief, catégorie, ajustement si vrai, si faux)
+CONTEXT_RULES = (
+    ("budget_info", "budget", -0.5, 0.3),        # Budget : priorité si pas de mention prix
+    ("urgent", "timeline", 0.2, 0.0),            # Timeline : priorité si urgent mentionné
+    ("complex", "tech_constraints", 0.3, 0.0),   # Tech : priorité si projet complexe
+    ("premium", "quality", 0.2, 0.0),            # Qualité : priorité si projet premium
+)
+
+# Synergies avec les réponses déjà données : (signal des réponses, catégorie, ajustement)
+SYNERGY_RULES = (
+    ("budget_high", "quality", 0.2),             # Budget élevé → qualité importante
+    ("timeline_urgent", "tech_constraints", -0.1),  # Urgent → moins de détails tech
+)
+
+BUDGET_WORDS = ("€", "budget", "prix", "coût", "tarif")
+PREMIUM_WORDS = ("qualité", "haut de gamme", "premium")
+
+@dataclass(frozen=True)
+class QuestionArrays:
+    """Banque de questions sous forme de tableaux (une colonne par question)"""
+    categories: Tuple[str, ...]
+    category_ids: np.ndarray   # (Q,) indice de catégorie
+    base_voi: np.ndarray       # (Q,)
+    importance: np.ndarray     # (Q,)
+    context_on: np.ndarray     # (règles de contexte, C) ajustement si le signal est vrai
+    context_off: np.ndarray    # (règles de contexte, C) ajustement si le signal est faux
+    synergy: np.ndarray        # (règles de synergie, C)
+
+@dataclass
+class QuestionPlan:
+    questions: List[Question]
+    expected_voi: float        # somme actualisée des VoI attendues le long du plan
+    depth: int                 # profondeur atteinte par la recherche en faisceau
+    states_evaluated: int      # états de réponses distincts évalués
+    truncated: bool            # budget de temps atteint : plan complété au mieux dans le temps restant
+    elapsed_ms: float
+
+@dataclass(frozen=True)
+class _PlanNode:
+    sequence: Tuple[int, ...]
+    value: float
+    states: Tuple[Tuple[Tuple, float], ...]  # distribution (clé d'état, probabilité)
+
 class QuestionerService:
-    """Génère des questions optimales par Value of Information"""
+    """Génère des questions optimales par Value of Information.
+
+    La VoI contextuelle de toute la banque est calculée en une expression
+    vectorisée : base + ajustements de contexte + synergies, ces deux derniers
+    termes étant calculés par catégorie (signaux du brief x matrices de
+    règles) puis diffusés aux questions. Les k meilleures questions sont
+    extraites par argpartition ; à VoI égale, l'ordre de la banque départage.
+    La banque est fixée à la construction : les classements mémorisés restent
+    valides tant que le service vit.
+    """
     
-    def __init__(self):
-        self.question_bank = self._build_question_bank()
+    def __init__(self, question_bank: Optional[List[Question]] = None, ranking_cache_size: int = 4096):
+        self.question_bank = question_bank if question_bank is not None else self._build_question_bank()
+        self.arrays = self._build_arrays(self.question_bank)
+        self.ranking_cache_size = ranking_cache_size
+        self._ranking_cache: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._outcomes = [self._answer_outcomes(question) for question in self.question_bank]
+        # Questions de chaque catégorie (indices croissants de la banque)
+        self._category_columns = [
+            columns for columns in (np.flatnonzero(self.arrays.category_ids == category)
+                                    for category in range(len(self.arrays.categories))) if len(columns)
+        ]
+        # Durées moyennes (s) des étapes du planificateur : (par appel, par unité de travail)
+        self._estimates = {step: (0.0, 0.0) for step in ("evaluate", "expand", "advance", "complete")}
         self.voi_weights = {
             "budget": 0.9,
             "timeline": 0.8,
@@ -29,6 +102,7 @@ class QuestionerService:
             "tech_constraints": 0.6,
             "context": 0.5
         }
+        self._calibrate()
     
     def _build_question_bank(self) -> List[Question]:
         """Base de questions avec importance"""
@@ -99,6 +173,35 @@ class QuestionerService:
             )
         ]
     
+    @staticmethod
+    def _build_arrays(question_bank: List[Question]) -> QuestionArrays:
+        """Tableaux de la banque et matrices de règles (signal x catégorie)"""
+        categories = tuple(dict.fromkeys(
+            [question.category for question in question_bank] +
+            [category for _, category, _, _ in CONTEXT_RULES] +
+            [category for _, category, _ in SYNERGY_RULES]
+        ))
+        category_index = {category: i for i, category in enumerate(categories)}
+        
+        context_on = np.zeros((len(CONTEXT_RULES), len(categories)))
+        context_off = np.zeros((len(CONTEXT_RULES), len(categories)))
+        for rule, (_, category, if_true, if_false) in enumerate(CONTEXT_RULES):
+            context_on[rule, category_index[category]] = if_true
+            context_off[rule, category_index[category]] = if_false
+        synergy = np.zeros((len(SYNERGY_RULES), len(categories)))
+        for rule, (_, category, adjustment) in enumerate(SYNERGY_RULES):
+            synergy[rule, category_index[category]] = adjustment
+        
+        return QuestionArrays(
+            categories=categories,
+            category_ids=np.array([category_index[q.category] for q in question_bank], dtype=np.intp),
+            base_voi=np.array([q.voi for q in question_bank], dtype=np.float64),
+            importance=np.array([q.importance for q in question_bank], dtype=np.float64),
+            context_on=context_on,
+            context_off=context_off,
+            synergy=synergy
+        )
+    
     def select_next_questions(
         self, 
         current_brief: Dict, 
@@ -106,92 +209,345 @@ class QuestionerService:
         max_questions: int = 5
     ) -> List[Question]:
         """Sélectionne les meilleures questions selon VoI"""
+        return self.select_next_questions_batch([current_brief], [answers_so_far], max_questions)[0]
+    
+    def select_next_questions_batch(
+        self,
+        briefs: Sequence[Dict],
+        answers: Optional[Sequence[Optional[Dict]]] = None,
+        max_questions: int = 5
+    ) -> List[List[Question]]:
+        """Meilleures questions pour chaque brief d'un lot (VoI décroissante).
+
+        Le classement ne dépend que des signaux du brief et des réponses : il
+        est calculé une fois par combinaison de signaux distincte du lot et
+        mémorisé (LRU) pour les lots suivants.
+        """
+        keys = [self._signal_key(brief, given) for brief, given in zip(briefs, self._answers_for(briefs, answers))]
+        rankings = self._rankings(keys, max_questions)
+        return [[self.question_bank[i] for i in rankings[key]] for key in keys]
+    
+    def contextual_voi(self, briefs: Sequence[Dict], answers: Optional[Sequence[Optional[Dict]]] = None) -> np.ndarray:
+        """VoI contextuelle (briefs x questions) ; -inf si la catégorie est déjà répondue"""
+        return self._voi([
+            self._signal_key(brief, given) for brief, given in zip(briefs, self._answers_for(briefs, answers))
+        ])
+    
+    def _answers_for(self, briefs: Sequence[Dict], answers: Optional[Sequence[Optional[Dict]]]) -> List[Dict]:
+        return [given or {} for given in answers] if answers is not None else [{}] * len(briefs)
+    
+    def _signal_key(self, brief: Dict, answers: Dict) -> Tuple[Tuple[bool, ...], ...]:
+        """(signaux du brief, signaux des réponses, catégories déjà répondues)"""
+        return (
+            self._context_signals(brief),
+            self._answer_signals(answers),
+            tuple(category in answers for category in self.arrays.categories)
+        )
+    
+    def _voi(self, keys: List[Tuple[Tuple[bool, ...], ...]]) -> np.ndarray:
+        arrays = self.arrays
+        context = np.array([key[0] for key in keys], dtype=bool).reshape(len(keys), len(CONTEXT_RULES))
+        signals = np.array([key[1] for key in keys], dtype=np.float64).reshape(len(keys), len(SYNERGY_RULES))
+        answered = np.array([key[2] for key in keys], dtype=bool).reshape(len(keys), len(arrays.categories))
         
-        if answers_so_far is None:
-            answers_so_far = {}
-        
-        # Calcule la VoI pour chaque question
-        scored_questions = []
+        # Ajustements par catégorie (B, C), diffusés aux questions par category_ids
+        adjustments = context @ arrays.context_on + ~context @ arrays.context_off
+        synergy = signals @ arrays.synergy
+        voi = arrays.base_voi + adjustments[:, arrays.category_ids] + synergy[:, arrays.category_ids]
+        np.clip(voi, 0.0, 1.0, out=voi)
+        voi[answered[:, arrays.category_ids]] = -np.inf
+        return voi
+    
+    def _rankings(self, keys: List[Tuple], k: int) -> Dict[Tuple, Tuple[int, ...]]:
+        """Classement (indices de questions) par clé de signaux, mémorisé"""
+        rankings, missing = {}, []
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                ranking = self._ranking_cache.get((key, k))
+                if ranking is None:
+                    missing.append(key)
+                else:
+                    self._ranking_cache.move_to_end((key, k))
+                    rankings[key] = ranking
+        if not missing:
+            return rankings
         
-        for question in self.question_bank:
-            # Skip si déjà répondu
-            if question.category in answers_so_far:
-                continue
-                
-            # Calcule VoI spécifique au contexte
-            voi = self._calculate_contextual_voi(question, current_brief, answers_so_far)
-            
-            scored_questions.append((question, voi))
+        computed = [tuple(row) for row in self.top_questions(self._voi(missing), k)]
+        rankings.update(zip(missing, computed))
+        with self._lock:
+            for key, ranking in zip(missing, computed):
+                self._ranking_cache[(key, k)] = ranking
+            while len(self._ranking_cache) > self.ranking_cache_size:
+                self._ranking_cache.popitem(last=False)
+        return rankings
+    
+    @staticmethod
+    def top_questions(voi: np.ndarray, k: int, full_sort_below: int = 256) -> List[List[int]]:
+        """Indices des k meilleures questions par ligne, triés par VoI décroissante.
+
+        Pour les grandes banques, argpartition isole la k-ième valeur ; les ex
+        aequo à cette valeur sont retenus dans l'ordre de la banque, comme le
+        ferait un tri stable. Les petites banques sont triées entièrement.
+        """
+        n_rows, n_questions = voi.shape
+        k = min(k, n_questions)
+        if k <= 0:
+            return [[] for _ in range(n_rows)]
         
-        # Trie par VoI décroissante
-        scored_questions.sort(key=lambda x: x[1], reverse=True)
+        if n_questions < full_sort_below or k == n_questions:
+            columns = np.argsort(-voi, axis=1, kind='stable')[:, :k]
+        else:
+            kth_index = np.argpartition(-voi, k - 1, axis=1)[:, k - 1:k]
+            kth = np.take_along_axis(voi, kth_index, axis=1)
+            above = voi > kth
+            tied = voi == kth
+            room = k - above.sum(axis=1, keepdims=True)
+            selected = above | (tied & (np.cumsum(tied, axis=1) <= room))
+            # Exactement k colonnes retenues par ligne, dans l'ordre de la banque
+            columns = np.nonzero(selected)[1].reshape(n_rows, k)
+            values = np.take_along_axis(voi, columns, axis=1)
+            columns = np.take_along_axis(columns, np.argsort(-values, axis=1, kind='stable'), axis=1)
         
-        # Retourne les top questions
-        return [q for q, _ in scored_questions[:max_questions]]
+        values = np.take_along_axis(voi, columns, axis=1)
+        return [row[row_values > -np.inf].tolist() for row, row_values in zip(columns, values)]
     
-    def _calculate_contextual_voi(
-        self, 
-        question: Question, 
-        brief: Dict, 
-        answers: Dict
-    ) -> float:
-        """Calcule la Value of Information contextuelle"""
+    def plan_questions(
+        self,
+        brief: Dict,
+        answers: Dict = None,
+        max_questions: int = 5,
+        time_budget_ms: float = 25.0,
+        beam_width: int = 8,
+        branching: int = 8,
+        discount: float = 0.9
+    ) -> QuestionPlan:
+        """Séquence de questions maximisant la VoI attendue, réponses anticipées.
+
+        Contrairement au top-k glouton, la valeur d'une question est évaluée
+        dans l'état attendu après les réponses précédentes (synergies). La
+        recherche en faisceau garde les `beam_width` meilleures séquences par
+        profondeur, chacune étendue par ses `branching` meilleures questions ;
+        les séquences de même ensemble de questions (même état final) sont
+        fusionnées. `discount` est la probabilité que l'utilisateur réponde à
+        la question suivante. Le budget est strict : chaque étape (évaluation
+        des états d'une profondeur, expansion d'une séquence, avancée du
+        faisceau, complétion) n'est lancée que si sa durée estimée, à
+        proportion de son travail, tient dans le temps restant. La meilleure
+        séquence partielle est complétée gloutonnement depuis son état attendu
+        si le temps le permet, sinon par le classement de l'état initial
+        (évalué par la recherche, ou mémorisé par select_next_questions) ;
+        sans l'un ni l'autre, le plan reste partiel.
+        """
+        start = time.perf_counter()
+        end = start + time_budget_ms / 1000
+        root = _PlanNode((), 0.0, ((self._signal_key(brief, answers or {}), 1.0),))
+        memo: Dict[Tuple, np.ndarray] = {}
+        beam, depth, truncated = [root], 0, False
         
-        base_voi = question.voi
+        while depth < max_questions:
+            # La recherche laisse la place à la complétion gloutonne de la meilleure séquence
+            states = max(len(node.states) for node in beam)
+            search_end = end - self._completion_estimate(states, states)
+            missing = [key for key in dict.fromkeys(key for node in beam for key, _ in node.states) if key not in memo]
+            step_start = time.perf_counter()
+            if not self._fits("evaluate", step_start, len(missing), search_end):
+                truncated = True
+                break
+            self._evaluate_states(missing, memo)
+            self._observe("evaluate", step_start, len(missing))
+            candidates: Dict[frozenset, Tuple[float, _PlanNode, int]] = {}
+            weight = discount ** depth
+            for node in beam:
+                step_start = time.perf_counter()
+                if not self._fits("expand", step_start, len(node.states), search_end):
+                    truncated = True
+                    break
+                expected = self._expected_voi(node, memo)
+                for question in self.top_questions(expected[None, :], branching)[0]:
+                    value = node.value + weight * float(expected[question])
+                    merged = frozenset(node.sequence + (question,))
+                    if merged not in candidates or candidates[merged][0] < value:
+                        candidates[merged] = (value, node, question)
+                self._observe("expand", step_start, len(node.states))
+            if truncated or not candidates:
+                break
+            best = heapq.nlargest(beam_width, candidates.values(), key=lambda candidate: candidate[0])
+            step_start = time.perf_counter()
+            if not self._fits("advance", step_start, len(best), search_end):
+                truncated = True
+                break
+            beam = [
+                _PlanNode(node.sequence + (question,), value, self._advance(node.states, question))
+                for value, node, question in best
+            ]
+            self._observe("advance", step_start, len(best))
+            depth += 1
         
-        # Ajustements contextuels
-        adjustments = 0.0
+        plan = beam[0]
+        if len(plan.sequence) < max_questions:
+            plan = self._complete_plan(plan, root, memo, max_questions, discount, end)
         
-        # Budget : priorité si pas de mention prix
-        if question.category == "budget":
-            if not self._has_budget_info(brief):
-                adjustments += 0.3
+        return QuestionPlan(
+            questions=[self.question_bank[i] for i in plan.sequence],
+            expected_voi=round(plan.value, 4),
+            depth=depth,
+            states_evaluated=len(memo),
+            truncated=truncated,
+            elapsed_ms=round((time.perf_counter() - start) * 1000, 3)
+        )
+    
+    def _calibrate(self):
+        """Plan et complétion hors budget : les durées des étapes sont connues dès le premier appel"""
+        self.plan_questions({}, None, 2, time_budget_ms=math.inf)
+        root = _PlanNode((), 0.0, ((self._signal_key({}, {}), 1.0),))
+        self._complete_plan(root, root, {}, 1, 0.9, math.inf)
+    
+    def _step_estimate(self, step: str, units: int) -> float:
+        """Durée prévue (s) d'une étape de `units` unités de travail, marge comprise.
+
+        Le maximum des deux moyennes couvre les petites étapes, dominées par
+        le coût fixe d'un appel, comme les grandes, proportionnelles au travail.
+        """
+        per_call, per_unit = self._estimates[step]
+        return STEP_MARGIN * max(per_call, units * per_unit)
+    
+    def _completion_estimate(self, missing: int, states: int) -> float:
+        """Durée prévue (s) de la complétion : évaluation des états manquants, puis classement"""
+        return (self._step_estimate("evaluate", missing) if missing else 0.0) + self._step_estimate("complete", states)
+    
+    def _fits(self, step: str, now: float, units: int, deadline: float) -> bool:
+        """Vrai si l'étape, estimée à `units` unités de travail, se termine avant l'échéance"""
+        return now + self._step_estimate(step, units) <= deadline
+    
+    def _observe(self, step: str, step_start: float, units: int):
+        """Met à jour les durées moyennes (mobiles) de l'étape"""
+        duration = time.perf_counter() - step_start
+        observed = (duration, duration / max(units, 1))
+        estimate = self._estimates[step]
+        self._estimates[step] = tuple(
+            new if not old else 0.8 * old + 0.2 * new for old, new in zip(estimate, observed)
+        )
+    
+    def _complete_plan(self, plan: _PlanNode, root: _PlanNode, memo: Dict[Tuple, np.ndarray],
+                       max_questions: int, discount: float, end: float) -> _PlanNode:
+        """Complète la séquence jusqu'à max_questions sans dépasser l'échéance `end`"""
+        count = max_questions - len(plan.sequence)
+        missing = [key for key, _ in plan.states if key not in memo]
+        step_start = time.perf_counter()
+        if step_start + self._completion_estimate(len(missing), len(plan.states)) <= end:
+            # Complétion gloutonne depuis l'état attendu de la séquence
+            if missing:
+                self._evaluate_states(missing, memo)
+                self._observe("evaluate", step_start, len(missing))
+                step_start = time.perf_counter()
+            expected = self._expected_voi(plan, memo)
+            completion = self._distinct_categories(expected, count)
+            self._observe("complete", step_start, len(plan.states))
+        else:
+            # Classement de l'état initial : VoI évaluée par la recherche, ou classement mémorisé
+            (key, _), = root.states
+            expected = memo.get(key)
+            if expected is not None and self._fits("expand", step_start, 1, end):
+                ranking = self._distinct_categories(expected, count + len(plan.sequence))
             else:
-                adjustments -= 0.5  # Déjà des infos budget
-        
-        # Timeline : priorité si urgent mentionné
-        elif question.category == "timeline":
-            if "urgent" in brief.get("description", "").lower():
-                adjustments += 0.2
-        
-        # Tech : priorité si projet complexe
-        elif question.category == "tech_constraints":
-            complexity = brief.get("structured", {}).get("estimated_complexity", 5)
-            if complexity > 7:
-                adjustments += 0.3
+                with self._lock:
+                    ranking = self._ranking_cache.get((key, max_questions), ())
+                expected = None
+            asked = {self.arrays.category_ids[question] for question in plan.sequence}
+            completion = []
+            for question in ranking:
+                category = self.arrays.category_ids[question]
+                if category not in asked and len(completion) < count:
+                    asked.add(category)
+                    completion.append(question)
         
-        # Qualité : priorité si projet premium
-        elif question.category == "quality":
-            if any(word in brief.get("description", "").lower() for word in ["qualité", "haut de gamme", "premium"]):
-                adjustments += 0.2
-        
-        # Synergie avec réponses existantes
-        synergy = self._calculate_synergy(question, answers)
-        
-        final_voi = base_voi + adjustments + synergy
-        return max(0.0, min(1.0, final_voi))
+        weight = discount ** len(plan.sequence)
+        sequence, value = plan.sequence, plan.value
+        for question in completion:
+            # Les questions du classement mémorisé ne sont pas valorisées : leur VoI n'est pas recalculée
+            voi = float(expected[question]) if expected is not None else 0.0
+            sequence, value = sequence + (question,), value + weight * voi
+            weight *= discount
+        return _PlanNode(sequence, value, plan.states)
+    
+    def plan_value(self, brief: Dict, answers: Dict, questions: Sequence[int], discount: float = 0.9) -> float:
+        """VoI attendue actualisée d'une séquence de questions (indices de la banque)"""
+        node = _PlanNode((), 0.0, ((self._signal_key(brief, answers or {}), 1.0),))
+        memo: Dict[Tuple, np.ndarray] = {}
+        for depth, question in enumerate(questions):
+            self._evaluate_states([key for key, _ in node.states], memo)
+            value = float(self._expected_voi(node, memo)[question])
+            if value == -np.inf:
+                continue
+            node = _PlanNode(node.sequence + (question,), node.value + discount ** depth * value,
+                             self._advance(node.states, question))
+        return node.value
+    
+    def _distinct_categories(self, expected: np.ndarray, count: int) -> List[int]:
+        """Meilleures questions d'au plus une par catégorie (une réponse couvre la catégorie).
+
+        Meilleure question de chaque catégorie (argmax : à VoI égale, la
+        première de la banque), puis catégories par VoI décroissante : même
+        résultat que le parcours du classement complet, sans trier la banque.
+        """
+        best = [columns[np.argmax(expected[columns])] for columns in self._category_columns]
+        best = [question for question in best if expected[question] > -np.inf]
+        best.sort(key=lambda question: (-expected[question], question))
+        return [int(question) for question in best[:count]]
+    
+    def _evaluate_states(self, keys: List[Tuple], memo: Dict[Tuple, np.ndarray]):
+        """VoI de tous les états non encore évalués, en un seul calcul vectorisé"""
+        missing = [key for key in dict.fromkeys(keys) if key not in memo]
+        if missing:
+            memo.update(zip(missing, self._voi(missing)))
+    
+    @staticmethod
+    def _expected_voi(node: _PlanNode, memo: Dict[Tuple, np.ndarray]) -> np.ndarray:
+        (key, probability), *others = node.states
+        expected = probability * memo[key]
+        for key, probability in others:
+            expected = expected + probability * memo[key]
+        return expected
+    
+    def _advance(self, states: Tuple[Tuple[Tuple, float], ...], question: int) -> Tuple[Tuple[Tuple, float], ...]:
+        """Distribution des états après réponse à une question (une branche par issue)"""
+        category = self.arrays.categories.index(self.question_bank[question].category)
+        advanced: Dict[Tuple, float] = {}
+        for (context, signals, answered), probability in states:
+            answered = answered[:category] + (True,) + answered[category + 1:]
+            for outcome, outcome_probability in self._outcomes[question]:
+                key = (context, tuple(a or b for a, b in zip(signals, outcome)), answered)
+                advanced[key] = advanced.get(key, 0.0) + probability * outcome_probability
+        return tuple(advanced.items())
+    
+    def _answer_outcomes(self, question: Question) -> Tuple[Tuple[Tuple[bool, ...], float], ...]:
+        """Issues possibles d'une question (signaux de réponse, probabilité), options équiprobables"""
+        if not question.options:
+            return (((False,) * len(SYNERGY_RULES), 1.0),)
+        outcomes: Dict[Tuple[bool, ...], float] = {}
+        for option in question.options:
+            signals = self._answer_signals({question.category: option})
+            outcomes[signals] = outcomes.get(signals, 0.0) + 1 / len(question.options)
+        return tuple(outcomes.items())
     
-    def _has_budget_info(self, brief: Dict) -> bool:
-        """Vérifie si le brief contient des infos budget"""
+    def _context_signals(self, brief: Dict) -> Tuple[bool, ...]:
+        """Signaux du brief dans l'ordre de CONTEXT_RULES (description mise en minuscules une fois)"""
         description = brief.get("description", "").lower()
-        return any(word in description for word in ["€", "budget", "prix", "coût", "tarif"])
+        signals = {
+            "budget_info": any(word in description for word in BUDGET_WORDS),
+            "urgent": "urgent" in description,
+            "complex": brief.get("structured", {}).get("estimated_complexity", 5) > 7,
+            "premium": any(word in description for word in PREMIUM_WORDS)
+        }
+        return tuple(signals[name] for name, _, _, _ in CONTEXT_RULES)
     
-    def _calculate_synergy(self, question: Question, answers: Dict) -> float:
-        """Calcule la synergie avec les réponses existantes"""
-        synergy = 0.0
-        
-        # Si on a le budget, les questions qualité deviennent plus importantes
-        if "budget" in answers and question.category == "quality":
-            budget_range = answers["budget"]
-            if "15000€" in budget_range or "> 15000€" in budget_range:
-                synergy += 0.2  # Budget élevé → qualité importante
-        
-        # Si urgent, les questions tech deviennent moins importantes
-        if "timeline" in answers and question.category == "tech_constraints":
-            if "Urgent" in answers["timeline"]:
-                synergy -= 0.1  # Urgent → moins de détails tech
-        
-        return synergy
+    def _answer_signals(self, answers: Dict) -> Tuple[bool, ...]:
+        """Signaux des réponses dans l'ordre de SYNERGY_RULES"""
+        signals = {
+            "budget_high": "budget" in answers and "15000€" in answers["budget"],
+            "timeline_urgent": "timeline" in answers and "Urgent" in answers["timeline"]
+        }
+        return tuple(signals[name] for name, _, _ in SYNERGY_RULES)
     
     def estimate_completion_gain(self, questions: List[Question]) -> Dict:
         """Estime le gain de complétude si ces questions sont répondues"""
@@ -210,12 +566,18 @@ class QuestionerService:
 # Service global
 questioner_service = QuestionerService()
 
-def get_next_questions(brief: Dict, answers: Dict = None, max_questions: int = 5) -> dict:
-    """Interface simple pour l'API"""
-    questions = questioner_service.select_next_questions(brief, answers, max_questions)
+def get_next_questions(brief: Dict, answers: Dict = None, max_questions: int = 5,
+                       plan: bool = False, time_budget_ms: float = 25.0) -> dict:
+    """Interface simple pour l'API (plan : séquence planifiée avec anticipation des réponses)"""
+    question_plan = None
+    if plan:
+        question_plan = questioner_service.plan_questions(brief, answers, max_questions, time_budget_ms)
+        questions = question_plan.questions
+    else:
+        questions = questioner_service.select_next_questions(brief, answers, max_questions)
     completion_gain = questioner_service.estimate_completion_gain(questions)
     
-    return {
+    result = {
         "questions": [
             {
                 "text": q.text,
@@ -229,3 +591,12 @@ def get_next_questions(brief: Dict, answers: Dict = None, max_questions: int = 5
         "completion_gain": completion_gain,
         "total_questions": len(questions)
     }
+    if question_plan is not None:
+        result["plan"] = {
+            "expected_voi": question_plan.expected_voi,
+            "depth": question_plan.depth,
+            "states_evaluated": question_plan.states_evaluated,
+            "truncated": question_plan.truncated,
+            "elapsed_ms": question_plan.elapsed_ms
+        }
+    return result
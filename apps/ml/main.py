@@ -1,14 +1,34 @@
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
+from dataclasses import replace
 import uvicorn
 import logging
+import os
 from services.text_normalizer import TextNormalizer
 from services.taxonomizer import Taxonomizer
 from services.template_rewriter import TemplateRewriter
 from services.brief_quality import BriefQualityAnalyzer
+from services.brief_session import (
+    BriefSession, brief_session_store, live_brief_store, parse_answers, parse_budget_amount
+)
 from services.price_time_suggester import PriceTimeSuggester
+from services.loc_uplift import loc_uplift_calculator
+from services.client_history_store import client_history_store
+from services.market_stats import market_stats_engine
+from services.market_intelligence import get_market_suggestions_batch
+from services.nlp_provider import nlp_provider
+from services.brief_tfidf import brief_term_extractor
+from services.mission_index import mission_index
+from services.near_duplicate import SemanticCache
+from services.skill_index import skill_completer
+from services.template_engine import template_path
+from services.data_reloader import DataReloader
+from services.shared_store import (
+    ensure_snapshot, preload_shared_state, process_memory, serve_preforked, shared_mode_enabled
+)
 
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
@@ -23,6 +43,76 @@ template_rewriter = TemplateRewriter()
 brief_quality_analyzer = BriefQualityAnalyzer()
 price_time_suggester = PriceTimeSuggester()
 
+# Rechargement à chaud des CSV de référence (0 pour désactiver)
+data_reloader = DataReloader(interval=float(os.getenv("ML_DATA_RELOAD_INTERVAL", "30")))
+data_reloader.watch("taxonomy", taxonomizer.taxonomy_file, taxonomizer.reload)
+data_reloader.watch("pricing", price_time_suggester.price_file, price_time_suggester.reload)
+
+def reload_snapshot() -> bool:
+    """Le snapshot compilé porte taxonomie et grille de prix : les deux sont
+    rechargées même si l'une échoue ; un échec partiel fait retenter la source."""
+    reloaded = [taxonomizer.reload(), price_time_suggester.reload()]
+    return all(reloaded)
+
+data_reloader.watch("snapshot", taxonomizer.snapshot_path, reload_snapshot)
+data_reloader.watch("client_history", client_history_store.history_file, client_history_store.reload)
+data_reloader.watch(
+    "client_events", client_history_store.events_file, client_history_store.apply_events, append_only=True
+)
+data_reloader.watch(
+    "market_events", market_stats_engine.events_file, market_stats_engine.apply_events, append_only=True
+)
+data_reloader.watch("brief_tfidf", brief_term_extractor.model_file, brief_term_extractor.reload)
+data_reloader.watch(
+    "completed_missions", mission_index.events_file, mission_index.apply_events, append_only=True
+)
+
+def reload_generator_templates() -> bool:
+    from enhancements.generator import generator_service
+    return generator_service.reload()
+
+# Fichiers de templates versionnés (apps/ml/templates ou ML_TEMPLATES_DIR)
+data_reloader.watch("rewriter_templates", template_rewriter.template_file, template_rewriter.reload)
+data_reloader.watch("generator_templates", template_path("generator"), reload_generator_templates)
+
+# Cache sémantique de /improve : un brief republié avec de légères retouches
+# réutilise le résultat déjà calculé (0 pour désactiver)
+improve_cache = SemanticCache(
+    threshold=float(os.getenv("ML_IMPROVE_CACHE_THRESHOLD", "0.9")),
+    capacity=int(os.getenv("ML_IMPROVE_CACHE_SIZE", "10000"))
+)
+# Les résultats en cache dépendent de la taxonomie, de la grille de prix et des templates
+IMPROVE_CACHE_SOURCES = ("taxonomy", "pricing", "snapshot", "rewriter_templates", "generator_templates")
+data_reloader.add_listener(
+    lambda name, version: improve_cache.clear() if name in IMPROVE_CACHE_SOURCES else None
+)
+
+def rebuild_skill_completer():
+    """Index d'autocomplétion : taxonomie active + base de compétences de NormalizeService"""
+    try:
+        from enhancements.normalize import normalize_service
+        extra_skills = normalize_service.skills_db
+    except Exception as e:
+        logger.warning(f"Base de compétences NormalizeService indisponible: {e}")
+        extra_skills = []
+    skill_completer.build_from_taxonomy(taxonomizer.taxonomy_data, extra_skills)
+
+rebuild_skill_completer()
+data_reloader.add_listener(
+    lambda name, version: rebuild_skill_completer() if name in ("taxonomy", "snapshot") else None
+)
+
+@app.on_event("startup")
+async def start_data_reloader():
+    if data_reloader.interval > 0:
+        data_reloader.start()
+
+@app.on_event("shutdown")
+async def stop_data_reloader():
+    data_reloader.stop()
+    market_stats_engine.checkpoint()
+    mission_index.save()
+
 class ProjectImproveRequest(BaseModel):
     title: str
     description: str
@@ -53,11 +143,84 @@ class ProjectImproveResponse(BaseModel):
     loc_uplift_reco: Dict[str, Any]
     rewrite_version: str
     reasons: List[str]
+    similar_missions: List[Dict[str, Any]] = []
+    # Session pour /brief/recompute (None si les sessions sont désactivées)
+    session_id: Optional[str] = None
+
+class ProjectImproveBatchRequest(BaseModel):
+    projects: List[ProjectImproveRequest]
+    complexity: str = "medium"
+
+class ProjectImproveBatchItem(ProjectImproveResponse):
+    market: Dict[str, Any]
+
+class ProjectImproveBatchResponse(BaseModel):
+    results: List[ProjectImproveBatchItem]
+    count: int
 
 class BriefRecomputeRequest(BaseModel):
-    project_id: str
+    session_id: Optional[str] = None
+    # Ancien nom de l'identifiant, accepté si session_id est absent
+    project_id: Optional[str] = None
     answers: List[Dict[str, str]]
 
+class BriefRecomputeResponse(BaseModel):
+    session_id: str
+    brief_quality_score: float
+    richness_score: float
+    completeness_percentage: float
+    missing_info: List[Dict[str, Any]]
+    constraints_std: List[str]
+    price_suggested_min: int
+    price_suggested_med: int
+    price_suggested_max: int
+    delay_suggested_days: int
+    loc_base: float
+    loc_uplift_reco: Dict[str, Any]
+    updated_fields: List[str]
+    criteria_updated: List[str]
+    recomputed: List[str]
+    improvement_summary: str
+
+class BriefEdit(BaseModel):
+    start: Optional[int] = None  # None : ajout en fin de champ
+    end: Optional[int] = None  # None : insertion en start
+    text: str = ""
+    field: str = "description"
+
+class BriefLiveRequest(BaseModel):
+    session_id: Optional[str] = None
+    # Texte complet : ouvre la session ou la resynchronise
+    title: Optional[str] = None
+    description: Optional[str] = None
+    edits: List[BriefEdit] = []
+    # Version connue du client : les modifications sont refusées (409) si elle diffère
+    version: Optional[int] = None
+
+class BriefLiveResponse(BaseModel):
+    session_id: Optional[str] = None
+    version: int
+    brief_quality_score: float
+    richness_score: float
+    completeness_percentage: float
+    missing_info: List[Dict[str, Any]]
+
+class LOCWhatIfRequest(BaseModel):
+    description: str = ""
+    category: str = ""
+    budget: float = 0
+    delay_days: int = 21
+    brief_quality_score: float = 0.5
+    price_suggested_min: float = 0
+    price_suggested_med: float = 0
+    price_suggested_max: float = 0
+    client_id: Optional[str] = None
+    budgets: Optional[List[float]] = None
+    delays: Optional[List[int]] = None
+
+class LOCTargetRequest(LOCWhatIfRequest):
+    target_loc: float = 0.8
+
 @app.get("/health")
 async def health_check():
     """Point de santé du service ML"""
@@ -102,7 +265,8 @@ async def generate_variants(request: dict):
         result = generate_brief_variants(
             title=request.get("title", ""),
             description=request.get("description", ""),
-            category=request.get("category", "autre")
+            category=request.get("category", "autre"),
+            slim=bool(request.get("slim", False))
         )
         
         return {"success": True, "data": result}
@@ -110,6 +274,24 @@ async def generate_variants(request: dict):
     except Exception as e:
         return {"success": False, "error": str(e)}
 
+@app.get("/templates/{template_id}")
+async def get_template(template_id: str, request: Request):
+    """Corps d'un template de génération, versionné et cacheable (ETag)"""
+    from enhancements.generator import generator_service
+    
+    template = generator_service.get_template(template_id)
+    if template is None:
+        raise HTTPException(status_code=404, detail=f"Template inconnu: {template_id}")
+    
+    etag = f'"{template_id}-{generator_service.template_version}"'
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=3600"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(
+        {"id": template_id, "version": generator_service.template_version, "template": template},
+        headers=headers
+    )
+
 @app.post("/questions")
 async def get_questions(request: dict):
     """Génère des questions adaptatives"""
@@ -119,137 +301,494 @@ async def get_questions(request: dict):
         brief = request.get("brief", {})
         answers = request.get("answers", {})
         max_questions = request.get("max_questions", 5)
+        # Mode plan : séquence optimisée par anticipation des réponses, budget de temps plafonné
+        plan = bool(request.get("plan", False))
+        time_budget_ms = min(float(request.get("time_budget_ms", 25.0)), 200.0)
         
-        result = get_next_questions(brief, answers, max_questions)
+        result = get_next_questions(brief, answers, max_questions, plan=plan, time_budget_ms=time_budget_ms)
         
         return {"success": True, "data": result}
         
     except Exception as e:
         return {"success": False, "error": str(e)}
 
+@app.get("/skills/complete")
+async def complete_skills(q: str, category: Optional[str] = None, limit: int = 10):
+    """Suggestions de compétences pour la saisie en cours, classées par fréquence"""
+    return {"query": q, "category": category, "suggestions": skill_completer.complete(q, category, limit)}
+
 @app.post("/improve", response_model=ProjectImproveResponse)
 async def improve_project(request: ProjectImproveRequest):
     """Améliore un projet avec l'IA complète"""
     try:
-        logger.info(f"Amélioration du projet: {request.title}")
-        
-        # 1. Normalisation du texte
-        normalized = text_normalizer.normalize(request.description)
-        logger.info(f"Texte normalisé, {len(normalized.keywords)} mots-clés extraits")
-        
-        # 2. Classification taxonomique
-        taxonomy_result = taxonomizer.classify(
-            text=f"{request.title} {request.description}",
-            keywords=normalized.keywords
-        )
-        logger.info(f"Classification: {taxonomy_result.category_std}/{taxonomy_result.sub_category_std}")
-        
-        # 3. Réécriture avec templates
-        rewritten = template_rewriter.rewrite_project(
-            original_title=request.title,
-            original_description=request.description,
-            category=taxonomy_result.category_std,
-            sub_category=taxonomy_result.sub_category_std,
-            skills=taxonomy_result.skills_std
-        )
-        logger.info(f"Projet réécrit avec template {taxonomy_result.category_std}")
-        
-        # 4. Analyse qualité du brief
-        quality_analysis = brief_quality_analyzer.analyze(
-            title=request.title,
-            description=request.description,
-            category=taxonomy_result.category_std
-        )
-        logger.info(f"Qualité brief: {quality_analysis.brief_quality_score:.2f}")
-        
-        # 5. Suggestions prix et délais
-        price_suggestion = price_time_suggester.suggest(
-            category=taxonomy_result.category_std,
-            sub_category=taxonomy_result.sub_category_std,
-            complexity='medium',  # Déterminé par l'analyse
-            brief_quality_score=quality_analysis.brief_quality_score,
-            constraints=normalized.constraints
-        )
-        logger.info(f"Prix suggéré: {price_suggestion.price_suggested_med}€")
-        
-        # 6. Compilation des résultats
-        response = ProjectImproveResponse(
-            title_std=rewritten.title_std,
-            summary_std=rewritten.summary_std,
-            acceptance_criteria=rewritten.acceptance_criteria,
-            category_std=taxonomy_result.category_std,
-            sub_category_std=taxonomy_result.sub_category_std,
-            skills_std=taxonomy_result.skills_std,
-            tags_std=taxonomy_result.tags_std,
-            tasks_std=rewritten.tasks_std,
-            deliverables_std=rewritten.deliverables_std,
-            constraints_std=normalized.constraints,
-            brief_quality_score=quality_analysis.brief_quality_score,
-            richness_score=quality_analysis.richness_score,
-            missing_info=[
-                {"id": info["type"], "q": info["questions"][0]}
-                for info in quality_analysis.missing_info[:3]
-            ],
-            price_suggested_min=price_suggestion.price_suggested_min,
-            price_suggested_med=price_suggestion.price_suggested_med,
-            price_suggested_max=price_suggestion.price_suggested_max,
-            delay_suggested_days=price_suggestion.delay_suggested_days,
-            loc_base=0.6,  # Score LOC de base
-            loc_uplift_reco={
-                "new_budget": int(price_suggestion.price_suggested_med * 1.1),
-                "new_delay": price_suggestion.delay_suggested_days + 2,
-                "delta_loc": 0.08
-            },
-            rewrite_version=rewritten.rewrite_version,
-            reasons=generate_improvement_reasons(quality_analysis, price_suggestion, taxonomy_result)
-        )
-        
+        text = f"{request.title} {request.description}"
+        context = (request.category, request.budget_min, request.budget_max, request.deadline)
+        if improve_cache.index.capacity:
+            cached = improve_cache.get(text, context)
+            if cached is not None:
+                logger.info("Brief quasi identique déjà amélioré, résultat en cache")
+                return open_session(*retarget_improvement(*cached, request))
+
+        response, session = build_improvement(request)
+        if improve_cache.index.capacity:
+            improve_cache.put(text, (response, session), context)
         logger.info("Amélioration terminée avec succès")
-        return response
+        return open_session(response, session)
         
     except Exception as e:
         logger.error(f"Erreur lors de l'amélioration: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Erreur lors de l'amélioration: {str(e)}")
 
-@app.post("/brief/recompute")
-async def recompute_brief(request: BriefRecomputeRequest):
-    """Recalcule les suggestions après réponses aux questions"""
+@app.post("/improve/batch", response_model=ProjectImproveBatchResponse)
+async def improve_projects_batch(request: ProjectImproveBatchRequest):
+    """Améliore un lot de projets ; le contexte marché est calculé une fois pour tout le lot"""
     try:
-        logger.info(f"Recalcul brief pour projet {request.project_id}")
-        
-        # TODO: Récupérer le projet depuis la DB
-        # Pour l'instant, on retourne un exemple
-        
-        # Simule une amélioration après réponses
-        improvement_factor = len(request.answers) * 0.05  # 5% par réponse
+        heat_by_category: Dict[str, Any] = {}
+        improved = [run_improvement(project, heat_by_category) for project in request.projects]
         
-        response = {
-            "brief_quality_score": min(0.95, 0.6 + improvement_factor),
-            "richness_score": min(0.90, 0.5 + improvement_factor),
-            "missing_info": [],  # Plus de questions manquantes
-            "price_suggested_med": 8500,  # Prix ajusté
-            "updated_fields": ["brief_quality_score", "richness_score", "price_suggested_med"],
-            "improvement_summary": f"Brief amélioré grâce à {len(request.answers)} réponse(s) supplémentaire(s)"
-        }
+        market = get_market_suggestions_batch(
+            categories=[result.category_std for result in improved],
+            descriptions=[project.description for project in request.projects],
+            complexities=[request.complexity] * len(improved)
+        )
+        results = [
+            ProjectImproveBatchItem(**result.model_dump(), market=market_row)
+            for result, market_row in zip(improved, market)
+        ]
+        logger.info(f"Lot de {len(results)} projets amélioré ({len(heat_by_category)} catégories)")
+        return ProjectImproveBatchResponse(results=results, count=len(results))
         
-        logger.info("Recalcul terminé")
+    except Exception as e:
+        logger.error(f"Erreur lors de l'amélioration par lot: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Erreur lors de l'amélioration par lot: {str(e)}")
+
+def run_improvement(request: ProjectImproveRequest,
+                    heat_by_category: Optional[Dict[str, Any]] = None) -> ProjectImproveResponse:
+    """Pipeline complet d'amélioration d'un projet, avec ouverture d'une session"""
+    return open_session(*build_improvement(request, heat_by_category))
+
+def open_session(response: ProjectImproveResponse, session: BriefSession) -> ProjectImproveResponse:
+    """Enregistre l'état du pipeline et renvoie la réponse portant l'identifiant de session.
+
+    Une réponse servie depuis le cache de /improve ouvre sa propre session à
+    partir de l'état mis en cache avec elle.
+    """
+    session_id = brief_session_store.create(session)
+    if session_id is None:
+        return response
+    return response.model_copy(update={"session_id": session_id})
+
+def retarget_improvement(response: ProjectImproveResponse, session: BriefSession,
+                         request: ProjectImproveRequest) -> Tuple[ProjectImproveResponse, BriefSession]:
+    """Résultat servi depuis le cache de /improve, rattaché au brief reçu.
+
+    Le brief mis en cache n'est qu'approximativement celui de la requête :
+    classification, réécriture et tension du marché sont reprises, mais la
+    qualité, les questions, les contraintes, le prix et le LOC sont
+    recalculés depuis le texte reçu, pour que la réponse et la session que
+    /brief/recompute complétera portent les mêmes valeurs.
+    """
+    if session.title == request.title and session.description == request.description:
+        return response, session
+    quality_state = brief_quality_analyzer.build_state(request.title, request.description)
+    quality = brief_quality_analyzer.analyze_state(quality_state)
+    price = suggest_session_price(session, quality, quality_state)
+    loc_base, loc_uplift_reco = compute_session_loc(session, request.description, session.budget, quality, price)
+    session = replace(
+        session,
+        title=request.title,
+        description=request.description,
+        quality_state=quality_state,
+        quality=quality,
+        price=price,
+        loc_base=loc_base,
+        loc_uplift_reco=loc_uplift_reco
+    )
+    response = response.model_copy(update={
+        "constraints_std": list(quality_state.constraints),
+        "brief_quality_score": quality.brief_quality_score,
+        "richness_score": quality.richness_score,
+        "missing_info": format_missing_info(quality.missing_info),
+        "price_suggested_min": price.price_suggested_min,
+        "price_suggested_med": price.price_suggested_med,
+        "price_suggested_max": price.price_suggested_max,
+        "delay_suggested_days": price.delay_suggested_days,
+        "loc_base": loc_base,
+        "loc_uplift_reco": loc_uplift_reco,
+        "reasons": generate_improvement_reasons(
+            quality, price, session.skills, session.category, session.taxonomy_confidence
+        )
+    })
+    return response, session
+
+def suggest_session_price(session: BriefSession, quality, quality_state):
+    """Prix suggéré pour la catégorie et la tension du marché d'une session"""
+    return price_time_suggester.suggest(
+        category=session.category,
+        sub_category=session.sub_category,
+        complexity='medium',
+        brief_quality_score=quality.brief_quality_score,
+        market_heat=session.market_heat,
+        constraints=list(quality_state.constraints)
+    )
+
+def compute_session_loc(session: BriefSession, description: str, budget, quality,
+                        price) -> Tuple[float, Dict[str, Any]]:
+    """LOC et recommandation d'uplift d'une session pour un texte et un prix donnés"""
+    loc_inputs = build_loc_inputs(
+        description=description,
+        category=session.category,
+        budget=budget,
+        brief_quality_score=quality.brief_quality_score,
+        price_suggestion=price,
+        missing_info=quality.missing_info,
+        heat_score=session.heat_score
+    )
+    loc_result = loc_uplift_calculator.calculate_loc_with_uplift(*loc_inputs)
+    return loc_result.loc_base, build_loc_uplift_reco(loc_result, loc_uplift_calculator.evaluate_what_if(*loc_inputs))
+
+def build_improvement(request: ProjectImproveRequest,
+                      heat_by_category: Optional[Dict[str, Any]] = None) -> Tuple[ProjectImproveResponse, BriefSession]:
+    """Pipeline complet d'amélioration d'un projet.
+
+    Retourne la réponse et l'état intermédiaire (taxonomie, caractéristiques
+    qualité, prix, LOC) repris par /brief/recompute. heat_by_category,
+    partagé entre les projets d'un lot, évite de relire la tension du marché
+    pour chaque projet d'une même catégorie.
+    """
+    logger.info(f"Amélioration du projet: {request.title}")
+    
+    # 1. Normalisation du texte
+    normalized = text_normalizer.normalize(request.description)
+    logger.info(f"Texte normalisé, {len(normalized.keywords)} mots-clés extraits")
+    
+    # 2. Classification taxonomique
+    taxonomy_result = taxonomizer.classify(
+        text=f"{request.title} {request.description}",
+        keywords=normalized.keywords
+    )
+    logger.info(f"Classification: {taxonomy_result.category_std}/{taxonomy_result.sub_category_std}")
+    
+    # 3. Réécriture avec templates
+    rewritten = template_rewriter.rewrite_project(
+        original_title=request.title,
+        original_description=request.description,
+        category=taxonomy_result.category_std,
+        sub_category=taxonomy_result.sub_category_std,
+        skills=taxonomy_result.skills_std
+    )
+    logger.info(f"Projet réécrit avec template {taxonomy_result.category_std}")
+    
+    # 4. Analyse qualité du brief
+    quality_state = brief_quality_analyzer.build_state(request.title, request.description)
+    quality_analysis = brief_quality_analyzer.analyze_state(quality_state)
+    logger.info(f"Qualité brief: {quality_analysis.brief_quality_score:.2f}")
+    
+    # 5. Suggestions prix et délais (tension du marché sur 24h vs 30j)
+    category = taxonomy_result.category_std
+    if heat_by_category is None:
+        market_heat, heat_score = market_stats_engine.heat(category)
+    else:
+        if category not in heat_by_category:
+            heat_by_category[category] = market_stats_engine.heat(category)
+        market_heat, heat_score = heat_by_category[category]
+    price_suggestion = price_time_suggester.suggest(
+        category=taxonomy_result.category_std,
+        sub_category=taxonomy_result.sub_category_std,
+        complexity='medium',  # Déterminé par l'analyse
+        brief_quality_score=quality_analysis.brief_quality_score,
+        market_heat=market_heat,
+        constraints=normalized.constraints
+    )
+    logger.info(f"Prix suggéré: {price_suggestion.price_suggested_med}€")
+
+    # Missions passées comparables, avec leur prix final, en appui du prix suggéré
+    similar_missions = mission_index.search(f"{request.title} {request.description}", category)
+    
+    # 6. Probabilité d'aboutissement (LOC) et leviers d'amélioration
+    budget = request.budget_max or request.budget_min or 0
+    loc_inputs = build_loc_inputs(
+        description=request.description,
+        category=taxonomy_result.category_std,
+        budget=budget,
+        brief_quality_score=quality_analysis.brief_quality_score,
+        price_suggestion=price_suggestion,
+        missing_info=quality_analysis.missing_info,
+        heat_score=heat_score
+    )
+    loc_result = loc_uplift_calculator.calculate_loc_with_uplift(*loc_inputs)
+    what_if = loc_uplift_calculator.evaluate_what_if(*loc_inputs)
+    loc_uplift_reco = build_loc_uplift_reco(loc_result, what_if)
+    logger.info(f"LOC: {loc_result.loc_base:.2f} (potentiel {loc_result.loc_uplift_reco['potential_final_loc']:.2f})")
+    
+    # 7. Compilation des résultats
+    response = ProjectImproveResponse(
+        title_std=rewritten.title_std,
+        summary_std=rewritten.summary_std,
+        acceptance_criteria=rewritten.acceptance_criteria,
+        category_std=taxonomy_result.category_std,
+        sub_category_std=taxonomy_result.sub_category_std,
+        skills_std=taxonomy_result.skills_std,
+        tags_std=taxonomy_result.tags_std,
+        tasks_std=rewritten.tasks_std,
+        deliverables_std=rewritten.deliverables_std,
+        constraints_std=normalized.constraints,
+        brief_quality_score=quality_analysis.brief_quality_score,
+        richness_score=quality_analysis.richness_score,
+        missing_info=format_missing_info(quality_analysis.missing_info),
+        price_suggested_min=price_suggestion.price_suggested_min,
+        price_suggested_med=price_suggestion.price_suggested_med,
+        price_suggested_max=price_suggestion.price_suggested_max,
+        delay_suggested_days=price_suggestion.delay_suggested_days,
+        loc_base=loc_result.loc_base,
+        loc_uplift_reco=loc_uplift_reco,
+        rewrite_version=rewritten.rewrite_version,
+        reasons=generate_improvement_reasons(
+            quality_analysis, price_suggestion, taxonomy_result.skills_std,
+            taxonomy_result.category_std, taxonomy_result.confidence
+        ),
+        similar_missions=[mission.as_dict() for mission in similar_missions]
+    )
+    session = BriefSession(
+        title=request.title,
+        description=request.description,
+        category=taxonomy_result.category_std,
+        sub_category=taxonomy_result.sub_category_std,
+        skills=tuple(taxonomy_result.skills_std),
+        budget=budget,
+        market_heat=market_heat,
+        heat_score=heat_score,
+        quality_state=quality_state,
+        quality=quality_analysis,
+        price=price_suggestion,
+        loc_base=loc_result.loc_base,
+        loc_uplift_reco=loc_uplift_reco,
+        taxonomy_confidence=taxonomy_result.confidence
+    )
+    
+    return response, session
+
+def format_missing_info(missing_info: List[Dict[str, Any]], answered=()) -> List[Dict[str, Any]]:
+    """Questions prioritaires renvoyées au client, hors critères déjà répondus"""
+    return [
+        {"id": info["type"], "q": info["questions"][0]}
+        for info in missing_info if info["type"] not in answered
+    ][:3]
+
+@app.post("/brief/recompute", response_model=BriefRecomputeResponse)
+async def recompute_brief(request: BriefRecomputeRequest):
+    """Recalcule les suggestions après réponses aux questions, depuis la session ouverte par /improve"""
+    session_id = request.session_id or request.project_id
+    session = brief_session_store.get(session_id) if session_id else None
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session inconnue ou expirée, relancer /improve")
+    try:
+        logger.info(f"Recalcul brief pour la session {session_id}")
+        updated, response = recompute_session(session_id, session, request.answers)
+        if not brief_session_store.update(session_id, updated):
+            logger.warning(f"Session {session_id} expirée pendant le recalcul")
+        logger.info(f"Recalcul terminé ({', '.join(response.recomputed)})")
         return response
         
     except Exception as e:
         logger.error(f"Erreur lors du recalcul: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Erreur lors du recalcul: {str(e)}")
 
+def recompute_session(session_id: str, session: BriefSession,
+                      answers: List[Dict[str, str]]) -> Tuple[BriefSession, BriefRecomputeResponse]:
+    """Ajoute des réponses à une session et ne recalcule que ce qu'elles touchent.
+
+    Ni normalisation complète, ni classification, ni réécriture : seul le
+    texte des réponses est analysé et les critères qualité qu'il touche sont
+    rescorés. Le prix n'est recalculé que si le score qualité ou les
+    contraintes changent, le LOC que si l'une de ses entrées change (prix,
+    budget, informations manquantes, mots d'urgence).
+    """
+    default_questions = {
+        info_type: criteria['questions'][0]
+        for info_type, criteria in brief_quality_analyzer.quality_criteria['essential_info'].items()
+    }
+    state, description, budget = session.quality_state, session.description, session.budget
+    answered = dict(session.answers)
+    criteria_updated, timing_changed = set(), False
+    parsed = parse_answers(answers, default_questions)
+    for answer_id, text, answer in parsed:
+        state, changed = brief_quality_analyzer.extend_state(state, text)
+        criteria_updated |= changed
+        description = f"{description}\n{text}"
+        timing_changed = timing_changed or loc_uplift_calculator.mentions_timing(text)
+        if answer_id:
+            answered[answer_id] = answer
+        if answer_id == 'budget':
+            budget = parse_budget_amount(answer) or budget
+    
+    recomputed = []
+    quality = session.quality
+    if state is not session.quality_state:
+        quality = brief_quality_analyzer.analyze_state(state)
+        recomputed.append("quality")
+    
+    price = session.price
+    if (quality.brief_quality_score != session.quality.brief_quality_score
+            or state.constraints != session.quality_state.constraints):
+        price = suggest_session_price(session, quality, state)
+        recomputed.append("price")
+    
+    loc_base, loc_uplift_reco = session.loc_base, session.loc_uplift_reco
+    if (price is not session.price or budget != session.budget or timing_changed
+            or quality.missing_info != session.quality.missing_info):
+        loc_base, loc_uplift_reco = compute_session_loc(session, description, budget, quality, price)
+        recomputed.append("loc")
+    
+    updated = BriefSession(
+        title=session.title,
+        description=description,
+        category=session.category,
+        sub_category=session.sub_category,
+        skills=session.skills,
+        budget=budget,
+        market_heat=session.market_heat,
+        heat_score=session.heat_score,
+        quality_state=state,
+        quality=quality,
+        price=price,
+        loc_base=loc_base,
+        loc_uplift_reco=loc_uplift_reco,
+        taxonomy_confidence=session.taxonomy_confidence,
+        answers=answered
+    )
+    
+    previous_missing = format_missing_info(session.quality.missing_info, session.answers)
+    missing_info = format_missing_info(quality.missing_info, answered)
+    fields = {
+        "brief_quality_score": (session.quality.brief_quality_score, quality.brief_quality_score),
+        "richness_score": (session.quality.richness_score, quality.richness_score),
+        "completeness_percentage": (session.quality.completeness_percentage, quality.completeness_percentage),
+        "missing_info": (previous_missing, missing_info),
+        "constraints_std": (session.quality_state.constraints, state.constraints),
+        "price_suggested_min": (session.price.price_suggested_min, price.price_suggested_min),
+        "price_suggested_med": (session.price.price_suggested_med, price.price_suggested_med),
+        "price_suggested_max": (session.price.price_suggested_max, price.price_suggested_max),
+        "delay_suggested_days": (session.price.delay_suggested_days, price.delay_suggested_days),
+        "loc_base": (session.loc_base, loc_base),
+        "loc_uplift_reco": (session.loc_uplift_reco, loc_uplift_reco)
+    }
+    
+    response = BriefRecomputeResponse(
+        session_id=session_id,
+        brief_quality_score=quality.brief_quality_score,
+        richness_score=quality.richness_score,
+        completeness_percentage=quality.completeness_percentage,
+        missing_info=missing_info,
+        constraints_std=list(state.constraints),
+        price_suggested_min=price.price_suggested_min,
+        price_suggested_med=price.price_suggested_med,
+        price_suggested_max=price.price_suggested_max,
+        delay_suggested_days=price.delay_suggested_days,
+        loc_base=loc_base,
+        loc_uplift_reco=loc_uplift_reco,
+        updated_fields=[name for name, (before, after) in fields.items() if before != after],
+        criteria_updated=sorted(criteria_updated),
+        recomputed=recomputed,
+        improvement_summary=(
+            f"Brief complété par {len(parsed)} réponse(s) : qualité "
+            f"{session.quality.brief_quality_score:.2f} -> {quality.brief_quality_score:.2f}, "
+            f"{len(missing_info)} question(s) restante(s)"
+        )
+    )
+    return updated, response
+
+@app.post("/brief/live", response_model=BriefLiveResponse)
+async def live_brief(request: BriefLiveRequest):
+    """Score qualité et questions manquantes pendant la saisie.
+
+    Le client ouvre une session avec le texte complet puis n'envoie que ses
+    modifications (plages remplacées ou ajouts en fin de champ) ; seul leur
+    voisinage est réanalysé.
+    """
+    session_id = request.session_id
+    live = live_brief_store.get(session_id) if session_id else None
+    if request.title is not None or request.description is not None:
+        if live is None:
+            live = brief_quality_analyzer.live(request.title or "", request.description or "")
+            session_id = live_brief_store.create(live)
+        else:
+            live.reset(request.title if request.title is not None else live.title,
+                       request.description if request.description is not None else live.description)
+    elif live is None:
+        raise HTTPException(status_code=404, detail="Session de saisie inconnue ou expirée, renvoyer le texte complet")
+    elif request.version is not None and request.version != live.version:
+        raise HTTPException(status_code=409, detail=f"Version {request.version} périmée (serveur : {live.version}), "
+                                                    "renvoyer le texte complet")
+    
+    try:
+        for edit in request.edits:
+            if edit.start is None:
+                live.append(edit.text, edit.field)
+            else:
+                live.apply_edit(edit.start, edit.end, edit.text, edit.field)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"{e}, renvoyer le texte complet")
+    
+    analysis = live.analysis()
+    return BriefLiveResponse(
+        session_id=session_id,
+        version=live.version,
+        brief_quality_score=analysis.brief_quality_score,
+        richness_score=analysis.richness_score,
+        completeness_percentage=analysis.completeness_percentage,
+        missing_info=format_missing_info(analysis.missing_info)
+    )
+
+@app.post("/loc/what-if")
+async def loc_what_if(request: LOCWhatIfRequest):
+    """Évalue le LOC sur une grille budget × délai (curseurs côté client)"""
+    try:
+        return loc_uplift_calculator.evaluate_what_if(
+            *loc_inputs_from_request(request),
+            budgets=request.budgets, delays=request.delays
+        )
+    except Exception as e:
+        logger.error(f"Erreur what-if LOC: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Erreur lors du calcul what-if: {str(e)}")
+
+@app.post("/loc/target")
+async def loc_target(request: LOCTargetRequest):
+    """Budget et/ou délai minimal pour atteindre une probabilité d'aboutissement cible"""
+    try:
+        return loc_uplift_calculator.solve_target_loc(*loc_inputs_from_request(request), request.target_loc)
+    except Exception as e:
+        logger.error(f"Erreur cible LOC: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Erreur lors du calcul de la cible LOC: {str(e)}")
+
 @app.get("/stats")
 async def get_ml_stats():
     """Statistiques du service ML"""
     try:
         taxonomy_stats = taxonomizer.get_category_stats()
         rewriter_stats = template_rewriter.get_rewrite_stats()
+        from enhancements.generator import generator_service
         
         return {
             "service_status": "operational",
             "taxonomy": taxonomy_stats,
             "templates": rewriter_stats,
+            "data_versions": {
+                "taxonomy": taxonomizer.data_version,
+                "pricing": price_time_suggester.data_version,
+                "reloads": data_reloader.reload_count
+            },
+            "client_history": client_history_store.get_stats(),
+            "market_stats": market_stats_engine.get_stats(),
+            "nlp": nlp_provider.get_stats(),
+            "brief_tfidf": brief_term_extractor.get_stats(),
+            "mission_index": mission_index.get_stats(),
+            "improve_cache": improve_cache.get_stats(),
+            "brief_sessions": brief_session_store.get_stats(),
+            "live_brief_sessions": live_brief_store.get_stats(),
+            "skill_completion": skill_completer.get_stats(),
+            "generate_cache": generator_service.get_cache_stats(),
+            "worker": {"pid": os.getpid(), "shared_data": shared_mode_enabled(), **process_memory()},
             "version": "1.0.0",
             "capabilities": [
                 "text_normalization",
@@ -264,7 +803,77 @@ async def get_ml_stats():
         logger.error(f"Erreur stats: {str(e)}")
         raise HTTPException(status_code=500, detail="Erreur lors de la récupération des stats")
 
-def generate_improvement_reasons(quality_analysis, price_suggestion, taxonomy_result) -> List[str]:
+def build_loc_inputs(description, category, budget, brief_quality_score, price_suggestion, missing_info,
+                     heat_score=0.5):
+    """Prépare (project_data, standardization_data, market_context) pour le calcul LOC"""
+    project_data = {
+        'budget': budget,
+        'category': category,
+        'description': description
+    }
+    standardization_data = {
+        'brief_quality_score': brief_quality_score,
+        'price_suggested_min': price_suggestion.price_suggested_min,
+        'price_suggested_med': price_suggestion.price_suggested_med,
+        'price_suggested_max': price_suggestion.price_suggested_max,
+        'delay_suggested_days': price_suggestion.delay_suggested_days,
+        'missing_info': missing_info
+    }
+    market_context = {'price_suggested_med': price_suggestion.price_suggested_med, 'heat_score': heat_score}
+    return project_data, standardization_data, market_context
+
+def loc_inputs_from_request(request: LOCWhatIfRequest):
+    """Construit les entrées du calcul LOC depuis une requête /loc/*"""
+    project_data = {
+        'budget': request.budget,
+        'category': request.category,
+        'description': request.description,
+        'client_id': request.client_id
+    }
+    standardization_data = {
+        'brief_quality_score': request.brief_quality_score,
+        'price_suggested_min': request.price_suggested_min,
+        'price_suggested_med': request.price_suggested_med,
+        'price_suggested_max': request.price_suggested_max,
+        'delay_suggested_days': request.delay_days
+    }
+    market_context = {'price_suggested_med': request.price_suggested_med}
+    return project_data, standardization_data, market_context
+
+def build_loc_uplift_reco(loc_result, what_if) -> Dict[str, Any]:
+    """Assemble la recommandation d'uplift renvoyée par /improve.
+
+    Conserve les clés historiques (new_budget, new_delay, delta_loc) en les
+    dérivant du point le moins coûteux de LOC maximal sur la frontière de Pareto.
+    """
+    reco = dict(loc_result.loc_uplift_reco)
+    frontier = what_if['pareto_frontier']
+
+    if frontier:
+        # Point le moins coûteux atteignant le LOC maximal de la frontière
+        best = max(frontier, key=lambda point: (point['loc'], -point['extra_cost'], -point['extra_delay_days']))
+        reco.update({
+            "new_budget": int(best['budget']),
+            "new_delay": best['delay_days'],
+            "delta_loc": best['loc_gain']
+        })
+    else:
+        reco.update({
+            "new_budget": int(what_if['current_budget']),
+            "new_delay": what_if['current_delay'],
+            "delta_loc": 0.0
+        })
+
+    reco.update({
+        "recommended_budget": reco["new_budget"],
+        "recommended_delay": reco["new_delay"],
+        "expected_loc_improvement": reco["delta_loc"],
+        "pareto_frontier": frontier
+    })
+    return reco
+
+def generate_improvement_reasons(quality_analysis, price_suggestion, skills, category,
+                                 taxonomy_confidence) -> List[str]:
     """Génère les raisons des améliorations suggérées"""
     reasons = []
     
@@ -277,11 +886,11 @@ def generate_improvement_reasons(quality_analysis, price_suggestion, taxonomy_re
     
     # Raisons liées aux prix
     if price_suggestion.confidence > 0.8:
-        reasons.append(f"Prix basé sur {len(taxonomy_result.skills_std)} compétences identifiées")
+        reasons.append(f"Prix basé sur {len(skills)} compétences identifiées")
     
     # Raisons liées à la taxonomie
-    if taxonomy_result.confidence > 0.7:
-        reasons.append(f"Catégorisation précise en {taxonomy_result.category_std}")
+    if taxonomy_confidence > 0.7:
+        reasons.append(f"Catégorisation précise en {category}")
     
     # Questions manquantes
     if len(quality_analysis.missing_info) > 0:
@@ -290,4 +899,10 @@ def generate_improvement_reasons(quality_analysis, price_suggestion, taxonomy_re
     return reasons[:4]  # Limite à 4 raisons
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8001)
+    if shared_mode_enabled():
+        # Données chargées une fois dans le maître puis partagées par les workers forkés
+        ensure_snapshot(taxonomizer.data_path, taxonomizer.snapshot_path)
+        preload_shared_state([taxonomizer, price_time_suggester])
+        serve_preforked(app, host="0.0.0.0", port=8001, workers=int(os.getenv("ML_WORKERS", "2")))
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=8001)
@@ -1,12 +1,18 @@
 
 import logging
-from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple
+from dataclasses import dataclass, replace
 import re
-from text_normalizer import TextNormalizer
+import numpy as np
+from services.text_normalizer import TextNormalizer
 
 logger = logging.getLogger(__name__)
 
+# Caractères remplacés par une espace par TextNormalizer._clean_text
+_SPECIAL_CHARS = re.compile(r'[^\w\s.,!?;:-]')
+_WORD_PATTERN = re.compile(r'\b\w{3,}\b')
+_SPACE_RUNS = re.compile(r'\s+')
+
 @dataclass
 class QualityAnalysis:
     brief_quality_score: float
@@ -16,10 +22,53 @@ class QualityAnalysis:
     improvements: List[str]
     completeness_percentage: float
 
+@dataclass(frozen=True)
+class QualityState:
+    """Caractéristiques d'un brief dont dérive l'analyse qualité.
+
+    Conservée entre deux appels, elle permet de compléter un brief (réponses
+    aux questions) en n'analysant que le texte ajouté : mots-clés trouvés par
+    critère, compteurs de mots et de phrases, extractions du normaliseur.
+    """
+    keyword_hits: Dict[str, FrozenSet[str]]
+    bonus_hits: Dict[str, bool]
+    essential_scores: Tuple[float, ...]  # Dans l'ordre de BriefQualityAnalyzer.essential_types
+    tech_hits: FrozenSet[str]
+    word_count: int
+    closed_sentences: int  # Phrases terminées de plus de 10 caractères
+    sentence_tail: str  # Texte après le dernier point, phrase encore ouverte
+    keywords: Tuple[str, ...]
+    constraints: Tuple[str, ...]
+    quantity_keys: FrozenSet[str]
+    clean_tail: str  # Fin du texte normalisé, pour les motifs à cheval sur un ajout
+
 class BriefQualityAnalyzer:
+    MAX_KEYWORDS = 20  # Limite de TextNormalizer._extract_keywords
+    CLEAN_TAIL_LENGTH = 64
+    # Colonnes de la matrice de caractéristiques, après les scores essentiels ;
+    # les six premières sont normalisées par FEATURE_SCALES (ratio plafonné à 1)
+    FEATURES = ('specific_details', 'word_count', 'unique_keywords', 'constraints', 'quantities',
+                'tech_mentions', 'sentences')
+    FEATURE_SCALES = (10, 100, 15, 5, 3, 3)
+    ESSENTIAL_STRENGTHS = {
+        'objective': 'Objectifs clairement définis',
+        'scope': 'Périmètre bien délimité',
+        'requirements': 'Exigences techniques précises',
+        'deliverables': 'Livrables explicites',
+        'timeline': 'Planning clairement exprimé',
+        'budget': 'Budget transparent'
+    }
+    ESSENTIAL_IMPROVEMENTS = {
+        'budget': "Indiquer une fourchette budgétaire même approximative",
+        'timeline': "Mentionner une échéance ou urgence du projet",
+        'deliverables': "Lister précisément les livrables attendus"
+    }
+
     def __init__(self):
         self.text_normalizer = TextNormalizer()
         self._init_quality_criteria()
+        self._init_weight_vectors()
+        self._live_tables = None
 
     def _init_quality_criteria(self):
         """Initialise les critères de qualité"""
@@ -28,6 +77,9 @@ class BriefQualityAnalyzer:
                 'objective': {
                     'weight': 0.25,
                     'keywords': ['objectif', 'but', 'goal', 'finalité', 'pourquoi'],
+                    # Bonus pour phrases complètes sur le sujet
+                    'bonus_words': ['pour', 'afin', 'objectif'],
+                    'bonus': 0.3,
                     'questions': [
                         'Quel est l\'objectif principal de ce projet ?',
                         'Quels résultats attendez-vous ?',
@@ -37,6 +89,8 @@ class BriefQualityAnalyzer:
                 'scope': {
                     'weight': 0.20,
                     'keywords': ['périmètre', 'inclus', 'exclus', 'limites', 'scope'],
+                    'bonus_words': ['inclure', 'périmètre', 'comprend'],
+                    'bonus': 0.3,
                     'questions': [
                         'Quel est le périmètre exact du projet ?',
                         'Que doit-on inclure/exclure ?',
@@ -46,6 +100,8 @@ class BriefQualityAnalyzer:
                 'requirements': {
                     'weight': 0.20,
                     'keywords': ['exigences', 'requis', 'nécessaire', 'obligatoire', 'contraintes'],
+                    'bonus_words': ['doit', 'exige', 'nécessaire'],
+                    'bonus': 0.3,
                     'questions': [
                         'Quelles sont vos exigences techniques ?',
                         'Y a-t-il des contraintes particulières ?',
@@ -55,6 +111,8 @@ class BriefQualityAnalyzer:
                 'deliverables': {
                     'weight': 0.15,
                     'keywords': ['livrable', 'résultat', 'produit', 'fichier', 'format'],
+                    'bonus_words': ['livrer', 'fournir', 'remettre'],
+                    'bonus': 0.3,
                     'questions': [
                         'Quels sont les livrables attendus ?',
                         'Dans quels formats souhaitez-vous les recevoir ?',
@@ -64,6 +122,8 @@ class BriefQualityAnalyzer:
                 'timeline': {
                     'weight': 0.10,
                     'keywords': ['délai', 'planning', 'échéance', 'timing', 'quand'],
+                    'bonus_words': ['avant', 'délai', 'échéance'],
+                    'bonus': 0.3,
                     'questions': [
                         'Quelle est votre échéance souhaitée ?',
                         'Y a-t-il des dates clés à respecter ?',
@@ -73,6 +133,8 @@ class BriefQualityAnalyzer:
                 'budget': {
                     'weight': 0.10,
                     'keywords': ['budget', 'prix', 'coût', 'tarif', 'combien'],
+                    'bonus_words': ['€', 'euro', 'budget', 'prix'],
+                    'bonus': 0.4,
                     'questions': [
                         'Quel est votre budget prévisionnel ?',
                         'Avez-vous une enveloppe budgétaire définie ?',
@@ -102,179 +164,266 @@ class BriefQualityAnalyzer:
             }
         }
 
+    def _init_weight_vectors(self):
+        """Vecteurs de poids des critères, dans un ordre fixe, calculés une fois"""
+        essential_info = self.quality_criteria['essential_info']
+        quality_indicators = self.quality_criteria['quality_indicators']
+        self.essential_types = tuple(essential_info)
+        self.quality_types = tuple(quality_indicators)
+        self.essential_weights = np.array([essential_info[key]['weight'] for key in self.essential_types])
+        self.quality_weights = np.array([quality_indicators[key]['weight'] for key in self.quality_types])
+        self.essential_weight_sum = self.essential_weights.sum()
+        self.quality_weight_sum = self.quality_weights.sum()
+        # Diversité des mots-clés, contraintes, quantités, profondeur technique
+        self.richness_weights = np.array([0.3, 0.3, 0.2, 0.2])
+        self._feature_scales = np.array(self.FEATURE_SCALES, dtype=float)
+        self._essential_index = {info_type: index for index, info_type in enumerate(self.essential_types)}
+        self._quality_index = {indicator: index for index, indicator in enumerate(self.quality_types)}
+        # Informations manquantes par poids décroissant, ordre des critères à poids égal
+        self._missing_order = np.argsort(-self.essential_weights, kind='stable').tolist()
+
     def analyze(self, title: str, description: str, category: str = None) -> QualityAnalysis:
         """Analyse la qualité d'un brief"""
-        
+        return self.analyze_state(self.build_state(title, description))
+
+    def build_state(self, title: str, description: str) -> QualityState:
+        """Extrait les caractéristiques qualité d'un brief complet"""
         # Normalisation du texte
         normalized = self.text_normalizer.normalize(description)
         full_text = f"{title} {description}".lower()
         
-        # Analyse des informations essentielles
-        essential_scores = self._analyze_essential_info(full_text)
-        
-        # Analyse des indicateurs de qualité
-        quality_scores = self._analyze_quality_indicators(title, description, normalized)
+        keyword_hits, bonus_hits = self._match_essential_info(full_text)
+        segments = description.split('.')
+        
+        return QualityState(
+            keyword_hits=keyword_hits,
+            bonus_hits=bonus_hits,
+            essential_scores=tuple(
+                self._essential_score(info_type, keyword_hits[info_type], bonus_hits[info_type])
+                for info_type in self.essential_types
+            ),
+            tech_hits=self._match_tech_keywords(description.lower()),
+            word_count=len(description.split()),
+            closed_sentences=self._count_sentences(segments[:-1]),
+            sentence_tail=segments[-1],
+            keywords=tuple(normalized.keywords),
+            constraints=tuple(normalized.constraints),
+            quantity_keys=frozenset(normalized.quantities),
+            clean_tail=normalized.clean_text[-self.CLEAN_TAIL_LENGTH:]
+        )
+
+    def extend_state(self, state: QualityState, text: str) -> Tuple[QualityState, Set[str]]:
+        """Ajoute un complément à la description d'un brief déjà analysé.
+
+        Équivaut à build_state sur la description suivie d'un saut de ligne et
+        du complément, sans relire le texte déjà analysé. Seuls les critères
+        essentiels touchés par le complément sont recalculés ; ils sont
+        retournés avec le nouvel état.
+        """
+        text_lower = text.lower()
+        keyword_hits, bonus_hits = self._match_essential_info(text_lower)
+        
+        changed = set()
+        new_hits, new_bonus, new_scores = dict(state.keyword_hits), dict(state.bonus_hits), list(state.essential_scores)
+        for info_type, hits in keyword_hits.items():
+            if (hits - state.keyword_hits[info_type]) or (bonus_hits[info_type] and not state.bonus_hits[info_type]):
+                new_hits[info_type] = state.keyword_hits[info_type] | hits
+                new_bonus[info_type] = state.bonus_hits[info_type] or bonus_hits[info_type]
+                new_scores[self._essential_index[info_type]] = self._essential_score(info_type, new_hits[info_type], new_bonus[info_type])
+                changed.add(info_type)
+        
+        # La phrase ouverte se poursuit dans le complément
+        segments = f"{state.sentence_tail}\n{text}".split('.')
+        
+        # Extractions du normaliseur sur le complément, précédé de la fin du
+        # texte déjà normalisé pour les motifs à cheval (« petit » / « budget »)
+        clean = self.text_normalizer._clean_text(text)
+        window = f"{state.clean_tail} {clean}".strip()
+        found = set(state.constraints) | set(self.text_normalizer._extract_constraints(window))
+        constraints = tuple(
+            constraint for constraint in self.text_normalizer.constraint_mapping.values() if constraint in found
+        )
         
-        # Calcul des scores globaux
-        brief_quality_score = self._calculate_brief_quality_score(essential_scores, quality_scores)
-        richness_score = self._calculate_richness_score(normalized, quality_scores)
+        keywords = list(state.keywords)
+        if len(keywords) < self.MAX_KEYWORDS:
+            seen = set(keywords)
+            for keyword in self.text_normalizer._extract_keywords(clean):
+                if keyword not in seen:
+                    seen.add(keyword)
+                    keywords.append(keyword)
+            keywords = keywords[:self.MAX_KEYWORDS]
+        
+        return replace(
+            state,
+            keyword_hits=new_hits,
+            bonus_hits=new_bonus,
+            essential_scores=tuple(new_scores),
+            tech_hits=state.tech_hits | self._match_tech_keywords(text_lower),
+            word_count=state.word_count + len(text.split()),
+            closed_sentences=state.closed_sentences + self._count_sentences(segments[:-1]),
+            sentence_tail=segments[-1],
+            keywords=tuple(keywords),
+            constraints=constraints,
+            quantity_keys=state.quantity_keys | frozenset(self.text_normalizer._extract_quantities(window)),
+            clean_tail=window[-self.CLEAN_TAIL_LENGTH:]
+        ), changed
+
+    def analyze_state(self, state: QualityState) -> QualityAnalysis:
+        """Analyse qualité à partir des caractéristiques extraites"""
+        return self.analyze_states([state])[0]
+
+    def analyze_many(self, briefs: Iterable[Tuple[str, str]]) -> List[QualityAnalysis]:
+        """Analyse qualité d'un lot de briefs (titre, description)"""
+        return self.analyze_states([self.build_state(title, description) for title, description in briefs])
+
+    def analyze_states(self, states: Sequence[QualityState]) -> List[QualityAnalysis]:
+        """Analyse qualité d'un lot d'états : les scores pondérés sont calculés
+        pour tout le lot en opérations matricielles sur la matrice de
+        caractéristiques, seules les listes de l'analyse restent par brief.
+        """
+        if not states:
+            return []
+        
+        matrix = self._feature_matrix(states)
+        essential, features = matrix[:, :len(self.essential_types)], matrix[:, len(self.essential_types):]
+        ratios = np.minimum(features[:, :len(self.FEATURE_SCALES)] / self._feature_scales, 1.0)
         
-        # Identification des informations manquantes
-        missing_info = self._identify_missing_info(essential_scores, full_text)
+        # Analyse des indicateurs de qualité
+        quality = self._analyze_quality_indicators(essential, ratios, features[:, -1])
         
-        # Identification des forces et améliorations
-        strengths = self._identify_strengths(essential_scores, quality_scores)
-        improvements = self._identify_improvements(essential_scores, quality_scores, missing_info)
+        # Scores pondérés des informations essentielles et des indicateurs de qualité
+        essential_score = (essential * self.essential_weights).sum(axis=1) / self.essential_weight_sum
+        quality_score = (quality * self.quality_weights).sum(axis=1) / self.quality_weight_sum
         
-        # Calcul du pourcentage de complétude
-        completeness_percentage = self._calculate_completeness(essential_scores)
+        # Calcul des scores globaux : moyenne pondérée (70% essentiel, 30% qualité)
+        brief_quality_scores = essential_score * 0.7 + quality_score * 0.3
+        richness_scores = self._calculate_richness_score(ratios)
         
-        return QualityAnalysis(
-            brief_quality_score=brief_quality_score,
-            richness_score=richness_score,
-            missing_info=missing_info,
-            strengths=strengths,
-            improvements=improvements,
-            completeness_percentage=completeness_percentage
-        )
-
-    def _analyze_essential_info(self, text: str) -> Dict[str, float]:
-        """Analyse la présence des informations essentielles"""
-        scores = {}
+        # Pourcentage de complétude
+        completeness = essential_score * 100
         
-        for info_type, criteria in self.quality_criteria['essential_info'].items():
-            score = 0.0
-            keywords = criteria['keywords']
-            
-            # Recherche des mots-clés
-            keyword_matches = sum(1 for keyword in keywords if keyword in text)
-            if keyword_matches > 0:
-                score += min(keyword_matches / len(keywords), 1.0) * 0.6
+        analyses = []
+        for essential_scores, quality_row, brief_quality_score, richness_score, completeness_percentage in zip(
+                essential.tolist(), quality.tolist(), brief_quality_scores.tolist(),
+                richness_scores.tolist(), completeness.tolist()):
+            quality_scores = dict(zip(self.quality_types, quality_row))
             
-            # Bonus pour phrases complètes sur le sujet
-            if info_type == 'objective' and any(word in text for word in ['pour', 'afin', 'objectif']):
-                score += 0.3
-            elif info_type == 'scope' and any(word in text for word in ['inclure', 'périmètre', 'comprend']):
-                score += 0.3
-            elif info_type == 'requirements' and any(word in text for word in ['doit', 'exige', 'nécessaire']):
-                score += 0.3
-            elif info_type == 'deliverables' and any(word in text for word in ['livrer', 'fournir', 'remettre']):
-                score += 0.3
-            elif info_type == 'timeline' and any(word in text for word in ['avant', 'délai', 'échéance']):
-                score += 0.3
-            elif info_type == 'budget' and any(word in text for word in ['€', 'euro', 'budget', 'prix']):
-                score += 0.4
+            # Identification des informations manquantes, des forces et améliorations
+            missing_info = self._identify_missing_info(essential_scores)
             
-            scores[info_type] = min(score, 1.0)
-        
-        return scores
+            analyses.append(QualityAnalysis(
+                brief_quality_score=brief_quality_score,
+                richness_score=richness_score,
+                missing_info=missing_info,
+                strengths=self._identify_strengths(essential_scores, quality_scores),
+                improvements=self._identify_improvements(essential_scores, quality_scores, missing_info),
+                completeness_percentage=completeness_percentage
+            ))
+        return analyses
 
-    def _analyze_quality_indicators(self, title: str, description: str, normalized) -> Dict[str, float]:
-        """Analyse les indicateurs de qualité"""
-        scores = {}
-        
-        # Spécificité
-        specific_details = len([word for word in normalized.keywords if len(word) > 5])
-        specificity_score = min(specific_details / 10, 1.0)  # Normalisation sur 10 détails
-        scores['specificity'] = specificity_score
-        
-        # Clarté
-        word_count = len(description.split())
-        clarity_score = min(word_count / 100, 1.0)  # Normalisation sur 100 mots
-        
-        # Bonus pour structure (phrases courtes, paragraphes)
-        sentences = len([s for s in description.split('.') if len(s.strip()) > 10])
-        if sentences >= 3:
-            clarity_score += 0.1
+    def live(self, title: str = "", description: str = "") -> 'IncrementalBriefAnalyzer':
+        """Analyseur incrémental d'un brief en cours de saisie"""
+        if self._live_tables is None:
+            self._live_tables = _LiveTables.build(self)
+        return IncrementalBriefAnalyzer(self, self._live_tables, title, description)
+
+    def _match_essential_info(self, text: str) -> Tuple[Dict[str, FrozenSet[str]], Dict[str, bool]]:
+        """Mots-clés et mots bonus de chaque critère essentiel présents dans le texte"""
+        keyword_hits, bonus_hits = {}, {}
+        for info_type, criteria in self.quality_criteria['essential_info'].items():
+            keyword_hits[info_type] = frozenset(keyword for keyword in criteria['keywords'] if keyword in text)
+            bonus_hits[info_type] = any(word in text for word in criteria['bonus_words'])
+        return keyword_hits, bonus_hits
+
+    def _essential_score(self, info_type: str, keyword_hits: FrozenSet[str], bonus_hit: bool) -> float:
+        """Score de présence d'une information essentielle"""
+        criteria = self.quality_criteria['essential_info'][info_type]
+        score = 0.0
         
-        scores['clarity'] = min(clarity_score, 1.0)
+        # Recherche des mots-clés
+        if keyword_hits:
+            score += min(len(keyword_hits) / len(criteria['keywords']), 1.0) * 0.6
         
-        # Complétude
-        sections_covered = sum(1 for score in self._analyze_essential_info(f"{title} {description}".lower()).values() if score > 0.3)
-        completeness_score = sections_covered / len(self.quality_criteria['essential_info'])
-        scores['completeness'] = completeness_score
+        # Bonus pour phrases complètes sur le sujet
+        if bonus_hit:
+            score += criteria['bonus']
         
-        # Profondeur technique
+        return min(score, 1.0)
+
+    def _match_tech_keywords(self, text: str) -> FrozenSet[str]:
         tech_keywords = self.quality_criteria['quality_indicators']['technical_depth']['tech_keywords']
-        tech_mentions = sum(1 for keyword in tech_keywords if keyword in description.lower())
-        tech_score = min(tech_mentions / 3, 1.0)  # Normalisation sur 3 mentions
-        scores['technical_depth'] = tech_score
-        
-        return scores
+        return frozenset(keyword for keyword in tech_keywords if keyword in text)
+
+    @staticmethod
+    def _count_sentences(segments: List[str]) -> int:
+        return sum(1 for segment in segments if len(segment.strip()) > 10)
+
+    def _feature_matrix(self, states: Sequence[QualityState]) -> np.ndarray:
+        """Matrice briefs x (scores essentiels, FEATURES) des caractéristiques numériques"""
+        rows = [
+            state.essential_scores + (
+                sum(1 for word in state.keywords if len(word) > 5),
+                state.word_count,
+                len(set(state.keywords)),
+                len(state.constraints),
+                len(state.quantity_keys),
+                len(state.tech_hits),
+                state.closed_sentences + self._count_sentences([state.sentence_tail])
+            )
+            for state in states
+        ]
+        return np.array(rows, dtype=float).reshape(len(rows), len(self.essential_types) + len(self.FEATURES))
 
-    def _calculate_brief_quality_score(self, essential_scores: Dict[str, float], quality_scores: Dict[str, float]) -> float:
-        """Calcule le score global de qualité du brief"""
+    def _analyze_quality_indicators(self, essential: np.ndarray, ratios: np.ndarray, sentences: np.ndarray) -> np.ndarray:
+        """Indicateurs de qualité de chaque brief, colonnes dans l'ordre de quality_types"""
+        quality = np.empty((len(ratios), len(self.quality_types)))
         
-        # Score pondéré des informations essentielles
-        essential_weight_sum = sum(self.quality_criteria['essential_info'][key]['weight'] for key in essential_scores.keys())
-        essential_score = sum(
-            score * self.quality_criteria['essential_info'][key]['weight'] 
-            for key, score in essential_scores.items()
-        ) / essential_weight_sum if essential_weight_sum > 0 else 0
+        # Spécificité : normalisation sur 10 détails
+        quality[:, self._quality_index['specificity']] = ratios[:, 0]
         
-        # Score pondéré des indicateurs de qualité
-        quality_weight_sum = sum(self.quality_criteria['quality_indicators'][key]['weight'] for key in quality_scores.keys())
-        quality_score = sum(
-            score * self.quality_criteria['quality_indicators'][key]['weight']
-            for key, score in quality_scores.items()
-        ) / quality_weight_sum if quality_weight_sum > 0 else 0
+        # Clarté : normalisation sur 100 mots, bonus pour structure (phrases courtes, paragraphes)
+        quality[:, self._quality_index['clarity']] = np.minimum(ratios[:, 1] + (sentences >= 3) * 0.1, 1.0)
         
-        # Moyenne pondérée (70% essentiel, 30% qualité)
-        return essential_score * 0.7 + quality_score * 0.3
-
-    def _calculate_richness_score(self, normalized, quality_scores: Dict[str, float]) -> float:
-        """Calcule le score de richesse du contenu"""
+        # Complétude : part des sections couvertes
+        quality[:, self._quality_index['completeness']] = (essential > 0.3).sum(axis=1) / len(self.essential_types)
         
-        # Facteurs de richesse
-        factors = {
-            'keyword_diversity': min(len(set(normalized.keywords)) / 15, 1.0),  # Diversité des mots-clés
-            'constraint_specificity': min(len(normalized.constraints) / 5, 1.0),  # Spécificité des contraintes
-            'quantity_precision': min(len(normalized.quantities) / 3, 1.0),  # Précision quantitative
-            'technical_depth': quality_scores.get('technical_depth', 0)
-        }
+        # Profondeur technique : normalisation sur 3 mentions
+        quality[:, self._quality_index['technical_depth']] = ratios[:, 5]
         
-        # Moyenne pondérée
-        weights = [0.3, 0.3, 0.2, 0.2]
-        return sum(score * weight for score, weight in zip(factors.values(), weights))
+        return quality
 
-    def _identify_missing_info(self, essential_scores: Dict[str, float], text: str) -> List[Dict[str, any]]:
+    def _calculate_richness_score(self, ratios: np.ndarray) -> np.ndarray:
+        """Calcule le score de richesse du contenu"""
+        # Facteurs de richesse : diversité des mots-clés, spécificité des
+        # contraintes, précision quantitative, profondeur technique
+        return (ratios[:, 2:6] * self.richness_weights).sum(axis=1)
+
+    def _identify_missing_info(self, essential_scores: List[float]) -> List[Dict[str, any]]:
         """Identifie les informations manquantes importantes"""
-        missing = []
-        
-        for info_type, score in essential_scores.items():
-            if score < 0.5:  # Seuil de présence insuffisante
-                criteria = self.quality_criteria['essential_info'][info_type]
-                missing.append({
-                    'type': info_type,
-                    'importance': 'high' if criteria['weight'] > 0.15 else 'medium',
-                    'questions': criteria['questions'],
-                    'current_score': score
-                })
-        
-        # Tri par importance (poids décroissant)
-        missing.sort(key=lambda x: self.quality_criteria['essential_info'][x['type']]['weight'], reverse=True)
+        essential_info = self.quality_criteria['essential_info']
+        
+        # Parcours par importance (poids décroissant)
+        missing = [
+            {
+                'type': self.essential_types[index],
+                'importance': 'high' if self.essential_weights[index] > 0.15 else 'medium',
+                'questions': essential_info[self.essential_types[index]]['questions'],
+                'current_score': essential_scores[index]
+            }
+            for index in self._missing_order
+            if essential_scores[index] < 0.5  # Seuil de présence insuffisante
+        ]
         
         return missing[:5]  # Limite à 5 questions prioritaires
 
-    def _identify_strengths(self, essential_scores: Dict[str, float], quality_scores: Dict[str, float]) -> List[str]:
+    def _identify_strengths(self, essential_scores: List[float], quality_scores: Dict[str, float]) -> List[str]:
         """Identifie les points forts du brief"""
-        strengths = []
-        
         # Points forts sur les informations essentielles
-        for info_type, score in essential_scores.items():
-            if score >= 0.8:
-                if info_type == 'objective':
-                    strengths.append('Objectifs clairement définis')
-                elif info_type == 'scope':
-                    strengths.append('Périmètre bien délimité')
-                elif info_type == 'requirements':
-                    strengths.append('Exigences techniques précises')
-                elif info_type == 'deliverables':
-                    strengths.append('Livrables explicites')
-                elif info_type == 'timeline':
-                    strengths.append('Planning clairement exprimé')
-                elif info_type == 'budget':
-                    strengths.append('Budget transparent')
+        strengths = [
+            self.ESSENTIAL_STRENGTHS[info_type]
+            for info_type, score in zip(self.essential_types, essential_scores)
+            if score >= 0.8 and info_type in self.ESSENTIAL_STRENGTHS
+        ]
         
         # Points forts sur la qualité
         if quality_scores.get('clarity', 0) >= 0.8:
@@ -286,7 +435,7 @@ class BriefQualityAnalyzer:
         
         return strengths
 
-    def _identify_improvements(self, essential_scores: Dict[str, float], quality_scores: Dict[str, float], missing_info: List[Dict]) -> List[str]:
+    def _identify_improvements(self, essential_scores: List[float], quality_scores: Dict[str, float], missing_info: List[Dict]) -> List[str]:
         """Identifie les améliorations recommandées"""
         improvements = []
         
@@ -305,26 +454,13 @@ class BriefQualityAnalyzer:
             improvements.append("Préciser les aspects techniques (technologies, contraintes)")
         
         # Améliorations spécifiques par catégorie manquante
-        for info_type, score in essential_scores.items():
-            if score < 0.3:
-                if info_type == 'budget':
-                    improvements.append("Indiquer une fourchette budgétaire même approximative")
-                elif info_type == 'timeline':
-                    improvements.append("Mentionner une échéance ou urgence du projet")
-                elif info_type == 'deliverables':
-                    improvements.append("Lister précisément les livrables attendus")
-        
-        return improvements[:4]  # Limite à 4 améliorations
-
-    def _calculate_completeness(self, essential_scores: Dict[str, float]) -> float:
-        """Calcule le pourcentage de complétude"""
-        total_weight = sum(self.quality_criteria['essential_info'][key]['weight'] for key in essential_scores.keys())
-        weighted_score = sum(
-            score * self.quality_criteria['essential_info'][key]['weight']
-            for key, score in essential_scores.items()
+        improvements.extend(
+            self.ESSENTIAL_IMPROVEMENTS[info_type]
+            for info_type, score in zip(self.essential_types, essential_scores)
+            if score < 0.3 and info_type in self.ESSENTIAL_IMPROVEMENTS
         )
         
-        return (weighted_score / total_weight * 100) if total_weight > 0 else 0
+        return improvements[:4]  # Limite à 4 améliorations
 
     def suggest_questions(self, missing_info: List[Dict[str, any]], category: str = None) -> List[Dict[str, any]]:
         """Suggère des questions personnalisées selon la catégorie"""
@@ -391,3 +527,338 @@ class BriefQualityAnalyzer:
                 ]
         
         return base_questions
+
+
+def _lowers_per_char(text: str, lowered: str) -> bool:
+    """Vrai si lowered == text.lower() se déduit caractère par caractère, à longueur égale.
+
+    Sinon (« İ » -> « i̇ », sigma final selon les voisins), les positions
+    d'une modification ne correspondent plus au texte en minuscules.
+    """
+    return len(lowered) == len(text) and 'Σ' not in text
+
+
+def _occurrences(text: str, word: str) -> int:
+    """Nombre d'occurrences d'une sous-chaîne, chevauchements compris"""
+    count, index = 0, text.find(word)
+    while index >= 0:
+        count += 1
+        index = text.find(word, index + 1)
+    return count
+
+
+def _overlaps_itself(word: str) -> bool:
+    """Deux occurrences du mot peuvent-elles se chevaucher (« aba ») ? str.count ne compterait pas la seconde"""
+    return any(word[:size] == word[-size:] for size in range(1, len(word)))
+
+
+def _left_bound(text: str, index: int, tokens: int, chunk: int = 128) -> int:
+    """Début du `tokens`-ième mot (séparé par des espaces) avant le mot entamé en index"""
+    while True:
+        low = max(0, index - chunk)
+        # Débuts de mots : fins des suites d'espaces ; la dernière précède le mot entamé
+        starts = [run.end() for run in _SPACE_RUNS.finditer(text, low, index)]
+        if len(starts) > tokens:
+            return starts[-1 - tokens]
+        if low == 0:
+            return 0
+        chunk *= 4
+
+
+def _right_bound(text: str, index: int, tokens: int, chunk: int = 128) -> int:
+    """Fin du `tokens`-ième mot après le mot entamé en index, plus l'espace qui le suit"""
+    length = len(text)
+    while True:
+        high = min(length, index + chunk)
+        # Fins de mots : débuts des suites d'espaces ; la première termine le mot entamé
+        ends = [run.start() for run in _SPACE_RUNS.finditer(text, index, high)]
+        if len(ends) > tokens:
+            return ends[tokens] + 1
+        if high == length:
+            return length
+        chunk *= 4
+
+
+@dataclass(frozen=True)
+class _LiveTables:
+    """Vocabulaires et motifs de l'analyse incrémentale, construits une fois par analyseur"""
+    essential_words: Tuple[str, ...]
+    criteria_by_word: Dict[str, Tuple[str, ...]]
+    tech_words: Tuple[str, ...]
+    overlapping: FrozenSet[str]  # Mots à compter chevauchements compris
+    margin: int  # Longueur du plus long mot-clé - 1
+    patterns: Tuple[Tuple[re.Pattern, str, str], ...]  # (motif, 'quantity'/'constraint', clé)
+    # Par famille de motifs : préfiltre (sur la fenêtre en casefold) et indices dans patterns
+    pattern_groups: Tuple[Tuple[re.Pattern, Tuple[int, ...]], ...]
+    constraint_order: Tuple[str, ...]
+
+    @classmethod
+    def build(cls, analyzer: 'BriefQualityAnalyzer') -> '_LiveTables':
+        criteria_by_word: Dict[str, List[str]] = {}
+        for info_type, criteria in analyzer.quality_criteria['essential_info'].items():
+            for word in list(criteria['keywords']) + list(criteria['bonus_words']):
+                criteria_by_word.setdefault(word, [])
+                if info_type not in criteria_by_word[word]:
+                    criteria_by_word[word].append(info_type)
+        tech_words = tuple(analyzer.quality_criteria['quality_indicators']['technical_depth']['tech_keywords'])
+
+        normalizer = analyzer.text_normalizer
+        sources = [
+            (pattern, 'quantity', key)
+            for pattern, key in normalizer.surface_patterns + normalizer.time_patterns + normalizer.distance_patterns
+        ] + [(pattern, 'constraint', constraint) for pattern, constraint in normalizer.constraint_mapping.items()]
+        # Lookahead : toutes les positions où le motif commence, comptables fenêtre par fenêtre
+        patterns = tuple(
+            (re.compile(f'(?=(?:{pattern}))', re.IGNORECASE), kind, key) for pattern, kind, key in sources
+        )
+        pattern_groups = []
+        for kind in ('quantity', 'constraint'):
+            group = [pattern for pattern, source_kind, _ in sources if source_kind == kind]
+            # Les quantités commencent toutes par un nombre : un chiffre suffit comme préfiltre.
+            # Sinon, alternative des motifs sans IGNORECASE (bien plus rapide), sur un texte en casefold
+            if all(pattern.startswith(r'(\d') for pattern in group):
+                prefilter = re.compile(r'\d')
+            else:
+                prefilter = re.compile('|'.join(f'(?:{pattern})' for pattern in group))
+            pattern_groups.append(
+                (prefilter, tuple(i for i, (_, source_kind, _) in enumerate(sources) if source_kind == kind))
+            )
+        words = list(criteria_by_word) + list(tech_words)
+        return cls(
+            essential_words=tuple(criteria_by_word),
+            criteria_by_word={word: tuple(types) for word, types in criteria_by_word.items()},
+            tech_words=tech_words,
+            overlapping=frozenset(word for word in words if _overlaps_itself(word)),
+            margin=max(len(word) for word in words) - 1,
+            patterns=patterns,
+            pattern_groups=tuple(pattern_groups),
+            constraint_order=tuple(normalizer.constraint_mapping.values())
+        )
+
+
+class IncrementalBriefAnalyzer:
+    """Analyse qualité d'un brief en cours de saisie, tenue à jour modification par modification.
+
+    Une modification remplace une plage de caractères du titre ou de la
+    description. Seul son voisinage est relu : une marge de la longueur du
+    plus long mot-clé pour les recherches de sous-chaînes, quelques mots
+    pour les motifs du normaliseur (quantités, contraintes), jusqu'aux
+    points ou espaces voisins pour les phrases et les mots. Les occurrences
+    sont comptées par mot-clé pour qu'un mot effacé disparaisse ; seuls les
+    critères dont un mot-clé apparaît ou disparaît sont rescorés. Le
+    résultat est celui de BriefQualityAnalyzer.analyze sur le texte courant.
+
+    Les positions sont en caractères (points de code) ; un client JavaScript
+    doit convertir ses positions UTF-16 pour les textes hors plan de base.
+    Tant que le texte contient un caractère dont la minuscule change de
+    longueur ou dépend de ses voisins (« İ », « Σ »), chaque modification
+    relit le texte complet.
+    """
+
+    PATTERN_TOKENS = 3  # Mots couverts au plus par un motif du normaliseur (« 5 mètres carrés »)
+
+    def __init__(self, analyzer: BriefQualityAnalyzer, tables: _LiveTables, title: str = "", description: str = ""):
+        self.analyzer = analyzer
+        self.tables = tables
+        self.version = 0
+        self.reset(title, description)
+
+    def reset(self, title: str, description: str):
+        """Repart d'un texte complet (ouverture ou resynchronisation du client)"""
+        tables = self.tables
+        self.title, self.description = title, description
+        text = f"{title} {description}"
+        self._lower = text.lower()
+        self._per_char = _lowers_per_char(text, self._lower)
+        description_lower = description.lower()
+        self._clean = _SPECIAL_CHARS.sub(' ', description_lower)
+
+        self._counts = {word: _occurrences(self._lower, word) for word in tables.essential_words}
+        self._tech_counts = {word: _occurrences(description_lower, word) for word in tables.tech_words}
+        self._pattern_counts = [len(pattern.findall(self._clean)) for pattern, _, _ in tables.patterns]
+        self._words = len(description.split())
+        self._sentences = self.analyzer._count_sentences(description.split('.'))
+        self._scan_keywords()
+
+        self._keyword_hits, self._bonus_hits, self._essential_scores = {}, {}, {}
+        self._rescore(self.analyzer.quality_criteria['essential_info'])
+        self._analysis = None
+        self.version += 1
+
+    def append(self, text: str, field: str = 'description'):
+        """Ajout en fin de champ (saisie au fil de l'eau)"""
+        length = len(self.title if field == 'title' else self.description)
+        self.apply_edit(length, length, text, field)
+
+    def apply_edit(self, start: int, end: Optional[int], text: str, field: str = 'description'):
+        """Remplace les caractères [start, end) du champ par text (insertion si end == start)"""
+        if field not in ('title', 'description'):
+            raise ValueError(f"Champ inconnu: {field}")
+        old = self.title if field == 'title' else self.description
+        end = start if end is None else end
+        if not 0 <= start <= end <= len(old):
+            raise ValueError(f"Plage {start}:{end} hors du texte ({len(old)} caractères)")
+        if start == end and not text:
+            return
+
+        tables = self.tables
+        new = old[:start] + text + old[end:]
+        lowered = text.lower()
+        if not (self._per_char and _lowers_per_char(text, lowered)):
+            # Minuscules non alignées sur le texte : resynchronisation sur le texte complet, comme analyze
+            self.reset(new if field == 'title' else self.title, new if field == 'description' else self.description)
+            return
+        offset = 0 if field == 'title' else len(self.title) + 1
+        old_lower = self._lower
+        self._lower = old_lower[:offset + start] + lowered + old_lower[offset + end:]
+
+        changed = self._update_counts(self._counts, tables.essential_words, old_lower, offset + start,
+                                      offset + end, len(text), 0)
+        if field == 'title':
+            self.title = new
+        else:
+            self._update_counts(self._tech_counts, tables.tech_words, old_lower, offset + start,
+                                offset + end, len(text), offset)
+            self._update_description(old, new, start, end, lowered)
+            self.description = new
+
+        criteria = {info_type for word in changed for info_type in tables.criteria_by_word[word]}
+        if criteria:
+            self._rescore(criteria)
+        self._analysis = None
+        self.version += 1
+
+    def _update_counts(self, counts: Dict[str, int], words: Tuple[str, ...], old: str,
+                       start: int, end: int, inserted: int, low: int) -> List[str]:
+        """Met à jour les occurrences autour d'une modification ; retourne les mots apparus ou disparus.
+
+        Une occurrence touchée par la modification tient dans la fenêtre
+        élargie de `margin` caractères ; celles qui n'y touchent pas sont
+        comptées à l'identique avant et après, ou pas du tout.
+        """
+        margin = self.tables.margin
+        window_start = max(low, start - margin)
+        old_window = old[window_start:end + margin]
+        new_window = self._lower[window_start:start + inserted + margin]
+        overlapping = self.tables.overlapping
+        changed = []
+        for word in words:
+            if word in overlapping:
+                delta = _occurrences(new_window, word) - _occurrences(old_window, word)
+            else:
+                delta = new_window.count(word) - old_window.count(word)
+            if delta:
+                before = counts[word]
+                counts[word] = before + delta
+                if (before > 0) != (counts[word] > 0):
+                    changed.append(word)
+        return changed
+
+    def _update_description(self, old: str, new: str, start: int, end: int, lowered: str):
+        """Mots, phrases et extractions du normaliseur autour d'une modification de la description"""
+        delta = len(new) - len(old)
+
+        # Mots : de l'espace qui précède à celle qui suit la modification
+        word_start, word_end = start, end
+        while word_start > 0 and not old[word_start - 1].isspace():
+            word_start -= 1
+        while word_end < len(old) and not old[word_end].isspace():
+            word_end += 1
+        self._words += len(new[word_start:word_end + delta].split()) - len(old[word_start:word_end].split())
+
+        # Phrases : du point qui précède à celui qui suit
+        sentence_start = old.rfind('.', 0, start) + 1
+        sentence_end = old.find('.', end)
+        if sentence_end < 0:
+            sentence_end = len(old)
+        count = self.analyzer._count_sentences
+        self._sentences += (count(new[sentence_start:sentence_end + delta].split('.'))
+                            - count(old[sentence_start:sentence_end].split('.')))
+
+        # Quantités et contraintes : quelques mots de part et d'autre
+        old_clean = self._clean
+        self._clean = old_clean[:start] + _SPECIAL_CHARS.sub(' ', lowered) + old_clean[end:]
+        window_start = _left_bound(old_clean, start, self.PATTERN_TOKENS)
+        window_end = _right_bound(old_clean, end, self.PATTERN_TOKENS)
+        old_window = old_clean[window_start:window_end]
+        new_window = self._clean[window_start:window_end + delta]
+        patterns = self.tables.patterns
+        folded = (old_window.casefold(), new_window.casefold())
+        for prefilter, indices in self.tables.pattern_groups:
+            # Le plus souvent, aucun motif de la famille dans les deux fenêtres
+            if prefilter.search(folded[0]) is None and prefilter.search(folded[1]) is None:
+                continue
+            for i in indices:
+                pattern = patterns[i][0]
+                self._pattern_counts[i] += len(pattern.findall(new_window)) - len(pattern.findall(old_window))
+
+        # Mots-clés : 20 premiers mots distincts, à relire si la modification les précède
+        if self._keywords_end is None or start <= self._keywords_end:
+            self._scan_keywords()
+
+    def _scan_keywords(self):
+        """Premiers mots-clés distincts (TextNormalizer._extract_keywords), lus jusqu'au dernier retenu"""
+        stop_words = self.analyzer.text_normalizer.stop_words
+        limit = self.analyzer.MAX_KEYWORDS
+        keywords, seen = [], set()
+        self._keywords_end = None
+        for match in _WORD_PATTERN.finditer(self._clean):
+            word = match.group()
+            if word in stop_words or word in seen:
+                continue
+            seen.add(word)
+            keywords.append(word)
+            if len(keywords) == limit:
+                self._keywords_end = match.end()
+                break
+        self._keywords = tuple(keywords)
+
+    def _rescore(self, criteria):
+        essential = self.analyzer.quality_criteria['essential_info']
+        for info_type in criteria:
+            hits = frozenset(word for word in essential[info_type]['keywords'] if self._counts[word])
+            bonus = any(self._counts[word] for word in essential[info_type]['bonus_words'])
+            self._keyword_hits[info_type] = hits
+            self._bonus_hits[info_type] = bonus
+            self._essential_scores[info_type] = self.analyzer._essential_score(info_type, hits, bonus)
+
+    def state(self) -> QualityState:
+        """Caractéristiques courantes, au format de BriefQualityAnalyzer.build_state"""
+        tables = self.tables
+        essential = self.analyzer.quality_criteria['essential_info']
+        present = {
+            key for (_, kind, key), count in zip(tables.patterns, self._pattern_counts) if count
+        }
+        tail = self.description[self.description.rfind('.') + 1:]
+        return QualityState(
+            keyword_hits={info_type: self._keyword_hits[info_type] for info_type in essential},
+            bonus_hits={info_type: self._bonus_hits[info_type] for info_type in essential},
+            essential_scores=tuple(self._essential_scores[info_type] for info_type in self.analyzer.essential_types),
+            tech_hits=frozenset(word for word, count in self._tech_counts.items() if count),
+            word_count=self._words,
+            closed_sentences=self._sentences - self.analyzer._count_sentences([tail]),
+            sentence_tail=tail,
+            keywords=self._keywords,
+            constraints=tuple(constraint for constraint in tables.constraint_order if constraint in present),
+            quantity_keys=frozenset(
+                key for (_, kind, key), count in zip(tables.patterns, self._pattern_counts)
+                if count and kind == 'quantity'
+            ),
+            clean_tail=self._clean_tail()
+        )
+
+    def _clean_tail(self) -> str:
+        """Fin du texte normalisé, calculée sur un suffixe assez long de la description"""
+        length = self.analyzer.CLEAN_TAIL_LENGTH
+        size = 2 * length
+        while True:
+            clean = self.analyzer.text_normalizer._clean_text(self.description[-size:])
+            if len(clean) > length or size >= len(self.description):
+                return clean[-length:]
+            size *= 2
+
+    def analysis(self) -> QualityAnalysis:
+        """Analyse qualité du texte courant (mise en cache jusqu'à la prochaine modification)"""
+        if self._analysis is None:
+            self._analysis = self.analyzer.analyze_state(self.state())
+        return self._analysis
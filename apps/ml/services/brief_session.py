@@ -0,0 +1,181 @@
+"""
+Sessions de questionnaire sur un brief
+/improve conserve l'état intermédiaire du pipeline (taxonomie, caractéristiques
+qualité, prix, LOC) dans une session ; /brief/recompute y ajoute les réponses
+aux questions et ne recalcule que ce qu'elles touchent, sans reclassifier ni
+réécrire le brief. /brief/live garde de même, pendant la saisie, l'analyseur
+qualité incrémental d'un brief. Les sessions sont gardées en mémoire du
+worker, en LRU borné, et expirent après un délai sans accès.
+"""
+
+import logging
+import os
+import re
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+from services.brief_quality import QualityAnalysis, QualityState
+from services.price_time_suggester import PriceTimeSuggestion
+
+logger = logging.getLogger(__name__)
+
+# Montant, milliers séparés par des espaces ou des points acceptés (« 5 000 », « 5.000 »), suffixe k (« 5k€ »).
+# Un point suivi de groupes d'exactement trois chiffres sépare les milliers ; sinon il est décimal (« 2.5k »).
+_AMOUNT_PATTERN = re.compile(
+    r'(\d{1,3}(?:[ \u00a0]\d{3}(?!\d))+|\d{1,3}(?:\.\d{3}(?!\d))+|\d+)(?:[.,](\d+))?\s*(k(?![a-zé]))?',
+    re.IGNORECASE
+)
+_GROUP_SEPARATORS = re.compile(r'[\s.]')
+
+
+@dataclass(frozen=True)
+class BriefSession:
+    """État du pipeline /improve d'un brief, complété au fil des réponses"""
+    title: str
+    description: str
+    category: str
+    sub_category: str
+    skills: Tuple[str, ...]
+    budget: float
+    market_heat: float
+    heat_score: float
+    quality_state: QualityState
+    quality: QualityAnalysis
+    price: PriceTimeSuggestion
+    loc_base: float
+    loc_uplift_reco: Dict[str, Any]
+    taxonomy_confidence: float = 0.0
+    answers: Dict[str, str] = field(default_factory=dict)
+
+
+def parse_answers(answers: List[Mapping[str, str]],
+                  default_questions: Mapping[str, str]) -> List[Tuple[str, str, str]]:
+    """Réponses reçues -> (identifiant, texte à ajouter au brief, réponse).
+
+    Accepte le format de missing_info complété par la réponse
+    ({"id", "q", "a"}) et les variantes question_id / type / answer / value.
+    La question précède la réponse dans le texte ajouté : « 5000€ » ne dit
+    rien du budget sans « Quel est votre budget prévisionnel ? ».
+    """
+    parsed = []
+    for item in answers:
+        answer_id = item.get('id') or item.get('question_id') or item.get('type') or ''
+        answer = (item.get('a') or item.get('answer') or item.get('value') or '').strip()
+        if not answer:
+            continue
+        question = item.get('q') or item.get('question') or default_questions.get(answer_id, '')
+        parsed.append((answer_id, f"{question} {answer}".strip(), answer))
+    return parsed
+
+
+def parse_budget_amount(text: str) -> Optional[float]:
+    """Montant le plus élevé d'une réponse budget (« 5 000 - 15 000 € » -> 15000)"""
+    amounts = []
+    for integer, decimals, thousands in _AMOUNT_PATTERN.findall(text):
+        amount = float(_GROUP_SEPARATORS.sub('', integer) + '.' + (decimals or '0'))
+        amounts.append(amount * 1000 if thousands else amount)
+    return max(amounts) if amounts else None
+
+
+class BriefSessionStore:
+    """Sessions en LRU borné avec expiration glissante (ttl depuis le dernier accès).
+
+    L'ordre LRU est aussi l'ordre des derniers accès : les sessions expirées
+    sont purgées en tête, sans parcours complet. Les BriefSession sont
+    immuables : un recalcul publie une nouvelle session sous le même
+    identifiant. Le magasin accepte tout objet de session (analyseur
+    incrémental de /brief/live).
+    """
+
+    def __init__(self, capacity: int = 10000, ttl_seconds: float = 3600.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.capacity = capacity
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._sessions: OrderedDict = OrderedDict()  # id -> (session, dernier accès)
+        self._lock = threading.Lock()
+        self.created = 0
+        self.expired = 0
+        self.evicted = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _purge(self, now: float):
+        while self._sessions:
+            session_id, (_, last_access) = next(iter(self._sessions.items()))
+            if now - last_access <= self.ttl_seconds:
+                break
+            del self._sessions[session_id]
+            self.expired += 1
+
+    def create(self, session: Any) -> Optional[str]:
+        """Enregistre une session ; None si les sessions sont désactivées (capacité 0)"""
+        if self.capacity <= 0:
+            return None
+        session_id = secrets.token_urlsafe(16)
+        with self._lock:
+            now = self._clock()
+            self._purge(now)
+            self._sessions[session_id] = (session, now)
+            while len(self._sessions) > self.capacity:
+                self._sessions.popitem(last=False)
+                self.evicted += 1
+            self.created += 1
+        return session_id
+
+    def get(self, session_id: str) -> Optional[Any]:
+        with self._lock:
+            now = self._clock()
+            self._purge(now)
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._sessions[session_id] = (entry[0], now)
+            self._sessions.move_to_end(session_id)
+            self.hits += 1
+            return entry[0]
+
+    def update(self, session_id: str, session: Any) -> bool:
+        """Remplace une session encore active ; False si elle a expiré entre-temps"""
+        with self._lock:
+            if session_id not in self._sessions:
+                return False
+            self._sessions[session_id] = (session, self._clock())
+            self._sessions.move_to_end(session_id)
+            return True
+
+    def clear(self):
+        with self._lock:
+            self._sessions.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'active': len(self._sessions),
+            'capacity': self.capacity,
+            'ttl_seconds': self.ttl_seconds,
+            'created': self.created,
+            'expired': self.expired,
+            'evicted': self.evicted,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0
+        }
+
+
+# Instances globales (capacité 0 pour désactiver)
+brief_session_store = BriefSessionStore(
+    capacity=int(os.getenv("ML_BRIEF_SESSIONS", "10000")),
+    ttl_seconds=float(os.getenv("ML_BRIEF_SESSION_TTL", "3600"))
+)
+# Saisie en direct : sessions courtes, abandonnées dès l'envoi du brief
+live_brief_store = BriefSessionStore(
+    capacity=int(os.getenv("ML_LIVE_BRIEF_SESSIONS", "10000")),
+    ttl_seconds=float(os.getenv("ML_LIVE_BRIEF_TTL", "900"))
+)
@@ -0,0 +1,314 @@
+"""
+Modèle TF-IDF du corpus de briefs
+Ajusté hors ligne (fréquences documentaires comptées en flux), sérialisé en un
+fichier compact (vocabulaire + vecteur IDF) et chargé une fois au démarrage.
+Les termes distinctifs d'un brief sont ses plus forts poids TF-IDF, extraits
+par opérations sur les lignes de la matrice creuse.
+
+Usage (depuis apps/ml) :
+    python -m services.brief_tfidf fit briefs.jsonl --output /infra/data/brief_tfidf.npz
+    python -m services.brief_tfidf top-terms briefs.jsonl --output terms.jsonl --k 10
+"""
+
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.preprocessing import normalize
+
+from services.data_reloader import file_version
+
+logger = logging.getLogger(__name__)
+
+MODEL_FILENAME = "brief_tfidf.npz"
+MODEL_FORMAT_VERSION = 1
+
+# Mots-outils français (sklearn ne fournit qu'une liste anglaise)
+FRENCH_STOP_WORDS = frozenset("""
+    au aux avec ce ces cet cette dans de des du elle en et eux il ils je la le les leur leurs lui ma mais me
+    même mes moi mon ne nos notre nous on ou où par pas pour qu que qui sa se ses son sur ta te tes toi ton
+    tu un une vos votre vous est sont être avoir été avons avez ont sera seront fait faire très plus aussi
+    comme si tout tous toutes afin ainsi dont chez entre sans sous vers
+""".split())
+
+# Lettres uniquement, deux caractères minimum : montants et délais sont exclus
+TOKEN_PATTERN = r"(?u)\b[^\W\d_]{2,}\b"
+
+
+@dataclass
+class TfidfModel:
+    terms: List[str]
+    idf: np.ndarray
+    params: Dict[str, any] = field(default_factory=dict)
+
+    def vocabulary(self) -> Dict[str, int]:
+        return {term: index for index, term in enumerate(self.terms)}
+
+    def save(self, path: Path):
+        """Termes concaténés en un seul blob UTF-8 + IDF float32, écriture atomique"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, 'wb') as f:
+            np.savez_compressed(
+                f,
+                terms=np.frombuffer("\n".join(self.terms).encode('utf-8'), dtype=np.uint8),
+                idf=self.idf.astype(np.float32),
+                params=np.frombuffer(json.dumps(self.params).encode('utf-8'), dtype=np.uint8)
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> 'TfidfModel':
+        with np.load(path) as data:
+            params = json.loads(data['params'].tobytes().decode('utf-8'))
+            if params.get('format_version') != MODEL_FORMAT_VERSION:
+                raise ValueError(f"Version de modèle TF-IDF non supportée: {params.get('format_version')}")
+            blob = data['terms'].tobytes().decode('utf-8')
+            terms = blob.split("\n") if blob else []
+            idf = data['idf'].astype(np.float64)
+        if len(terms) != len(idf):
+            raise ValueError("Vocabulaire et vecteur IDF de tailles différentes")
+        return cls(terms=terms, idf=idf, params=params)
+
+
+def _count_vectorizer(ngram_max: int = 1, vocabulary: Optional[Dict[str, int]] = None) -> CountVectorizer:
+    return CountVectorizer(
+        lowercase=True,
+        token_pattern=TOKEN_PATTERN,
+        stop_words=list(FRENCH_STOP_WORDS),
+        ngram_range=(1, ngram_max),
+        vocabulary=vocabulary,
+        dtype=np.float32
+    )
+
+
+def fit_corpus(texts: Iterable[str], min_df: int = 2, max_df: float = 0.5,
+               max_features: int = 50000, ngram_max: int = 1, sublinear_tf: bool = True) -> TfidfModel:
+    """Ajuste vocabulaire et IDF en un seul passage sur le corpus.
+
+    Seules les fréquences documentaires sont conservées (un Counter), jamais
+    la matrice documents × termes. IDF lissé comme sklearn :
+    ln((1 + n) / (1 + df)) + 1.
+    """
+    analyzer = _count_vectorizer(ngram_max).build_analyzer()
+    document_frequency = Counter()
+    n_docs = 0
+    for text in texts:
+        document_frequency.update(set(analyzer(text)))
+        n_docs += 1
+
+    max_count = max_df * n_docs if isinstance(max_df, float) else max_df
+    candidates = [(term, df) for term, df in document_frequency.items() if min_df <= df <= max_count]
+    # Les termes les plus fréquents d'abord, ordre alphabétique à égalité
+    candidates.sort(key=lambda item: (-item[1], item[0]))
+    terms = sorted(term for term, _ in candidates[:max_features])
+
+    df = np.array([document_frequency[term] for term in terms], dtype=np.float64)
+    idf = np.log((1 + n_docs) / (1 + df)) + 1
+    params = {
+        'format_version': MODEL_FORMAT_VERSION,
+        'n_docs': n_docs,
+        'min_df': min_df,
+        'max_df': max_df,
+        'ngram_max': ngram_max,
+        'sublinear_tf': sublinear_tf
+    }
+    return TfidfModel(terms=terms, idf=idf, params=params)
+
+
+def top_k_rows(matrix: sparse.csr_matrix, k: int) -> List[np.ndarray]:
+    """Indices de colonnes des k plus forts poids de chaque ligne.
+
+    Tri global unique des non-zéros par (ligne, poids décroissant) puis rang
+    dans la ligne via indptr ; à poids égal, l'ordre des colonnes est gardé.
+    """
+    matrix = matrix.tocsr()
+    matrix.sum_duplicates()
+    counts = np.diff(matrix.indptr)
+    rows = np.repeat(np.arange(matrix.shape[0]), counts)
+    order = np.lexsort((matrix.indices, -matrix.data, rows))
+    ranks = np.arange(order.size) - matrix.indptr[rows[order]]
+    selected = matrix.indices[order[ranks < k]]
+    return np.split(selected, np.cumsum(np.minimum(counts, k))[:-1])
+
+
+class BriefTermExtractor:
+    """Transformation TF-IDF et termes distinctifs à partir du modèle persisté"""
+
+    def __init__(self, data_path: str = "/infra/data", top_k: int = 8):
+        self.model_file = Path(os.getenv("ML_TFIDF_MODEL", str(Path(data_path) / MODEL_FILENAME)))
+        self.top_k = top_k
+        self.model: Optional[TfidfModel] = None
+        self.model_version = None
+        self._vectorizer: Optional[CountVectorizer] = None
+        self._lock = threading.Lock()
+        self.reload()
+
+    @property
+    def available(self) -> bool:
+        return self.model is not None
+
+    def reload(self) -> bool:
+        """Charge le modèle sérialisé ; le précédent reste actif en cas d'échec"""
+        if not self.model_file.exists():
+            return False
+        try:
+            model = TfidfModel.load(self.model_file)
+            vectorizer = _count_vectorizer(model.params.get('ngram_max', 1), model.vocabulary())
+        except Exception as e:
+            logger.error(f"Erreur chargement modèle TF-IDF {self.model_file}: {e}")
+            return False
+
+        with self._lock:
+            self.model, self._vectorizer = model, vectorizer
+            self.model_version = file_version(self.model_file)
+        logger.info(f"Modèle TF-IDF chargé: {len(model.terms)} termes, {model.params.get('n_docs')} briefs")
+        return True
+
+    def _current(self):
+        with self._lock:
+            return self.model, self._vectorizer
+
+    @staticmethod
+    def _weigh(model: TfidfModel, vectorizer: CountVectorizer, texts: List[str]) -> sparse.csr_matrix:
+        counts = vectorizer.transform(texts)
+        if model.params.get('sublinear_tf', True):
+            np.log(counts.data, out=counts.data)
+            counts.data += 1
+        # Multiplication colonne par l'IDF sur les seuls non-zéros
+        counts.data *= model.idf[counts.indices].astype(np.float32)
+        return normalize(counts, norm='l2', copy=False)
+
+    def transform(self, texts: List[str]) -> Optional[sparse.csr_matrix]:
+        """Matrice TF-IDF creuse (lignes normalisées L2) d'un lot de textes"""
+        model, vectorizer = self._current()
+        return self._weigh(model, vectorizer, texts) if model is not None else None
+
+    def transform_chunks(self, texts: Iterable[str], chunk_size: int = 10000) -> Iterator[sparse.csr_matrix]:
+        """Transformation en flux : une matrice creuse par tranche de chunk_size textes.
+
+        Le modèle est figé au premier lot : un rechargement pendant le flux ne
+        mélange pas deux vocabulaires.
+        """
+        model, vectorizer = self._current()
+        if model is None:
+            return
+        chunk = []
+        for text in texts:
+            chunk.append(text)
+            if len(chunk) >= chunk_size:
+                yield self._weigh(model, vectorizer, chunk)
+                chunk = []
+        if chunk:
+            yield self._weigh(model, vectorizer, chunk)
+
+    def top_terms(self, text: str, k: Optional[int] = None) -> List[str]:
+        """Termes les plus distinctifs d'un brief ([] sans modèle)"""
+        return next(self.top_terms_batch([text], k), [])
+
+    def top_terms_batch(self, texts: Iterable[str], k: Optional[int] = None,
+                        chunk_size: int = 10000) -> Iterator[List[str]]:
+        """Termes distinctifs de chaque brief, dans l'ordre, tranche par tranche"""
+        model, vectorizer = self._current()
+        if model is None:
+            return
+        k = k or self.top_k
+        chunk = []
+        for text in texts:
+            chunk.append(text)
+            if len(chunk) >= chunk_size:
+                yield from self._top_terms(model, vectorizer, chunk, k)
+                chunk = []
+        if chunk:
+            yield from self._top_terms(model, vectorizer, chunk, k)
+
+    def _top_terms(self, model: TfidfModel, vectorizer: CountVectorizer, texts: List[str], k: int):
+        for indices in top_k_rows(self._weigh(model, vectorizer, texts), k):
+            yield [model.terms[index] for index in indices]
+
+    def get_stats(self) -> Dict[str, any]:
+        model = self.model
+        return {
+            'loaded': model is not None,
+            'terms': len(model.terms) if model else 0,
+            'n_docs': model.params.get('n_docs') if model else 0,
+            'model_bytes': self.model_file.stat().st_size if model and self.model_file.exists() else 0
+        }
+
+
+def iter_corpus(path: Path) -> Iterator[str]:
+    """Briefs d'un fichier .jsonl (title + description) ou texte (un brief par ligne)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if path.suffix == '.jsonl':
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                yield f"{record.get('title') or ''} {record.get('description') or ''}"
+            else:
+                yield line
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Modèle TF-IDF du corpus de briefs")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    fit = commands.add_parser("fit", help="Ajuste et sérialise le modèle")
+    fit.add_argument("corpus")
+    fit.add_argument("--output", default=str(Path("/infra/data") / MODEL_FILENAME))
+    fit.add_argument("--min-df", type=int, default=2)
+    fit.add_argument("--max-df", type=float, default=0.5)
+    fit.add_argument("--max-features", type=int, default=50000)
+    fit.add_argument("--ngram-max", type=int, default=1)
+
+    top = commands.add_parser("top-terms", help="Termes distinctifs de chaque brief (JSONL)")
+    top.add_argument("corpus")
+    top.add_argument("--model", default=str(Path("/infra/data") / MODEL_FILENAME))
+    top.add_argument("--output", required=True)
+    top.add_argument("--k", type=int, default=8)
+    top.add_argument("--chunk-size", type=int, default=10000)
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    start = time.perf_counter()
+
+    if args.command == "fit":
+        model = fit_corpus(iter_corpus(Path(args.corpus)), min_df=args.min_df, max_df=args.max_df,
+                           max_features=args.max_features, ngram_max=args.ngram_max)
+        model.save(Path(args.output))
+        logger.info(f"{len(model.terms)} termes sur {model.params['n_docs']} briefs -> {args.output} "
+                    f"({Path(args.output).stat().st_size / 1024:.0f} Ko, {time.perf_counter() - start:.1f} s)")
+    else:
+        os.environ["ML_TFIDF_MODEL"] = args.model
+        extractor = BriefTermExtractor(top_k=args.k)
+        if not extractor.available:
+            parser.error(f"modèle introuvable ou invalide: {args.model}")
+        count = 0
+        with open(args.output, 'w', encoding='utf-8') as out:
+            for terms in extractor.top_terms_batch(iter_corpus(Path(args.corpus)), chunk_size=args.chunk_size):
+                out.write(json.dumps(terms, ensure_ascii=False) + "\n")
+                count += 1
+        logger.info(f"{count} briefs traités en {time.perf_counter() - start:.1f} s")
+
+
+# Instance globale
+brief_term_extractor = BriefTermExtractor()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""
+Feature store historique client
+Agrégats par client (missions publiées, taux d'aboutissement, budget moyen) en
+tables compactes indexées par identifiant interné, mis à jour depuis un journal
+d'événements en ajout seul
+"""
+
+import csv
+import json
+import logging
+import sqlite3
+import sys
+import threading
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+from services.data_reloader import read_appended_lines
+
+logger = logging.getLogger(__name__)
+
+HISTORY_FILES = ("client_history.sqlite", "client_history.csv")
+EVENTS_FILENAME = "client_events.jsonl"
+SQLITE_QUERY = "SELECT client_id, missions_posted, missions_completed, avg_budget FROM client_history"
+
+
+@dataclass(frozen=True)
+class ClientHistory:
+    client_id: str
+    missions_posted: int
+    missions_completed: int
+    avg_budget: float
+
+    @property
+    def completion_rate(self) -> float:
+        return self.missions_completed / self.missions_posted if self.missions_posted else 0.0
+
+
+class _HistoryTable:
+    """Colonnes parallèles (array) indexées par un dict client_id -> ligne"""
+
+    def __init__(self):
+        self.index: Dict[str, int] = {}
+        self.posted = array('I')
+        self.completed = array('I')
+        self.budget_total = array('d')
+
+    def row_for(self, client_id: str) -> int:
+        row = self.index.get(client_id)
+        if row is None:
+            row = len(self.posted)
+            self.index[sys.intern(client_id)] = row
+            self.posted.append(0)
+            self.completed.append(0)
+            self.budget_total.append(0.0)
+        return row
+
+    def add(self, client_id: str, posted: int, completed: int, avg_budget: float):
+        row = self.row_for(client_id)
+        self.posted[row] += posted
+        self.completed[row] += completed
+        self.budget_total[row] += avg_budget * posted
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[str, int, int, float]]) -> '_HistoryTable':
+        """Construction en bloc : listes Python puis conversion unique en array"""
+        table = cls()
+        index, posted, completed, budget_total = table.index, [], [], []
+        for client_id, client_posted, client_completed, avg_budget in rows:
+            row = index.get(client_id)
+            if row is None:
+                index[sys.intern(client_id)] = len(posted)
+                posted.append(client_posted)
+                completed.append(client_completed)
+                budget_total.append(avg_budget * client_posted)
+            else:
+                posted[row] += client_posted
+                completed[row] += client_completed
+                budget_total[row] += avg_budget * client_posted
+        table.posted = array('I', posted)
+        table.completed = array('I', completed)
+        table.budget_total = array('d', budget_total)
+        return table
+
+    def nbytes(self) -> int:
+        columns = (self.posted, self.completed, self.budget_total)
+        return sum(column.buffer_info()[1] * column.itemsize for column in columns)
+
+
+class ClientHistoryStore:
+    """Lookup O(1) des agrégats client avec cache LRU en frontal.
+
+    Le fichier de base (SQLite ou CSV, export périodique) est chargé dans une
+    nouvelle table publiée par une seule affectation ; le journal
+    client_events.jsonl contient les événements postérieurs à l'export et est
+    lu de façon incrémentale depuis le dernier offset.
+    """
+
+    def __init__(self, data_path: str = "/infra/data", cache_size: int = 10000):
+        self.data_path = Path(data_path)
+        self.history_file = next(
+            (self.data_path / name for name in HISTORY_FILES if (self.data_path / name).exists()),
+            self.data_path / HISTORY_FILES[-1]
+        )
+        self.events_file = self.data_path / EVENTS_FILENAME
+        self.cache_size = cache_size
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.events_applied = 0
+        self._table = _HistoryTable()
+        self._cache: OrderedDict = OrderedDict()
+        self._events_offset = 0
+        self._lock = threading.Lock()
+        self.reload()
+
+    def __len__(self) -> int:
+        return len(self._table.index)
+
+    def get(self, client_id: str) -> Optional[ClientHistory]:
+        """Agrégats d'un client, None s'il est inconnu"""
+        with self._lock:
+            history = self._cache.get(client_id)
+            if history is not None:
+                self._cache.move_to_end(client_id)
+                self.cache_hits += 1
+                return history
+
+            self.cache_misses += 1
+            table = self._table
+            row = table.index.get(client_id)
+            if row is None:
+                return None
+
+            posted = table.posted[row]
+            history = ClientHistory(
+                client_id=client_id,
+                missions_posted=posted,
+                missions_completed=table.completed[row],
+                avg_budget=table.budget_total[row] / posted if posted else 0.0
+            )
+            self._cache[client_id] = history
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return history
+
+    def reload(self) -> bool:
+        """Recharge le fichier de base puis rejoue le journal d'événements"""
+        try:
+            table = _HistoryTable.from_rows(self._read_history(self.history_file))
+        except Exception as e:
+            logger.error(f"Erreur chargement historique client {self.history_file}: {e}")
+            return False
+
+        with self._lock:
+            self._table = table
+            self._cache.clear()
+            self._events_offset = 0
+            self.events_applied = 0
+        self.apply_events()
+        logger.info(f"Historique client chargé: {len(table.index)} clients")
+        return True
+
+    def apply_events(self) -> bool:
+        """Applique les événements ajoutés au journal depuis le dernier appel"""
+        lines, offset = read_appended_lines(self.events_file, self._events_offset)
+        if lines is None:
+            # Journal tronqué ou remplacé : on repart du fichier de base
+            logger.warning("Journal client tronqué, rechargement complet")
+            return self.reload()
+
+        applied = 0
+        with self._lock:
+            table = self._table
+            for line in lines:
+                try:
+                    event = json.loads(line)
+                    client_id = str(event['client_id'])
+                except (ValueError, KeyError):
+                    continue
+                if event.get('type') == 'mission_posted':
+                    table.add(client_id, 1, 0, float(event.get('budget') or 0))
+                elif event.get('type') == 'mission_completed':
+                    table.add(client_id, 0, 1, 0.0)
+                else:
+                    continue
+                self._cache.pop(client_id, None)
+                applied += 1
+            self._events_offset = offset
+            self.events_applied += applied
+
+        return True
+
+    def _read_history(self, path: Path) -> Iterable[Tuple[str, int, int, float]]:
+        if not path.exists():
+            return
+        if path.suffix in ('.sqlite', '.db'):
+            connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+            try:
+                for client_id, posted, completed, avg_budget in connection.execute(SQLITE_QUERY):
+                    yield str(client_id), int(posted), int(completed), float(avg_budget or 0)
+            finally:
+                connection.close()
+        else:
+            with open(path, 'r', encoding='utf-8', newline='') as f:
+                reader = csv.reader(f)
+                header = next(reader, [])
+                columns = [header.index(name) for name in
+                           ('client_id', 'missions_posted', 'missions_completed', 'avg_budget')]
+                for row in reader:
+                    if not row:
+                        continue
+                    client_id, posted, completed, avg_budget = (row[column] for column in columns)
+                    yield client_id, int(posted or 0), int(completed or 0), float(avg_budget or 0)
+
+    def memory_footprint(self, sample_size: int = 1000) -> Dict[str, float]:
+        """Empreinte mémoire estimée (colonnes, index, identifiants internés)"""
+        table = self._table
+        clients = len(table.index)
+        sample = [key for key, _ in zip(table.index, range(sample_size))]
+        key_bytes = sum(sys.getsizeof(key) for key in sample) / len(sample) * clients if sample else 0
+        total = table.nbytes() + sys.getsizeof(table.index) + key_bytes
+        per_client = total / clients if clients else 0.0
+        return {
+            'clients': clients,
+            'bytes': int(total),
+            'bytes_per_client': round(per_client, 1),
+            'mb_per_million_clients': round(per_client * 1_000_000 / (1024 * 1024), 1)
+        }
+
+    def get_stats(self) -> Dict[str, any]:
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            'clients': len(self),
+            'events_applied': self.events_applied,
+            'cache_hit_rate': round(self.cache_hits / lookups, 3) if lookups else 0.0,
+            'memory': self.memory_footprint()
+        }
+
+
+# Instance globale
+client_history_store = ClientHistoryStore()
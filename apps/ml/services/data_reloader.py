@@ -0,0 +1,201 @@
+"""
+Rechargement à chaud des données de référence (/infra/data)
+Surveille les CSV et reconstruit les index en arrière-plan sans bloquer les requêtes
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class DataVersion:
+    checksum: str
+    mtime: float
+    size: int
+    loaded_at: float
+
+    def as_dict(self) -> Dict[str, any]:
+        return {
+            'checksum': self.checksum,
+            'mtime': self.mtime,
+            'size': self.size,
+            'loaded_at': self.loaded_at
+        }
+
+
+def file_version(path: Path) -> Optional[DataVersion]:
+    """Calcule l'empreinte (sha1 tronqué, mtime, taille) d'un fichier de données"""
+    try:
+        stat = path.stat()
+        digest = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 16), b''):
+                digest.update(chunk)
+    except OSError:
+        return None
+
+    return DataVersion(
+        checksum=digest.hexdigest()[:12],
+        mtime=stat.st_mtime,
+        size=stat.st_size,
+        loaded_at=time.time()
+    )
+
+
+def read_appended_lines(path: Path, offset: int) -> Tuple[Optional[List[bytes]], int]:
+    """Lit les lignes complètes ajoutées à un journal depuis `offset`.
+
+    Retourne (lignes, nouvel offset). Une ligne en cours d'écriture est laissée
+    pour le prochain appel. (None, 0) signale un journal tronqué ou remplacé.
+    """
+    try:
+        size = path.stat().st_size
+    except OSError:
+        return [], offset
+
+    if size < offset:
+        return None, 0
+
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        chunk = f.read(size - offset)
+
+    end = chunk.rfind(b'\n') + 1
+    return chunk[:end].splitlines(), offset + end
+
+
+@dataclass
+class _WatchedSource:
+    name: str
+    path: Path
+    reload: Callable[[], bool]
+    append_only: bool = False
+    mtime: float = 0.0
+    size: int = -1
+    checksum: Optional[str] = None
+
+
+class DataReloader:
+    """Surveille des fichiers de données et déclenche leur rechargement.
+
+    Chaque source fournit une fonction `reload()` qui construit les nouvelles
+    structures hors du chemin des requêtes puis les publie par une seule
+    affectation d'attribut. Les listeners sont notifiés après chaque bascule
+    pour invalider les caches dérivés.
+    """
+
+    def __init__(self, interval: float = 30.0):
+        self.interval = interval
+        self._sources: Dict[str, _WatchedSource] = {}
+        self._listeners: List[Callable[[str, str], None]] = []
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.reload_count = 0
+
+    def watch(self, name: str, path: Path, reload: Callable[[], bool], append_only: bool = False):
+        """Enregistre une source de données à surveiller.
+
+        Une source append_only (journal d'événements) n'est pas hachée : tout
+        changement de taille déclenche reload(), qui lit la suite du fichier.
+        """
+        source = _WatchedSource(name=name, path=Path(path), reload=reload, append_only=append_only)
+        if append_only:
+            try:
+                stat = source.path.stat()
+                source.mtime, source.size, source.checksum = stat.st_mtime, stat.st_size, f"{stat.st_size}b"
+            except OSError:
+                pass
+        else:
+            version = file_version(source.path)
+            if version:
+                source.mtime, source.size, source.checksum = version.mtime, version.size, version.checksum
+        with self._lock:
+            self._sources[name] = source
+
+    def add_listener(self, callback: Callable[[str, str], None]):
+        """Ajoute un callback appelé avec (nom de la source, nouvelle version)"""
+        with self._lock:
+            self._listeners.append(callback)
+
+    def check_now(self) -> List[str]:
+        """Vérifie toutes les sources et recharge celles qui ont changé"""
+        with self._lock:
+            sources = list(self._sources.values())
+
+        reloaded = []
+        for source in sources:
+            try:
+                stat = source.path.stat()
+            except OSError:
+                continue
+
+            # Test rapide sur mtime/taille avant de recalculer le checksum
+            if stat.st_mtime == source.mtime and stat.st_size == source.size:
+                continue
+
+            if source.append_only:
+                mtime, size = stat.st_mtime, stat.st_size
+                checksum = f"{stat.st_size}b"
+            else:
+                version = file_version(source.path)
+                if version is None:
+                    continue
+                mtime, size = version.mtime, version.size
+                if version.checksum == source.checksum:
+                    source.mtime, source.size = mtime, size
+                    continue
+                checksum = version.checksum
+
+            # mtime/taille ne sont retenus qu'après succès : un échec est retenté au prochain passage
+            if not source.reload():
+                logger.warning(f"Rechargement de {source.name} échoué, version précédente conservée")
+                continue
+
+            source.mtime, source.size, source.checksum = mtime, size, checksum
+            self.reload_count += 1
+            reloaded.append(source.name)
+            logger.info(f"Données {source.name} rechargées (version {checksum})")
+            self._notify(source.name, checksum)
+
+        return reloaded
+
+    def _notify(self, name: str, checksum: str):
+        with self._lock:
+            listeners = list(self._listeners)
+        for callback in listeners:
+            try:
+                callback(name, checksum)
+            except Exception as e:
+                logger.error(f"Erreur listener rechargement {name}: {e}")
+
+    def start(self):
+        """Démarre la surveillance dans un thread démon"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="data-reloader", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval)
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.check_now()
+            except Exception as e:
+                logger.error(f"Erreur surveillance des données: {e}")
+
+    def get_versions(self) -> Dict[str, Optional[str]]:
+        with self._lock:
+            return {name: source.checksum for name, source in self._sources.items()}
@@ -0,0 +1,379 @@
+"""
+Snapshot binaire des données de référence (taxonomie, index mots-clés, grille de prix)
+Compilé hors ligne depuis les CSV, ouvert par mmap sans parsing au démarrage des workers
+
+Usage :
+    python -m services.data_snapshot --data-path /infra/data
+"""
+
+import argparse
+import bisect
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+from array import array
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from services.data_reloader import file_version
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FILENAME = "reference_data.snap"
+SNAPSHOT_MAGIC = b"APSNAP01"
+SNAPSHOT_FORMAT_VERSION = 1
+
+# Ordre des colonnes de la grille de prix
+PRICE_FIELDS = (
+    'hourly_min', 'hourly_med', 'hourly_max',
+    'daily_min', 'daily_med', 'daily_max',
+    'complexity_factor', 'avg_days'
+)
+
+_ALIGNMENT = 8
+
+
+def default_snapshot_path(data_path: Path) -> Path:
+    """Chemin du snapshot : variable ML_DATA_SNAPSHOT ou fichier à côté des CSV"""
+    return Path(os.getenv("ML_DATA_SNAPSHOT", str(Path(data_path) / SNAPSHOT_FILENAME)))
+
+
+class _StringTableBuilder:
+    """Table de chaînes : les mots-clés triés occupent les ids [0, K)"""
+
+    def __init__(self, sorted_keywords: List[str]):
+        self.strings = list(sorted_keywords)
+        self.ids = {s: i for i, s in enumerate(self.strings)}
+
+    def intern(self, value: str) -> int:
+        string_id = self.ids.get(value)
+        if string_id is None:
+            string_id = len(self.strings)
+            self.strings.append(value)
+            self.ids[value] = string_id
+        return string_id
+
+    def to_bytes(self) -> bytes:
+        return '\x00'.join(self.strings).encode('utf-8')
+
+
+def compile_snapshot(taxonomy, price_data: Dict[str, Dict[str, Dict[str, float]]],
+                     output_path: Path, sources: Dict[str, str]) -> Dict[str, int]:
+    """Compile la taxonomie et la grille de prix en un fichier binaire mmap-able.
+
+    `taxonomy` est un TaxonomySnapshot (ou tout objet exposant taxonomy_data et
+    category_keywords). L'écriture passe par un fichier temporaire puis
+    os.replace : les workers qui ont déjà mappé l'ancienne version ne la voient
+    jamais modifiée.
+    """
+    keywords = sorted(taxonomy.category_keywords.keys())
+    if any('\x00' in s for s in keywords):
+        raise ValueError("Les chaînes de la taxonomie ne peuvent pas contenir de caractère NUL")
+    strings = _StringTableBuilder(keywords)
+
+    # Entrées (catégorie, sous-catégorie, compétence) dans l'ordre du CSV
+    entry_category, entry_sub, entry_skill = array('I'), array('I'), array('I')
+    entry_kw_offsets, entry_kw_ids = array('I', [0]), array('I')
+    for category, sub_categories in taxonomy.taxonomy_data.items():
+        for sub_category, skills in sub_categories.items():
+            for skill_info in skills:
+                entry_category.append(strings.intern(category))
+                entry_sub.append(strings.intern(sub_category))
+                entry_skill.append(strings.intern(skill_info['skill']))
+                for keyword in skill_info['keywords']:
+                    entry_kw_ids.append(strings.intern(keyword))
+                entry_kw_offsets.append(len(entry_kw_ids))
+
+    # Index inversé mot-clé -> (catégorie, sous-catégorie, compétence)
+    posting_offsets = array('I', [0])
+    posting_category, posting_sub, posting_skill = array('I'), array('I'), array('I')
+    for keyword in keywords:
+        for match in taxonomy.category_keywords[keyword]:
+            posting_category.append(strings.intern(match['category']))
+            posting_sub.append(strings.intern(match['sub_category']))
+            posting_skill.append(strings.intern(match['skill']))
+        posting_offsets.append(len(posting_category))
+
+    # Grille de prix : une ligne de float64 par (catégorie, sous-catégorie)
+    price_keys, price_values = array('I'), array('d')
+    for category, sub_categories in price_data.items():
+        for sub_category, values in sub_categories.items():
+            price_keys.extend((strings.intern(category), strings.intern(sub_category)))
+            price_values.extend(float(values[field]) for field in PRICE_FIELDS)
+
+    sections = [
+        ('strings', strings.to_bytes()),
+        ('entry_category', entry_category),
+        ('entry_sub', entry_sub),
+        ('entry_skill', entry_skill),
+        ('entry_kw_offsets', entry_kw_offsets),
+        ('entry_kw_ids', entry_kw_ids),
+        ('posting_offsets', posting_offsets),
+        ('posting_category', posting_category),
+        ('posting_sub', posting_sub),
+        ('posting_skill', posting_skill),
+        ('price_keys', price_keys),
+        ('price_values', price_values),
+    ]
+
+    payloads = []
+    directory = {}
+    offset = 0
+    for name, data in sections:
+        raw = data if isinstance(data, bytes) else data.tobytes()
+        typecode = 'B' if isinstance(data, bytes) else data.typecode
+        directory[name] = [offset, len(raw), typecode]
+        padding = (-len(raw)) % _ALIGNMENT
+        payloads.append(raw + b'\x00' * padding)
+        offset += len(raw) + padding
+
+    counts = {
+        'strings': len(strings.strings),
+        'keywords': len(keywords),
+        'categories': len(taxonomy.taxonomy_data),
+        'entries': len(entry_category),
+        'postings': len(posting_category),
+        'prices': len(price_keys) // 2
+    }
+    header = json.dumps({
+        'format': SNAPSHOT_FORMAT_VERSION,
+        'sources': sources,
+        'counts': counts,
+        'price_fields': list(PRICE_FIELDS),
+        'sections': directory
+    }).encode('utf-8')
+    header += b' ' * ((-(len(SNAPSHOT_MAGIC) + 4 + len(header))) % _ALIGNMENT)
+
+    output_path = Path(output_path)
+    tmp_path = output_path.with_name(output_path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(SNAPSHOT_MAGIC)
+        f.write(struct.pack('<I', len(header)))
+        f.write(header)
+        for payload in payloads:
+            f.write(payload)
+    os.replace(tmp_path, output_path)
+
+    return counts
+
+
+class _KeywordIndex(Mapping):
+    """Vue en lecture seule de l'index mots-clés, recherche dichotomique"""
+
+    def __init__(self, snapshot: 'ReferenceSnapshot'):
+        self._snapshot = snapshot
+        self._keywords = snapshot.strings[:snapshot.counts['keywords']]
+
+    def _position(self, keyword) -> int:
+        i = bisect.bisect_left(self._keywords, keyword)
+        if i < len(self._keywords) and self._keywords[i] == keyword:
+            return i
+        return -1
+
+    def __contains__(self, keyword) -> bool:
+        return isinstance(keyword, str) and self._position(keyword) >= 0
+
+    def __getitem__(self, keyword) -> List[Dict[str, str]]:
+        i = self._position(keyword) if isinstance(keyword, str) else -1
+        if i < 0:
+            raise KeyError(keyword)
+        s = self._snapshot
+        start, end = s.posting_offsets[i], s.posting_offsets[i + 1]
+        return [
+            {
+                'category': s.strings[s.posting_category[p]],
+                'sub_category': s.strings[s.posting_sub[p]],
+                'skill': s.strings[s.posting_skill[p]]
+            }
+            for p in range(start, end)
+        ]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keywords)
+
+    def __len__(self) -> int:
+        return len(self._keywords)
+
+
+class CompiledTaxonomy:
+    """Taxonomie adossée au snapshot mmap, même interface que TaxonomySnapshot"""
+
+    def __init__(self, snapshot: 'ReferenceSnapshot', version: str):
+        self._snapshot = snapshot
+        self.version = version
+        self.category_keywords = _KeywordIndex(snapshot)
+        self._taxonomy_data: Optional[Dict[str, Dict[str, List[Dict[str, any]]]]] = None
+
+    @property
+    def category_count(self) -> int:
+        return self._snapshot.counts['categories']
+
+    def iter_skills(self) -> Iterator[Tuple[str, str, str, List[str]]]:
+        s = self._snapshot
+        strings, kw_offsets, kw_ids = s.strings, s.entry_kw_offsets, s.entry_kw_ids
+        for i in range(len(s.entry_category)):
+            yield (
+                strings[s.entry_category[i]],
+                strings[s.entry_sub[i]],
+                strings[s.entry_skill[i]],
+                [strings[k] for k in kw_ids[kw_offsets[i]:kw_offsets[i + 1]]]
+            )
+
+    @property
+    def taxonomy_data(self) -> Dict[str, Dict[str, List[Dict[str, any]]]]:
+        """Structure imbriquée, matérialisée au premier accès puis gardée pour ce snapshot.
+
+        Partagée par tous les appelants, comme TaxonomySnapshot.taxonomy_data :
+        à traiter en lecture seule.
+        """
+        if self._taxonomy_data is None:
+            taxonomy_data = {}
+            for category, sub_category, skill, keywords in self.iter_skills():
+                taxonomy_data.setdefault(category, {}).setdefault(sub_category, []).append({
+                    'skill': skill,
+                    'keywords': keywords
+                })
+            self._taxonomy_data = taxonomy_data
+        return self._taxonomy_data
+
+
+class ReferenceSnapshot:
+    """Fichier snapshot ouvert en mmap : les tableaux pointent dans le page cache partagé"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        buffer = memoryview(self._mmap)
+        if bytes(buffer[:len(SNAPSHOT_MAGIC)]) != SNAPSHOT_MAGIC:
+            raise ValueError(f"Snapshot invalide: {self.path}")
+        header_len = struct.unpack_from('<I', buffer, len(SNAPSHOT_MAGIC))[0]
+        header_start = len(SNAPSHOT_MAGIC) + 4
+        header = json.loads(bytes(buffer[header_start:header_start + header_len]))
+        if header.get('format') != SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(f"Format de snapshot non supporté: {header.get('format')}")
+
+        self.sources = header['sources']
+        self.counts = header['counts']
+        base = header_start + header_len
+
+        sections = {}
+        for name, (offset, length, typecode) in header['sections'].items():
+            view = buffer[base + offset:base + offset + length]
+            sections[name] = view if typecode == 'B' else view.cast(typecode)
+
+        # Seule la table de chaînes est décodée (un seul appel C), le reste reste mappé
+        self.strings = bytes(sections.pop('strings')).decode('utf-8').split('\x00')
+        for name, view in sections.items():
+            setattr(self, name, view)
+
+    def taxonomy(self) -> CompiledTaxonomy:
+        return CompiledTaxonomy(self, version=self.sources.get('taxonomy', 'snapshot'))
+
+    def price_data(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Reconstruit la grille de prix (quelques dizaines de lignes)"""
+        price_data = {}
+        n_fields = len(PRICE_FIELDS)
+        for row in range(self.counts['prices']):
+            category = self.strings[self.price_keys[2 * row]]
+            sub_category = self.strings[self.price_keys[2 * row + 1]]
+            values = self.price_values[row * n_fields:(row + 1) * n_fields]
+            entry = dict(zip(PRICE_FIELDS, values))
+            entry['avg_days'] = int(entry['avg_days'])
+            price_data.setdefault(category, {})[sub_category] = entry
+        return price_data
+
+
+_open_snapshots: Dict[str, Tuple[Tuple[int, int], ReferenceSnapshot]] = {}
+_open_lock = threading.Lock()
+
+
+def open_snapshot(path: Path) -> Optional[ReferenceSnapshot]:
+    """Ouvre (ou réutilise) le snapshot mmap d'un chemin, None s'il est absent ou invalide"""
+    path = Path(path)
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+
+    key = str(path)
+    identity = (stat.st_ino, stat.st_mtime_ns)
+    with _open_lock:
+        cached = _open_snapshots.get(key)
+        if cached and cached[0] == identity:
+            return cached[1]
+        try:
+            snapshot = ReferenceSnapshot(path)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Snapshot {path} ignoré: {e}")
+            return None
+        _open_snapshots[key] = (identity, snapshot)
+        return snapshot
+
+
+def _is_fresh(snapshot: ReferenceSnapshot, source: str, csv_path: Path) -> bool:
+    """Le snapshot est utilisable si le CSV source est absent ou inchangé"""
+    if not csv_path.exists():
+        return True
+    csv_version = file_version(csv_path)
+    return csv_version is not None and snapshot.sources.get(source) == csv_version.checksum
+
+
+def is_snapshot_fresh(snapshot_path: Path, data_path: Path) -> bool:
+    """Vrai si le snapshot existe et correspond aux deux CSV sources"""
+    snapshot = open_snapshot(snapshot_path)
+    return snapshot is not None and \
+        _is_fresh(snapshot, 'taxonomy', Path(data_path) / "taxonomy_skills_fr.csv") and \
+        _is_fresh(snapshot, 'pricing', Path(data_path) / "price_terms_fr.csv")
+
+
+def load_compiled_taxonomy(snapshot_path: Path, csv_path: Path) -> Optional[CompiledTaxonomy]:
+    snapshot = open_snapshot(snapshot_path)
+    if snapshot is None or not _is_fresh(snapshot, 'taxonomy', csv_path):
+        return None
+    return snapshot.taxonomy()
+
+
+def load_compiled_prices(snapshot_path: Path, csv_path: Path) -> Optional[Tuple[Dict, str]]:
+    snapshot = open_snapshot(snapshot_path)
+    if snapshot is None or not _is_fresh(snapshot, 'pricing', csv_path):
+        return None
+    return snapshot.price_data(), snapshot.sources.get('pricing', 'snapshot')
+
+
+def build_from_csv(data_path: Path, output_path: Optional[Path] = None) -> Dict[str, int]:
+    """Étape de build : parse les CSV une fois et écrit le snapshot"""
+    from services.taxonomizer import parse_taxonomy_csv
+    from services.price_time_suggester import parse_price_csv
+
+    data_path = Path(data_path)
+    output_path = Path(output_path) if output_path else default_snapshot_path(data_path)
+
+    # Pas de repli sur les données par défaut : le build échoue si un CSV est invalide
+    taxonomy = parse_taxonomy_csv(data_path / "taxonomy_skills_fr.csv")
+    price_data, pricing_version = parse_price_csv(data_path / "price_terms_fr.csv")
+
+    return compile_snapshot(
+        taxonomy, price_data, output_path,
+        sources={'taxonomy': taxonomy.version, 'pricing': pricing_version}
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile les données de référence en snapshot binaire")
+    parser.add_argument('--data-path', default="/infra/data")
+    parser.add_argument('--output', default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    counts = build_from_csv(Path(args.data_path), Path(args.output) if args.output else None)
+    logger.info(f"Snapshot compilé: {counts}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,9 +3,18 @@
 LOC Uplift - Calcul probabilité d'aboutissement et recommandations
 """
 
+import math
+import re
+import time
+import unicodedata
 import numpy as np
-from typing import Dict, List, Optional, Tuple
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
 from dataclasses import dataclass
+from services.client_history_store import ClientHistoryStore, client_history_store as default_client_history_store
+
+# Leviers d'uplift, dans l'ordre des colonnes de score_batch
+UPLIFT_ACTIONS = ('budget_increase', 'delay_extension', 'brief_enhancement')
 
 @dataclass
 class LOCResult:
@@ -15,7 +24,11 @@ class LOCResult:
     recommendations: List[str]
 
 class LOCUpliftCalculator:
-    def __init__(self):
+    def __init__(self, client_history_store: Optional[ClientHistoryStore] = None):
+        self.client_history_store = (
+            client_history_store if client_history_store is not None else default_client_history_store
+        )
+
         # Facteurs de base pour le calcul LOC
         self.base_factors = {
             'brief_quality': 0.25,      # Impact qualité du brief
@@ -56,6 +69,15 @@ class LOCUpliftCalculator:
             'services_personne': {'avg_loc': 0.82, 'top_quartile': 0.92}
         }
 
+        # Mots-clés d'urgence (partagés par le calcul unitaire et le calcul par lot)
+        self.urgent_keywords = ['urgent', 'rapide', 'vite', 'asap', 'immédiat', 'pressé']
+        self.flexible_keywords = ['flexible', 'pas pressé', 'quand possible']
+        self._urgent_pattern = re.compile('|'.join(map(re.escape, self.urgent_keywords)))
+        self._flexible_pattern = re.compile('|'.join(map(re.escape, self.flexible_keywords)))
+
+        # Composantes prix du solveur aux points de rupture, par fourchette de prix suggérés
+        self._budget_curve = lru_cache(maxsize=4096)(self._compute_budget_curve)
+
     def calculate_loc_with_uplift(self,
                                  project_data: Dict,
                                  standardization_data: Dict,
@@ -169,37 +191,50 @@ class LOCUpliftCalculator:
             'menage': 'services_personne'
         }
         
-        mapped_category = category_mapping.get(category, category)
-        return demand_scores.get(mapped_category, demand_scores['default'])
+        # « Développement mobile » : catégorie complète, sinon mot le plus spécifique d'abord
+        folded = unicodedata.normalize('NFKD', (category or '').lower())
+        folded = ''.join(char for char in folded if not unicodedata.combining(char)).replace('-', '_')
+        for key in (folded, *reversed(folded.split())):
+            mapped_category = category_mapping.get(key, key)
+            if mapped_category in demand_scores:
+                return demand_scores[mapped_category]
+        return demand_scores['default']
 
     def _assess_client_history(self, client_id: str) -> float:
-        """Évalue l'historique du client (simulé)"""
-        # Simulation basée sur l'ID client
+        """Évalue l'historique du client depuis le feature store"""
         if not client_id:
             return 0.5
         
-        # Hash simple pour simulation cohérente
-        hash_val = sum(ord(c) for c in client_id) % 100
+        history = self.client_history_store.get(client_id)
+        if history is None or history.missions_posted == 0:
+            return 0.4  # Nouveau client
         
-        if hash_val > 80:
+        completion_rate = history.completion_rate
+        if completion_rate >= 0.8 and history.missions_posted >= 3:
             return 0.9  # Excellent client
-        elif hash_val > 60:
+        elif completion_rate >= 0.6:
             return 0.7  # Bon client
-        elif hash_val > 40:
+        elif completion_rate >= 0.4:
             return 0.6  # Client moyen
         else:
-            return 0.4  # Nouveau client
+            return 0.4  # Client peu fiable
+
+    def mentions_timing(self, text: str) -> bool:
+        """Le texte contient-il un mot d'urgence ou de souplesse ?
+
+        Seuls ces mots de la description interviennent dans le LOC : un
+        complément qui n'en contient aucun ne le modifie pas par ce biais.
+        """
+        text = text.lower()
+        return bool(self._urgent_pattern.search(text) or self._flexible_pattern.search(text))
 
     def _assess_urgency(self, description: str) -> float:
         """Évalue l'urgence du projet"""
-        urgent_keywords = ['urgent', 'rapide', 'vite', 'asap', 'immédiat', 'pressé']
-        flexible_keywords = ['flexible', 'pas pressé', 'quand possible']
-        
         desc_lower = description.lower()
         
-        if any(keyword in desc_lower for keyword in urgent_keywords):
+        if any(keyword in desc_lower for keyword in self.urgent_keywords):
             return 0.8  # Projet urgent = plus attractif
-        elif any(keyword in desc_lower for keyword in flexible_keywords):
+        elif any(keyword in desc_lower for keyword in self.flexible_keywords):
             return 0.6  # Projet flexible = moyennement attractif
         else:
             return 0.7  # Neutre
@@ -331,6 +366,427 @@ class LOCUpliftCalculator:
         else:
             return self.improvement_coefficients['budget_increase']['low']
 
+    def _calculate_delay_uplift(self, current_delay: float, recommended_delay: float) -> float:
+        """Calcule l'amélioration LOC selon l'extension du délai"""
+        if recommended_delay <= current_delay:
+            return 0.0
+        if current_delay <= 0:
+            return self.improvement_coefficients['delay_extension']['high']
+
+        extension_ratio = (recommended_delay - current_delay) / current_delay
+
+        if extension_ratio >= 0.5:
+            return self.improvement_coefficients['delay_extension']['high']
+        elif extension_ratio >= 0.2:
+            return self.improvement_coefficients['delay_extension']['medium']
+        else:
+            return self.improvement_coefficients['delay_extension']['low']
+
+    def evaluate_what_if(self,
+                         project_data: Dict,
+                         standardization_data: Dict,
+                         market_context: Dict,
+                         budgets: Optional[List[float]] = None,
+                         delays: Optional[List[float]] = None) -> Dict:
+        """Évalue le LOC sur une grille (budget, délai) en une passe numpy.
+
+        Seules la compétitivité prix et le réalisme budget dépendent du budget ;
+        les cinq autres composantes sont calculées une fois. Le délai agit via
+        le même barème d'uplift que les recommandations. Retourne la grille et
+        la frontière de Pareto (surcoût, délai supplémentaire) -> gain de LOC.
+        """
+        current_budget = float(project_data.get('budget', 0))
+        current_delay = float(standardization_data.get('delay_suggested_days', 21))
+        reference_budget = current_budget or float(standardization_data.get('price_suggested_med', 0))
+
+        if budgets is None:
+            budgets = reference_budget * np.linspace(1.0, 2.0, 21) if reference_budget > 0 else [0.0]
+        if delays is None:
+            delays = current_delay + np.arange(0, max(1, int(current_delay)) + 1)
+
+        budget_axis = np.unique(np.append(np.asarray(budgets, dtype=float), current_budget))
+        delay_axis = np.unique(np.append(np.asarray(delays, dtype=float), current_delay))
+
+        # Composantes indépendantes du budget (scalaires)
+        fixed_part = self._fixed_loc_part(project_data, standardization_data, market_context)
+
+        # Composantes dépendantes du budget (vecteurs)
+        budget_part = (
+            self._price_competitiveness_vector(budget_axis, market_context.get('price_suggested_med', np.nan)) *
+            self.base_factors['price_competitiveness'] +
+            self._budget_realism_vector(
+                budget_axis,
+                standardization_data.get('price_suggested_min', 0),
+                standardization_data.get('price_suggested_max', 0)
+            ) * self.base_factors['budget_realism']
+        )
+        loc_by_budget = self._round_loc(np.clip(fixed_part + budget_part, 0.15, 0.95))
+        delay_uplift = self._delay_uplift_vector(current_delay, delay_axis)
+
+        loc_grid = np.minimum(0.95, loc_by_budget[:, None] + delay_uplift[None, :])
+
+        current_i = int(np.searchsorted(budget_axis, current_budget))
+        current_j = int(np.searchsorted(delay_axis, current_delay))
+        current_loc = float(loc_grid[current_i, current_j])
+        gain = loc_grid - current_loc
+
+        # Frontière de Pareto : un point est dominé si un point moins cher et
+        # moins long (au sens large) atteint au moins le même LOC
+        prefix_max = np.maximum.accumulate(np.maximum.accumulate(loc_grid, axis=0), axis=1)
+        dominated_by = np.full(loc_grid.shape, -np.inf)
+        dominated_by[1:, :] = prefix_max[:-1, :]
+        dominated_by[:, 1:] = np.maximum(dominated_by[:, 1:], prefix_max[:, :-1])
+        on_frontier = (loc_grid > dominated_by) & (gain > 1e-9)
+        on_frontier[:current_i, :] = False
+        on_frontier[:, :current_j] = False
+
+        frontier = [
+            {
+                'budget': float(budget_axis[i]),
+                'delay_days': int(delay_axis[j]),
+                'extra_cost': float(budget_axis[i] - current_budget),
+                'extra_delay_days': int(delay_axis[j] - current_delay),
+                'loc': round(float(loc_grid[i, j]), 3),
+                'loc_gain': round(float(gain[i, j]), 3)
+            }
+            for i, j in zip(*np.nonzero(on_frontier))
+        ]
+        frontier.sort(key=lambda point: (point['extra_cost'], point['extra_delay_days']))
+
+        return {
+            'current_loc': current_loc,
+            'current_budget': current_budget,
+            'current_delay': int(current_delay),
+            'budgets': budget_axis.tolist(),
+            'delays': delay_axis.astype(int).tolist(),
+            'loc_grid': np.round(loc_grid, 3).tolist(),
+            'pareto_frontier': frontier
+        }
+
+    def _fixed_loc_part(self, project_data: Dict, standardization_data: Dict, market_context: Dict) -> float:
+        """Somme pondérée des composantes LOC qui ne dépendent pas du budget"""
+        return (
+            standardization_data.get('brief_quality_score', 0.5) * self.base_factors['brief_quality'] +
+            self._context_loc_part(project_data, market_context)
+        )
+
+    def _context_loc_part(self, project_data: Dict, market_context: Dict) -> float:
+        """Composantes indépendantes du budget et de la qualité du brief"""
+        return (
+            self._assess_category_demand(project_data.get('category', '')) * self.base_factors['category_demand'] +
+            self._assess_client_history(project_data.get('client_id')) * self.base_factors['client_history'] +
+            market_context.get('heat_score', 0.5) * self.base_factors['market_conditions'] +
+            self._assess_urgency(project_data.get('description', '')) * self.base_factors['urgency']
+        )
+
+    def _price_competitiveness_vector(self, budgets: np.ndarray, suggested_med) -> np.ndarray:
+        """Version vectorisée de _assess_price_competitiveness (prix médian scalaire ou par ligne, NaN si absent)"""
+        budgets = np.asarray(budgets, dtype=float)
+        # Sans référence marché le budget est comparé à lui-même (ratio 1)
+        suggested_med = np.where(np.isnan(suggested_med), budgets, suggested_med)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = budgets / suggested_med
+        competitiveness = np.select(
+            [ratio >= 1.2, ratio >= 1.0, ratio >= 0.8],
+            [0.9, 0.7, 0.5],
+            default=0.3
+        )
+        return np.select([budgets == 0, suggested_med > 0], [0.4, competitiveness], default=0.6)
+
+    def _budget_realism_vector(self, budgets: np.ndarray, suggested_min, suggested_max) -> np.ndarray:
+        """Version vectorisée de _assess_budget_realism (fourchette scalaire ou par ligne)"""
+        budgets = np.asarray(budgets, dtype=float)
+        realism = np.select(
+            [(budgets >= suggested_min) & (budgets <= suggested_max), budgets >= np.multiply(suggested_min, 0.8)],
+            [0.9, 0.7],
+            default=0.3
+        )
+        return np.where((budgets == 0) | np.equal(suggested_min, 0), 0.4, realism)
+
+    def _delay_uplift_vector(self, current_delay: float, delays: np.ndarray) -> np.ndarray:
+        """Version vectorisée de _calculate_delay_uplift"""
+        coefficients = self.improvement_coefficients['delay_extension']
+        if current_delay <= 0:
+            return np.where(delays > current_delay, coefficients['high'], 0.0)
+
+        extension_ratio = (delays - current_delay) / current_delay
+        return np.select(
+            [extension_ratio >= 0.5, extension_ratio >= 0.2, extension_ratio > 0],
+            [coefficients['high'], coefficients['medium'], coefficients['low']],
+            default=0.0
+        )
+
+    def solve_target_loc(self,
+                         project_data: Dict,
+                         standardization_data: Dict,
+                         market_context: Dict,
+                         target_loc: float) -> Dict:
+        """Trouve l'augmentation de budget et/ou l'extension de délai minimale pour atteindre target_loc.
+
+        LOC(budget) et l'uplift délai sont des fonctions en escalier : le minimum
+        est forcément atteint sur un point de rupture (seuils de ratio prix,
+        bornes min/max suggérées, paliers d'extension). Seuls ces points sont
+        évalués, en une grille numpy. Les composantes prix aux points de
+        rupture sont mises en cache par fourchette de prix suggérés ; les
+        autres composantes, exactes, sont ajoutées à chaque appel dans l'ordre
+        de _calculate_base_loc.
+        """
+        start = time.perf_counter()
+        current_budget = float(project_data.get('budget', 0))
+        current_delay = int(standardization_data.get('delay_suggested_days', 21))
+        current_loc = self._calculate_base_loc(project_data, standardization_data, market_context)
+
+        # Axe budget : budget actuel puis points de rupture au-delà
+        budgets, budget_locs = [current_budget], [current_loc]
+        breakpoints, price_part, realism_part = self._budget_curve(
+            *self._budget_curve_key(standardization_data, market_context)
+        )
+        above = breakpoints > current_budget
+        if above.any():
+            budgets.extend(breakpoints[above].tolist())
+            budget_locs.extend(self._loc_at_breakpoints(
+                project_data, standardization_data, market_context, price_part[above], realism_part[above]
+            ).tolist())
+
+        # Axe délai : délai actuel puis paliers low / medium / high
+        delays = sorted({current_delay, current_delay + 1,
+                         math.ceil(current_delay * 1.2), math.ceil(current_delay * 1.5)})
+        delay_axis = np.array(delays, dtype=float)
+        delay_uplift = self._delay_uplift_vector(float(current_delay), delay_axis)
+
+        loc_grid = np.minimum(0.95, np.array(budget_locs)[:, None] + delay_uplift[None, :])
+        feasible = loc_grid >= target_loc - 1e-9
+
+        def budget_option(i, j):
+            return {
+                'budget': budgets[i],
+                'increase_amount': round(budgets[i] - current_budget, 2),
+                'delay_days': delays[j],
+                'extension_days': delays[j] - current_delay,
+                'loc': round(float(loc_grid[i, j]), 3)
+            }
+
+        budget_only = np.flatnonzero(feasible[:, 0])
+        delay_only = np.flatnonzero(feasible[0, :])
+
+        # Combinaisons : budget minimal pour chaque délai, sans les points dominés
+        combined = []
+        best_i = len(budgets)
+        for j in range(len(delays)):
+            column = np.flatnonzero(feasible[:, j])
+            if column.size and column[0] < best_i:
+                best_i = int(column[0])
+                combined.append(budget_option(best_i, j))
+
+        return {
+            'target_loc': target_loc,
+            'current_loc': current_loc,
+            'already_met': bool(feasible[0, 0]),
+            'reachable': bool(feasible.any()),
+            'budget_only': budget_option(int(budget_only[0]), 0) if budget_only.size else None,
+            'delay_only': budget_option(0, int(delay_only[0])) if delay_only.size else None,
+            'combined': combined,
+            'solve_ms': round((time.perf_counter() - start) * 1000, 3)
+        }
+
+    def solve_target_loc_batch(self, missions: List[Tuple[Dict, Dict, Dict]], target_loc: float) -> Dict:
+        """Résout la cible LOC pour un lot de missions (project_data, standardization_data, market_context)"""
+        cache_before = self._budget_curve.cache_info()
+        start = time.perf_counter()
+        results = [self.solve_target_loc(*mission, target_loc) for mission in missions]
+        total_ms = (time.perf_counter() - start) * 1000
+
+        solve_times = np.array([result['solve_ms'] for result in results]) if results else np.zeros(1)
+        cache_after = self._budget_curve.cache_info()
+
+        return {
+            'results': results,
+            'stats': {
+                'missions': len(results),
+                'reachable': sum(result['reachable'] for result in results),
+                'total_ms': round(total_ms, 3),
+                'mean_ms': round(float(solve_times.mean()), 4),
+                'p95_ms': round(float(np.percentile(solve_times, 95)), 4),
+                'cache_hits': cache_after.hits - cache_before.hits,
+                'cache_misses': cache_after.misses - cache_before.misses
+            }
+        }
+
+    def _budget_curve_key(self, standardization_data: Dict, market_context: Dict) -> Tuple:
+        """Clé de cache : prix médian marché (None si absent) et fourchette suggérée"""
+        suggested_med = market_context.get('price_suggested_med')
+        return (
+            None if suggested_med is None else float(suggested_med),
+            float(standardization_data.get('price_suggested_min', 0)),
+            float(standardization_data.get('price_suggested_max', 0))
+        )
+
+    def _compute_budget_curve(self, suggested_med: Optional[float], suggested_min: float,
+                              suggested_max: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Budgets où une composante prix augmente, avec les composantes pondérées
+        compétitivité prix et réalisme budget en ces points.
+
+        Au-delà du maximum suggéré le réalisme baisse : ce n'est jamais le
+        budget minimal d'une cible, ce point n'est pas retenu.
+        """
+        breakpoints = []
+        if suggested_med is not None and suggested_med > 0:
+            breakpoints.extend(self._ratio_threshold_budget(threshold, suggested_med) for threshold in (0.8, 1.0, 1.2))
+        if suggested_min > 0:
+            breakpoints.extend([suggested_min * 0.8, suggested_min])
+        breakpoints = np.unique(np.array(breakpoints, dtype=float))
+
+        price_part = self._price_competitiveness_vector(
+            breakpoints, np.nan if suggested_med is None else suggested_med
+        ) * self.base_factors['price_competitiveness']
+        realism_part = self._budget_realism_vector(
+            breakpoints, suggested_min, suggested_max
+        ) * self.base_factors['budget_realism']
+        for array in (breakpoints, price_part, realism_part):
+            array.setflags(write=False)
+        return breakpoints, price_part, realism_part
+
+    @staticmethod
+    def _ratio_threshold_budget(threshold: float, suggested_med: float) -> float:
+        """Plus petit budget dont le ratio au prix médian atteint le seuil (en flottants)"""
+        budget = threshold * suggested_med
+        while budget / suggested_med < threshold:
+            budget = math.nextafter(budget, math.inf)
+        while math.nextafter(budget, -math.inf) / suggested_med >= threshold:
+            budget = math.nextafter(budget, -math.inf)
+        return budget
+
+    def _loc_at_breakpoints(self, project_data: Dict, standardization_data: Dict, market_context: Dict,
+                            price_part: np.ndarray, realism_part: np.ndarray) -> np.ndarray:
+        """LOC de base aux points de rupture, sommé dans l'ordre de _calculate_base_loc"""
+        loc = (
+            standardization_data.get('brief_quality_score', 0.5) * self.base_factors['brief_quality'] +
+            price_part +
+            self._assess_category_demand(project_data.get('category', '')) * self.base_factors['category_demand'] +
+            self._assess_client_history(project_data.get('client_id')) * self.base_factors['client_history'] +
+            market_context.get('heat_score', 0.5) * self.base_factors['market_conditions'] +
+            self._assess_urgency(project_data.get('description', '')) * self.base_factors['urgency'] +
+            realism_part
+        )
+        return self._round_loc(np.clip(loc, 0.15, 0.95))
+
+    def score_batch(self, columns: Dict[str, Sequence], top_actions: int = 2) -> Dict[str, np.ndarray]:
+        """Calcule le LOC et les meilleurs leviers d'uplift pour un lot de missions en colonnes.
+
+        Colonnes : budget, category, description, client_id, brief_quality_score,
+        price_suggested_min/med/max, heat_score, missing_info_count. Les colonnes
+        absentes prennent les défauts du calcul unitaire ; price_suggested_med
+        sert à la fois de référence marché et de prix standardisé (NaN : absent).
+        Prix, réalisme, leviers et classement sont vectorisés. Catégorie et
+        client sont évalués une fois par valeur distincte, l'urgence et
+        l'arrondi final restent des boucles Python par ligne (regex et round()
+        du calcul unitaire). Les sept composantes forment une matrice (n, 7)
+        pondérée colonne par colonne dans l'ordre de base_factors
+        (_weighted_sum), pas par un produit BLAS : les résultats sont
+        identiques à calculate_loc_with_uplift ligne par ligne. top_actions
+        contient les indices dans UPLIFT_ACTIONS (-1 si aucun levier).
+        """
+        n = len(columns['budget'])
+
+        def numeric(name: str, default: float) -> np.ndarray:
+            values = columns.get(name)
+            return np.full(n, default) if values is None else np.asarray(values, dtype=float)
+
+        def text(name: str) -> Sequence:
+            values = columns.get(name)
+            return [None] * n if values is None else values
+
+        budget = numeric('budget', 0.0)
+        quality = numeric('brief_quality_score', 0.5)
+        suggested_min = numeric('price_suggested_min', 0.0)
+        suggested_med = numeric('price_suggested_med', np.nan)
+        suggested_max = numeric('price_suggested_max', 0.0)
+        missing_count = numeric('missing_info_count', 0.0)
+        descriptions = [description or '' for description in text('description')]
+        lowered = [description.lower() for description in descriptions]
+
+        components = np.column_stack([
+            quality,
+            self._price_competitiveness_vector(budget, suggested_med),
+            self._map_distinct([category or '' for category in text('category')], self._assess_category_demand),
+            self._map_distinct(text('client_id'), self._assess_client_history),
+            numeric('heat_score', 0.5),
+            self._urgency_vector(lowered),
+            self._budget_realism_vector(budget, suggested_min, suggested_max)
+        ])
+        weights = np.fromiter(self.base_factors.values(), dtype=float, count=len(self.base_factors))
+        loc = self._round_loc(np.clip(self._weighted_sum(components, weights), 0.15, 0.95))
+
+        # Gains des trois leviers, nuls quand le levier ne s'applique pas
+        coefficients = self.improvement_coefficients
+        standard_med = np.nan_to_num(suggested_med, nan=0.0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            increase_ratio = (standard_med - budget) / budget
+        budget_gain = np.select(
+            [budget == 0, increase_ratio >= 0.5, increase_ratio >= 0.2],
+            [coefficients['budget_increase']['high'], coefficients['budget_increase']['high'],
+             coefficients['budget_increase']['medium']],
+            default=coefficients['budget_increase']['low']
+        )
+        delay_blocked = np.fromiter(
+            (('urgent' in description or 'vite' in description) for description in lowered), dtype=bool, count=n
+        )
+        gains = np.column_stack([
+            np.where((standard_med > 0) & (budget < standard_med), budget_gain, 0.0),
+            np.where(delay_blocked, 0.0, coefficients['delay_extension']['medium']),
+            np.where((quality < 0.8) | (missing_count > 0), coefficients['brief_enhancement']['details'], 0.0)
+        ])
+
+        order = np.argsort(-gains, axis=1, kind='stable')[:, :top_actions]
+        top_gains = np.take_along_axis(gains, order, axis=1)
+
+        return {
+            'loc': loc,
+            'potential_loc': np.minimum(0.95, loc + gains.sum(axis=1)),
+            'top_actions': np.where(top_gains > 0, order, -1),
+            'top_action_gains': top_gains,
+            'ranking': np.argsort(-loc, kind='stable')
+        }
+
+    @staticmethod
+    def _weighted_sum(components: np.ndarray, weights: np.ndarray) -> np.ndarray:
+        """Produit matrice-vecteur accumulé colonne par colonne dans l'ordre de base_factors.
+
+        components @ weights passe par BLAS, qui réordonne les additions : le
+        dernier bit diffère du sum() unitaire et l'arrondi à 3 décimales bascule.
+        """
+        total = np.zeros(components.shape[0])
+        for k in range(components.shape[1]):
+            total += components[:, k] * weights[k]
+        return total
+
+    @staticmethod
+    def _round_loc(values: np.ndarray) -> np.ndarray:
+        """Arrondi à 3 décimales identique à round() du calcul unitaire.
+
+        np.round multiplie par 1000 avant d'arrondir : 0.5595 (stocké
+        0.55949999…) devient 0.56 là où round() donne 0.559. Les composantes
+        étant des multiples de 0.005, ce cas touche plusieurs % des lignes.
+        """
+        return np.fromiter((round(value, 3) for value in values.tolist()), dtype=float, count=values.size)
+
+    def _map_distinct(self, values: Sequence, assess) -> np.ndarray:
+        """Applique une évaluation scalaire une seule fois par valeur distincte"""
+        scores = {}
+        return np.fromiter(
+            (scores[value] if value in scores else scores.setdefault(value, assess(value)) for value in values),
+            dtype=float, count=len(values)
+        )
+
+    def _urgency_vector(self, lowered_descriptions: Sequence[str]) -> np.ndarray:
+        """Version par lot de _assess_urgency (descriptions déjà en minuscules)"""
+        urgent, flexible = self._urgent_pattern.search, self._flexible_pattern.search
+        return np.fromiter(
+            (0.8 if urgent(text) else 0.6 if flexible(text) else 0.7 for text in lowered_descriptions),
+            dtype=float, count=len(lowered_descriptions)
+        )
+
     def _generate_text_recommendations(self, loc_base: float, uplift_reco: Dict, improvement_potential: float) -> List[str]:
         """Génère les recommandations textuelles"""
         recommendations = []
@@ -6,11 +6,13 @@ Analyse les tendances, prix et disponibilité par domaine
 
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 from dataclasses import dataclass
 import json
 import os
 from pathlib import Path
+from services.market_stats import MarketStatsEngine, market_stats_engine, summarize
+from services.market_store import MarketDataStore
 
 @dataclass
 class MarketData:
@@ -22,6 +24,25 @@ class MarketData:
     demand_score: float
     competition_level: str  # low, medium, high
 
+COMPLEXITY_MULTIPLIERS = {"low": 0.8, "medium": 1.0, "high": 1.3, "very_high": 1.6}
+PROVIDER_COMPLEXITY_FACTORS = {"low": 0.8, "medium": 0.6, "high": 0.3, "very_high": 0.15}
+CONFIDENCE_COMPLEXITY_ADJUSTMENTS = {"low": 0.05, "medium": 0.0, "high": -0.05, "very_high": -0.1}
+
+# Catégories de la taxonomie (category_std) -> clés des données de marché de référence
+MARKET_CATEGORY_MAPPING = {
+    "développement": "development",
+    "developpement": "development",
+    "web-development": "development",
+    "data-science": "development",
+    "mobile-development": "mobile",
+    "services": "services_personne"
+}
+
+def market_key(category: str) -> str:
+    """Clé des données de marché de référence pour une catégorie de la taxonomie"""
+    category = category.lower()
+    return MARKET_CATEGORY_MAPPING.get(category, category)
+
 @dataclass
 class MarketSuggestion:
     suggested_budget_min: float
@@ -32,9 +53,14 @@ class MarketSuggestion:
     pricing_confidence: float
 
 class MarketIntelligenceService:
-    def __init__(self):
-        self.data_path = Path("/app/data")
+    def __init__(self, data_path: str = "/app/data", stats_engine: Optional[MarketStatsEngine] = None,
+                 min_samples: int = 30):
+        self.data_path = Path(data_path)
         self.market_data = self._load_market_data()
+        self.stats_engine = stats_engine if stats_engine is not None else market_stats_engine
+        self.market_store = MarketDataStore(self.data_path / "market")
+        self.min_samples = min_samples
+        self._historical: Dict[str, Tuple[Optional[tuple], Optional[MarketData]]] = {}
         
     def _load_market_data(self) -> Dict[str, MarketData]:
         """Charge les données de marché enrichies"""
@@ -97,24 +123,74 @@ class MarketIntelligenceService:
             
         return market_data
     
+    def get_market(self, category: str) -> Optional[MarketData]:
+        """Données de marché : agrégats live, sinon historique Arrow, sinon données de référence (market_key)"""
+        summary = self.stats_engine.summary(category)
+        if summary is not None and summary['price_samples'] >= self.min_samples:
+            return self._market_from_summary(category, summary)
+        
+        historical = self._historical_market(category)
+        if historical is not None:
+            return historical
+        
+        return self.market_data.get(market_key(category))
+    
+    def _historical_market(self, category: str) -> Optional[MarketData]:
+        """Agrégats de l'historique partitionné, recalculés quand la partition change"""
+        version = self.market_store.partition_version(category)
+        if version is None:
+            return None
+        
+        cached_version, market = self._historical.get(category, (None, None))
+        if cached_version != version:
+            stats = self.market_store.category_stats(category)
+            summary = summarize(stats) if stats else None
+            market = None
+            if summary and summary['price_samples'] >= self.min_samples:
+                market = self._market_from_summary(category, summary)
+            self._historical[category] = (version, market)
+        return market
+    
+    def _market_from_summary(self, category: str, summary: Dict[str, float]) -> MarketData:
+        """Convertit des agrégats (live ou historiques) en MarketData"""
+        # Peu d'offres par mission = demande supérieure à l'offre
+        bids_per_mission = summary['bids_per_mission']
+        if bids_per_mission > 8:
+            competition_level = "high"
+        elif bids_per_mission > 3:
+            competition_level = "medium"
+        else:
+            competition_level = "low"
+        
+        # Délai et demande de référence tant que le journal n'en fournit pas
+        seed = self.market_data.get(market_key(category))
+        avg_timeline = seed.avg_timeline if seed else 14
+        if summary['avg_timeline']:
+            avg_timeline = int(round(summary['avg_timeline']))
+        demand_score = seed.demand_score if seed else 0.5
+        if summary['missions']:
+            demand_score = round(1 / (1 + bids_per_mission / 10), 3)
+        
+        return MarketData(
+            category=category,
+            avg_price=round(summary['avg_price'], 2),
+            price_range=(round(summary['price_p10'], 2), round(summary['price_p90'], 2)),
+            avg_timeline=avg_timeline,
+            provider_count=summary['providers'],
+            demand_score=demand_score,
+            competition_level=competition_level
+        )
+    
     def get_market_suggestions(self, category: str, description: str, 
                              complexity: str = "medium") -> MarketSuggestion:
         """Génère des suggestions de marché basées sur l'analyse IA"""
         
-        if category not in self.market_data:
+        market = self.get_market(category)
+        if market is None:
             return self._get_default_suggestion()
         
-        market = self.market_data[category]
-        
         # Ajustements basés sur la complexité
-        complexity_multipliers = {
-            "low": 0.8,
-            "medium": 1.0,
-            "high": 1.3,
-            "very_high": 1.6
-        }
-        
-        multiplier = complexity_multipliers.get(complexity, 1.0)
+        multiplier = COMPLEXITY_MULTIPLIERS.get(complexity, 1.0)
         
         # Calcul des suggestions
         base_min = market.price_range[0] * multiplier
@@ -152,19 +228,96 @@ class MarketIntelligenceService:
             pricing_confidence=confidence
         )
     
+    def get_market_suggestions_batch(self, categories: Sequence[str], complexities: Sequence[str],
+                                     urgent: Sequence[bool], premium: Sequence[bool]) -> Dict[str, any]:
+        """Version vectorisée de get_market_suggestions.
+        
+        Les données de marché sont résolues une fois par catégorie distincte et
+        les conseils une fois par couple (catégorie, complexité) ; budgets,
+        délais, prestataires et confiance sont calculés en colonnes numpy avec
+        les mêmes opérations, dans le même ordre, que le calcul unitaire.
+        Les drapeaux urgent / premium viennent de extract_market_flags.
+        """
+        n = len(categories)
+        distinct_categories, category_index = np.unique(np.asarray(categories, dtype=object), return_inverse=True)
+        markets = [self.get_market(category) for category in distinct_categories]
+        known = np.array([market is not None for market in markets])[category_index]
+        
+        def market_column(attribute, default):
+            values = [getattr(market, attribute) if market else default for market in markets]
+            return np.asarray(values, dtype=float)[category_index]
+        
+        price_min = np.array([market.price_range[0] if market else 0.0 for market in markets])[category_index]
+        price_max = np.array([market.price_range[1] if market else 0.0 for market in markets])[category_index]
+        avg_timeline = market_column('avg_timeline', 0)
+        provider_count = market_column('provider_count', 0)
+        demand_score = market_column('demand_score', 0)
+        competition = np.array([market.competition_level if market else '' for market in markets])[category_index]
+        
+        complexities = np.asarray(complexities, dtype=object)
+        multiplier = np.array([COMPLEXITY_MULTIPLIERS.get(c, 1.0) for c in complexities])
+        urgent = np.asarray(urgent, dtype=bool)
+        premium = np.asarray(premium, dtype=bool)
+        
+        # Budgets
+        base_min = price_min * multiplier
+        base_max = price_max * multiplier
+        base_min = np.where(urgent, base_min * 1.2, base_min)
+        base_max = np.where(urgent, base_max * 1.4, base_max)
+        base_min = np.where(premium, base_min * 1.3, base_min)
+        base_max = np.where(premium, base_max * 1.5, base_max)
+        
+        # Délais
+        timeline = np.maximum(1, np.trunc(avg_timeline * multiplier).astype(int))
+        timeline = np.where(urgent, np.maximum(1, timeline // 2), timeline)
+        
+        # Prestataires disponibles
+        factor = np.array([PROVIDER_COMPLEXITY_FACTORS.get(c, 0.6) for c in complexities])
+        providers = np.trunc(provider_count * factor)
+        providers = np.select(
+            [competition == "high", competition == "low"],
+            [np.trunc(providers * 1.2), np.trunc(providers * 0.7)],
+            default=providers
+        )
+        providers = np.maximum(5, providers).astype(int)
+        
+        # Confiance
+        confidence = np.full(n, 0.85)
+        confidence = np.where(provider_count > 500, confidence + 0.05, confidence)
+        confidence = np.where(demand_score > 0.9, confidence + 0.03, confidence)
+        confidence = confidence + np.array([CONFIDENCE_COMPLEXITY_ADJUSTMENTS.get(c, 0.0) for c in complexities])
+        confidence = np.minimum(0.95, np.maximum(0.60, confidence))
+        
+        # Conseils textuels, une fois par couple (catégorie, complexité)
+        advice_cache = {}
+        advice = []
+        for i in range(n):
+            key = (category_index[i], complexities[i])
+            if key not in advice_cache:
+                market = markets[category_index[i]]
+                advice_cache[key] = (
+                    self._generate_market_advice(market, complexities[i], multiplier[i]) if market
+                    else self._get_default_suggestion().market_advice
+                )
+            advice.append(advice_cache[key])
+        
+        # Catégories inconnues : suggestion par défaut
+        default = self._get_default_suggestion()
+        return {
+            'suggested_budget_min': np.where(known, np.round(base_min), default.suggested_budget_min),
+            'suggested_budget_max': np.where(known, np.round(base_max), default.suggested_budget_max),
+            'suggested_timeline': np.where(known, timeline, default.suggested_timeline),
+            'available_providers': np.where(known, providers, default.available_providers),
+            'pricing_confidence': np.where(known, confidence, default.pricing_confidence),
+            'market_advice': advice
+        }
+    
     def _estimate_available_providers(self, market: MarketData, complexity: str) -> int:
         """Estime le nombre de prestataires disponibles"""
         base_count = market.provider_count
         
         # Ajustement selon la complexité
-        complexity_factors = {
-            "low": 0.8,
-            "medium": 0.6,
-            "high": 0.3,
-            "very_high": 0.15
-        }
-        
-        factor = complexity_factors.get(complexity, 0.6)
+        factor = PROVIDER_COMPLEXITY_FACTORS.get(complexity, 0.6)
         estimated = int(base_count * factor)
         
         # Ajustement selon la concurrence
@@ -203,14 +356,7 @@ class MarketIntelligenceService:
             base_confidence += 0.03
         
         # Ajustement selon la complexité
-        complexity_adjustments = {
-            "low": 0.05,
-            "medium": 0.0,
-            "high": -0.05,
-            "very_high": -0.1
-        }
-        
-        base_confidence += complexity_adjustments.get(complexity, 0.0)
+        base_confidence += CONFIDENCE_COMPLEXITY_ADJUSTMENTS.get(complexity, 0.0)
         
         return min(0.95, max(0.60, base_confidence))
     
@@ -225,6 +371,15 @@ class MarketIntelligenceService:
             pricing_confidence=0.60
         )
 
+def extract_market_flags(descriptions: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Drapeaux urgent / premium extraits une seule fois par description"""
+    lowered = [description.lower() for description in descriptions]
+    urgent = np.fromiter(("urgent" in text for text in lowered), dtype=bool, count=len(lowered))
+    premium = np.fromiter(
+        ("premium" in text or "haut de gamme" in text for text in lowered), dtype=bool, count=len(lowered)
+    )
+    return urgent, premium
+
 # Service global
 market_service = MarketIntelligenceService()
 
@@ -242,3 +397,24 @@ def get_market_suggestions(category: str, description: str, complexity: str = "m
         "market_advice": suggestion.market_advice,
         "pricing_confidence": suggestion.pricing_confidence
     }
+
+def get_market_suggestions_batch(categories: Sequence[str], descriptions: Sequence[str],
+                                 complexities: Optional[Sequence[str]] = None) -> List[dict]:
+    """Interface lot pour l'API, même format que get_market_suggestions"""
+    urgent, premium = extract_market_flags(descriptions)
+    complexities = complexities if complexities is not None else ["medium"] * len(categories)
+    batch = market_service.get_market_suggestions_batch(categories, complexities, urgent, premium)
+    
+    return [
+        {
+            "suggested_budget": {
+                "min": float(batch['suggested_budget_min'][i]),
+                "max": float(batch['suggested_budget_max'][i])
+            },
+            "suggested_timeline_days": int(batch['suggested_timeline'][i]),
+            "estimated_providers": int(batch['available_providers'][i]),
+            "market_advice": batch['market_advice'][i],
+            "pricing_confidence": float(batch['pricing_confidence'][i])
+        }
+        for i in range(len(categories))
+    ]
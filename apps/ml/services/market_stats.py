@@ -0,0 +1,524 @@
+"""
+Statistiques de marché incrémentales
+Agrège en continu les événements missions / offres d'un journal en ajout seul :
+compteurs, moyennes glissantes, sketches de quantiles et cardinalité des
+prestataires, en mémoire bornée par catégorie
+"""
+
+import hashlib
+import json
+import logging
+import math
+import os
+import pickle
+import threading
+import time
+import zipfile
+from array import array
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+import numpy as np
+from services.data_reloader import read_appended_lines
+from services.near_duplicate import MinHashLSH
+
+logger = logging.getLogger(__name__)
+
+EVENTS_FILENAME = "market_events.jsonl"
+CHECKPOINT_FILENAME = "market_stats.ckpt"
+# Index de déduplication, hors du checkpoint : signatures en npz, relues sans pickle
+DEDUPE_FILENAME = "market_dedupe.npz"
+CHECKPOINT_VERSION = 2
+
+# Fenêtres glissantes : (durée d'un seau en secondes, nombre de seaux)
+WINDOWS = {
+    '24h': (3600, 24),
+    '7d': (6 * 3600, 28),
+    '30d': (86400, 30),
+}
+WINDOW_FIELDS = ('missions', 'bids', 'price_sum', 'price_count', 'budget_sum', 'budget_count')
+
+
+@dataclass
+class RunningStats:
+    """Moyenne et variance en une passe (Welford), fusionnables (Chan)"""
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+
+    def add_many(self, values: np.ndarray):
+        """Fusionne un bloc de valeurs (moyenne et M2 du bloc calculées en numpy)"""
+        if values.size == 0:
+            return
+        block = RunningStats(count=int(values.size), mean=float(values.mean()))
+        block.m2 = float(((values - block.mean) ** 2).sum())
+        self.merge(block)
+
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def merge(self, other: 'RunningStats'):
+        if other.count == 0:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+
+class QuantileSketch:
+    """Sketch de quantiles à erreur relative bornée (type DDSketch).
+
+    Les valeurs positives sont rangées dans des seaux logarithmiques de ratio
+    gamma = (1 + alpha) / (1 - alpha) : tout quantile est restitué à alpha près
+    en relatif. Au-delà de max_buckets, les seaux les plus bas sont fusionnés,
+    ce qui borne la mémoire sans dégrader les quantiles hauts.
+    """
+
+    def __init__(self, alpha: float = 0.01, max_buckets: int = 1024):
+        self.alpha = alpha
+        self.max_buckets = max_buckets
+        self._log_gamma = math.log((1 + alpha) / (1 - alpha))
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+
+    def add(self, value: float):
+        if value <= 0:
+            return
+        key = math.ceil(math.log(value) / self._log_gamma)
+        self.buckets[key] = self.buckets.get(key, 0) + 1
+        self.count += 1
+        if len(self.buckets) > self.max_buckets:
+            self._collapse()
+
+    def add_many(self, values: np.ndarray):
+        """Insertion vectorisée (chargement d'historique en colonnes)"""
+        values = values[values > 0]
+        if values.size == 0:
+            return
+        keys, counts = np.unique(np.ceil(np.log(values) / self._log_gamma).astype(np.int64), return_counts=True)
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        self.count += int(values.size)
+        while len(self.buckets) > self.max_buckets:
+            self._collapse()
+
+    def merge(self, other: 'QuantileSketch'):
+        for key, count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        self.count += other.count
+        while len(self.buckets) > self.max_buckets:
+            self._collapse()
+
+    def quantile(self, q: float) -> Optional[float]:
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen > rank:
+                # Milieu du seau en relatif : erreur <= alpha
+                return 2 * math.exp(key * self._log_gamma) / (1 + math.exp(self._log_gamma))
+        return None
+
+    def _collapse(self):
+        lowest, second = sorted(self.buckets)[:2]
+        self.buckets[second] += self.buckets.pop(lowest)
+
+
+class HyperLogLog:
+    """Estimation du nombre de prestataires distincts en 2^precision octets"""
+
+    def __init__(self, precision: int = 10):
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add_many(self, items: Iterable[str]):
+        for item in items:
+            self.add(item)
+
+    def add(self, item: str):
+        hashed = int.from_bytes(hashlib.blake2b(item.encode('utf-8'), digest_size=8).digest(), 'big')
+        index = hashed >> (64 - self.precision)
+        remaining = hashed & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - remaining.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: 'HyperLogLog'):
+        self.registers = bytearray(max(a, b) for a, b in zip(self.registers, other.registers))
+
+    def estimate(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / sum(2.0 ** -register for register in self.registers)
+        zeros = self.registers.count(0)
+        if raw <= 2.5 * m and zeros:
+            # Correction petites cardinalités (linear counting)
+            return int(round(m * math.log(m / zeros)))
+        return int(round(raw))
+
+
+class RingWindow:
+    """Agrégats d'une fenêtre glissante en seaux de taille fixe (tampon circulaire).
+
+    Les totaux de la fenêtre sont maintenus à l'ajout et à l'expiration d'un
+    seau : une lecture coûte au plus n_buckets remises à zéro, jamais un
+    parcours des événements.
+    """
+
+    def __init__(self, bucket_seconds: int, n_buckets: int):
+        self.bucket_seconds = bucket_seconds
+        self.n_buckets = n_buckets
+        self.epochs = array('q', [-1] * n_buckets)
+        self.values = array('d', [0.0] * (n_buckets * len(WINDOW_FIELDS)))
+        self.totals = [0.0] * len(WINDOW_FIELDS)
+        self.head = -1
+
+    @property
+    def seconds(self) -> int:
+        return self.bucket_seconds * self.n_buckets
+
+    def add(self, timestamp: float, values: Tuple[float, ...]):
+        index = int(timestamp // self.bucket_seconds)
+        self.advance(index)
+        if index <= self.head - self.n_buckets:
+            return  # Plus ancien que la fenêtre
+
+        slot = index % self.n_buckets
+        self.epochs[slot] = index
+        base = slot * len(WINDOW_FIELDS)
+        for offset, value in enumerate(values):
+            self.values[base + offset] += value
+            self.totals[offset] += value
+
+    def advance(self, index: int):
+        """Fait glisser la fenêtre jusqu'au seau `index` en expirant les seaux sortants"""
+        if index <= self.head:
+            return
+        for expired in range(max(self.head + 1, index - self.n_buckets + 1), index + 1):
+            slot = expired % self.n_buckets
+            if self.epochs[slot] >= 0:
+                base = slot * len(WINDOW_FIELDS)
+                for offset in range(len(WINDOW_FIELDS)):
+                    self.totals[offset] -= self.values[base + offset]
+                    self.values[base + offset] = 0.0
+                self.epochs[slot] = -1
+        self.head = index
+
+    def read(self, now: float) -> Dict[str, float]:
+        self.advance(int(now // self.bucket_seconds))
+        return dict(zip(WINDOW_FIELDS, self.totals))
+
+
+@dataclass
+class CategoryStats:
+    """Agrégats d'une catégorie : taille constante quel que soit l'historique"""
+    missions: int = 0
+    bids: int = 0
+    budget: RunningStats = field(default_factory=RunningStats)
+    price: RunningStats = field(default_factory=RunningStats)
+    timeline: RunningStats = field(default_factory=RunningStats)
+    price_sketch: QuantileSketch = field(default_factory=QuantileSketch)
+    timeline_sketch: QuantileSketch = field(default_factory=QuantileSketch)
+    providers: HyperLogLog = field(default_factory=HyperLogLog)
+
+    def merge(self, other: 'CategoryStats'):
+        self.missions += other.missions
+        self.bids += other.bids
+        for name in ('budget', 'price', 'timeline', 'price_sketch', 'timeline_sketch', 'providers'):
+            getattr(self, name).merge(getattr(other, name))
+
+    @property
+    def bids_per_mission(self) -> float:
+        return self.bids / self.missions if self.missions else 0.0
+
+
+def summarize(stats: CategoryStats) -> Dict[str, float]:
+    """Indicateurs dérivés d'une catégorie (moyennes, quantiles, prestataires)"""
+    return {
+        'missions': stats.missions,
+        'bids': stats.bids,
+        'bids_per_mission': stats.bids_per_mission,
+        'avg_budget': stats.budget.mean,
+        'price_samples': stats.price.count,
+        'avg_price': stats.price.mean,
+        'price_std': stats.price.std,
+        'price_p10': stats.price_sketch.quantile(0.1),
+        'price_p50': stats.price_sketch.quantile(0.5),
+        'price_p90': stats.price_sketch.quantile(0.9),
+        'avg_timeline': stats.timeline.mean,
+        'timeline_p50': stats.timeline_sketch.quantile(0.5),
+        'timeline_p90': stats.timeline_sketch.quantile(0.9),
+        'providers': stats.providers.estimate()
+    }
+
+
+class MarketStatsEngine:
+    """Ingestion incrémentale de market_events.jsonl.
+
+    Événements (une ligne JSON) :
+      {"type": "mission", "category": ..., "budget": ..., "timeline_days": ..., "description": ...}
+      {"type": "bid", "category": ..., "provider_id": ..., "price": ..., "timeline_days": ...}
+    Le journal est lu depuis le dernier offset ; les lectures ne parcourent
+    jamais l'historique. Une mission dont la description est un quasi-doublon
+    d'une des `dedupe_capacity` dernières missions (republication avec
+    retouches) n'est pas comptée.
+    """
+
+    def __init__(self, data_path: str = "/infra/data", checkpoint_interval: float = 300.0,
+                 min_heat_missions: int = 10, dedupe_threshold: float = 0.85, dedupe_capacity: int = 100000):
+        self.data_path = Path(data_path)
+        self.events_file = self.data_path / EVENTS_FILENAME
+        self.checkpoint_file = self.data_path / CHECKPOINT_FILENAME
+        self.dedupe_file = self.data_path / DEDUPE_FILENAME
+        self.checkpoint_interval = checkpoint_interval
+        self.min_heat_missions = min_heat_missions
+        self.events_applied = 0
+        self.duplicates_skipped = 0
+        self.duplicates = MinHashLSH(threshold=dedupe_threshold, capacity=dedupe_capacity) \
+            if dedupe_capacity else None
+        self._stats: Dict[str, CategoryStats] = {}
+        self._windows: Dict[str, Dict[str, RingWindow]] = {}
+        self._summaries: Dict[str, Dict[str, float]] = {}
+        self._events_offset = 0
+        self._last_checkpoint = time.time()
+        self._lock = threading.Lock()
+        self.restore()
+        self.apply_events()
+
+    def ingest(self, event: Dict) -> bool:
+        """Intègre un événement, retourne False s'il est ignoré"""
+        category = event.get('category')
+        event_type = event.get('type')
+        if not category or event_type not in ('mission', 'bid'):
+            return False
+
+        if event_type == 'mission' and self._is_duplicate(event):
+            self.duplicates_skipped += 1
+            return False
+
+        budget = float(event.get('budget') or 0)
+        price = float(event.get('price') or 0)
+
+        with self._lock:
+            stats = self._stats.get(category)
+            if stats is None:
+                stats = self._stats[category] = CategoryStats()
+                self._windows[category] = {
+                    name: RingWindow(bucket_seconds, n_buckets) for name, (bucket_seconds, n_buckets) in WINDOWS.items()
+                }
+
+            if event_type == 'mission':
+                stats.missions += 1
+                if budget:
+                    stats.budget.add(budget)
+                window_values = (1, 0, 0.0, 0, budget, 1 if budget else 0)
+            else:
+                stats.bids += 1
+                if price:
+                    stats.price.add(price)
+                    stats.price_sketch.add(price)
+                if event.get('timeline_days'):
+                    stats.timeline.add(float(event['timeline_days']))
+                    stats.timeline_sketch.add(float(event['timeline_days']))
+                if event.get('provider_id'):
+                    stats.providers.add(str(event['provider_id']))
+                window_values = (0, 1, price, 1 if price else 0, 0.0, 0)
+
+            timestamp = float(event.get('ts') or time.time())
+            for window in self._windows[category].values():
+                window.add(timestamp, window_values)
+
+            self._summaries.pop(category, None)
+            self.events_applied += 1
+            return True
+
+    def _is_duplicate(self, event: Dict) -> bool:
+        description = event.get('description')
+        if self.duplicates is None or not description:
+            return False
+        text = f"{event.get('title') or ''} {description}"
+        key = str(event.get('mission_id') or f"{self.events_applied}:{self.duplicates.inserts}")
+        return bool(self.duplicates.insert(key, text))
+
+    def apply_events(self) -> bool:
+        """Intègre les événements ajoutés au journal depuis le dernier appel"""
+        lines, offset = read_appended_lines(self.events_file, self._events_offset)
+        if lines is None:
+            logger.warning("Journal marché tronqué, réingestion complète")
+            with self._lock:
+                self._stats = {}
+                self._windows = {}
+                self._summaries = {}
+                self.events_applied = 0
+                self.duplicates_skipped = 0
+            if self.duplicates is not None:
+                self.duplicates.clear()
+            lines, offset = read_appended_lines(self.events_file, 0)
+
+        for line in lines or []:
+            try:
+                self.ingest(json.loads(line))
+            except (ValueError, TypeError, AttributeError):
+                continue
+        self._events_offset = offset
+
+        if lines and time.time() - self._last_checkpoint >= self.checkpoint_interval:
+            self.checkpoint()
+        return True
+
+    def window_stats(self, category: str, window: str, now: Optional[float] = None) -> Optional[Dict[str, float]]:
+        """Demande et niveau de prix d'une catégorie sur une fenêtre ('24h', '7d', '30d')"""
+        with self._lock:
+            windows = self._windows.get(category)
+            if windows is None:
+                return None
+            ring = windows[window]
+            totals = ring.read(now if now is not None else time.time())
+
+        return {
+            'missions': int(totals['missions']),
+            'bids': int(totals['bids']),
+            'missions_per_day': totals['missions'] * 86400 / ring.seconds,
+            'avg_price': totals['price_sum'] / totals['price_count'] if totals['price_count'] else None,
+            'avg_budget': totals['budget_sum'] / totals['budget_count'] if totals['budget_count'] else None
+        }
+
+    def heat(self, category: str, now: Optional[float] = None) -> Tuple[float, float]:
+        """Tension du marché : (market_heat pour les prix, heat_score 0-1 pour le LOC).
+
+        Compare le rythme de publication des dernières 24h à la moyenne
+        journalière sur 30 jours ; neutre (1.0, 0.5) sans historique suffisant.
+        """
+        recent = self.window_stats(category, '24h', now)
+        baseline = self.window_stats(category, '30d', now)
+        if recent is None or baseline['missions'] < self.min_heat_missions:
+            return 1.0, 0.5
+
+        ratio = recent['missions_per_day'] / baseline['missions_per_day']
+        market_heat = min(1.2, max(0.85, 1 + 0.1 * (ratio - 1)))
+        return round(market_heat, 3), round(ratio / (1 + ratio), 3)
+
+    def checkpoint(self) -> bool:
+        """Sauvegarde atomique des agrégats, fenêtres et offset du journal.
+
+        L'index de déduplication (jusqu'à dedupe_capacity signatures) est
+        écrit à part, en npz, avec l'offset du journal qu'il couvre.
+        """
+        try:
+            log_inode = self.events_file.stat().st_ino
+        except OSError:
+            log_inode = None
+
+        with self._lock:
+            events_offset = self._events_offset
+            state = pickle.dumps({
+                'version': CHECKPOINT_VERSION,
+                'log_inode': log_inode,
+                'events_offset': events_offset,
+                'events_applied': self.events_applied,
+                'stats': self._stats,
+                'windows': self._windows,
+                'duplicates_skipped': self.duplicates_skipped
+            }, protocol=pickle.HIGHEST_PROTOCOL)
+
+        if self.duplicates is not None:
+            dedupe_tmp = self.dedupe_file.with_name(f".{self.dedupe_file.name}.{os.getpid()}.tmp")
+            try:
+                with open(dedupe_tmp, 'wb') as f:
+                    self.duplicates.save(f, events_offset=events_offset, log_inode=log_inode or 0)
+                os.replace(dedupe_tmp, self.dedupe_file)
+            except OSError as e:
+                logger.warning(f"Sauvegarde de l'index de déduplication impossible: {e}")
+                dedupe_tmp.unlink(missing_ok=True)
+
+        tmp_path = self.checkpoint_file.with_name(f".{self.checkpoint_file.name}.{os.getpid()}.tmp")
+        try:
+            tmp_path.write_bytes(state)
+            os.replace(tmp_path, self.checkpoint_file)
+        except OSError as e:
+            logger.warning(f"Checkpoint marché impossible: {e}")
+            tmp_path.unlink(missing_ok=True)
+            return False
+
+        self._last_checkpoint = time.time()
+        return True
+
+    def restore(self) -> bool:
+        """Recharge le dernier checkpoint s'il correspond encore au journal"""
+        try:
+            state = pickle.loads(self.checkpoint_file.read_bytes())
+            stat = self.events_file.stat()
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            return False
+
+        if (state.get('version') != CHECKPOINT_VERSION or state['log_inode'] != stat.st_ino
+                or state['events_offset'] > stat.st_size):
+            logger.info("Checkpoint marché obsolète, réingestion du journal")
+            return False
+
+        with self._lock:
+            self._stats = state['stats']
+            self._windows = state['windows']
+            self._summaries = {}
+            self._events_offset = state['events_offset']
+            self.events_applied = state['events_applied']
+            self.duplicates_skipped = state['duplicates_skipped']
+        if self.duplicates is not None:
+            self._restore_duplicates(state['events_offset'], stat.st_ino)
+        logger.info(f"Checkpoint marché restauré ({self.events_applied} événements)")
+        return True
+
+    def _restore_duplicates(self, events_offset: int, log_inode: int):
+        """Recharge l'index de déduplication s'il couvre le même offset du journal que le checkpoint"""
+        try:
+            metadata = self.duplicates.load(self.dedupe_file)
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile) as e:
+            logger.info(f"Index de déduplication non restauré: {e}")
+            metadata = None
+        if metadata != {'events_offset': events_offset, 'log_inode': log_inode}:
+            # Index absent ou d'un autre checkpoint : les prochaines missions repartent d'un index vide
+            self.duplicates.clear()
+
+    def summary(self, category: str) -> Optional[Dict[str, float]]:
+        """Indicateurs dérivés d'une catégorie, recalculés seulement après un nouvel événement"""
+        summary = self._summaries.get(category)
+        if summary is not None:
+            return summary
+
+        with self._lock:
+            stats = self._stats.get(category)
+            if stats is None:
+                return None
+            summary = summarize(stats)
+            self._summaries[category] = summary
+        return summary
+
+    def get_stats(self) -> Dict[str, any]:
+        with self._lock:
+            categories = {
+                category: {'missions': stats.missions, 'bids': stats.bids, 'providers': stats.providers.estimate()}
+                for category, stats in self._stats.items()
+            }
+        for category, stats in categories.items():
+            stats['missions_24h'] = self.window_stats(category, '24h')['missions']
+            stats['market_heat'], stats['heat_score'] = self.heat(category)
+        return {
+            'events_applied': self.events_applied,
+            'duplicates_skipped': self.duplicates_skipped,
+            'categories': categories
+        }
+
+
+# Instance globale
+market_stats_engine = MarketStatsEngine()
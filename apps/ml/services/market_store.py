@@ -0,0 +1,164 @@
+"""
+Historique marché en colonnes (Arrow IPC partitionné par catégorie)
+Les fichiers sont lus par memory mapping : seules les colonnes utiles sont
+décodées et seules les partitions des catégories demandées sont parcourues,
+par lots de taille bornée
+"""
+
+import argparse
+import logging
+import os
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+from urllib.parse import quote, unquote
+
+from services.market_stats import CategoryStats
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.fs as pafs
+    import pyarrow.json as pajson
+except ImportError:  # pyarrow est optionnel : sans lui le service garde ses données de référence
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+PARTITION_KEY = "category"
+SCAN_COLUMNS = ["type", "budget", "price", "timeline_days", "provider_id"]
+
+
+def market_schema() -> 'pa.Schema':
+    return pa.schema([
+        ("ts", pa.float64()),
+        ("type", pa.string()),
+        ("budget", pa.float64()),
+        ("price", pa.float64()),
+        ("timeline_days", pa.float64()),
+        ("provider_id", pa.string()),
+    ])
+
+
+class MarketDataStore:
+    """Partitions `category=<nom>/part-*.arrow` sous `root`"""
+
+    def __init__(self, root: Path, batch_size: int = 262144):
+        self.root = Path(root)
+        self.batch_size = batch_size
+
+    @property
+    def available(self) -> bool:
+        return pa is not None and self.root.exists()
+
+    def categories(self) -> List[str]:
+        if not self.available:
+            return []
+        prefix = f"{PARTITION_KEY}="
+        return sorted(unquote(path.name[len(prefix):]) for path in self.root.glob(f"{prefix}*") if path.is_dir())
+
+    def partition_version(self, category: str) -> Optional[Tuple[int, float]]:
+        """(nombre de fichiers, mtime max) d'une partition, pour invalider les caches"""
+        partition = self.root / f"{PARTITION_KEY}={quote(category, safe='')}"
+        try:
+            stats = [entry.stat() for entry in os.scandir(partition) if entry.name.endswith('.arrow')]
+        except OSError:
+            return None
+        return (len(stats), max(stat.st_mtime for stat in stats)) if stats else None
+
+    def append(self, table: 'pa.Table') -> int:
+        """Écrit une table (colonne category incluse) en un fichier par partition"""
+        if pa is None:
+            raise RuntimeError("pyarrow n'est pas installé")
+
+        table = table.combine_chunks()
+        written = 0
+        stamp = f"{time.time_ns()}-{os.getpid()}"
+        for category in pc.unique(table[PARTITION_KEY]).to_pylist():
+            if category is None:
+                continue
+            rows = table.filter(pc.equal(table[PARTITION_KEY], category))
+            rows = rows.select(market_schema().names).cast(market_schema())
+
+            partition = self.root / f"{PARTITION_KEY}={quote(category, safe='')}"
+            partition.mkdir(parents=True, exist_ok=True)
+            tmp_path = partition / f".part-{stamp}.tmp"
+            # IPC non compressé : les buffers restent directement mappables
+            with pa.OSFile(str(tmp_path), 'wb') as sink, pa.ipc.new_file(sink, rows.schema) as writer:
+                writer.write_table(rows, max_chunksize=self.batch_size)
+            os.replace(tmp_path, partition / f"part-{stamp}.arrow")
+            written += rows.num_rows
+
+        return written
+
+    def append_events_file(self, events_file: Path) -> int:
+        """Compacte un journal market_events.jsonl dans les partitions"""
+        table = pajson.read_json(str(events_file))
+        for name, field in zip(market_schema().names, market_schema()):
+            if name not in table.column_names:
+                table = table.append_column(name, pa.nulls(table.num_rows, field.type))
+        return self.append(table)
+
+    def category_stats(self, category: str, since: Optional[float] = None) -> Optional[CategoryStats]:
+        """Agrégats d'une catégorie calculés en flux sur ses seules partitions"""
+        if not self.available:
+            return None
+
+        dataset = ds.dataset(
+            str(self.root), format="ipc", partitioning="hive",
+            filesystem=pafs.LocalFileSystem(use_mmap=True)
+        )
+        predicate = ds.field(PARTITION_KEY) == category
+        if since is not None:
+            predicate = predicate & (ds.field("ts") >= since)
+
+        stats = CategoryStats()
+        scanner = dataset.scanner(columns=SCAN_COLUMNS, filter=predicate, batch_size=self.batch_size)
+        for batch in scanner.to_batches():
+            if batch.num_rows:
+                self._accumulate(stats, batch)
+        return stats if stats.missions or stats.bids else None
+
+    @staticmethod
+    def _accumulate(stats: CategoryStats, batch: 'pa.RecordBatch'):
+        event_type = batch.column("type")
+        is_mission = pc.fill_null(pc.equal(event_type, "mission"), False).to_numpy(zero_copy_only=False)
+        is_bid = pc.fill_null(pc.equal(event_type, "bid"), False).to_numpy(zero_copy_only=False)
+
+        budget = batch.column("budget").to_numpy(zero_copy_only=False)
+        price = batch.column("price").to_numpy(zero_copy_only=False)
+        timeline = batch.column("timeline_days").to_numpy(zero_copy_only=False)
+
+        stats.missions += int(is_mission.sum())
+        stats.bids += int(is_bid.sum())
+
+        budgets = budget[is_mission]
+        stats.budget.add_many(budgets[budgets > 0])
+        prices = price[is_bid]
+        prices = prices[prices > 0]
+        stats.price.add_many(prices)
+        stats.price_sketch.add_many(prices)
+        timelines = timeline[is_bid]
+        timelines = timelines[timelines > 0]
+        stats.timeline.add_many(timelines)
+        stats.timeline_sketch.add_many(timelines)
+
+        # Identifiants dédoublonnés par lot avant le hachage HyperLogLog
+        providers = pc.unique(batch.column("provider_id").filter(pa.array(is_bid))).drop_null()
+        stats.providers.add_many(providers.to_pylist())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compacte un journal d'événements marché en partitions Arrow")
+    parser.add_argument("events_file", help="Journal market_events.jsonl à importer")
+    parser.add_argument("--root", default="/app/data/market", help="Répertoire des partitions")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    rows = MarketDataStore(Path(args.root)).append_events_file(Path(args.events_file))
+    logger.info(f"{rows} événements importés dans {args.root}")
+
+
+if __name__ == "__main__":
+    main()
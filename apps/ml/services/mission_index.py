@@ -0,0 +1,367 @@
+"""
+Index des missions passées similaires (ancrage des prix suggérés)
+Vecteurs creux hachés des briefs, partitionnés par catégorie et stockés par
+terme (CSC) : une requête ne parcourt que les listes des termes qu'elle
+contient. Insertions incrémentales depuis le journal completed_missions.jsonl,
+persistance sur disque avec l'offset (et l'inode) du journal déjà indexé.
+
+Usage (depuis apps/ml) :
+    python -m services.mission_index --data-path /infra/data
+"""
+
+import argparse
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import quote
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+
+from services.brief_tfidf import FRENCH_STOP_WORDS, TOKEN_PATTERN
+from services.data_reloader import read_appended_lines
+
+logger = logging.getLogger(__name__)
+
+EVENTS_FILENAME = "completed_missions.jsonl"
+INDEX_DIRNAME = "mission_index"
+STATE_FILENAME = "index.json"
+LOCK_FILENAME = ".lock"
+N_FEATURES = 1 << 18
+TITLE_MAX_CHARS = 120
+
+
+@dataclass
+class SimilarMission:
+    mission_id: str
+    title: str
+    final_price: float
+    similarity: float
+
+    def as_dict(self) -> Dict[str, any]:
+        return {
+            'mission_id': self.mission_id,
+            'title': self.title,
+            'final_price': self.final_price,
+            'similarity': round(self.similarity, 3)
+        }
+
+
+class _Partition:
+    """Missions d'une catégorie.
+
+    Les gros volumes sont scellés en segments CSC (listes par terme) ; les
+    derniers ajouts, et les petites catégories entières, restent en CSR et
+    sont parcourus par produit direct. Un segment CSC coûte un indptr de
+    N_FEATURES entrées, d'où le seuil de scellement élevé.
+    """
+
+    def __init__(self, max_segments: int = 4, seal_size: int = 16384):
+        self.max_segments = max_segments
+        self.seal_size = seal_size
+        self.segments: List[sparse.csc_matrix] = []
+        self.pending: List[sparse.csr_matrix] = []
+        self.pending_rows = 0
+        self.ids: List[str] = []
+        self.titles: List[str] = []
+        self.prices = array('d')
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(self, vectors: sparse.csr_matrix, ids: List[str], titles: List[str], prices: Iterable[float]):
+        self.pending.append(vectors)
+        self.pending_rows += vectors.shape[0]
+        self.ids.extend(ids)
+        self.titles.extend(titles)
+        self.prices.extend(prices)
+        if self.pending_rows >= self.seal_size:
+            self.seal()
+
+    def seal(self):
+        """Scelle le tampon en segment CSC ; fusion des segments au-delà de max_segments"""
+        if self.pending:
+            self.segments.append(sparse.vstack(self.pending, format='csc'))
+            self.pending, self.pending_rows = [], 0
+        if len(self.segments) > self.max_segments:
+            self.segments = [sparse.vstack(self.segments, format='csc')]
+
+    def _tail(self) -> Optional[sparse.csr_matrix]:
+        if len(self.pending) > 1:
+            self.pending = [sparse.vstack(self.pending, format='csr')]
+        return self.pending[0] if self.pending else None
+
+    def scores(self, terms: np.ndarray, weights: np.ndarray) -> np.ndarray:
+        """Cosinus de la requête avec chaque mission, dans l'ordre d'insertion"""
+        parts = [segment[:, terms] @ weights for segment in self.segments]
+        tail = self._tail()
+        if tail is not None:
+            query = np.zeros(tail.shape[1], dtype=np.float32)
+            query[terms] = weights
+            parts.append(tail @ query)
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=np.float32)
+
+    def nbytes(self) -> int:
+        matrices = self.segments + self.pending
+        return sum(matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes for matrix in matrices) + \
+            self.prices.buffer_info()[1] * self.prices.itemsize
+
+    def save(self, path: Path):
+        """Une seule matrice CSR par fichier (indptr par ligne, compact pour les petites catégories)"""
+        tail = self._tail()
+        parts = [segment.tocsr() for segment in self.segments] + ([tail] if tail is not None else [])
+        matrix = sparse.vstack(parts, format='csr') if parts else \
+            sparse.csr_matrix((0, N_FEATURES), dtype=np.float32)
+        meta = json.dumps({'ids': self.ids, 'titles': self.titles}, ensure_ascii=False).encode('utf-8')
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            np.savez(
+                f, data=matrix.data, indices=matrix.indices, indptr=matrix.indptr,
+                shape=np.array(matrix.shape), prices=np.frombuffer(self.prices, dtype=np.float64),
+                meta=np.frombuffer(meta, dtype=np.uint8)
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> '_Partition':
+        partition = cls()
+        with np.load(path) as data:
+            matrix = sparse.csr_matrix((data['data'], data['indices'], data['indptr']), shape=tuple(data['shape']))
+            meta = json.loads(data['meta'].tobytes().decode('utf-8'))
+            partition.prices = array('d', data['prices'].tobytes())
+        partition.ids, partition.titles = meta['ids'], meta['titles']
+        if matrix.shape[0]:
+            partition.pending, partition.pending_rows = [matrix], matrix.shape[0]
+            if partition.pending_rows >= partition.seal_size:
+                partition.seal()
+        return partition
+
+
+class MissionIndex:
+    """Recherche des k missions passées les plus proches d'un brief.
+
+    Recherche exacte par défaut. `query_terms` ne garde que les termes les plus
+    lourds de la requête : moins de listes parcourues, au prix d'un rappel
+    inférieur à 1 (voir benchmarks/mission_index.py).
+    """
+
+    def __init__(self, data_path: str = "/infra/data", index_dir: Optional[str] = None,
+                 query_terms: Optional[int] = None):
+        self.data_path = Path(data_path)
+        self.index_dir = Path(index_dir) if index_dir else self.data_path / INDEX_DIRNAME
+        self.events_file = self.data_path / EVENTS_FILENAME
+        self.query_terms = query_terms
+        self.partitions: Dict[str, _Partition] = {}
+        self.queries = 0
+        self.query_ms_total = 0.0
+        self._events_offset = 0
+        self._dirty = False
+        self._vectorizer = HashingVectorizer(
+            n_features=N_FEATURES, token_pattern=TOKEN_PATTERN, stop_words=list(FRENCH_STOP_WORDS),
+            alternate_sign=False, norm=None, dtype=np.float32
+        )
+        self._lock = threading.Lock()
+        self.load()
+        self.apply_events()
+
+    def __len__(self) -> int:
+        return sum(len(partition) for partition in self.partitions.values())
+
+    def vectorize(self, texts: List[str]) -> sparse.csr_matrix:
+        """Vecteurs hachés, tf sous-linéaire, normalisés L2"""
+        counts = self._vectorizer.transform(texts)
+        np.log1p(counts.data, out=counts.data)
+        return normalize(counts, norm='l2', copy=False)
+
+    def add_many(self, missions: List[Dict[str, any]]) -> int:
+        """Indexe des missions {mission_id, category, title, description, final_price}"""
+        by_category: Dict[str, List[Dict[str, any]]] = {}
+        for mission in missions:
+            if mission.get('category') and mission.get('final_price'):
+                by_category.setdefault(mission['category'], []).append(mission)
+
+        added = 0
+        for category, rows in by_category.items():
+            vectors = self.vectorize([f"{row.get('title') or ''} {row.get('description') or ''}" for row in rows])
+            with self._lock:
+                partition = self.partitions.setdefault(category, _Partition())
+                partition.add(
+                    vectors,
+                    [str(row.get('mission_id', '')) for row in rows],
+                    [(row.get('title') or '')[:TITLE_MAX_CHARS] for row in rows],
+                    (float(row['final_price']) for row in rows)
+                )
+            added += len(rows)
+        self._dirty = self._dirty or bool(added)
+        return added
+
+    def search(self, text: str, category: str, k: int = 5,
+               query_terms: Optional[int] = None) -> List[SimilarMission]:
+        """k missions les plus similaires de la catégorie (similarité cosinus décroissante)"""
+        partition = self.partitions.get(category)
+        if partition is None or not len(partition):
+            return []
+
+        start = time.perf_counter()
+        query = self.vectorize([text])
+        terms, weights = query.indices, query.data
+        query_terms = query_terms or self.query_terms
+        if query_terms and terms.size > query_terms:
+            keep = np.argpartition(-weights, query_terms - 1)[:query_terms]
+            terms, weights = terms[keep], weights[keep]
+        if not terms.size:
+            return []
+
+        with self._lock:
+            scores = partition.scores(terms, weights)
+            k = min(k, scores.size)
+            best = np.argpartition(-scores, k - 1)[:k]
+            best = best[np.argsort(-scores[best], kind='stable')]
+            results = [
+                SimilarMission(partition.ids[row], partition.titles[row], partition.prices[row], float(scores[row]))
+                for row in best if scores[row] > 0
+            ]
+
+        self.queries += 1
+        self.query_ms_total += (time.perf_counter() - start) * 1000
+        return results
+
+    def apply_events(self) -> bool:
+        """Indexe les missions ajoutées au journal depuis le dernier appel"""
+        lines, offset = read_appended_lines(self.events_file, self._events_offset)
+        if lines is None:
+            # Journal tronqué ou remplacé : l'index est reconstruit depuis le début du fichier
+            logger.warning("Journal des missions terminées tronqué, réindexation complète")
+            with self._lock:
+                self.partitions = {}
+            lines, offset = read_appended_lines(self.events_file, 0)
+        missions = []
+        for line in lines or []:
+            try:
+                missions.append(json.loads(line))
+            except ValueError:
+                continue
+        added = self.add_many(missions) if missions else 0
+        self._events_offset = offset
+        if added:
+            logger.info(f"{added} missions ajoutées à l'index de similarité")
+        return True
+
+    def save(self) -> bool:
+        """Persiste une génération de partitions (un fichier .npz par catégorie) puis index.json.
+
+        index.json est écrit en dernier : il liste les fichiers de sa
+        génération avec l'offset et l'inode du journal qu'ils couvrent. Un
+        arrêt avant son remplacement laisse l'état précédent intact, sans
+        missions rejouées deux fois. Les workers qui sauvegardent en même
+        temps (arrêt en mode partagé) sont sérialisés par un verrou de fichier.
+        """
+        state_file = self.index_dir / STATE_FILENAME
+        if not self._dirty and state_file.exists():
+            return True
+        try:
+            self.index_dir.mkdir(parents=True, exist_ok=True)
+            with open(self.index_dir / LOCK_FILENAME, 'w') as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                generation = f"{time.time_ns()}-{os.getpid()}"
+                try:
+                    log_inode = self.events_file.stat().st_ino
+                except OSError:
+                    log_inode = None
+
+                with self._lock:
+                    files = {}
+                    for category, partition in self.partitions.items():
+                        files[category] = f"{quote(category, safe='')}.{generation}.npz"
+                        partition.save(self.index_dir / files[category])
+                    state = {
+                        'events_offset': self._events_offset,
+                        'log_inode': log_inode,
+                        'missions': len(self),
+                        'partitions': files
+                    }
+                tmp_path = self.index_dir / f".{STATE_FILENAME}.{os.getpid()}.tmp"
+                tmp_path.write_text(json.dumps(state), encoding='utf-8')
+                os.replace(tmp_path, state_file)
+
+                # Partitions des générations précédentes et restes de sauvegardes interrompues
+                current = set(files.values())
+                for path in [*self.index_dir.glob("*.npz"), *self.index_dir.glob(".*.tmp")]:
+                    if path.name not in current:
+                        path.unlink(missing_ok=True)
+            self._dirty = False
+            return True
+        except Exception as e:
+            logger.error(f"Erreur sauvegarde index de missions {self.index_dir}: {e}")
+            return False
+
+    def load(self) -> bool:
+        """Recharge l'index sauvegardé s'il correspond encore au journal"""
+        state_file = self.index_dir / STATE_FILENAME
+        if not state_file.exists():
+            return False
+        try:
+            state = json.loads(state_file.read_text(encoding='utf-8'))
+            stat = self.events_file.stat()
+        except (OSError, ValueError) as e:
+            logger.error(f"Erreur chargement index de missions {self.index_dir}: {e}")
+            return False
+
+        if (state.get('log_inode') != stat.st_ino or state.get('events_offset', 0) > stat.st_size
+                or 'partitions' not in state):
+            logger.info("Index de missions obsolète, réindexation du journal")
+            return False
+
+        try:
+            partitions = {
+                category: _Partition.load(self.index_dir / filename)
+                for category, filename in state['partitions'].items()
+            }
+        except Exception as e:
+            logger.error(f"Erreur chargement index de missions {self.index_dir}: {e}")
+            return False
+
+        with self._lock:
+            self.partitions = partitions
+            self._events_offset = state['events_offset']
+        logger.info(f"Index de missions chargé: {len(self)} missions, {len(partitions)} catégories")
+        return True
+
+    def get_stats(self) -> Dict[str, any]:
+        return {
+            'missions': len(self),
+            'categories': len(self.partitions),
+            'index_mb': round(sum(p.nbytes() for p in self.partitions.values()) / (1024 * 1024), 1),
+            'queries': self.queries,
+            'avg_query_ms': round(self.query_ms_total / self.queries, 2) if self.queries else 0.0
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Indexe les nouvelles missions terminées et persiste l'index")
+    parser.add_argument("--data-path", default="/infra/data", help=f"Répertoire contenant {EVENTS_FILENAME}")
+    parser.add_argument("--index-dir", default=None, help=f"Répertoire de l'index (défaut: <data-path>/{INDEX_DIRNAME})")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    start = time.perf_counter()
+    index = MissionIndex(data_path=args.data_path, index_dir=args.index_dir)
+    index.save()
+    logger.info(f"{len(index)} missions indexées en {time.perf_counter() - start:.1f} s -> {index.index_dir}")
+
+
+# Instance globale
+mission_index = MissionIndex()
+
+
+if __name__ == "__main__":
+    main()
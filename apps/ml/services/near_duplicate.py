@@ -0,0 +1,257 @@
+"""
+Détection des briefs quasi identiques (MinHash + LSH)
+Les briefs sont normalisés (TextNormalizer._clean_text), découpés en shingles
+de mots puis résumés par une signature MinHash ; l'indexation par bandes LSH
+ne compare un nouveau brief qu'aux briefs tombant dans un même seau.
+"""
+
+import logging
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from services.text_normalizer import TextNormalizer
+
+logger = logging.getLogger(__name__)
+
+
+def optimal_bands(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """(bandes, lignes par bande) minimisant faux positifs + faux négatifs.
+
+    Une paire de similarité s devient candidate avec la probabilité
+    1 - (1 - s^r)^b ; on intègre cette courbe de part et d'autre du seuil.
+    """
+    similarities = np.linspace(0.0, 1.0, 201)
+    below = similarities < threshold
+    best, best_error = (num_perm, 1), float('inf')
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        probability = 1 - (1 - similarities ** rows) ** bands
+        error = probability[below].mean() * threshold + (1 - probability[~below]).mean() * (1 - threshold)
+        if error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+
+class MinHashLSH:
+    """Index LSH de signatures MinHash avec capacité bornée (les plus anciennes sortent)"""
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 128, shingle_size: int = 3,
+                 capacity: Optional[int] = None, on_evict: Optional[Callable[[Hashable], None]] = None,
+                 seed: int = 1):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.capacity = capacity
+        self.on_evict = on_evict
+        self.seed = seed
+        self.bands, self.rows = optimal_bands(threshold, num_perm)
+        self.normalizer = TextNormalizer()
+
+        # Famille multiply-shift : h(x) = ((a * x + b) mod 2^64) >> 32, a impair
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 1 << 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 1 << 63, size=num_perm, dtype=np.uint64)
+
+        self._signatures: OrderedDict = OrderedDict()
+        self._buckets: List[Dict[bytes, List[Hashable]]] = [{} for _ in range(self.bands)]
+        self._lock = threading.Lock()
+        self.inserts = 0
+        self.duplicates_found = 0
+        self.candidates_checked = 0
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def shingles(self, text: str) -> Set[str]:
+        words = self.normalizer._clean_text(text).split()
+        if len(words) < self.shingle_size:
+            return {" ".join(words)} if words else set()
+        return {" ".join(words[i:i + self.shingle_size]) for i in range(len(words) - self.shingle_size + 1)}
+
+    def signature(self, text: str) -> np.ndarray:
+        """Signature MinHash (uint32, num_perm valeurs) du texte normalisé"""
+        shingles = self.shingles(text)
+        if not shingles:
+            return np.full(self.num_perm, 0xFFFFFFFF, dtype=np.uint32)
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode('utf-8')) for shingle in shingles), dtype=np.uint64, count=len(shingles)
+        )
+        with np.errstate(over='ignore'):
+            permuted = (hashes[:, None] * self._a + self._b) >> np.uint64(32)
+        return permuted.min(axis=0).astype(np.uint32)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
+
+    def query(self, text: Optional[str] = None, signature: Optional[np.ndarray] = None) -> List[Tuple[Hashable, float]]:
+        """Briefs indexés de similarité estimée >= seuil, du plus proche au moins proche"""
+        if signature is None:
+            signature = self.signature(text)
+        with self._lock:
+            return self._query(signature)
+
+    def _query(self, signature: np.ndarray) -> List[Tuple[Hashable, float]]:
+        candidates = set()
+        for bucket, key in zip(self._buckets, self._band_keys(signature)):
+            candidates.update(bucket.get(key, ()))
+        self.candidates_checked += len(candidates)
+
+        matches = []
+        for candidate in candidates:
+            similarity = float(np.mean(self._signatures[candidate] == signature))
+            if similarity >= self.threshold:
+                matches.append((candidate, similarity))
+        matches.sort(key=lambda match: -match[1])
+        return matches
+
+    def insert(self, key: Hashable, text: Optional[str] = None,
+               signature: Optional[np.ndarray] = None) -> List[Tuple[Hashable, float]]:
+        """Indexe un brief et retourne les quasi-doublons déjà présents"""
+        if signature is None:
+            signature = self.signature(text)
+        with self._lock:
+            if key in self._signatures:
+                self._remove(key)
+            duplicates = self._query(signature)
+            self._signatures[key] = signature
+            for bucket, band_key in zip(self._buckets, self._band_keys(signature)):
+                bucket.setdefault(band_key, []).append(key)
+            self.inserts += 1
+            self.duplicates_found += bool(duplicates)
+
+            evicted = []
+            while self.capacity and len(self._signatures) > self.capacity:
+                oldest = next(iter(self._signatures))
+                self._remove(oldest)
+                evicted.append(oldest)
+
+        if self.on_evict:
+            for old_key in evicted:
+                self.on_evict(old_key)
+        return duplicates
+
+    def touch(self, key: Hashable):
+        """Marque une entrée comme récemment utilisée (éviction LRU)"""
+        with self._lock:
+            if key in self._signatures:
+                self._signatures.move_to_end(key)
+
+    def remove(self, key: Hashable):
+        with self._lock:
+            self._remove(key)
+
+    def _remove(self, key: Hashable):
+        signature = self._signatures.pop(key, None)
+        if signature is None:
+            return
+        for bucket, band_key in zip(self._buckets, self._band_keys(signature)):
+            keys = bucket.get(band_key)
+            if keys is not None:
+                keys.remove(key)
+                if not keys:
+                    del bucket[band_key]
+
+    def clear(self):
+        with self._lock:
+            self._signatures.clear()
+            self._buckets = [{} for _ in range(self.bands)]
+
+    def save(self, file, **metadata):
+        """Écrit clés (en chaînes) et signatures, dans l'ordre LRU, au format npz (sans pickle)"""
+        with self._lock:
+            keys = np.array([str(key) for key in self._signatures], dtype=str)
+            signatures = np.array(list(self._signatures.values()), dtype=np.uint32).reshape(-1, self.num_perm)
+            counters = np.array([self.inserts, self.duplicates_found, self.candidates_checked], dtype=np.int64)
+        np.savez(
+            file,
+            keys=keys,
+            signatures=signatures,
+            counters=counters,
+            params=np.array([self.num_perm, self.shingle_size, self.seed], dtype=np.int64),
+            **{f"meta_{name}": np.asarray(value) for name, value in metadata.items()}
+        )
+
+    def load(self, file) -> Optional[Dict[str, Any]]:
+        """Recharge un index écrit par save ; retourne ses métadonnées (None si incompatible)"""
+        with np.load(file, allow_pickle=False) as data:
+            if data['params'].tolist() != [self.num_perm, self.shingle_size, self.seed]:
+                return None
+            keys = data['keys'].tolist()
+            signatures = data['signatures']
+            counters = data['counters'].tolist()
+            metadata = {name[len("meta_"):]: data[name].item() for name in data.files if name.startswith("meta_")}
+
+        if self.capacity:
+            keys, signatures = keys[-self.capacity:], signatures[-self.capacity:]
+        with self._lock:
+            self._signatures = OrderedDict()
+            self._buckets = [{} for _ in range(self.bands)]
+            for key, signature in zip(keys, signatures):
+                self._signatures[key] = signature
+                for bucket, band_key in zip(self._buckets, self._band_keys(signature)):
+                    bucket.setdefault(band_key, []).append(key)
+            self.inserts, self.duplicates_found, self.candidates_checked = counters
+        return metadata
+
+    def get_stats(self) -> Dict[str, any]:
+        return {
+            'indexed': len(self),
+            'bands': self.bands,
+            'rows_per_band': self.rows,
+            'inserts': self.inserts,
+            'duplicates_found': self.duplicates_found,
+            'avg_candidates': round(self.candidates_checked / self.inserts, 2) if self.inserts else 0.0
+        }
+
+
+class SemanticCache:
+    """Cache de résultats indexé par quasi-identité du brief.
+
+    Un résultat n'est réutilisé que si le contexte (catégorie, budget, échéance…)
+    est strictement identique ; seul le texte peut différer à la marge.
+    """
+
+    def __init__(self, threshold: float = 0.9, capacity: int = 10000, num_perm: int = 128):
+        self.index = MinHashLSH(threshold=threshold, num_perm=num_perm, capacity=capacity,
+                                on_evict=self._evict)
+        self._entries: Dict[int, Tuple[Hashable, Any]] = {}
+        self._next_key = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _evict(self, key: int):
+        self._entries.pop(key, None)
+
+    def get(self, text: str, context: Hashable = None) -> Optional[Any]:
+        for key, _ in self.index.query(text):
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == context:
+                self.index.touch(key)
+                self.hits += 1
+                return entry[1]
+        self.misses += 1
+        return None
+
+    def put(self, text: str, value: Any, context: Hashable = None):
+        key = self._next_key
+        self._next_key += 1
+        self._entries[key] = (context, value)
+        self.index.insert(key, text)
+
+    def clear(self):
+        self.index.clear()
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, any]:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'threshold': self.index.threshold
+        }
@@ -0,0 +1,117 @@
+"""
+Modèle spaCy partagé par tout le processus
+Chargé à la première utilisation, sans les composants inutilisés, avec une
+interface `pipe` par lots pour les analyses en masse
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Dict, Iterable, Iterator, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = os.getenv("ML_SPACY_MODEL", "fr_core_news_sm")
+# Composants jamais utilisés : non chargés du tout
+DEFAULT_EXCLUDE = ("parser",)
+# Composants chargés mais désactivés sauf demande explicite
+OPTIONAL_COMPONENTS = ("ner",)
+
+
+class NLPProvider:
+    """Instance unique et paresseuse du modèle spaCy.
+
+    Le modèle n'est chargé qu'au premier appel de `get`, `__call__` ou `pipe`
+    (verrou pour les appels concurrents). Il n'est pas préchargé avant le fork
+    des workers : un processus qui ne l'utilise pas n'en paie pas la mémoire.
+    Un échec de chargement est mémorisé : les appelants reçoivent None et
+    gardent leur traitement de repli.
+    """
+
+    def __init__(self, model_name: str = DEFAULT_MODEL, exclude: Sequence[str] = DEFAULT_EXCLUDE,
+                 optional: Sequence[str] = OPTIONAL_COMPONENTS, batch_size: int = 256, n_process: int = 1):
+        self.model_name = model_name
+        self.exclude = tuple(exclude)
+        self.optional = tuple(optional)
+        self.batch_size = batch_size
+        self.n_process = n_process
+        self.load_ms = 0.0
+        self.docs_processed = 0
+        self._nlp = None
+        self._failed = False
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._nlp is not None
+
+    def get(self):
+        """Modèle chargé (None si spaCy ou le modèle est indisponible)"""
+        if self._nlp is not None or self._failed:
+            return self._nlp
+        with self._lock:
+            if self._nlp is None and not self._failed:
+                self._load()
+        return self._nlp
+
+    def _load(self):
+        start = time.perf_counter()
+        try:
+            import spacy
+            nlp = spacy.load(self.model_name, exclude=list(self.exclude))
+        except Exception as e:
+            self._failed = True
+            logger.warning(f"Modèle spaCy {self.model_name} indisponible, traitement basique: {e}")
+            return
+        self.load_ms = (time.perf_counter() - start) * 1000
+        self._nlp = nlp
+        logger.info(f"Modèle spaCy {self.model_name} chargé en {self.load_ms:.0f} ms "
+                    f"(composants: {', '.join(nlp.pipe_names)})")
+
+    def _disabled(self, with_ner: bool) -> list:
+        disabled = [name for name in self.optional if name in self._nlp.pipe_names]
+        if with_ner and "ner" in disabled:
+            disabled.remove("ner")
+        return disabled
+
+    def __call__(self, text: str, with_ner: bool = False):
+        """Analyse d'un texte unique, None si le modèle est indisponible"""
+        nlp = self.get()
+        if nlp is None:
+            return None
+        self.docs_processed += 1
+        return nlp(text, disable=self._disabled(with_ner))
+
+    def pipe(self, texts: Iterable[str], batch_size: Optional[int] = None, n_process: Optional[int] = None,
+             with_ner: bool = False) -> Iterator:
+        """Analyse en flux par lots (`nlp.pipe`), dans l'ordre des textes.
+
+        n_process > 1 répartit les lots sur des processus fils ; à réserver aux
+        gros volumes, le démarrage des processus coûtant plusieurs secondes.
+        """
+        nlp = self.get()
+        if nlp is None:
+            return
+        docs = nlp.pipe(
+            texts,
+            batch_size=batch_size or self.batch_size,
+            n_process=n_process or self.n_process,
+            disable=self._disabled(with_ner)
+        )
+        for doc in docs:
+            self.docs_processed += 1
+            yield doc
+
+    def get_stats(self) -> Dict[str, any]:
+        return {
+            'model': self.model_name,
+            'loaded': self.loaded,
+            'components': list(self._nlp.pipe_names) if self._nlp is not None else [],
+            'load_ms': round(self.load_ms, 1),
+            'docs_processed': self.docs_processed
+        }
+
+
+# Instance globale
+nlp_provider = NLPProvider()
@@ -5,6 +5,8 @@ from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 from dataclasses import dataclass
 import statistics
+from services.data_reloader import file_version
+from services.data_snapshot import default_snapshot_path, load_compiled_prices
 
 logger = logging.getLogger(__name__)
 
@@ -17,47 +19,80 @@ class PriceTimeSuggestion:
     rationale: Dict[str, any]
     confidence: float
 
+def parse_price_csv(price_file: Path) -> Tuple[Dict[str, Dict[str, Dict[str, float]]], str]:
+    """Construit la grille de prix depuis le CSV"""
+    price_data = {}
+    version = 'absent'
+
+    if price_file.exists():
+        file_info = file_version(price_file)
+        version = file_info.checksum if file_info else 'unknown'
+        with open(price_file, 'r', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                category = row['category']
+                sub_category = row['sub_category']
+                
+                if category not in price_data:
+                    price_data[category] = {}
+                
+                price_data[category][sub_category] = {
+                    'hourly_min': float(row.get('hourly_min', 25)),
+                    'hourly_med': float(row.get('hourly_med', 45)),
+                    'hourly_max': float(row.get('hourly_max', 80)),
+                    'daily_min': float(row.get('daily_min', 200)),
+                    'daily_med': float(row.get('daily_med', 350)),
+                    'daily_max': float(row.get('daily_max', 600)),
+                    'complexity_factor': float(row.get('complexity_factor', 1.0)),
+                    'avg_days': int(row.get('avg_days', 15))
+                }
+
+    return price_data, version
+
 class PriceTimeSuggester:
-    def __init__(self, data_path: str = "/infra/data"):
+    def __init__(self, data_path: str = "/infra/data", snapshot_path: Optional[str] = None):
         self.data_path = Path(data_path)
+        self.price_file = self.data_path / "price_terms_fr.csv"
+        self.snapshot_path = Path(snapshot_path) if snapshot_path else default_snapshot_path(self.data_path)
         self.price_data = {}
+        self.data_version = 'empty'
         self.time_factors = {}
+        self._init_time_factors()
         self._load_pricing_data()
 
     def _load_pricing_data(self):
         """Charge les données de prix depuis les fichiers CSV"""
         try:
-            price_file = self.data_path / "price_terms_fr.csv"
-            if price_file.exists():
-                with open(price_file, 'r', encoding='utf-8') as f:
-                    reader = csv.DictReader(f)
-                    for row in reader:
-                        category = row['category']
-                        sub_category = row['sub_category']
-                        
-                        if category not in self.price_data:
-                            self.price_data[category] = {}
-                        
-                        self.price_data[category][sub_category] = {
-                            'hourly_min': float(row.get('hourly_min', 25)),
-                            'hourly_med': float(row.get('hourly_med', 45)),
-                            'hourly_max': float(row.get('hourly_max', 80)),
-                            'daily_min': float(row.get('daily_min', 200)),
-                            'daily_med': float(row.get('daily_med', 350)),
-                            'daily_max': float(row.get('daily_max', 600)),
-                            'complexity_factor': float(row.get('complexity_factor', 1.0)),
-                            'avg_days': int(row.get('avg_days', 15))
-                        }
-            
-            self._init_time_factors()
+            self.price_data, self.data_version = self._build_price_table()
             logger.info(f"Données de prix chargées pour {len(self.price_data)} catégories")
             
         except Exception as e:
             logger.error(f"Erreur lors du chargement des prix: {e}")
             self._init_default_pricing()
 
+    def reload(self) -> bool:
+        """Reconstruit la grille de prix et la publie en une seule affectation"""
+        try:
+            price_data, version = self._build_price_table()
+        except Exception as e:
+            logger.error(f"Erreur lors du rechargement des prix: {e}")
+            return False
+
+        # _get_base_pricing lit self.price_data une seule fois par appel
+        self.price_data, self.data_version = price_data, version
+        logger.info(f"Données de prix rechargées pour {len(price_data)} catégories (version {version})")
+        return True
+
+    def _build_price_table(self) -> Tuple[Dict[str, Dict[str, Dict[str, float]]], str]:
+        """Ouvre le snapshot binaire s'il est à jour, sinon parse le CSV"""
+        compiled = load_compiled_prices(self.snapshot_path, self.price_file)
+        if compiled is not None:
+            return compiled
+        return parse_price_csv(self.price_file)
+
     def _init_default_pricing(self):
         """Initialise une grille de prix par défaut"""
+        self.data_version = 'default'
         self.price_data = {
             'développement': {
                 'web': {
@@ -196,14 +231,15 @@ class PriceTimeSuggester:
         }
         
         mapped_category = category_mapping.get(category_lower, 'développement')
+        price_data = self.price_data
         
-        if mapped_category in self.price_data:
+        if mapped_category in price_data:
             # Sélection de la sous-catégorie
-            if sub_category and sub_category.lower() in self.price_data[mapped_category]:
-                return self.price_data[mapped_category][sub_category.lower()]
+            if sub_category and sub_category.lower() in price_data[mapped_category]:
+                return price_data[mapped_category][sub_category.lower()]
             else:
                 # Prendre la première sous-catégorie disponible
-                first_sub = next(iter(self.price_data[mapped_category].values()))
+                first_sub = next(iter(price_data[mapped_category].values()))
                 return first_sub
         
         # Valeurs par défaut
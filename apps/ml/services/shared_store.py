@@ -0,0 +1,146 @@
+"""
+Mode données partagées entre workers (ML_SHARED_DATA=1)
+Le processus maître charge une seule fois les structures en lecture seule puis fork
+les workers uvicorn, qui les partagent au lieu d'en garder chacun une copie
+"""
+
+import gc
+import importlib
+import logging
+import os
+import signal
+import socket
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from services.data_snapshot import build_from_csv, is_snapshot_fresh
+
+logger = logging.getLogger(__name__)
+
+# Modules dont les instances globales (templates, banque de questions) doivent
+# être chargées avant le fork
+PRELOAD_MODULES = (
+    "enhancements.normalize",
+    "enhancements.generator",
+    "enhancements.questioner",
+    "services.smart_brief",
+)
+
+
+def shared_mode_enabled() -> bool:
+    return os.getenv("ML_SHARED_DATA", "0") == "1"
+
+
+def ensure_snapshot(data_path: Path, snapshot_path: Path) -> bool:
+    """Compile le snapshot binaire s'il est absent ou périmé"""
+    if is_snapshot_fresh(snapshot_path, data_path):
+        return True
+    try:
+        counts = build_from_csv(data_path, snapshot_path)
+        logger.info(f"Snapshot partagé compilé: {counts}")
+        return True
+    except Exception as e:
+        logger.error(f"Impossible de compiler le snapshot partagé: {e}")
+        return False
+
+
+def preload_shared_state(services: Iterable, modules: Iterable[str] = PRELOAD_MODULES):
+    """Charge les données en lecture seule dans le maître avant le fork.
+
+    Les services rechargés basculent sur le snapshot mmap (pages partagées via
+    le page cache). gc.freeze() sort ensuite tous les objets chargés des
+    générations suivies par le GC : les collectes des workers ne réécrivent
+    plus leurs en-têtes, ce qui préserve le partage copy-on-write.
+    """
+    for module in modules:
+        try:
+            importlib.import_module(module)
+        except Exception as e:
+            logger.warning(f"Préchargement de {module} ignoré: {e}")
+
+    for service in services:
+        service.reload()
+
+    gc.collect()
+    gc.freeze()
+    logger.info(f"État partagé préchargé ({gc.get_freeze_count()} objets gelés)")
+
+
+def process_memory(pid: Optional[int] = None) -> Dict[str, int]:
+    """Mémoire d'un processus en Ko : RSS, PSS (part proportionnelle) et privée (USS)"""
+    path = f"/proc/{pid or 'self'}/smaps_rollup"
+    memory = {'rss_kb': 0, 'pss_kb': 0, 'uss_kb': 0}
+    try:
+        with open(path) as f:
+            for line in f:
+                key, _, value = line.partition(':')
+                if key == 'Rss':
+                    memory['rss_kb'] = int(value.split()[0])
+                elif key == 'Pss':
+                    memory['pss_kb'] = int(value.split()[0])
+                elif key in ('Private_Clean', 'Private_Dirty'):
+                    memory['uss_kb'] += int(value.split()[0])
+    except OSError:
+        pass
+    return memory
+
+
+def serve_preforked(app, host: str, port: int, workers: int):
+    """Lance `workers` serveurs uvicorn forkés depuis le maître sur un socket commun.
+
+    uvicorn --workers démarre ses workers en mode spawn (réimport complet) ;
+    ici les workers héritent de l'état préchargé. Un worker qui meurt est
+    relancé depuis le maître, donc toujours avec les pages partagées.
+    """
+    import uvicorn
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+
+    children = set()
+    stopping = False
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            config = uvicorn.Config(app, host=host, port=port, log_level="info")
+            uvicorn.Server(config).run(sockets=[sock])
+            os._exit(0)
+        children.add(pid)
+
+    def shutdown(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+
+    for _ in range(workers):
+        spawn()
+    logger.info(f"{workers} workers démarrés en mode données partagées sur {host}:{port}")
+
+    while children:
+        try:
+            pid, _ = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        children.discard(pid)
+        if not stopping:
+            logger.warning(f"Worker {pid} arrêté, redémarrage")
+            time.sleep(0.5)
+            spawn()
+
+    sock.close()
@@ -0,0 +1,357 @@
+"""
+Index de compétences : correspondance approchée et autocomplétion
+Index de suppressions type SymSpell : chaque compétence est enregistrée sous
+toutes ses variantes à k caractères supprimés (k <= distance max) ; un mot
+saisi génère ses propres suppressions et ne rencontre que les compétences à
+distance d'édition potentiellement faible, quelle que soit la taille du
+vocabulaire. Les mots courants du français ne sont jamais corrigés vers une
+compétence (« réactif » n'est pas React). L'autocomplétion repose sur des
+clés triées interrogées par recherche dichotomique
+"""
+
+import bisect
+import heapq
+import logging
+import re
+import unicodedata
+from dataclasses import dataclass
+from itertools import combinations
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from services.brief_tfidf import FRENCH_STOP_WORDS
+
+logger = logging.getLogger(__name__)
+
+_KEY_PATTERN = re.compile(r'[^a-z0-9+#]')
+_TOKEN_PATTERN = re.compile(r"[\w+#.\-]+")
+
+# Mots français proches d'un nom de compétence : jamais corrigés (les
+# correspondances exactes restent admises). Les pluriels en -s/-x sont couverts.
+FRENCH_VOCABULARY = FRENCH_STOP_WORDS | frozenset("""
+    réactif réactive réaction réagir angulaire illustration illustrateur illustratrice vue revue
+    nœud noeud figure script rubrique principal principale production reproduction information
+    analyseur précision innovation reconstruction content contente
+""".split())
+
+
+def skill_key(text: str) -> str:
+    """Clé de comparaison : minuscules, sans accents ni séparateurs (« Vue.js » -> « vuejs »)"""
+    text = unicodedata.normalize('NFKD', text.lower())
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return _KEY_PATTERN.sub('', text)
+
+
+def edit_distance(left: str, right: str, max_distance: int) -> int:
+    """Distance de Damerau-Levenshtein restreinte (transpositions adjacentes).
+
+    Retourne max_distance + 1 dès que la distance dépasse la borne.
+    """
+    if abs(len(left) - len(right)) > max_distance:
+        return max_distance + 1
+    if left == right:
+        return 0
+
+    previous_previous = None
+    previous = list(range(len(right) + 1))
+    for i in range(1, len(left) + 1):
+        current = [i] + [0] * len(right)
+        row_min = i
+        for j in range(1, len(right) + 1):
+            cost = 0 if left[i - 1] == right[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous_previous is not None and j > 1 and left[i - 1] == right[j - 2]
+                    and left[i - 2] == right[j - 1]):
+                value = min(value, previous_previous[j - 2] + 1)
+            current[j] = value
+            row_min = min(row_min, value)
+        if row_min > max_distance:
+            return max_distance + 1
+        previous_previous, previous = previous, current
+    return previous[-1] if previous[-1] <= max_distance else max_distance + 1
+
+
+@dataclass
+class SkillMatch:
+    skill: str
+    distance: int
+    token: str
+
+
+class SymSpellIndex:
+    """Recherche des compétences à distance d'édition bornée d'un mot.
+
+    Les suppressions ne portent que sur les `prefix_length` premiers caractères
+    (variante SymSpell) : l'index reste compact, la distance exacte est vérifiée
+    sur les clés complètes. Les couples (hash de suppression, compétence) sont
+    stockés dans deux tableaux triés et interrogés par recherche dichotomique
+    vectorisée, sans dictionnaire Python par variante.
+    """
+
+    def __init__(self, skills: Iterable[str], max_distance: int = 2, prefix_length: int = 7,
+                 distance_by_length: Sequence[Tuple[int, int]] = ((6, 0), (9, 1)),
+                 vocabulary: Iterable[str] = FRENCH_VOCABULARY):
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        # (longueur limite, distance) : aucune correction sous 6 caractères, une seule sous 9
+        self.distance_by_length = tuple(distance_by_length)
+        self.vocabulary = frozenset(skill_key(word) for word in vocabulary)
+        self.skills: List[str] = []
+        self.keys: List[str] = []
+        self._word_keys: List[Tuple[str, ...]] = []
+        self._by_key: Dict[str, int] = {}
+
+        hashes, ids = [], []
+        for skill in skills:
+            key = skill_key(skill)
+            if not key or key in self._by_key:
+                continue
+            skill_id = len(self.skills)
+            self._by_key[key] = skill_id
+            self.skills.append(skill)
+            self.keys.append(key)
+            self._word_keys.append(tuple(filter(None, map(skill_key, skill.split()))))
+            for variant in self._deletes(key[:prefix_length], max_distance):
+                hashes.append(hash(variant))
+                ids.append(skill_id)
+
+        hashes = np.array(hashes, dtype=np.int64)
+        order = np.argsort(hashes, kind='stable')
+        self._hashes = hashes[order]
+        self._ids = np.array(ids, dtype=np.int32)[order]
+        self.max_words = max((len(skill.split()) for skill in self.skills), default=1)
+
+    def __len__(self) -> int:
+        return len(self.skills)
+
+    @staticmethod
+    def _deletes(word: str, max_distance: int) -> set:
+        variants = {word}
+        for distance in range(1, min(max_distance, len(word)) + 1):
+            for positions in combinations(range(len(word)), distance):
+                variants.add(''.join(char for i, char in enumerate(word) if i not in positions))
+        return variants
+
+    def allowed_distance(self, key: str) -> int:
+        for min_length, distance in self.distance_by_length:
+            if len(key) < min_length:
+                return min(distance, self.max_distance)
+        return self.max_distance
+
+    def is_vocabulary(self, word: str) -> bool:
+        """Mot courant du français, à ne pas corriger : accentué, mot-outil ou lexique (pluriel compris)"""
+        if any(not char.isascii() for char in word):
+            return True
+        key = skill_key(word)
+        return key in self.vocabulary or (key[-1:] in ('s', 'x') and key[:-1] in self.vocabulary)
+
+    def _words_match(self, words: Sequence[str], skill_id: int) -> bool:
+        """Chaque mot d'une fenêtre correspond à un mot de la compétence (« google adds » -> Google Ads)"""
+        skill_words = self._word_keys[skill_id]
+        for word in words:
+            key = skill_key(word)
+            distance = max(self.allowed_distance(key), 1) if len(key) >= 3 else 0
+            if not any(edit_distance(key, skill_word, distance) <= distance for skill_word in skill_words):
+                return False
+        return True
+
+    def lookup(self, token: str, max_distance: Optional[int] = None, limit: int = 3) -> List[SkillMatch]:
+        """Compétences les plus proches d'un mot (distance croissante puis ordre du vocabulaire).
+
+        Seules les correspondances exactes sont admises pour les mots courants
+        du français et les fenêtres contenant un mot étranger à la compétence ;
+        « reactjs » vaut « React » (suffixe js usuel), « pythons » ne vaut rien.
+        """
+        key = skill_key(token)
+        if not key:
+            return []
+        exact = self._by_key.get(key)
+        if exact is None and key.endswith('js'):
+            exact = self._by_key.get(key[:-2])
+        if exact is not None and limit == 1:
+            return [SkillMatch(self.skills[exact], 0, token)]
+
+        words = token.split()
+        max_distance = self.allowed_distance(key) if max_distance is None else min(max_distance, self.max_distance)
+        if any(self.is_vocabulary(word) for word in words):
+            max_distance = 0
+        if max_distance == 0:
+            return [SkillMatch(self.skills[exact], 0, token)] if exact is not None else []
+
+        queries = np.array([hash(variant) for variant in self._deletes(key[:self.prefix_length], max_distance)],
+                           dtype=np.int64)
+        starts = np.searchsorted(self._hashes, queries, side='left')
+        ends = np.searchsorted(self._hashes, queries, side='right')
+        candidates = set()
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            if end > start:
+                candidates.update(self._ids[start:end].tolist())
+
+        matches = []
+        for skill_id in candidates:
+            candidate = self.keys[skill_id]
+            # Pluriel d'un nom de compétence : nom commun (« des pythons »), pas une faute de frappe
+            if key[-1] in ('s', 'x') and key[:-1] == candidate:
+                continue
+            distance = edit_distance(key, candidate, max_distance)
+            if distance <= max_distance and (len(words) == 1 or self._words_match(words, skill_id)):
+                matches.append((distance, skill_id))
+        matches.sort()
+        return [SkillMatch(self.skills[skill_id], distance, token) for distance, skill_id in matches[:limit]]
+
+    def extract(self, text: str, max_distance: Optional[int] = None) -> List[SkillMatch]:
+        """Compétences d'un texte, y compris mal orthographiées ou en plusieurs mots.
+
+        Les fenêtres de mots les plus longues sont essayées d'abord (« google
+        ads » avant « google ») ; un mot n'est rattaché qu'à une compétence.
+        """
+        tokens = _TOKEN_PATTERN.findall(text)
+        used = [False] * len(tokens)
+        found: Dict[str, SkillMatch] = {}
+        for size in range(min(self.max_words, len(tokens)), 0, -1):
+            for start in range(len(tokens) - size + 1):
+                if any(used[start:start + size]):
+                    continue
+                window = " ".join(tokens[start:start + size])
+                best = self.lookup(window, max_distance, limit=1)
+                if not best:
+                    continue
+                match = best[0]
+                for i in range(start, start + size):
+                    used[i] = True
+                previous = found.get(match.skill)
+                if previous is None or match.distance < previous.distance:
+                    found[match.skill] = match
+        return list(found.values())
+
+    def nbytes(self) -> int:
+        return self._hashes.nbytes + self._ids.nbytes
+
+
+def _prefix_key(text: str) -> str:
+    """Clé d'autocomplétion : minuscules sans accents, espaces et ponctuation conservés"""
+    text = unicodedata.normalize('NFKD', text.lower())
+    return ' '.join(''.join(char for char in text if not unicodedata.combining(char)).split())
+
+
+class _PrefixView:
+    """Clés triées (une par début de mot de chaque compétence) et top-k des préfixes courts"""
+
+    def __init__(self, entries: List[Tuple[str, int]], rank: List[int], top_k: int, short_prefix: int):
+        entries.sort()
+        self.keys = [key for key, _ in entries]
+        self.ids = [skill_id for _, skill_id in entries]
+        by_prefix: Dict[str, set] = {}
+        for key, skill_id in entries:
+            for length in range(1, min(short_prefix, len(key)) + 1):
+                by_prefix.setdefault(key[:length], set()).add(skill_id)
+        self.top = {
+            prefix: sorted(skill_ids, key=rank.__getitem__)[:top_k] for prefix, skill_ids in by_prefix.items()
+        }
+        self.short_prefix = short_prefix
+
+    def complete(self, prefix: str, rank: List[int], limit: int) -> List[int]:
+        if len(prefix) <= self.short_prefix:
+            return self.top.get(prefix, [])[:limit]
+        start = bisect.bisect_left(self.keys, prefix)
+        end = bisect.bisect_left(self.keys, prefix + '\uffff', lo=start)
+        return heapq.nsmallest(limit, set(self.ids[start:end]), key=rank.__getitem__)
+
+
+@dataclass(frozen=True)
+class _CompletionSnapshot:
+    skills: List[str]
+    frequencies: List[int]
+    rank: List[int]
+    views: Dict[Optional[str], _PrefixView]
+
+
+class SkillCompleter:
+    """Autocomplétion des compétences par préfixe, classée par fréquence d'usage.
+
+    Chaque compétence est indexée à chaque début de mot (« ads » trouve
+    « Google Ads »). Les préfixes d'au plus `short_prefix` caractères, qui
+    couvrent le plus de compétences, ont leur top-k précalculé ; au-delà, une
+    recherche dichotomique délimite la plage de clés à classer. Une vue par
+    catégorie permet le filtrage sans parcours. L'index est reconstruit hors
+    ligne puis publié par une seule affectation.
+    """
+
+    def __init__(self, top_k: int = 10, short_prefix: int = 3):
+        self.top_k = top_k
+        self.short_prefix = short_prefix
+        self._snapshot = _CompletionSnapshot([], [], [], {None: _PrefixView([], [], top_k, short_prefix)})
+
+    def build(self, entries: Iterable[Tuple[str, Optional[str]]]):
+        """Construit l'index depuis des couples (compétence, catégorie ou None).
+
+        La fréquence d'une compétence est son nombre d'occurrences dans les
+        sources (sous-catégories de la taxonomie, base de compétences).
+        """
+        skill_ids: Dict[str, int] = {}
+        skills, frequencies, categories = [], [], []
+        for skill, category in entries:
+            skill = skill.strip()
+            key = _prefix_key(skill)
+            if not key:
+                continue
+            skill_id = skill_ids.get(key)
+            if skill_id is None:
+                skill_id = skill_ids[key] = len(skills)
+                skills.append(skill)
+                frequencies.append(0)
+                categories.append(set())
+            frequencies[skill_id] += 1
+            if category:
+                categories[skill_id].add(category)
+
+        order = sorted(range(len(skills)), key=lambda i: (-frequencies[i], len(skills[i]), skills[i].lower()))
+        rank = [0] * len(skills)
+        for position, skill_id in enumerate(order):
+            rank[skill_id] = position
+
+        entries_by_view: Dict[Optional[str], List[Tuple[str, int]]] = {None: []}
+        for skill_id, skill in enumerate(skills):
+            words = _prefix_key(skill).split()
+            keys = [' '.join(words[i:]) for i in range(len(words))]
+            for view in [None] + sorted(categories[skill_id]):
+                entries_by_view.setdefault(view, []).extend((key, skill_id) for key in keys)
+
+        views = {
+            view: _PrefixView(view_entries, rank, self.top_k, self.short_prefix)
+            for view, view_entries in entries_by_view.items()
+        }
+        self._snapshot = _CompletionSnapshot(skills, frequencies, rank, views)
+        logger.info(f"Autocomplétion compétences: {len(skills)} compétences, {len(views) - 1} catégories")
+
+    def build_from_taxonomy(self, taxonomy_data: Dict[str, Dict[str, List[Dict[str, any]]]],
+                            extra_skills: Iterable[str] = ()):
+        self.build(
+            [(info['skill'], category)
+             for category, sub_categories in taxonomy_data.items()
+             for skills in sub_categories.values()
+             for info in skills] +
+            [(skill, None) for skill in extra_skills]
+        )
+
+    def complete(self, prefix: str, category: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, any]]:
+        """Suggestions pour un préfixe saisi, filtrées par catégorie si fournie"""
+        snapshot = self._snapshot
+        view = snapshot.views.get(category)
+        key = _prefix_key(prefix)
+        if view is None or not key:
+            return []
+        limit = min(limit or self.top_k, self.top_k)
+        return [
+            {'skill': snapshot.skills[skill_id], 'frequency': snapshot.frequencies[skill_id]}
+            for skill_id in view.complete(key, snapshot.rank, limit)
+        ]
+
+    def get_stats(self) -> Dict[str, any]:
+        snapshot = self._snapshot
+        return {'skills': len(snapshot.skills), 'categories': len(snapshot.views) - 1}
+
+
+# Instance globale
+skill_completer = SkillCompleter()
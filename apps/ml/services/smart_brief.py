@@ -3,11 +3,11 @@ Smart Brief - Structuration IA automatique des besoins clients
 """
 
 import re
-import spacy
-from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass
-from sklearn.feature_extraction.text import TfidfVectorizer
+from typing import Any, Dict, List, Optional, Tuple
+from dataclasses import dataclass, field
 import numpy as np
+from services.nlp_provider import nlp_provider
+from services.brief_tfidf import brief_term_extractor
 
 @dataclass
 class BriefAnalysis:
@@ -19,16 +19,10 @@ class BriefAnalysis:
     suggestions: List[str]
     structured_brief: Dict[str, any]
     complexity_level: str
+    distinctive_terms: List[str] = field(default_factory=list)  # plus forts poids TF-IDF du corpus
 
 class SmartBriefProcessor:
     def __init__(self):
-        # Chargement du modèle français (fallback simple si spacy indisponible)
-        self.nlp = None
-        try:
-            self.nlp = spacy.load("fr_core_news_sm")
-        except:
-            print("SpaCy FR model not available, using basic processing")
-
         # Mots-clés techniques par domaine
         self.tech_keywords = {
             'web_dev': ['react', 'vue', 'angular', 'node', 'php', 'laravel', 'symfony', 'api', 'rest', 'graphql'],
@@ -44,6 +38,11 @@ class SmartBriefProcessor:
             'délai', 'budget', 'livrables', 'critères'
         ]
 
+    @property
+    def nlp(self):
+        """Modèle français partagé, chargé à la première utilisation (None si indisponible)"""
+        return nlp_provider.get()
+
     def analyze_brief(self, brief_text: str) -> BriefAnalysis:
         """Analyse complète d'un brief client"""
 
@@ -62,6 +61,9 @@ class SmartBriefProcessor:
         # Extraction mots-clés techniques
         technical_keywords = self._extract_technical_keywords(cleaned_text)
 
+        # Termes distinctifs par rapport au corpus de briefs (vide sans modèle TF-IDF)
+        distinctive_terms = brief_term_extractor.top_terms(cleaned_text)
+
         # Génération de suggestions
         suggestions = self._generate_suggestions(
             structure_score, completeness_score, clarity_score, missing_elements
@@ -81,7 +83,8 @@ class SmartBriefProcessor:
             missing_elements=missing_elements,
             suggestions=suggestions,
             structured_brief=structured_brief,
-            complexity_level=complexity_level
+            complexity_level=complexity_level,
+            distinctive_terms=distinctive_terms
         )
 
     def _clean_text(self, text: str) -> str:
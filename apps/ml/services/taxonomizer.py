@@ -6,6 +6,8 @@ from pathlib import Path
 from dataclasses import dataclass
 import re
 from collections import defaultdict
+from services.data_reloader import file_version
+from services.data_snapshot import default_snapshot_path, load_compiled_taxonomy
 
 logger = logging.getLogger(__name__)
 
@@ -17,56 +19,125 @@ class TaxonomyResult:
     tags_std: List[str]
     confidence: float
 
+@dataclass(frozen=True)
+class TaxonomySnapshot:
+    """Jeu de données de taxonomie immuable, remplacé en bloc au rechargement"""
+    taxonomy_data: Dict[str, Dict[str, List[Dict[str, any]]]]
+    category_keywords: Dict[str, List[Dict[str, str]]]
+    version: str
+
+    @property
+    def category_count(self) -> int:
+        return len(self.taxonomy_data)
+
+    def iter_skills(self):
+        """Parcourt (catégorie, sous-catégorie, compétence, mots-clés) dans l'ordre du CSV"""
+        for category, sub_categories in self.taxonomy_data.items():
+            for sub_category, skills in sub_categories.items():
+                for skill_info in skills:
+                    yield category, sub_category, skill_info['skill'], skill_info['keywords']
+
+def parse_taxonomy_csv(taxonomy_file: Path) -> TaxonomySnapshot:
+    """Construit la taxonomie et l'index des mots-clés depuis le CSV"""
+    taxonomy_data = {}
+    category_keywords = defaultdict(list)
+    version = 'absent'
+
+    # Chargement de la taxonomie des compétences
+    if taxonomy_file.exists():
+        file_info = file_version(taxonomy_file)
+        version = file_info.checksum if file_info else 'unknown'
+        with open(taxonomy_file, 'r', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                category = row['category']
+                sub_category = row['sub_category']
+                skill = row['skill']
+                keywords = row.get('keywords', '').split(',')
+                
+                if category not in taxonomy_data:
+                    taxonomy_data[category] = {}
+                if sub_category not in taxonomy_data[category]:
+                    taxonomy_data[category][sub_category] = []
+                
+                taxonomy_data[category][sub_category].append({
+                    'skill': skill,
+                    'keywords': [k.strip().lower() for k in keywords if k.strip()]
+                })
+                
+                # Index pour la recherche par mots-clés
+                for keyword in keywords:
+                    if keyword.strip():
+                        category_keywords[keyword.strip().lower()].append({
+                            'category': category,
+                            'sub_category': sub_category,
+                            'skill': skill
+                        })
+
+    return TaxonomySnapshot(
+        taxonomy_data=taxonomy_data,
+        category_keywords=dict(category_keywords),
+        version=version
+    )
+
 class Taxonomizer:
-    def __init__(self, data_path: str = "/infra/data"):
+    def __init__(self, data_path: str = "/infra/data", snapshot_path: Optional[str] = None):
         self.data_path = Path(data_path)
-        self.taxonomy_data = {}
+        self.taxonomy_file = self.data_path / "taxonomy_skills_fr.csv"
+        self.snapshot_path = Path(snapshot_path) if snapshot_path else default_snapshot_path(self.data_path)
         self.skills_mapping = {}
-        self.category_keywords = defaultdict(list)
+        self._snapshot = TaxonomySnapshot(taxonomy_data={}, category_keywords={}, version='empty')
         self._load_taxonomy_data()
 
+    @property
+    def taxonomy_data(self) -> Dict[str, Dict[str, List[Dict[str, any]]]]:
+        return self._snapshot.taxonomy_data
+
+    @property
+    def category_keywords(self) -> Dict[str, List[Dict[str, str]]]:
+        return self._snapshot.category_keywords
+
+    @property
+    def data_version(self) -> str:
+        """Version (checksum) des données de taxonomie actives"""
+        return self._snapshot.version
+
     def _load_taxonomy_data(self):
         """Charge les données de taxonomie depuis les fichiers CSV"""
         try:
-            # Chargement de la taxonomie des compétences
-            taxonomy_file = self.data_path / "taxonomy_skills_fr.csv"
-            if taxonomy_file.exists():
-                with open(taxonomy_file, 'r', encoding='utf-8') as f:
-                    reader = csv.DictReader(f)
-                    for row in reader:
-                        category = row['category']
-                        sub_category = row['sub_category']
-                        skill = row['skill']
-                        keywords = row.get('keywords', '').split(',')
-                        
-                        if category not in self.taxonomy_data:
-                            self.taxonomy_data[category] = {}
-                        if sub_category not in self.taxonomy_data[category]:
-                            self.taxonomy_data[category][sub_category] = []
-                        
-                        self.taxonomy_data[category][sub_category].append({
-                            'skill': skill,
-                            'keywords': [k.strip().lower() for k in keywords if k.strip()]
-                        })
-                        
-                        # Index pour la recherche par mots-clés
-                        for keyword in keywords:
-                            if keyword.strip():
-                                self.category_keywords[keyword.strip().lower()].append({
-                                    'category': category,
-                                    'sub_category': sub_category,
-                                    'skill': skill
-                                })
-            
-            logger.info(f"Taxonomie chargée: {len(self.taxonomy_data)} catégories")
+            self._snapshot = self._build_snapshot()
+            logger.info(f"Taxonomie chargée: {self._snapshot.category_count} catégories")
             
         except Exception as e:
             logger.error(f"Erreur lors du chargement de la taxonomie: {e}")
             self._init_default_taxonomy()
 
+    def reload(self) -> bool:
+        """Reconstruit la taxonomie puis la publie en une seule affectation.
+
+        Les requêtes en cours conservent la version qu'elles ont lue ; en cas
+        d'erreur la version active reste en place.
+        """
+        try:
+            snapshot = self._build_snapshot()
+        except Exception as e:
+            logger.error(f"Erreur lors du rechargement de la taxonomie: {e}")
+            return False
+
+        self._snapshot = snapshot
+        logger.info(f"Taxonomie rechargée: {snapshot.category_count} catégories (version {snapshot.version})")
+        return True
+
+    def _build_snapshot(self) -> TaxonomySnapshot:
+        """Ouvre le snapshot binaire s'il est à jour, sinon parse le CSV"""
+        compiled = load_compiled_taxonomy(self.snapshot_path, self.taxonomy_file)
+        if compiled is not None:
+            return compiled
+        return parse_taxonomy_csv(self.taxonomy_file)
+
     def _init_default_taxonomy(self):
         """Initialise une taxonomie par défaut"""
-        self.taxonomy_data = {
+        taxonomy_data = {
             "développement": {
                 "web": [
                     {"skill": "React", "keywords": ["react", "reactjs", "jsx"]},
@@ -127,9 +198,12 @@ class Taxonomizer:
                 ]
             }
         }
+        self._snapshot = TaxonomySnapshot(taxonomy_data=taxonomy_data, category_keywords={}, version='default')
 
     def classify(self, text: str, keywords: List[str] = None) -> TaxonomyResult:
         """Classifie un texte selon la taxonomie"""
+        # Une seule lecture du snapshot : cohérent même pendant un rechargement
+        snapshot = self._snapshot
         text_lower = text.lower()
         all_keywords = keywords or []
         
@@ -144,8 +218,8 @@ class Taxonomizer:
         
         for keyword in all_keywords:
             keyword_lower = keyword.lower()
-            if keyword_lower in self.category_keywords:
-                for match in self.category_keywords[keyword_lower]:
+            if keyword_lower in snapshot.category_keywords:
+                for match in snapshot.category_keywords[keyword_lower]:
                     category = match['category']
                     sub_category = match['sub_category']
                     skill = match['skill']
@@ -158,20 +232,15 @@ class Taxonomizer:
                         matched_tags.append(keyword)
         
         # Recherche directe dans le texte
-        for category, sub_categories in self.taxonomy_data.items():
-            for sub_category, skills in sub_categories.items():
-                for skill_info in skills:
-                    skill_name = skill_info['skill']
-                    skill_keywords = skill_info['keywords']
-                    
-                    # Vérification de la présence des mots-clés dans le texte
-                    for keyword in skill_keywords:
-                        if keyword in text_lower:
-                            category_scores[category][sub_category] += 0.8
-                            if skill_name not in matched_skills[(category, sub_category)]:
-                                matched_skills[(category, sub_category)].append(skill_name)
-                            if keyword not in matched_tags:
-                                matched_tags.append(keyword)
+        for category, sub_category, skill_name, skill_keywords in snapshot.iter_skills():
+            # Vérification de la présence des mots-clés dans le texte
+            for keyword in skill_keywords:
+                if keyword in text_lower:
+                    category_scores[category][sub_category] += 0.8
+                    if skill_name not in matched_skills[(category, sub_category)]:
+                        matched_skills[(category, sub_category)].append(skill_name)
+                    if keyword not in matched_tags:
+                        matched_tags.append(keyword)
         
         # Sélection de la meilleure catégorie/sous-catégorie
         best_category = None
@@ -231,9 +300,11 @@ class Taxonomizer:
             'skill_alternatives': {}
         }
         
+        taxonomy_data = self.taxonomy_data
+
         # Recherche des compétences manquantes dans la même catégorie
-        if current_category in self.taxonomy_data:
-            for sub_category, skills in self.taxonomy_data[current_category].items():
+        if current_category in taxonomy_data:
+            for sub_category, skills in taxonomy_data[current_category].items():
                 for skill_info in skills:
                     skill_name = skill_info['skill']
                     if skill_name not in current_skills:
@@ -244,7 +315,7 @@ class Taxonomizer:
                         })
         
         # Catégories liées
-        for category in self.taxonomy_data.keys():
+        for category in taxonomy_data.keys():
             if category != current_category:
                 suggestions['related_categories'].append(category)
         
@@ -252,14 +323,17 @@ class Taxonomizer:
 
     def get_category_stats(self) -> Dict[str, any]:
         """Retourne les statistiques de la taxonomie"""
+        snapshot = self._snapshot
+        taxonomy_data = snapshot.taxonomy_data
         stats = {
-            'total_categories': len(self.taxonomy_data),
+            'total_categories': len(taxonomy_data),
+            'data_version': snapshot.version,
             'total_subcategories': 0,
             'total_skills': 0,
             'categories': {}
         }
         
-        for category, sub_categories in self.taxonomy_data.items():
+        for category, sub_categories in taxonomy_data.items():
             sub_count = len(sub_categories)
             skill_count = sum(len(skills) for skills in sub_categories.values())
             
@@ -0,0 +1,125 @@
+"""
+Moteur de templates précompilés
+Les templates (réécriture, génération d'annonces) sont lus depuis des fichiers
+JSON versionnés puis compilés une fois : chaque gabarit devient une liste de
+segments littéraux et d'emplacements nommés. Le rendu remplit les
+emplacements et concatène par un seul ''.join, sans analyse du format ni
+parcours des dictionnaires de templates à chaque requête.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from string import Formatter
+from types import MappingProxyType
+from typing import Any, Dict, FrozenSet, Iterable, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+TEMPLATES_DIR = Path(os.getenv("ML_TEMPLATES_DIR", str(Path(__file__).resolve().parent.parent / "templates")))
+
+
+class TemplateError(ValueError):
+    """Template invalide (syntaxe, champ inconnu, fichier mal formé)"""
+
+
+class CompiledTemplate:
+    """Gabarit « texte {champ} texte » compilé en segments.
+
+    Seuls les champs nommés simples sont acceptés (ni spécification de format
+    ni attribut) : les valeurs sont des chaînes déjà prêtes.
+    """
+
+    __slots__ = ('source', 'parts', 'slots', 'fields', 'text')
+
+    def __init__(self, source: str, allowed_fields: Optional[Iterable[str]] = None):
+        parts, slots = [], []
+        try:
+            parsed = list(Formatter().parse(source))
+        except ValueError as e:
+            raise TemplateError(f"Template invalide {source[:40]!r}: {e}") from e
+        for literal, field, format_spec, conversion in parsed:
+            if literal:
+                parts.append(literal)
+            if field is None:
+                continue
+            if not field.isidentifier() or format_spec or conversion:
+                raise TemplateError(f"Champ non supporté {{{field}}} dans {source[:40]!r}")
+            slots.append((len(parts), field))
+            parts.append('')
+
+        self.source = source
+        self.parts = tuple(parts)
+        self.slots = tuple(slots)
+        self.fields: FrozenSet[str] = frozenset(field for _, field in slots)
+        # Gabarit sans champ : le rendu est une constante
+        self.text = ''.join(parts) if not slots else None
+
+        if allowed_fields is not None:
+            unknown = self.fields - set(allowed_fields)
+            if unknown:
+                raise TemplateError(f"Champs inconnus {sorted(unknown)} dans {source[:40]!r}")
+
+    def render(self, values: Mapping[str, str]) -> str:
+        if self.text is not None:
+            return self.text
+        parts = list(self.parts)
+        for index, field in self.slots:
+            parts[index] = values[field]
+        return ''.join(parts)
+
+    def __repr__(self) -> str:
+        return f"CompiledTemplate({self.source[:40]!r})"
+
+
+@dataclass(frozen=True)
+class TemplateFile:
+    """Contenu brut d'un fichier de templates et sa version"""
+    path: Path
+    version: str
+    checksum: str
+    data: Dict[str, Any]
+
+    @property
+    def tag(self) -> str:
+        """Version déclarée + empreinte du contenu (change à chaque modification)"""
+        return f"{self.version}+{self.checksum}"
+
+
+def freeze(value: Any) -> Any:
+    """Copie en lecture seule d'une valeur JSON (dict -> MappingProxyType, liste -> tuple).
+
+    Pour les résultats mis en cache et partagés entre réponses : une
+    modification par un appelant lève une erreur au lieu de corrompre le cache.
+    """
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def template_path(name: str, templates_dir: Optional[Path] = None) -> Path:
+    return Path(templates_dir or TEMPLATES_DIR) / f"{name}.json"
+
+
+def load_template_file(path: Path) -> TemplateFile:
+    """Lit un fichier de templates JSON ; le champ "version" est obligatoire"""
+    path = Path(path)
+    raw = path.read_bytes()
+    try:
+        data = json.loads(raw.decode('utf-8'))
+    except ValueError as e:
+        raise TemplateError(f"{path}: JSON invalide ({e})") from e
+    if not isinstance(data, dict) or 'version' not in data:
+        raise TemplateError(f"{path}: champ 'version' manquant")
+
+    return TemplateFile(
+        path=path,
+        version=str(data['version']),
+        checksum=hashlib.sha1(raw).hexdigest()[:12],
+        data=data
+    )
@@ -1,183 +1,166 @@
-
 import logging
-from typing import Dict, List, Optional
+import threading
+from collections import OrderedDict
+from typing import Dict, FrozenSet, List, Mapping, Optional, Tuple
 from dataclasses import dataclass
+from pathlib import Path
 import re
 
+from services.template_engine import (
+    CompiledTemplate, TemplateError, TemplateFile, freeze, load_template_file, template_path
+)
+
 logger = logging.getLogger(__name__)
 
+TITLE_FIELDS = ('category', 'purpose', 'type_site', 'type_design', 'type_marketing', 'platform')
+
+COMPLEXITY_MULTIPLIERS = {
+    'simple': 0.7,
+    'moyenne': 1.0,
+    'complexe': 1.5
+}
+
 @dataclass
 class RewrittenProject:
     title_std: str
     summary_std: str
-    acceptance_criteria: List[str]
-    tasks_std: List[Dict[str, any]]
-    deliverables_std: List[Dict[str, any]]
+    acceptance_criteria: Tuple[str, ...]
+    tasks_std: Tuple[Mapping[str, any], ...]
+    deliverables_std: Tuple[Mapping[str, any], ...]
     rewrite_version: str
 
+@dataclass(frozen=True)
+class CompiledRewriteTemplate:
+    """Template de catégorie prêt au rendu"""
+    title: CompiledTemplate
+    summary: CompiledTemplate
+    acceptance_criteria: Tuple[str, ...]
+    tasks: Dict[str, Tuple[Dict[str, any], ...]]  # estimations par niveau de complexité
+    deliverables: Tuple[Dict[str, any], ...]
+
+@dataclass(frozen=True)
+class _RewriteTemplates:
+    file: TemplateFile
+    aliases: Dict[str, str]
+    skill_criteria: Tuple[Tuple[FrozenSet[str], str], ...]
+    templates: Dict[str, CompiledRewriteTemplate]
+
+@dataclass(frozen=True)
+class RewriteSkeleton:
+    """Parties d'une réécriture indépendantes du texte du brief.
+
+    Partagées entre toutes les réponses d'une même clé, donc gelées
+    (tuples et MappingProxyType, voir template_engine.freeze).
+    """
+    acceptance_criteria: Tuple[str, ...]
+    tasks: Tuple[Mapping[str, any], ...]
+    deliverables: Tuple[Mapping[str, any], ...]
+
 class TemplateRewriter:
-    def __init__(self):
-        self.version = "1.0.0"
-        self._init_templates()
-
-    def _init_templates(self):
-        """Initialise les templates par catégorie"""
-        self.templates = {
-            'web_development': {
-                'title_pattern': 'Développement {type_site} - {purpose}',
-                'summary_structure': [
-                    'Vision et objectifs du projet web',
-                    'Technologies et contraintes techniques',
-                    'Fonctionnalités principales attendues',
-                    'Design et expérience utilisateur',
-                    'Hébergement et mise en production'
-                ],
-                'acceptance_criteria_base': [
-                    'Site web fonctionnel et responsive',
-                    'Code propre et documenté',
-                    'Tests unitaires et d\'intégration',
-                    'Performance optimisée (< 3s de chargement)',
-                    'Compatible tous navigateurs récents'
-                ],
-                'tasks_template': [
-                    {'name': 'Analyse et conception', 'estimated_hours': 8},
-                    {'name': 'Développement frontend', 'estimated_hours': 24},
-                    {'name': 'Développement backend', 'estimated_hours': 16},
-                    {'name': 'Intégration et tests', 'estimated_hours': 8},
-                    {'name': 'Déploiement et documentation', 'estimated_hours': 4}
-                ],
-                'deliverables_template': [
-                    {'name': 'Code source complet', 'format': 'Repository Git'},
-                    {'name': 'Documentation technique', 'format': 'Markdown/PDF'},
-                    {'name': 'Guide utilisateur', 'format': 'PDF'},
-                    {'name': 'Application déployée', 'format': 'URL de production'}
-                ]
-            },
-            
-            'mobile_development': {
-                'title_pattern': 'Application Mobile {platform} - {purpose}',
-                'summary_structure': [
-                    'Vision et objectifs de l\'application mobile',
-                    'Plateformes cibles et technologies',
-                    'Fonctionnalités et expérience utilisateur',
-                    'Performance et optimisation requises',
-                    'Publication et distribution'
-                ],
-                'acceptance_criteria_base': [
-                    'Application native/cross-platform fonctionnelle',
-                    'Design responsive adapté à tous écrans',
-                    'Performance optimale (< 3s de chargement)',
-                    'Publication sur stores réussie',
-                    'Tests sur appareils multiples validés'
-                ],
-                'tasks_template': [
-                    {'name': 'Conception UX/UI', 'estimated_hours': 12},
-                    {'name': 'Développement natif/hybride', 'estimated_hours': 32},
-                    {'name': 'Intégration API et services', 'estimated_hours': 16},
-                    {'name': 'Tests et optimisation', 'estimated_hours': 12},
-                    {'name': 'Publication stores', 'estimated_hours': 8}
-                ],
-                'deliverables_template': [
-                    {'name': 'Application mobile complète', 'format': 'APK/IPA'},
-                    {'name': 'Code source', 'format': 'Repository Git'},
-                    {'name': 'Documentation technique', 'format': 'Markdown'},
-                    {'name': 'Publication sur stores', 'format': 'Liens stores'}
-                ]
-            },
+    """Réécrit les projets à partir des templates de templates/rewriter.json.
 
-            'design': {
-                'title_pattern': 'Design {type_design} - {purpose}',
-                'summary_structure': [
-                    'Brief créatif et objectifs visuels',
-                    'Identité de marque et guidelines',
-                    'Supports et formats requis',
-                    'Style et inspirations',
-                    'Livraison et utilisation'
-                ],
-                'acceptance_criteria_base': [
-                    'Designs conformes au brief créatif',
-                    'Fichiers sources modifiables fournis',
-                    'Formats d\'export optimisés',
-                    'Charte graphique respectée',
-                    'Validation client obtenue'
-                ],
-                'tasks_template': [
-                    {'name': 'Recherche et moodboard', 'estimated_hours': 4},
-                    {'name': 'Concepts et esquisses', 'estimated_hours': 8},
-                    {'name': 'Réalisation designs finaux', 'estimated_hours': 16},
-                    {'name': 'Déclinaisons et exports', 'estimated_hours': 6},
-                    {'name': 'Présentation et ajustements', 'estimated_hours': 4}
-                ],
-                'deliverables_template': [
-                    {'name': 'Designs finaux HD', 'format': 'PNG/JPG/SVG'},
-                    {'name': 'Fichiers sources', 'format': 'PSD/AI/Figma'},
-                    {'name': 'Charte graphique', 'format': 'PDF'},
-                    {'name': 'Déclinaisons formats', 'format': 'Archive ZIP'}
-                ]
-            },
+    Le fichier est compilé au chargement : le classement des sections du
+    résumé, les textes fixes et les estimations par complexité sont résolus
+    une fois ; une réécriture ne fait plus que remplir les emplacements
+    variables. Un rechargement publie les nouveaux templates par une seule
+    affectation.
 
-            'marketing': {
-                'title_pattern': 'Stratégie Marketing {type_marketing} - {purpose}',
-                'summary_structure': [
-                    'Objectifs marketing et KPIs',
-                    'Cible et personas',
-                    'Canaux et stratégies',
-                    'Contenus et planning',
-                    'Mesure et optimisation'
-                ],
-                'acceptance_criteria_base': [
-                    'Stratégie claire et actionnable',
-                    'Contenus créés et programmés',
-                    'Campagnes configurées et lancées',
-                    'Reporting et suivi mis en place',
-                    'Objectifs mesurables atteints'
-                ],
-                'tasks_template': [
-                    {'name': 'Audit et analyse concurrentielle', 'estimated_hours': 8},
-                    {'name': 'Définition stratégie et personas', 'estimated_hours': 6},
-                    {'name': 'Création contenus et campagnes', 'estimated_hours': 20},
-                    {'name': 'Mise en place et lancement', 'estimated_hours': 8},
-                    {'name': 'Suivi et optimisation', 'estimated_hours': 8}
-                ],
-                'deliverables_template': [
-                    {'name': 'Stratégie marketing', 'format': 'Document PDF'},
-                    {'name': 'Personas et ciblage', 'format': 'Présentation'},
-                    {'name': 'Contenus créés', 'format': 'Archive médias'},
-                    {'name': 'Reporting mensuel', 'format': 'Dashboard/PDF'}
-                ]
-            },
+    Critères d'acceptation, tâches et livrables ne dépendent que du template,
+    de la complexité et des compétences : ils forment un squelette mis en
+    cache (LRU) et partagé par les réponses au lieu d'être recopiés. Seuls le
+    titre et le résumé sont calculés à chaque réécriture.
+    """
+
+    def __init__(self, templates_dir: Optional[Path] = None, skeleton_cache_size: int = 1024):
+        self.template_file = template_path("rewriter", templates_dir)
+        self._compiled = self._compile(load_template_file(self.template_file))
+        self.skeleton_cache_size = skeleton_cache_size
+        self._skeletons: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.skeleton_hits = 0
+        self.skeleton_misses = 0
+
+    @property
+    def version(self) -> str:
+        return self._compiled.file.version
 
-            'default': {
-                'title_pattern': 'Projet {category} - {purpose}',
-                'summary_structure': [
-                    'Contexte et objectifs du projet',
-                    'Périmètre et contraintes',
-                    'Livrables attendus',
-                    'Critères de réussite',
-                    'Planning et modalités'
-                ],
-                'acceptance_criteria_base': [
-                    'Livrables conformes au cahier des charges',
-                    'Qualité professionnelle respectée',
-                    'Délais et budget respectés',
-                    'Communication régulière maintenue',
-                    'Satisfaction client validée'
-                ],
-                'tasks_template': [
-                    {'name': 'Analyse des besoins', 'estimated_hours': 4},
-                    {'name': 'Conception et planification', 'estimated_hours': 8},
-                    {'name': 'Réalisation principale', 'estimated_hours': 24},
-                    {'name': 'Tests et validations', 'estimated_hours': 6},
-                    {'name': 'Livraison et documentation', 'estimated_hours': 4}
-                ],
-                'deliverables_template': [
-                    {'name': 'Livrable principal', 'format': 'À définir'},
-                    {'name': 'Documentation', 'format': 'PDF'},
-                    {'name': 'Code source/fichiers', 'format': 'Archive'},
-                    {'name': 'Guide d\'utilisation', 'format': 'Document'}
-                ]
-            }
+    @property
+    def templates(self) -> Dict[str, Dict]:
+        return self._compiled.file.data['templates']
+
+    def reload(self) -> bool:
+        """Recharge et recompile le fichier de templates (False si invalide)"""
+        try:
+            compiled = self._compile(load_template_file(self.template_file))
+        except (OSError, TemplateError, KeyError, TypeError) as e:
+            logger.error(f"Templates de réécriture non rechargés ({self.template_file}): {e}")
+            return False
+        with self._lock:
+            self._compiled = compiled
+            self._skeletons.clear()
+        logger.info(f"Templates de réécriture chargés: version {compiled.file.tag}")
+        return True
+
+    def _compile(self, template_file: TemplateFile) -> _RewriteTemplates:
+        data = template_file.data
+        templates = {
+            key: self._compile_template(template, data['summary_texts'])
+            for key, template in data['templates'].items()
         }
+        if 'default' not in templates:
+            raise TemplateError(f"{template_file.path}: template 'default' manquant")
+        unknown = set(data['category_aliases'].values()) - set(templates)
+        if unknown:
+            raise TemplateError(f"{template_file.path}: alias vers des templates inconnus {sorted(unknown)}")
+
+        return _RewriteTemplates(
+            file=template_file,
+            aliases={alias.lower(): key for alias, key in data['category_aliases'].items()},
+            skill_criteria=tuple(
+                (frozenset(skill.lower() for skill in rule['skills']), rule['criterion'])
+                for rule in data.get('skill_criteria', [])
+            ),
+            templates=templates
+        )
+
+    @staticmethod
+    def _compile_template(template: Dict, summary_texts: Dict[str, str]) -> CompiledRewriteTemplate:
+        """Compile un template de catégorie.
+
+        Chaque section du résumé devient soit un texte fixe, soit un
+        emplacement rempli depuis la description (objectifs, technologies,
+        fonctionnalités).
+        """
+        sections = []
+        for section in template.get('summary_structure', []):
+            lower = section.lower()
+            if 'objectifs' in lower:
+                content = '{objectives}'
+            elif 'technologies' in lower or 'techniques' in lower:
+                content = '{tech_requirements}'
+            elif 'fonctionnalités' in lower:
+                content = '{features}'
+            elif 'design' in lower:
+                content = _escape(summary_texts['design'])
+            elif 'planning' in lower or 'modalités' in lower:
+                content = _escape(summary_texts['planning'])
+            else:
+                content = _escape(summary_texts['default'])
+            sections.append(f"**{_escape(section)}** : {content}")
+
+        base_tasks = template.get('tasks_template', [])
+        return CompiledRewriteTemplate(
+            title=CompiledTemplate(template.get('title_pattern', 'Projet {category} - {purpose}'), TITLE_FIELDS),
+            summary=CompiledTemplate('\n\n'.join(sections)),
+            acceptance_criteria=tuple(template.get('acceptance_criteria_base', [])),
+            tasks={
+                complexity: tuple(
+                    {**task, 'estimated_hours': int(task['estimated_hours'] * multiplier)} for task in base_tasks
+                )
+                for complexity, multiplier in COMPLEXITY_MULTIPLIERS.items()
+            },
+            deliverables=tuple(template.get('deliverables_template', []))
+        )
 
     def rewrite_project(self, 
                        original_title: str, 
@@ -186,10 +169,11 @@ class TemplateRewriter:
                        sub_category: str = None,
                        skills: List[str] = None) -> RewrittenProject:
         """Réécrit un projet selon les templates de qualité"""
+        compiled = self._compiled
         
         # Sélection du template approprié
-        template_key = self._select_template(category, sub_category)
-        template = self.templates.get(template_key, self.templates['default'])
+        template_key = self._select_template(category, sub_category, compiled)
+        template = compiled.templates.get(template_key, compiled.templates['default'])
         
         # Extraction des informations du projet original
         project_info = self._extract_project_info(original_title, original_description)
@@ -200,45 +184,58 @@ class TemplateRewriter:
         # Génération du résumé structuré
         summary_std = self._generate_summary(template, project_info, original_description)
         
-        # Génération des critères d'acceptation
-        acceptance_criteria = self._generate_acceptance_criteria(template, project_info, skills)
-        
-        # Génération des tâches
-        tasks_std = self._generate_tasks(template, project_info)
-        
-        # Génération des livrables
-        deliverables_std = self._generate_deliverables(template, project_info)
+        # Critères d'acceptation, tâches et livrables (squelette partagé)
+        skeleton = self._get_skeleton(compiled, template_key, template, project_info, skills)
         
         return RewrittenProject(
             title_std=title_std,
             summary_std=summary_std,
-            acceptance_criteria=acceptance_criteria,
-            tasks_std=tasks_std,
-            deliverables_std=deliverables_std,
-            rewrite_version=self.version
+            acceptance_criteria=skeleton.acceptance_criteria,
+            tasks_std=skeleton.tasks,
+            deliverables_std=skeleton.deliverables,
+            rewrite_version=compiled.file.version
         )
 
-    def _select_template(self, category: str, sub_category: str = None) -> str:
-        """Sélectionne le template approprié"""
-        category_lower = category.lower()
-        
-        template_mapping = {
-            'développement': 'web_development',
-            'dev': 'web_development',
-            'web': 'web_development',
-            'mobile': 'mobile_development',
-            'app': 'mobile_development',
-            'design': 'design',
-            'graphisme': 'design',
-            'ui': 'design',
-            'ux': 'design',
-            'marketing': 'marketing',
-            'communication': 'marketing',
-            'seo': 'marketing',
-            'publicité': 'marketing'
-        }
-        
-        return template_mapping.get(category_lower, 'default')
+    def _get_skeleton(self, compiled: _RewriteTemplates, template_key: str, template: CompiledRewriteTemplate,
+                      project_info: Dict, skills: List[str] = None) -> RewriteSkeleton:
+        """Squelette de la réécriture, construit une fois par clé.
+
+        La signature des compétences est l'ensemble des règles de critères
+        qu'elles déclenchent : deux listes de compétences différentes mais
+        équivalentes pour le template partagent le même squelette.
+        """
+        skills_lower = {skill.lower() for skill in skills or []}
+        skills_signature = tuple(
+            index for index, (rule_skills, _) in enumerate(compiled.skill_criteria)
+            if not rule_skills.isdisjoint(skills_lower)
+        )
+        complexity = project_info['complexity'] if project_info['complexity'] in template.tasks else 'moyenne'
+        key = (compiled.file.checksum, template_key, complexity, skills_signature)
+        
+        with self._lock:
+            skeleton = self._skeletons.get(key)
+            if skeleton is not None:
+                self._skeletons.move_to_end(key)
+                self.skeleton_hits += 1
+                return skeleton
+            self.skeleton_misses += 1
+        
+        skeleton = RewriteSkeleton(
+            acceptance_criteria=freeze(self._generate_acceptance_criteria(template, compiled, skills_signature)),
+            tasks=freeze(self._generate_tasks(template, complexity)),
+            deliverables=freeze(self._generate_deliverables(template))
+        )
+        with self._lock:
+            self._skeletons[key] = skeleton
+            if len(self._skeletons) > self.skeleton_cache_size:
+                self._skeletons.popitem(last=False)
+        return skeleton
+
+    def _select_template(self, category: str, sub_category: str = None,
+                         compiled: Optional[_RewriteTemplates] = None) -> str:
+        """Sélectionne le template approprié (alias de catégories du fichier de templates)"""
+        compiled = compiled or self._compiled
+        return compiled.aliases.get(category.lower(), 'default')
 
     def _extract_project_info(self, title: str, description: str) -> Dict[str, any]:
         """Extrait les informations clés du projet"""
@@ -284,46 +281,25 @@ class TemplateRewriter:
         
         return info
 
-    def _generate_title(self, template: Dict, project_info: Dict, category: str) -> str:
+    def _generate_title(self, template: CompiledRewriteTemplate, project_info: Dict, category: str) -> str:
         """Génère un titre standardisé"""
-        title_pattern = template.get('title_pattern', 'Projet {category} - {purpose}')
-        
-        # Remplacement des variables
-        title = title_pattern.format(
-            category=category.title(),
-            purpose=project_info['purpose'],
-            type_site=project_info['type_site'],
-            type_design=project_info['type_design'],
-            type_marketing=project_info['type_marketing'],
-            platform=project_info['platform']
-        )
-        
-        return title
+        return template.title.render({**project_info, 'category': category.title()})
 
-    def _generate_summary(self, template: Dict, project_info: Dict, original_description: str) -> str:
+    def _generate_summary(self, template: CompiledRewriteTemplate, project_info: Dict, original_description: str) -> str:
         """Génère un résumé structuré"""
-        structure = template.get('summary_structure', [])
-        
-        # Extraction d'informations de la description originale
+        fields = template.summary.fields
         description_lower = original_description.lower()
         
-        summary_parts = []
+        # Seules les sections présentes dans le template sont extraites
+        values = {}
+        if 'objectives' in fields:
+            values['objectives'] = self._extract_objectives(description_lower)
+        if 'tech_requirements' in fields:
+            values['tech_requirements'] = self._extract_tech_requirements(description_lower)
+        if 'features' in fields:
+            values['features'] = self._extract_features(description_lower)
         
-        for section in structure:
-            if 'objectifs' in section.lower():
-                summary_parts.append(f"**{section}** : {self._extract_objectives(description_lower)}")
-            elif 'technologies' in section.lower() or 'techniques' in section.lower():
-                summary_parts.append(f"**{section}** : {self._extract_tech_requirements(description_lower)}")
-            elif 'fonctionnalités' in section.lower():
-                summary_parts.append(f"**{section}** : {self._extract_features(description_lower)}")
-            elif 'design' in section.lower():
-                summary_parts.append(f"**{section}** : Interface moderne et intuitive, expérience utilisateur optimisée")
-            elif 'planning' in section.lower() or 'modalités' in section.lower():
-                summary_parts.append(f"**{section}** : Développement agile avec livraisons incrementales")
-            else:
-                summary_parts.append(f"**{section}** : À définir selon vos besoins spécifiques")
-        
-        return '\n\n'.join(summary_parts)
+        return template.summary.render(values)
 
     def _extract_objectives(self, description: str) -> str:
         """Extrait les objectifs de la description"""
@@ -385,56 +361,28 @@ class TemplateRewriter:
         else:
             return "Fonctionnalités essentielles selon le cahier des charges"
 
-    def _generate_acceptance_criteria(self, template: Dict, project_info: Dict, skills: List[str] = None) -> List[str]:
-        """Génère les critères d'acceptation SMART"""
-        base_criteria = template.get('acceptance_criteria_base', [])
-        
-        # Critères spécifiques selon les compétences
-        specific_criteria = []
-        skills = skills or []
-        
-        if any(skill.lower() in ['react', 'vue', 'angular'] for skill in skills):
-            specific_criteria.append('Interface utilisateur moderne et interactive')
-        
-        if any(skill.lower() in ['seo', 'référencement'] for skill in skills):
-            specific_criteria.append('Optimisation SEO complète et mesurable')
-        
-        if any(skill.lower() in ['security', 'sécurité'] for skill in skills):
-            specific_criteria.append('Sécurité renforcée et conformité RGPD')
-        
-        return base_criteria + specific_criteria
+    def _generate_acceptance_criteria(self, template: CompiledRewriteTemplate, compiled: _RewriteTemplates,
+                                      skills_signature: Tuple[int, ...]) -> List[str]:
+        """Génère les critères d'acceptation SMART (base du template + règles déclenchées par les compétences)"""
+        return list(template.acceptance_criteria) + [compiled.skill_criteria[index][1] for index in skills_signature]
 
-    def _generate_tasks(self, template: Dict, project_info: Dict) -> List[Dict[str, any]]:
-        """Génère les tâches avec estimations"""
-        base_tasks = template.get('tasks_template', [])
-        
-        # Ajustement des estimations selon la complexité
-        complexity_multiplier = {
-            'simple': 0.7,
-            'moyenne': 1.0,
-            'complexe': 1.5
-        }
-        
-        multiplier = complexity_multiplier.get(project_info['complexity'], 1.0)
-        
-        adjusted_tasks = []
-        for task in base_tasks:
-            adjusted_task = task.copy()
-            adjusted_task['estimated_hours'] = int(task['estimated_hours'] * multiplier)
-            adjusted_tasks.append(adjusted_task)
-        
-        return adjusted_tasks
+    def _generate_tasks(self, template: CompiledRewriteTemplate, complexity: str) -> List[Dict[str, any]]:
+        """Génère les tâches avec estimations (précalculées par niveau de complexité)"""
+        return list(template.tasks[complexity])
 
-    def _generate_deliverables(self, template: Dict, project_info: Dict) -> List[Dict[str, any]]:
+    def _generate_deliverables(self, template: CompiledRewriteTemplate) -> List[Dict[str, any]]:
         """Génère les livrables attendus"""
-        return template.get('deliverables_template', [])
+        return list(template.deliverables)
 
     def get_rewrite_stats(self) -> Dict[str, any]:
         """Retourne les statistiques de réécriture"""
+        compiled = self._compiled
         return {
-            'version': self.version,
-            'available_templates': list(self.templates.keys()),
-            'template_count': len(self.templates),
+            'version': compiled.file.version,
+            'template_version': compiled.file.tag,
+            'available_templates': list(compiled.templates.keys()),
+            'template_count': len(compiled.templates),
+            'skeleton_cache': self.get_skeleton_stats(),
             'categories_supported': [
                 'développement web',
                 'développement mobile',
@@ -443,3 +391,15 @@ class TemplateRewriter:
                 'services généraux'
             ]
         }
+
+    def get_skeleton_stats(self) -> Dict[str, any]:
+        lookups = self.skeleton_hits + self.skeleton_misses
+        return {
+            'entries': len(self._skeletons),
+            'hit_rate': round(self.skeleton_hits / lookups, 3) if lookups else 0.0
+        }
+
+
+def _escape(text: str) -> str:
+    """Texte littéral inséré dans un gabarit"""
+    return text.replace('{', '{{').replace('}', '}}')
@@ -41,6 +41,29 @@ class TextNormalizer:
             r'(?:budget\s+serré|petit\s+budget)',
         ]
 
+        # Mots vides français
+        self.stop_words = {
+            'le', 'la', 'les', 'un', 'une', 'des', 'du', 'de', 'et', 'ou', 'mais',
+            'car', 'si', 'ce', 'se', 'que', 'qui', 'quoi', 'dont', 'où', 'quand',
+            'comment', 'pourquoi', 'je', 'tu', 'il', 'elle', 'nous', 'vous', 'ils',
+            'elles', 'mon', 'ma', 'mes', 'ton', 'ta', 'tes', 'son', 'sa', 'ses',
+            'notre', 'nos', 'votre', 'vos', 'leur', 'leurs', 'dans', 'sur', 'avec',
+            'par', 'pour', 'sans', 'sous', 'vers', 'chez', 'contre', 'entre',
+            'pendant', 'avant', 'après', 'depuis', 'jusqu', 'avoir', 'être',
+            'faire', 'aller', 'venir', 'voir', 'savoir', 'pouvoir', 'vouloir',
+            'devoir', 'falloir', 'très', 'plus', 'moins', 'bien', 'mal', 'beaucoup'
+        }
+
+        # Motif -> contrainte, dans l'ordre de restitution
+        self.constraint_mapping = {
+            r'(?:sur\s+site|en\s+présentiel|physiquement)': 'on_site_required',
+            r'(?:à\s+distance|en\s+remote|télétravail)': 'remote_ok',
+            r'(?:urgent|rapidement|immédiatement)': 'urgent',
+            r'(?:budget\s+serré|petit\s+budget)': 'tight_budget',
+            r'(?:expérience\s+requise|expérimenté)': 'experience_required',
+            r'(?:certification|certifié|agréé)': 'certification_required',
+        }
+
     def normalize(self, text: str) -> NormalizedText:
         """Normalise le texte français et extrait les informations structurées"""
         
@@ -98,16 +121,7 @@ class TextNormalizer:
         """Extrait les contraintes du texte"""
         constraints = []
         
-        constraint_mapping = {
-            r'(?:sur\s+site|en\s+présentiel|physiquement)': 'on_site_required',
-            r'(?:à\s+distance|en\s+remote|télétravail)': 'remote_ok',
-            r'(?:urgent|rapidement|immédiatement)': 'urgent',
-            r'(?:budget\s+serré|petit\s+budget)': 'tight_budget',
-            r'(?:expérience\s+requise|expérimenté)': 'experience_required',
-            r'(?:certification|certifié|agréé)': 'certification_required',
-        }
-        
-        for pattern, constraint in constraint_mapping.items():
+        for pattern, constraint in self.constraint_mapping.items():
             if re.search(pattern, text, re.IGNORECASE):
                 constraints.append(constraint)
         
@@ -115,24 +129,12 @@ class TextNormalizer:
 
     def _extract_keywords(self, text: str) -> List[str]:
         """Extrait les mots-clés pertinents"""
-        # Mots vides français
-        stop_words = {
-            'le', 'la', 'les', 'un', 'une', 'des', 'du', 'de', 'et', 'ou', 'mais',
-            'car', 'si', 'ce', 'se', 'que', 'qui', 'quoi', 'dont', 'où', 'quand',
-            'comment', 'pourquoi', 'je', 'tu', 'il', 'elle', 'nous', 'vous', 'ils',
-            'elles', 'mon', 'ma', 'mes', 'ton', 'ta', 'tes', 'son', 'sa', 'ses',
-            'notre', 'nos', 'votre', 'vos', 'leur', 'leurs', 'dans', 'sur', 'avec',
-            'par', 'pour', 'sans', 'sous', 'vers', 'chez', 'contre', 'entre',
-            'pendant', 'avant', 'après', 'depuis', 'jusqu', 'avoir', 'être',
-            'faire', 'aller', 'venir', 'voir', 'savoir', 'pouvoir', 'vouloir',
-            'devoir', 'falloir', 'très', 'plus', 'moins', 'bien', 'mal', 'beaucoup'
-        }
         
         # Tokenisation simple
         words = re.findall(r'\b\w{3,}\b', text.lower())
         
         # Filtrage des mots vides et extraction des mots-clés
-        keywords = [word for word in words if word not in stop_words]
+        keywords = [word for word in words if word not in self.stop_words]
         
         # Déduplication en gardant l'ordre
         seen = set()
@@ -147,7 +149,7 @@ class TextNormalizer:
     def extract_price_indicators(self, text: str) -> List[Dict[str, any]]:
         """Extrait les indicateurs de prix du texte"""
         price_patterns = [
-            (r'(\d+(?:[.,]\d+)?)\s*€?\s*(?:/\s*h|par\s+heure|de\s+l[\'']heure)', 'hourly'),
+            (r'(\d+(?:[.,]\d+)?)\s*€?\s*(?:/\s*h|par\s+heure|de\s+l[\'’]heure)', 'hourly'),
             (r'(\d+(?:[.,]\d+)?)\s*€?\s*(?:/\s*jour|par\s+jour)', 'daily'),
             (r'(\d+(?:[.,]\d+)?)\s*€?\s*(?:forfait|global|total)', 'fixed'),
             (r'budget\s*:?\s*(\d+(?:[.,]\d+)?)\s*€?', 'budget_max'),
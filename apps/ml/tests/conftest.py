@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Les modules du service s'importent depuis apps/ml (from services.x import ...)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
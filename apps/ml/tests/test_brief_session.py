@@ -0,0 +1,129 @@
+import logging
+import random
+
+import pytest
+
+from main import (ProjectImproveRequest, brief_quality_analyzer, build_improvement, build_loc_inputs,
+                  build_loc_uplift_reco, loc_uplift_calculator, price_time_suggester, recompute_session)
+from services.brief_session import parse_budget_amount
+
+PHRASES = [
+    "Nous voulons un site web pour notre restaurant avec menu en ligne.",
+    "Refonte complète du site vitrine de l'entreprise, responsive et rapide.",
+    "Application mobile iphone et android avec chat et notifications.",
+    "Boutique en ligne avec paiement, espace admin et api de livraison.",
+    "Nouveau logo simple et charte graphique pour une association.",
+    "Outil interne de gestion des stocks, backend python et base de données",
+]
+ANSWERS = {
+    "objective": ["Augmenter les réservations de 20%", "Remplacer un fichier Excel partagé"],
+    "scope": ["Inclure menu, galerie et formulaire de contact", "Hors maintenance et hébergement"],
+    "requirements": ["Le site doit être responsive, backend simple", "Compatible avec notre ERP"],
+    "deliverables": ["Codes sources et documentation", "Fichiers PDF et SVG"],
+    "timeline": ["Avant fin mars", "Urgent, sous deux semaines"],
+    "budget": ["5 000 - 8 000 €", "Environ 3k€"],
+}
+
+
+@pytest.fixture(autouse=True)
+def quiet_logs():
+    logging.disable(logging.INFO)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+def _requests(n_briefs: int, rng: random.Random):
+    return [
+        ProjectImproveRequest(
+            title=f"Projet {i}",
+            description=" ".join(rng.sample(PHRASES, rng.randint(1, 3))) * rng.randint(1, 3),
+            budget_max=rng.choice([None, 1500, 5000])
+        )
+        for i in range(n_briefs)
+    ]
+
+
+def test_recompute_matches_full_analysis_of_concatenated_brief():
+    rng = random.Random(7)
+    for request in _requests(60, rng):
+        response, session = build_improvement(request)
+        assert session is not None
+        description = request.description
+        for missing in response.missing_info:
+            answer = {"id": missing["id"], "q": missing["q"], "a": rng.choice(ANSWERS[missing["id"]])}
+            description = f"{description}\n{missing['q']} {answer['a']}"
+            session, recomputed = recompute_session("test", session, [answer])
+
+            # Qualité : identique à l'analyse complète du brief concaténé
+            assert session.description == description
+            expected = brief_quality_analyzer.analyze(request.title, description)
+            assert session.quality == expected
+            assert brief_quality_analyzer.analyze_state(brief_quality_analyzer.build_state(request.title, description)) == expected
+            assert recomputed.brief_quality_score == expected.brief_quality_score
+            assert recomputed.richness_score == expected.richness_score
+
+            # Ce qui n'a pas été recalculé est à jour : prix et LOC depuis l'état de la session
+            price = price_time_suggester.suggest(
+                category=session.category,
+                sub_category=session.sub_category,
+                complexity='medium',
+                brief_quality_score=expected.brief_quality_score,
+                market_heat=session.market_heat,
+                constraints=list(session.quality_state.constraints)
+            )
+            assert session.price == price
+            loc_inputs = build_loc_inputs(
+                description=description,
+                category=session.category,
+                budget=session.budget,
+                brief_quality_score=expected.brief_quality_score,
+                price_suggestion=price,
+                missing_info=expected.missing_info,
+                heat_score=session.heat_score
+            )
+            loc_result = loc_uplift_calculator.calculate_loc_with_uplift(*loc_inputs)
+            assert session.loc_base == loc_result.loc_base
+            assert session.loc_uplift_reco == build_loc_uplift_reco(
+                loc_result, loc_uplift_calculator.evaluate_what_if(*loc_inputs)
+            )
+
+
+def test_recompute_answers_match_full_improve_scores():
+    rng = random.Random(11)
+    for request in _requests(20, rng):
+        response, session = build_improvement(request)
+        description = request.description
+        answers = [
+            {"id": missing["id"], "q": missing["q"], "a": rng.choice(ANSWERS[missing["id"]])}
+            for missing in response.missing_info
+        ]
+        for answer in answers:
+            description = f"{description}\n{answer['q']} {answer['a']}"
+        # Toutes les réponses d'un coup
+        _, recomputed = recompute_session("test", session, answers)
+        rerun, _ = build_improvement(request.model_copy(update={"description": description}))
+        assert recomputed.brief_quality_score == rerun.brief_quality_score
+        assert recomputed.richness_score == rerun.richness_score
+
+
+@pytest.mark.parametrize("answer, amount", [
+    ("5 000 - 15 000 €", 15000),
+    ("5\u00a0000 €", 5000),
+    ("Environ 3k€", 3000),
+    ("2.5k€", 2500),
+    ("12,5 k€", 12500),
+    ("> 15000€", 15000),
+    # Point séparateur de milliers (« 5.000 € ») : groupes d'exactement trois chiffres
+    ("5.000 €", 5000),
+    ("10.000€", 10000),
+    ("10.000 - 20.000 €", 20000),
+    ("1.500.000 €", 1500000),
+    ("1.250,50 €", 1250.5),
+    ("entre 1.5 et 2.000", 2000),
+    # Sinon le point reste décimal
+    ("1.5k", 1500),
+    ("3.14159", 3.14159),
+    ("Pas de budget", None),
+])
+def test_parse_budget_amount(answer, amount):
+    assert parse_budget_amount(answer) == amount
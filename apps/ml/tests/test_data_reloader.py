@@ -0,0 +1,42 @@
+from services.data_reloader import DataReloader
+
+
+def test_failed_reload_is_retried_until_it_succeeds(tmp_path):
+    path = tmp_path / "taxonomy.csv"
+    path.write_text("a,b\n")
+    outcomes = [False, True]
+    calls = []
+
+    def reload():
+        calls.append(path.read_text())
+        return outcomes[len(calls) - 1]
+
+    reloader = DataReloader(interval=0)
+    reloader.watch("taxonomy", path, reload)
+    path.write_text("a,b\nc,d\n")
+
+    assert reloader.check_now() == []
+    assert reloader.check_now() == ["taxonomy"]
+    assert len(calls) == 2
+    assert reloader.check_now() == []
+    assert len(calls) == 2
+
+
+def test_failed_append_only_reload_is_retried(tmp_path):
+    path = tmp_path / "events.jsonl"
+    path.write_text("")
+    outcomes = [False, True]
+    calls = []
+
+    def apply_events():
+        calls.append(True)
+        return outcomes[len(calls) - 1]
+
+    reloader = DataReloader(interval=0)
+    reloader.watch("events", path, apply_events, append_only=True)
+    path.write_text('{"id": 1}\n')
+
+    assert reloader.check_now() == []
+    assert reloader.check_now() == ["events"]
+    assert reloader.check_now() == []
+    assert len(calls) == 2
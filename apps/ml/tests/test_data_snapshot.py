@@ -0,0 +1,41 @@
+import pytest
+
+from services.data_snapshot import build_from_csv, load_compiled_taxonomy
+from services.taxonomizer import parse_taxonomy_csv
+
+TAXONOMY_CSV = """category,sub_category,skill,keywords
+développement,web,React,"react,frontend,spa"
+développement,web,Django,"django,python,backend"
+développement,mobile,Flutter,"flutter,android,ios"
+design,graphisme,Logo,"logo,identité,charte"
+"""
+PRICE_CSV = """category,sub_category,hourly_min,hourly_med,hourly_max,daily_min,daily_med,daily_max,complexity_factor,avg_days
+développement,web,35,55,85,280,440,680,1.2,18
+design,graphisme,30,45,70,240,360,560,1.0,10
+"""
+
+
+@pytest.fixture(scope="module")
+def data_path(tmp_path_factory):
+    data_path = tmp_path_factory.mktemp("data")
+    (data_path / "taxonomy_skills_fr.csv").write_text(TAXONOMY_CSV, encoding='utf-8')
+    (data_path / "price_terms_fr.csv").write_text(PRICE_CSV, encoding='utf-8')
+    build_from_csv(data_path, data_path / "reference.snapshot")
+    return data_path
+
+
+def _load(data_path):
+    return load_compiled_taxonomy(data_path / "reference.snapshot", data_path / "taxonomy_skills_fr.csv")
+
+
+def test_compiled_taxonomy_matches_csv(data_path):
+    parsed = parse_taxonomy_csv(data_path / "taxonomy_skills_fr.csv")
+    compiled = _load(data_path)
+    assert compiled.taxonomy_data == parsed.taxonomy_data
+    assert compiled.category_count == parsed.category_count
+
+
+def test_taxonomy_data_is_materialized_once_per_snapshot(data_path):
+    compiled = _load(data_path)
+    assert compiled.taxonomy_data is compiled.taxonomy_data
+    assert _load(data_path).taxonomy_data is not compiled.taxonomy_data
@@ -0,0 +1,62 @@
+import copy
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from enhancements.generator import GeneratorService
+
+TITLE = "Site vitrine"
+DESCRIPTION = "Site web pour notre restaurant avec menu en ligne et réservation."
+
+
+@pytest.fixture
+def service():
+    return GeneratorService(cache_size=8)
+
+
+def test_cached_payload_is_read_only(service):
+    payload, cached = service.generate_payload(TITLE, DESCRIPTION, "développement web")
+    assert not cached
+
+    with pytest.raises(TypeError):
+        payload["sow"]["livrables"] += ("Livrable ajouté",)
+    with pytest.raises(TypeError):
+        payload["templates"]["title_patterns"] = []
+    with pytest.raises(TypeError):
+        payload["variants"][0]["title"] = "modifié"
+    with pytest.raises(AttributeError):
+        payload["sow"]["jalons"].append("Jalon ajouté")
+
+
+def test_cached_payload_is_detached_from_templates(service):
+    category = "développement web"
+    templates = copy.deepcopy(service.templates)
+    sow_templates = copy.deepcopy(service.sow_templates)
+    payload, _ = service.generate_payload(TITLE, DESCRIPTION, category)
+
+    # La réponse est une copie : aucune valeur n'est un objet du template lui-même
+    for name, value in service.sow_templates[category].items():
+        assert payload["sow"].get(name) is not value
+    for name, value in service.templates[category].items():
+        assert payload["templates"].get(name) is not value
+
+    assert service.templates == templates
+    assert service.sow_templates == sow_templates
+
+    hit, cached = service.generate_payload(TITLE, DESCRIPTION, category)
+    assert cached and hit is payload
+
+
+def test_generate_endpoint_serializes_frozen_payload():
+    client = TestClient(main.app)
+    request = {"title": TITLE, "description": DESCRIPTION, "category": "développement web"}
+    first = client.post("/generate", json=request).json()
+    second = client.post("/generate", json=request).json()
+    assert first["success"] and second == first
+    assert isinstance(first["data"]["sow"]["livrables"], list)
+    assert isinstance(first["data"]["templates"], dict)
+
+    slim = client.post("/generate", json={**request, "slim": True}).json()
+    assert "templates" not in slim["data"]
+    assert slim["data"]["sow"] == first["data"]["sow"]
@@ -0,0 +1,79 @@
+import logging
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from services.brief_session import brief_session_store
+
+DESCRIPTION = (
+    "Nous voulons un site web vitrine pour notre restaurant italien avec menu en ligne, "
+    "galerie photos, formulaire de réservation, plan d'accès et espace d'administration "
+    "pour modifier les plats du jour. Le site doit être responsive et rapide."
+)
+
+
+@pytest.fixture
+def client():
+    logging.disable(logging.INFO)
+    main.improve_cache.clear()
+    yield TestClient(main.app)
+    main.improve_cache.clear()
+    logging.disable(logging.NOTSET)
+
+
+def _improve(client, description):
+    response = client.post("/improve", json={"title": "Site restaurant", "description": description})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_cache_hit_opens_session_on_received_brief(client):
+    _improve(client, DESCRIPTION)
+    edited = DESCRIPTION + " Merci."
+    hits = main.improve_cache.hits
+    result = _improve(client, edited)
+    assert main.improve_cache.hits == hits + 1
+
+    session = brief_session_store.get(result["session_id"])
+    assert session.description == edited
+    expected = main.brief_quality_analyzer.build_state("Site restaurant", edited)
+    assert session.quality_state == expected
+    assert session.quality == main.brief_quality_analyzer.analyze_state(expected)
+
+
+@pytest.mark.parametrize("source", ["rewriter_templates", "generator_templates", "taxonomy", "pricing"])
+def test_reloads_clear_improve_cache(client, source):
+    _improve(client, DESCRIPTION)
+    main.data_reloader._notify(source, "v2")
+    hits = main.improve_cache.hits
+    _improve(client, DESCRIPTION)
+    assert main.improve_cache.hits == hits
+
+
+QUALITY_FIELDS = ("constraints_std", "brief_quality_score", "richness_score", "missing_info", "price_suggested_min",
+                  "price_suggested_med", "price_suggested_max", "delay_suggested_days", "loc_base",
+                  "loc_uplift_reco", "reasons")
+
+
+def test_cache_hit_recomputes_quality_dependent_fields(client):
+    _improve(client, DESCRIPTION)
+    edited = DESCRIPTION + " Budget serré."
+    hits = main.improve_cache.hits
+    result = _improve(client, edited)
+    assert main.improve_cache.hits == hits + 1
+
+    # Mêmes valeurs qu'un /improve complet du brief reçu, et que sa session
+    request = main.ProjectImproveRequest(title="Site restaurant", description=edited)
+    expected, _ = main.build_improvement(request)
+    cached = _improve(client, DESCRIPTION)
+    assert (expected.brief_quality_score, expected.price_suggested_med, expected.loc_base) != (
+        cached["brief_quality_score"], cached["price_suggested_med"], cached["loc_base"])
+    for name in QUALITY_FIELDS:
+        assert result[name] == getattr(expected, name), name
+
+    session = brief_session_store.get(result["session_id"])
+    assert session.quality.brief_quality_score == result["brief_quality_score"]
+    assert session.price.price_suggested_med == result["price_suggested_med"]
+    assert session.loc_base == result["loc_base"]
+    assert session.loc_uplift_reco == result["loc_uplift_reco"]
@@ -0,0 +1,87 @@
+import random
+
+import pytest
+
+from services.brief_quality import BriefQualityAnalyzer
+
+PHRASES = [
+    "Nous voulons un site web pour notre restaurant avec menu en ligne.",
+    "L'objectif est d'augmenter les réservations de 20% avant l'été.",
+    "Le périmètre doit inclure la galerie, le formulaire de contact et un espace admin.",
+    "Livrables attendus : codes sources, documentation et formation.",
+    "Budget prévisionnel de 5 000 €, délai de 6 semaines, télétravail possible.",
+    "Application mobile responsive avec api et backend python.",
+    "Surface de 5 mètres carrés, URGENT, pas de week-end.",
+]
+CHARACTERS = "abcdefghijklmnopqrstuvwxyzéèÉ ,.:;'%€0123456789\n"
+# Minuscules qui changent de longueur (« İ » -> « i̇ ») ou dépendent des voisins (sigma final)
+UNICODE_PHRASES = PHRASES + ["Agence à İstanbul, budget de 3 000 €.", "Site du restaurant ΟΔΟΣ ΣΙΣΥΦΟΣ, délai 2 mois."]
+UNICODE_CHARACTERS = CHARACTERS + "İΣ"
+
+
+@pytest.fixture(scope="module")
+def analyzer():
+    return BriefQualityAnalyzer()
+
+
+def _edit(live, rng: random.Random, phrases=PHRASES, characters=CHARACTERS):
+    """(start, end, texte, champ) : frappe, effacement, remplacement ou collage n'importe où"""
+    field = 'title' if rng.random() < 0.1 else 'description'
+    length = len(live.title if field == 'title' else live.description)
+    start = rng.choice([length, rng.randint(0, length)])
+    draw = rng.random()
+    if draw < 0.5:
+        return start, start, rng.choice(characters), field
+    if draw < 0.75:
+        begin = max(0, start - rng.randint(1, 12))
+        return begin, start, "", field
+    if draw < 0.9:
+        # Collage d'une phrase (ou d'un morceau de mot-clé) au milieu du texte
+        phrase = rng.choice(phrases)
+        piece = phrase[rng.randint(0, len(phrase) - 1):]
+        return start, min(length, start + rng.randint(0, 15)), rng.choice([phrase, piece]), field
+    return 0, length, rng.choice(["", rng.choice(phrases)]), field
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_incremental_analyzer_matches_full_analyze(analyzer, seed):
+    rng = random.Random(seed)
+    title = rng.choice(["Site vitrine restaurant", "", "Application mobile"])
+    description = " ".join(rng.choice(PHRASES) for _ in range(rng.randint(0, 6)))
+    live = analyzer.live(title, description)
+    for _ in range(300):
+        live.apply_edit(*_edit(live, rng))
+        assert live.state() == analyzer.build_state(live.title, live.description)
+        assert live.analysis() == analyzer.analyze(live.title, live.description)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_incremental_analyzer_matches_full_analyze_with_unicode_case(analyzer, seed):
+    rng = random.Random(seed)
+    live = analyzer.live(rng.choice(["Agence İstanbul", "ΟΔΟΣ", ""]), rng.choice(UNICODE_PHRASES))
+    for _ in range(300):
+        live.apply_edit(*_edit(live, rng, UNICODE_PHRASES, UNICODE_CHARACTERS))
+        assert live.state() == analyzer.build_state(live.title, live.description)
+        assert live.analysis() == analyzer.analyze(live.title, live.description)
+
+
+def test_append_and_reset_match_full_analyze(analyzer):
+    live = analyzer.live()
+    text = ""
+    for phrase in PHRASES:
+        for char in phrase + " ":
+            live.append(char)
+            text += char
+    assert live.description == text
+    assert live.analysis() == analyzer.analyze("", text)
+
+    live.reset("Refonte", PHRASES[0])
+    assert live.analysis() == analyzer.analyze("Refonte", PHRASES[0])
+
+
+def test_apply_edit_rejects_invalid_ranges(analyzer):
+    live = analyzer.live("Titre", "abc")
+    with pytest.raises(ValueError):
+        live.apply_edit(2, 5, "x")
+    with pytest.raises(ValueError):
+        live.apply_edit(0, 0, "x", field="category")
@@ -0,0 +1,100 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from services.loc_uplift import UPLIFT_ACTIONS, LOCUpliftCalculator
+
+CATEGORIES = ['developpement', 'développement', 'développement mobile', 'web-development', 'mobile', 'design',
+              'marketing', 'travaux', 'ménage', 'autre', '']
+DESCRIPTIONS = [
+    "Site vitrine pour un cabinet d'avocats",
+    "Application mobile urgente de réservation",
+    "Refonte du logo, pas pressé",
+    "Campagne SEO à lancer vite",
+    "Rénovation salle de bain, flexible sur les dates",
+    "",
+]
+
+
+@pytest.fixture(scope="module")
+def calculator():
+    return LOCUpliftCalculator()
+
+
+def _columns(n: int, rng: random.Random):
+    # Prix médian absent (NaN), nul, entier ou flottant ; budgets autour des seuils de ratio
+    med = [rng.choice([math.nan, 0, 800, 3000, 12000, round(rng.uniform(300, 9000), 2)]) for _ in range(n)]
+    reference = [0 if math.isnan(m) else m for m in med]
+    return {
+        'budget': [rng.choice([0, round(m * rng.choice([0.5, 0.8, 1.0, 1.2, rng.uniform(0.3, 1.8)]), 2), rng.randint(0, 9000)])
+                   for m in reference],
+        'category': [rng.choice(CATEGORIES) for _ in range(n)],
+        'description': [rng.choice(DESCRIPTIONS) for _ in range(n)],
+        'client_id': [rng.choice([None, '', f"client-{rng.randrange(50)}"]) for _ in range(n)],
+        'brief_quality_score': [rng.choice([round(rng.random(), 3), 0.8, 0.5595]) for _ in range(n)],
+        'price_suggested_min': [round(m * rng.choice([0, 0.7])) for m in reference],
+        'price_suggested_med': med,
+        'price_suggested_max': [round(m * rng.choice([0, 1.3])) for m in reference],
+        'heat_score': [round(rng.random(), 2) for _ in range(n)],
+        'missing_info_count': [rng.randrange(3) for _ in range(n)],
+    }
+
+
+def _scalar(calculator, columns, i):
+    med = columns['price_suggested_med'][i]
+    project_data = {name: columns[name][i] for name in ('budget', 'category', 'description', 'client_id')}
+    standardization_data = {
+        'brief_quality_score': columns['brief_quality_score'][i],
+        'price_suggested_min': columns['price_suggested_min'][i],
+        'price_suggested_max': columns['price_suggested_max'][i],
+        'missing_info': [None] * columns['missing_info_count'][i]
+    }
+    market_context = {'heat_score': columns['heat_score'][i]}
+    if not math.isnan(med):
+        standardization_data['price_suggested_med'] = med
+        market_context['price_suggested_med'] = med
+    return calculator.calculate_loc_with_uplift(project_data, standardization_data, market_context)
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_score_batch_matches_scalar_path(calculator, seed):
+    columns = _columns(400, random.Random(seed))
+    scores = calculator.score_batch(columns, top_actions=len(UPLIFT_ACTIONS))
+
+    for i in range(len(columns['budget'])):
+        result = _scalar(calculator, columns, i)
+        assert scores['loc'][i] == result.loc_base
+        assert scores['potential_loc'][i] == pytest.approx(result.loc_uplift_reco['potential_final_loc'])
+
+        # Leviers : mêmes types et mêmes gains, dans l'ordre décroissant des gains
+        expected = {action['type']: action['expected_loc_improvement'] for action in result.loc_uplift_reco['actions']}
+        batch = {
+            UPLIFT_ACTIONS[index]: gain
+            for index, gain in zip(scores['top_actions'][i], scores['top_action_gains'][i]) if index >= 0
+        }
+        assert batch == pytest.approx(expected)
+
+    assert np.array_equal(scores['ranking'], np.argsort(-scores['loc'], kind='stable'))
+
+
+def test_score_batch_defaults_match_scalar_defaults(calculator):
+    # Colonnes absentes : mêmes défauts que le calcul unitaire
+    scores = calculator.score_batch({'budget': [0, 500, 2000]})
+    for i, budget in enumerate([0, 500, 2000]):
+        assert scores['loc'][i] == calculator._calculate_base_loc({'budget': budget}, {}, {})
+
+
+@pytest.mark.parametrize("category, demand", [
+    ('développement', 0.8),
+    ('Développement web', 0.8),
+    ('développement mobile', 0.7),
+    ('web-development', 0.8),
+    ('design graphique', 0.6),
+    ('ménage', 0.8),
+    ('autre', 0.6),
+    ('', 0.6),
+])
+def test_category_demand_folds_accents(calculator, category, demand):
+    assert calculator._assess_category_demand(category) == demand
@@ -0,0 +1,105 @@
+import math
+import random
+
+import pytest
+
+from services.loc_uplift import LOCUpliftCalculator
+
+
+@pytest.fixture(scope="module")
+def calculator():
+    return LOCUpliftCalculator()
+
+
+def _mission(rng: random.Random):
+    suggested_min = rng.choice([0, 0, rng.randint(1, 60) * 100, rng.uniform(100, 6000)])
+    suggested_med = rng.choice([rng.randint(10, 80) * 100, rng.uniform(500, 8000)])
+    project_data = {
+        'budget': rng.choice([0, rng.randint(0, 100) * 50, round(rng.uniform(0, 9000), 1)]),
+        'category': rng.choice(['developpement', 'design', 'autre']),
+        'description': rng.choice(['urgent', '', 'flexible'])
+    }
+    standardization_data = {
+        'brief_quality_score': round(rng.random(), 3),
+        'price_suggested_min': suggested_min,
+        'price_suggested_max': max(suggested_min, suggested_med) * rng.choice([1.0, 1.3, 1.6]),
+        'delay_suggested_days': 21
+    }
+    market_context = {'price_suggested_med': suggested_med, 'heat_score': round(rng.random(), 3)}
+    return project_data, standardization_data, market_context
+
+
+def _candidate_budgets(project_data, standardization_data, market_context):
+    """Budget actuel, grille régulière et voisins flottants des seuils de prix"""
+    budget = project_data['budget']
+    suggested_min = standardization_data['price_suggested_min']
+    suggested_med = market_context['price_suggested_med']
+    top = 1.5 * max(suggested_med, suggested_min) + 10
+    step = suggested_med / 40
+    budgets = {budget} | {budget + k * step for k in range(int((top - budget) / step) + 1)}
+    for threshold in (0.8 * suggested_med, suggested_med, 1.2 * suggested_med, suggested_min, suggested_min * 0.8):
+        for direction in (-math.inf, math.inf):
+            value = threshold
+            for _ in range(3):
+                budgets.add(value)
+                value = math.nextafter(value, direction)
+    return sorted(value for value in budgets if value >= budget)
+
+
+def _loc(calculator, project_data, standardization_data, market_context, budget):
+    return calculator._calculate_base_loc({**project_data, 'budget': budget}, standardization_data, market_context)
+
+
+def test_budget_only_is_minimal_budget(calculator):
+    rng = random.Random(7)
+    for _ in range(150):
+        mission = _mission(rng)
+        target = round(rng.uniform(0.3, 0.95), 2)
+        result = calculator.solve_target_loc(*mission, target)
+        first_feasible = next(
+            (budget for budget in _candidate_budgets(*mission)
+             if _loc(calculator, *mission, budget) >= target - 1e-9),
+            None
+        )
+
+        option = result['budget_only']
+        if option is None:
+            assert first_feasible is None
+            continue
+        assert option['loc'] == _loc(calculator, *mission, option['budget'])
+        assert option['loc'] >= target - 1e-9
+        assert first_feasible is None or first_feasible >= option['budget']
+
+
+def test_combined_options_reach_target(calculator):
+    rng = random.Random(11)
+    for _ in range(100):
+        project_data, standardization_data, market_context = _mission(rng)
+        target = round(rng.uniform(0.3, 0.95), 2)
+        result = calculator.solve_target_loc(project_data, standardization_data, market_context, target)
+        for option in result['combined']:
+            base = _loc(calculator, project_data, standardization_data, market_context, option['budget'])
+            assert option['loc'] >= target - 1e-9
+            assert option['loc'] >= base
+
+
+def test_budget_axis_without_suggested_minimum(calculator):
+    # /loc/target ne fournit pas toujours de fourchette : la compétitivité prix reste améliorable
+    result = calculator.solve_target_loc(
+        {'budget': 1000, 'category': 'developpement'},
+        {'brief_quality_score': 0.5, 'price_suggested_min': 0, 'price_suggested_max': 0},
+        {'price_suggested_med': 5000, 'heat_score': 0.5},
+        0.6
+    )
+    assert result['budget_only'] is not None
+    assert result['budget_only']['budget'] == 6000.0
+
+
+def test_budget_not_bucketed_by_quality(calculator):
+    result = calculator.solve_target_loc(
+        {'budget': 999.5, 'category': 'developpement'},
+        {'brief_quality_score': 0.788, 'price_suggested_min': 3000, 'price_suggested_max': 8000},
+        {'price_suggested_med': 5000, 'heat_score': 0.368},
+        0.6
+    )
+    assert result['budget_only']['budget'] == 3000.0
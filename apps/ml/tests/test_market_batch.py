@@ -0,0 +1,42 @@
+import random
+
+import pytest
+
+from services.market_intelligence import MarketIntelligenceService, extract_market_flags
+from services.market_stats import MarketStatsEngine
+
+TAXONOMY_CATEGORIES = ['web-development', 'mobile-development', 'développement', 'design', 'marketing',
+                       'travaux', 'services', 'services_personne', 'data-science', 'consulting', 'inconnue']
+DESCRIPTIONS = ["Site vitrine", "Refonte urgente de la boutique", "Application premium", "Logo haut de gamme urgent"]
+
+
+@pytest.fixture(scope="module")
+def service(tmp_path_factory):
+    data_path = tmp_path_factory.mktemp("market")
+    return MarketIntelligenceService(data_path=str(data_path), stats_engine=MarketStatsEngine(data_path=str(data_path)))
+
+
+def test_taxonomy_categories_resolve_to_reference_markets(service):
+    default = service._get_default_suggestion()
+    for category in ['web-development', 'mobile-development', 'développement', 'services']:
+        suggestion = service.get_market_suggestions(category, "Site vitrine")
+        assert suggestion.suggested_budget_min != default.suggested_budget_min or \
+            suggestion.available_providers != default.available_providers
+
+
+def test_batch_matches_scalar_path(service):
+    rng = random.Random(3)
+    categories = [rng.choice(TAXONOMY_CATEGORIES) for _ in range(300)]
+    descriptions = [rng.choice(DESCRIPTIONS) for _ in range(300)]
+    complexities = [rng.choice(['low', 'medium', 'high', 'very_high', 'autre']) for _ in range(300)]
+    urgent, premium = extract_market_flags(descriptions)
+
+    batch = service.get_market_suggestions_batch(categories, complexities, urgent, premium)
+    for i, (category, description, complexity) in enumerate(zip(categories, descriptions, complexities)):
+        expected = service.get_market_suggestions(category, description, complexity)
+        assert batch['suggested_budget_min'][i] == expected.suggested_budget_min
+        assert batch['suggested_budget_max'][i] == expected.suggested_budget_max
+        assert batch['suggested_timeline'][i] == expected.suggested_timeline
+        assert batch['available_providers'][i] == expected.available_providers
+        assert batch['pricing_confidence'][i] == expected.pricing_confidence
+        assert batch['market_advice'][i] == expected.market_advice
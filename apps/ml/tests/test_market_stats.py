@@ -0,0 +1,73 @@
+import json
+import logging
+
+import pytest
+
+from services.market_stats import MarketStatsEngine
+
+DESCRIPTIONS = [
+    "Création d'un site vitrine pour un cabinet d'avocats à Lyon avec prise de rendez-vous en ligne",
+    "Application mobile de réservation pour un salon de coiffure avec paiement et rappels par SMS",
+    "Refonte du logo et de la charte graphique d'une association sportive de quartier",
+]
+
+
+@pytest.fixture(autouse=True)
+def quiet_logs():
+    logging.disable(logging.INFO)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+def _append(path, events):
+    with open(path, "a", encoding="utf-8") as f:
+        for event in events:
+            f.write(json.dumps(event) + "\n")
+
+
+def _mission(mission_id, description):
+    return {"type": "mission", "mission_id": mission_id, "category": "development", "budget": 1000,
+            "ts": 1_700_000_000 + mission_id, "description": description}
+
+
+@pytest.fixture
+def engine_path(tmp_path):
+    _append(tmp_path / "market_events.jsonl", [_mission(i, text) for i, text in enumerate(DESCRIPTIONS, 1)])
+    return tmp_path
+
+
+def test_checkpoint_keeps_dedupe_index_out_of_pickle(engine_path):
+    engine = MarketStatsEngine(data_path=str(engine_path))
+    assert len(engine.duplicates) == len(DESCRIPTIONS)
+    assert engine.checkpoint()
+    assert b"MinHashLSH" not in (engine_path / "market_stats.ckpt").read_bytes()
+
+    restored = MarketStatsEngine(data_path=str(engine_path))
+    assert restored.events_applied == len(DESCRIPTIONS)
+    assert list(restored.duplicates._signatures) == [str(i) for i in range(1, len(DESCRIPTIONS) + 1)]
+    for key, signature in engine.duplicates._signatures.items():
+        assert (restored.duplicates._signatures[str(key)] == signature).all()
+
+    # Une republication retouchée d'une mission d'avant le checkpoint reste détectée
+    _append(engine_path / "market_events.jsonl", [_mission(10, DESCRIPTIONS[0] + " urgent")])
+    restored.apply_events()
+    assert restored.duplicates_skipped == 1
+    assert restored.get_stats()['categories']['development']['missions'] == len(DESCRIPTIONS)
+
+
+def test_stale_dedupe_index_is_not_restored(engine_path):
+    engine = MarketStatsEngine(data_path=str(engine_path))
+    assert engine.checkpoint()
+    dedupe = (engine_path / "market_dedupe.npz").read_bytes()
+
+    _append(engine_path / "market_events.jsonl", [_mission(5, "Traduction d'un catalogue produits en anglais")])
+    engine.apply_events()
+    assert engine.checkpoint()
+    # Index d'un checkpoint antérieur : ignoré plutôt que mélangé au nouveau
+    (engine_path / "market_dedupe.npz").write_bytes(dedupe)
+    assert len(MarketStatsEngine(data_path=str(engine_path)).duplicates) == 0
+
+    (engine_path / "market_dedupe.npz").write_bytes(b"pas un npz")
+    restored = MarketStatsEngine(data_path=str(engine_path))
+    assert restored.events_applied == len(DESCRIPTIONS) + 1
+    assert len(restored.duplicates) == 0
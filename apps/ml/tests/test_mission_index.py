@@ -0,0 +1,87 @@
+import json
+import os
+
+import pytest
+
+from services import mission_index as mission_index_module
+from services.mission_index import MissionIndex
+
+
+def _write_events(path, missions, mode='a'):
+    with open(path, mode, encoding='utf-8') as f:
+        for mission in missions:
+            f.write(json.dumps(mission) + "\n")
+
+
+def _mission(i, category='web'):
+    return {'mission_id': f"m{i}", 'category': category, 'title': f"Site vitrine {i}",
+            'description': "site vitrine responsive restaurant", 'final_price': 1000 + i}
+
+
+def _ids(index):
+    return sorted(mission_id for partition in index.partitions.values() for mission_id in partition.ids)
+
+
+@pytest.fixture
+def data_path(tmp_path):
+    _write_events(tmp_path / "completed_missions.jsonl", [_mission(i) for i in range(5)], mode='w')
+    return tmp_path
+
+
+def test_save_and_load_round_trip(data_path):
+    index = MissionIndex(data_path=str(data_path))
+    assert index.save()
+
+    reloaded = MissionIndex(data_path=str(data_path))
+    assert _ids(reloaded) == _ids(index)
+    assert reloaded.search("site vitrine restaurant", 'web', k=2)
+
+
+def test_crash_before_state_file_does_not_duplicate_entries(data_path, monkeypatch):
+    index = MissionIndex(data_path=str(data_path))
+    assert index.save()
+
+    # Nouvelles missions indexées, arrêt brutal entre les partitions et index.json
+    _write_events(data_path / "completed_missions.jsonl", [_mission(i) for i in range(5, 8)])
+    index.apply_events()
+    monkeypatch.setattr(mission_index_module.os, 'replace', _fail_on_state_file(os.replace))
+    assert not index.save()
+    monkeypatch.undo()
+
+    reloaded = MissionIndex(data_path=str(data_path))
+    assert _ids(reloaded) == sorted(f"m{i}" for i in range(8))
+
+
+def _fail_on_state_file(replace):
+    def fail(source, destination):
+        if str(destination).endswith("index.json"):
+            raise OSError("arrêt simulé")
+        return replace(source, destination)
+    return fail
+
+
+def test_replaced_log_invalidates_saved_index(data_path):
+    MissionIndex(data_path=str(data_path)).save()
+
+    # Journal remplacé (rotation) : même taille possible, autre inode
+    events_file = data_path / "completed_missions.jsonl"
+    replacement = data_path / "rotated.jsonl"
+    _write_events(replacement, [_mission(i, 'design') for i in range(2)], mode='w')
+    os.replace(replacement, events_file)
+
+    reloaded = MissionIndex(data_path=str(data_path))
+    assert list(reloaded.partitions) == ['design']
+    assert _ids(reloaded) == ['m0', 'm1']
+
+
+def test_previous_generations_are_removed(data_path):
+    index = MissionIndex(data_path=str(data_path))
+    index.save()
+    _write_events(data_path / "completed_missions.jsonl", [_mission(9)])
+    index.apply_events()
+    index.save()
+
+    files = sorted(path.name for path in index.index_dir.iterdir())
+    state = json.loads((index.index_dir / "index.json").read_text(encoding='utf-8'))
+    assert [name for name in files if name.endswith('.npz')] == sorted(state['partitions'].values())
+    assert not [name for name in files if name.endswith('.tmp')]
@@ -0,0 +1,44 @@
+import pytest
+
+from services.nlp_provider import NLPProvider
+
+TEXTS = [
+    "Nous souhaitons créer un site e-commerce en React avec paiement Stripe.",
+    "Refonte du logo et de la charte graphique de l'entreprise à Lyon.",
+    "Application mobile Flutter pour la prise de rendez-vous.",
+]
+
+
+def test_importing_the_app_does_not_load_the_model():
+    import main
+
+    from services.smart_brief import SmartBriefProcessor
+
+    SmartBriefProcessor()
+    # Ni l'import de l'application ni la création d'un service ne chargent le modèle
+    assert main.nlp_provider.get_stats()['loaded'] is False
+
+
+def test_unavailable_model_falls_back_to_none():
+    provider = NLPProvider(model_name="modele_inexistant")
+    assert provider("texte") is None
+    assert list(provider.pipe(TEXTS)) == []
+    assert provider.get_stats()['loaded'] is False
+
+
+@pytest.fixture(scope="module")
+def provider():
+    provider = NLPProvider(batch_size=2)
+    if provider.get() is None:
+        pytest.skip("modèle spaCy indisponible")
+    return provider
+
+
+def test_pipe_matches_single_calls(provider):
+    assert "parser" not in provider.get().pipe_names
+    single = [[(token.text, token.lemma_, token.pos_) for token in provider(text)] for text in TEXTS]
+    batched = [[(token.text, token.lemma_, token.pos_) for token in doc] for doc in provider.pipe(TEXTS)]
+    assert batched == single
+    # NER désactivé par défaut, disponible sur demande
+    assert provider(TEXTS[1]).ents == ()
+    assert "Lyon" in [ent.text for ent in provider(TEXTS[1], with_ner=True).ents]
@@ -0,0 +1,117 @@
+import random
+
+import numpy as np
+import pytest
+
+from enhancements.questioner import Question, QuestionerService
+
+CATEGORIES = ["budget", "timeline", "quality", "tech_constraints", "context"]
+DESCRIPTIONS = [
+    "Site vitrine premium, budget 3000€",
+    "Application mobile urgente",
+    "Refonte du logo",
+    "Plateforme complexe de qualité, urgent",
+    "",
+]
+BUDGETS_MS = (1.0, 2.0, 5.0, 10.0)
+
+
+def _bank(n_questions: int, rng: random.Random):
+    # Banque aléatoire : VoI arrondies (nombreux ex aequo), quelques questions à options (synergies)
+    return QuestionerService().question_bank + [
+        Question(text=f"Question {i}", type="text", options=None, importance=round(rng.random(), 2),
+                 voi=round(rng.random(), 1), category=rng.choice(CATEGORIES))
+        for i in range(n_questions)
+    ]
+
+
+def _briefs(n: int, rng: random.Random):
+    cases = []
+    for _ in range(n):
+        brief = {"description": rng.choice(DESCRIPTIONS),
+                 "structured": {"estimated_complexity": rng.randint(1, 10)}}
+        answers = {}
+        if rng.random() < 0.3:
+            answers["budget"] = rng.choice(["500-1500€", "5000-15000€", "> 15000€"])
+        if rng.random() < 0.3:
+            answers["timeline"] = rng.choice(["Urgent (< 1 semaine)", "Flexible (> 1 mois)"])
+        cases.append((brief, answers))
+    return cases
+
+
+@pytest.fixture(scope="module")
+def large_service():
+    return QuestionerService(_bank(3000, random.Random(3000)))
+
+
+def test_plan_respects_time_budget(large_service):
+    # Une préemption du processus peut allonger une étape : chaque plan a droit à cinq essais,
+    # un dépassement systématique (étape lancée sans vérifier l'échéance) échoue à chacun
+    for budget in BUDGETS_MS:
+        for brief, answers in _briefs(30, random.Random(int(budget))):
+            elapsed = [large_service.plan_questions(brief, answers, 5, time_budget_ms=budget).elapsed_ms
+                       for _ in range(5)]
+            assert min(elapsed) <= budget, (budget, elapsed)
+
+
+def test_zero_budget_plans_from_cached_ranking_only(large_service):
+    brief, answers = {"description": "Boutique en ligne"}, {"budget": "500-1500€"}
+    plan = large_service.plan_questions(brief, answers, 5, time_budget_ms=0)
+    assert plan.truncated and plan.states_evaluated == 0 and plan.questions == []
+
+    # Classement glouton mémorisé : repris sans évaluation, une question par catégorie
+    greedy = large_service.select_next_questions(brief, answers, 5)
+    plan = large_service.plan_questions(brief, answers, 5, time_budget_ms=0)
+    assert plan.states_evaluated == 0
+    assert plan.questions
+    assert all(any(question is asked for asked in greedy) for question in plan.questions)
+    assert len({question.category for question in plan.questions}) == len(plan.questions)
+
+
+@pytest.mark.parametrize("bank_size", [0, 300])
+def test_plan_asks_one_question_per_category(bank_size):
+    rng = random.Random(bank_size)
+    service = QuestionerService(_bank(bank_size, rng)) if bank_size else QuestionerService()
+    for brief, answers in _briefs(40, rng):
+        for budget in (0.0, 0.5, 2.0, 1e6):
+            plan = service.plan_questions(brief, answers, rng.randint(1, 6), time_budget_ms=budget)
+            categories = [question.category for question in plan.questions]
+            assert len(set(categories)) == len(categories)
+            assert not set(categories) & set(answers)
+        # Sans contrainte de temps : autant de questions que de catégories non répondues
+        plan = service.plan_questions(brief, answers, 5, time_budget_ms=1e6)
+        assert not plan.truncated
+        assert len(plan.questions) == len(CATEGORIES) - len(answers)
+
+
+def test_distinct_categories_matches_full_ranking():
+    # Référence : parcours du classement complet (tri stable), première question de chaque catégorie
+    rng = np.random.default_rng(7)
+    service = QuestionerService(_bank(500, random.Random(7)))
+    for _ in range(200):
+        expected = rng.integers(0, 4, len(service.question_bank)) / 4
+        expected[rng.random(len(expected)) < 0.2] = -np.inf
+        count = int(rng.integers(1, 7))
+        reference, seen = [], set()
+        for question in np.argsort(-expected, kind="stable"):
+            category = service.arrays.category_ids[question]
+            if expected[question] > -np.inf and category not in seen and len(reference) < count:
+                seen.add(category)
+                reference.append(int(question))
+        assert service._distinct_categories(expected, count) == reference
+
+
+def test_top_questions_partition_matches_stable_sort():
+    # argpartition (full_sort_below=0) et tri complet stable : mêmes indices, ex aequo dans l'ordre de la banque
+    rng = np.random.default_rng(46)
+    for _ in range(300):
+        n_rows, n_questions = int(rng.integers(1, 6)), int(rng.integers(1, 400))
+        voi = rng.integers(0, int(rng.integers(1, 6)), (n_rows, n_questions)) / 4
+        voi[rng.random(voi.shape) < rng.random()] = -np.inf
+        k = int(rng.integers(0, n_questions + 2))
+        reference = [
+            [int(i) for i in row[:k] if values[i] > -np.inf]
+            for row, values in zip(np.argsort(-voi, axis=1, kind="stable"), voi)
+        ]
+        assert QuestionerService.top_questions(voi, k, full_sort_below=0) == reference
+        assert QuestionerService.top_questions(voi, k, full_sort_below=n_questions + 1) == reference
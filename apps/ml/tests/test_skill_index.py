@@ -0,0 +1,47 @@
+import pytest
+
+from enhancements.normalize import NormalizeService
+
+
+@pytest.fixture(scope="module")
+def service():
+    return NormalizeService()
+
+
+def _extracted(service, text):
+    return {match.skill for match in service.skill_index.extract(text)}
+
+
+@pytest.mark.parametrize("text", [
+    "Site réactif et angulaire avec une illustration, deux vues",
+    "Nous élevons des pythons",
+    "Une vue principale, la production et l'information du public",
+    "Le site doit être réactive et la revue des figures précise",
+])
+def test_french_words_are_not_skills(service, text):
+    assert _extracted(service, text) == set()
+    assert service._extract_skills(text) == []
+
+
+def test_multi_word_window_does_not_swallow_neighbours(service):
+    matches = service.skill_index.extract("Backend en nodejs et base SQL")
+    assert [(match.skill, match.token) for match in matches] == [("Node.js", "nodejs")]
+
+
+@pytest.mark.parametrize("text, skills", [
+    ("Site en reactjs et wordpres", {"React", "WordPress"}),
+    ("Campagne google adds et facebok ads", {"Google Ads", "Facebook Ads"}),
+    ("Du typescipt, du javscript et du phtoshop", {"TypeScript", "JavaScript", "Photoshop"}),
+    ("Front en vue js, API en Node js, scripts en Python", {"Vue.js", "Node.js", "Python"}),
+])
+def test_typos_and_variants_are_still_found(service, text, skills):
+    assert _extracted(service, text) == skills
+    assert set(service._extract_skills(text)) == skills
+
+
+def test_short_words_are_never_corrected(service):
+    index = service.skill_index
+    assert index.lookup("reac", limit=1) == []
+    assert index.lookup("pyton", limit=1) == []
+    assert index.lookup("pythn", limit=1) == []
+    assert [match.skill for match in index.lookup("pythonn", limit=1)] == ["Python"]
@@ -0,0 +1,49 @@
+import copy
+
+import pytest
+
+from services.template_rewriter import TemplateRewriter
+
+DESCRIPTION = "Site vitrine pour notre restaurant avec réservation en ligne et menu."
+
+
+@pytest.fixture
+def rewriter():
+    return TemplateRewriter(skeleton_cache_size=8)
+
+
+def _rewrite(rewriter):
+    return rewriter.rewrite_project("Site restaurant", DESCRIPTION, "développement", skills=["React"])
+
+
+def _plain(result):
+    return (list(result.acceptance_criteria), [dict(task) for task in result.tasks_std],
+            [dict(deliverable) for deliverable in result.deliverables_std])
+
+
+def test_shared_skeleton_is_read_only(rewriter):
+    result = _rewrite(rewriter)
+    expected = _plain(result)
+
+    with pytest.raises(AttributeError):
+        result.acceptance_criteria.append("Critère ajouté")
+    with pytest.raises(TypeError):
+        result.tasks_std[0]["estimated_hours"] = 0
+    with pytest.raises(TypeError):
+        result.deliverables_std[0]["name"] = "modifié"
+
+    hits = rewriter.skeleton_hits
+    again = _rewrite(rewriter)
+    assert rewriter.skeleton_hits == hits + 1
+    assert _plain(again) == expected
+
+
+def test_skeleton_is_detached_from_templates(rewriter):
+    templates = copy.deepcopy(rewriter.templates)
+    result = _rewrite(rewriter)
+    compiled = rewriter._compiled.templates
+    for template in compiled.values():
+        assert not any(task is compiled_task for task in result.tasks_std
+                       for tasks in template.tasks.values() for compiled_task in tasks)
+        assert not any(item is deliverable for item in result.deliverables_std for deliverable in template.deliverables)
+    assert rewriter.templates == templates